@@ -32,6 +32,7 @@ import (
 	clientgoscheme "k8s.io/client-go/kubernetes/scheme"
 	ctrlrt "sigs.k8s.io/controller-runtime"
 	ctrlrtcache "sigs.k8s.io/controller-runtime/pkg/cache"
+	ctrlrtconfig "sigs.k8s.io/controller-runtime/pkg/config"
 	ctrlrthealthz "sigs.k8s.io/controller-runtime/pkg/healthz"
 	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
 	metricsserver "sigs.k8s.io/controller-runtime/pkg/metrics/server"
@@ -43,6 +44,10 @@ import (
 	_ "github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/resource/scalable_target"
 	_ "github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/resource/scaling_policy"
 
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/cachetrim"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/sharding"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/statuspatch"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
 	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/version"
 )
 
@@ -112,13 +117,38 @@ func main() {
 		)
 		os.Exit(1)
 	}
+	shardCfg := sharding.ConfigFromEnv("ack-"+awsServiceAlias, ackCfg.LeaderElectionNamespace)
+	if shardCfg.Enabled() && ackCfg.EnableLeaderElection {
+		// Every replica is active when sharded; the shard leases take the
+		// place of the leader lease
+		setupLog.Info(
+			"leader election is disabled in sharded mode",
+			"aws.service", awsServiceAlias,
+		)
+	}
+	// The priority queue reconciles resources that were created or changed
+	// ahead of the unchanged ones delivered by the initial list and by
+	// informer resyncs
+	usePriorityQueue := tuning.Bool(tuning.EnvPriorityQueue, true)
+	cacheOptions := ctrlrtcache.Options{
+		Scheme:               scheme,
+		DefaultNamespaces:    watchNamespaces,
+		DefaultLabelSelector: watchSelectors,
+	}
+	if cachetrim.Enabled() {
+		cachetrim.Apply(
+			&cacheOptions,
+			&svctypes.ScalableTarget{},
+			&svctypes.ScalingPolicy{},
+		)
+	}
 	mgr, err := ctrlrt.NewManager(ctrlrt.GetConfigOrDie(), ctrlrt.Options{
-		Scheme: scheme,
-		Cache: ctrlrtcache.Options{
-			Scheme:               scheme,
-			DefaultNamespaces:    watchNamespaces,
-			DefaultLabelSelector: watchSelectors,
+		Scheme:    scheme,
+		NewClient: statuspatch.NewClient,
+		Controller: ctrlrtconfig.Controller{
+			UsePriorityQueue: &usePriorityQueue,
 		},
+		Cache: cacheOptions,
 		WebhookServer: &ctrlrtwebhook.DefaultServer{
 			Options: ctrlrtwebhook.Options{
 				Port: port,
@@ -126,7 +156,7 @@ func main() {
 			},
 		},
 		Metrics:                 metricsserver.Options{BindAddress: ackCfg.MetricsAddr},
-		LeaderElection:          ackCfg.EnableLeaderElection,
+		LeaderElection:          ackCfg.EnableLeaderElection && !shardCfg.Enabled(),
 		LeaderElectionID:        "ack-" + awsServiceAPIGroup,
 		LeaderElectionNamespace: ackCfg.LeaderElectionNamespace,
 		HealthProbeBindAddress:  ackCfg.HealthzAddr,
@@ -141,6 +171,21 @@ func main() {
 		os.Exit(1)
 	}
 
+	if shardCfg.Enabled() {
+		coordinator, err := sharding.NewCoordinator(mgr.GetConfig(), shardCfg)
+		if err == nil {
+			err = mgr.Add(coordinator)
+		}
+		if err != nil {
+			setupLog.Error(
+				err, "unable to set up shard coordinator",
+				"aws.service", awsServiceAlias,
+			)
+			os.Exit(1)
+		}
+		sharding.SetDefault(coordinator)
+	}
+
 	stopChan := ctrlrt.SetupSignalHandler()
 
 	setupLog.Info(
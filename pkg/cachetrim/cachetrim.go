@@ -0,0 +1,171 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package cachetrim shrinks the objects held by the controller's informer
+// cache.
+//
+// The cache keeps a full copy of every ScalableTarget and ScalingPolicy, and
+// with tens of thousands of them most of that memory is metadata the
+// controller never looks at: managedFields, and annotations written by other
+// tools such as kubectl's last-applied-configuration, which repeats the
+// whole spec. With ACK_CACHE_TRIM set, informer transforms drop them before
+// the objects are stored:
+//
+//   - managedFields are dropped from every cached object;
+//   - annotations of the controller's own kinds are dropped unless they are
+//     in the services.k8s.aws domain, which holds everything the runtime and
+//     this controller read, or listed in ACK_CACHE_KEEP_ANNOTATIONS.
+//
+// Specs and statuses are kept whole, since reconciles and the status patch
+// skipping of package statuspatch compare them. Metadata and spec changes
+// are sent as merge patches of the fields that changed, so the trimmed
+// fields are never written back as removed.
+package cachetrim
+
+import (
+	"reflect"
+	"strings"
+
+	"github.com/prometheus/client_golang/prometheus"
+	"k8s.io/apimachinery/pkg/api/meta"
+	toolscache "k8s.io/client-go/tools/cache"
+	ctrlrtcache "sigs.k8s.io/controller-runtime/pkg/cache"
+	"sigs.k8s.io/controller-runtime/pkg/client"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+// ackDomain is the annotation domain of the ACK runtime and controllers.
+const ackDomain = "services.k8s.aws"
+
+var trimmed = prometheus.NewCounterVec(
+	prometheus.CounterOpts{
+		Name: "ack_cache_trimmed_bytes_total",
+		Help: "Bytes of metadata dropped from objects before they were stored in the informer cache",
+	},
+	[]string{"kind", "field"},
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(trimmed)
+}
+
+// Enabled returns true if ACK_CACHE_TRIM turns trimming on.
+func Enabled() bool {
+	return tuning.Bool(tuning.EnvCacheTrim, false)
+}
+
+// Apply sets up opts so that managedFields are dropped from every cached
+// object, and unused annotations from the objects of kinds.
+func Apply(opts *ctrlrtcache.Options, kinds ...client.Object) {
+	keep := map[string]bool{}
+	for _, key := range strings.Split(tuning.String(tuning.EnvCacheKeepAnnotations, ""), ",") {
+		if key = strings.TrimSpace(key); key != "" {
+			keep[key] = true
+		}
+	}
+
+	opts.DefaultTransform = chain(opts.DefaultTransform, stripManagedFields("other"))
+	if opts.ByObject == nil {
+		opts.ByObject = map[client.Object]ctrlrtcache.ByObject{}
+	}
+	for _, obj := range kinds {
+		kind := reflect.TypeOf(obj).Elem().Name()
+		byObject := opts.ByObject[obj]
+		byObject.Transform = chain(
+			byObject.Transform,
+			stripManagedFields(kind),
+			stripAnnotations(kind, keep),
+		)
+		opts.ByObject[obj] = byObject
+	}
+}
+
+// chain returns a transform applying every non-nil transform of fns in turn.
+func chain(fns ...toolscache.TransformFunc) toolscache.TransformFunc {
+	return func(i interface{}) (interface{}, error) {
+		var err error
+		for _, fn := range fns {
+			if fn == nil {
+				continue
+			}
+			if i, err = fn(i); err != nil {
+				return nil, err
+			}
+		}
+		return i, nil
+	}
+}
+
+// stripManagedFields returns a transform dropping the managedFields of
+// objects of kind.
+func stripManagedFields(kind string) toolscache.TransformFunc {
+	return func(i interface{}) (interface{}, error) {
+		obj, err := meta.Accessor(i)
+		if err != nil {
+			// Tombstones of deleted objects are passed through as is
+			return i, nil
+		}
+		managed := obj.GetManagedFields()
+		if len(managed) == 0 {
+			return i, nil
+		}
+		size := 0
+		for _, entry := range managed {
+			if entry.FieldsV1 != nil {
+				size += len(entry.FieldsV1.Raw)
+			}
+		}
+		trimmed.WithLabelValues(kind, "managedFields").Add(float64(size))
+		obj.SetManagedFields(nil)
+		return i, nil
+	}
+}
+
+// stripAnnotations returns a transform dropping the annotations of objects
+// of kind that are neither in the ACK domain nor in keep.
+func stripAnnotations(kind string, keep map[string]bool) toolscache.TransformFunc {
+	return func(i interface{}) (interface{}, error) {
+		obj, err := meta.Accessor(i)
+		if err != nil {
+			return i, nil
+		}
+		annotations := obj.GetAnnotations()
+		size := 0
+		for key, value := range annotations {
+			if keep[key] || inACKDomain(key) {
+				continue
+			}
+			size += len(key) + len(value)
+			delete(annotations, key)
+		}
+		if size == 0 {
+			return i, nil
+		}
+		trimmed.WithLabelValues(kind, "annotations").Add(float64(size))
+		if len(annotations) == 0 {
+			annotations = nil
+		}
+		obj.SetAnnotations(annotations)
+		return i, nil
+	}
+}
+
+// inACKDomain returns true if the annotation key has a prefix in the
+// services.k8s.aws domain, e.g. services.k8s.aws/region or
+// applicationautoscaling.services.k8s.aws/spec-fingerprint.
+func inACKDomain(key string) bool {
+	prefix, _, ok := strings.Cut(key, "/")
+	return ok && (prefix == ackDomain || strings.HasSuffix(prefix, "."+ackDomain))
+}
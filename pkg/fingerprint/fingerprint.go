@@ -0,0 +1,194 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package fingerprint lets resyncs of unchanged resources skip the AWS read.
+//
+// When a read finds the AWS resource in the state the spec asks for, the
+// resource manager stores a fingerprint on the resource in an annotation: a
+// hash of the desired spec, a hash of the observed AWS state and the time of
+// the read. A later resync whose spec still hashes to the same value, on a
+// resource that is still synced, can then return the resource as its own
+// latest state without describing it, and the delta between the two is empty
+// without being computed. Nothing is written back to the API server on such
+// a resync.
+//
+// Changes made outside of the controller are only caught by a full read, so
+// the fingerprint expires after the max age and the next resync reads AWS
+// again. That also delays drift detection by up to the max age, so
+// fingerprints are only used when ACK_SPEC_FINGERPRINT_MAX_AGE is set.
+package fingerprint
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"strconv"
+	"strings"
+	"time"
+
+	"github.com/prometheus/client_golang/prometheus"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// Annotation holds the fingerprint of the last read that found the AWS
+	// resource in sync with the spec.
+	Annotation = "applicationautoscaling.services.k8s.aws/spec-fingerprint"
+
+	version = "v1"
+	// defaultMaxAge is how long a fingerprint stays valid when
+	// ACK_SPEC_FINGERPRINT_MAX_AGE is not set. Zero disables fingerprints.
+	defaultMaxAge = 0
+)
+
+var (
+	lookups = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_spec_fingerprint_lookups_total",
+			Help: "Number of reads that checked the spec fingerprint, by whether the AWS read was skipped",
+		},
+		[]string{"kind", "result"},
+	)
+
+	maxAge = tuning.Duration(tuning.EnvSpecFingerprintMaxAge, defaultMaxAge)
+	now    = time.Now
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(lookups)
+}
+
+// Enabled returns whether resyncs may skip the AWS read.
+func Enabled() bool {
+	return maxAge > 0
+}
+
+// Fingerprint identifies a desired spec together with the AWS state it was
+// last found in sync with.
+type Fingerprint struct {
+	Desired    string
+	Observed   string
+	ObservedAt time.Time
+}
+
+// New returns the fingerprint of desired and observed, read now.
+func New(desired, observed interface{}) Fingerprint {
+	return Fingerprint{
+		Desired:    Hash(desired),
+		Observed:   Hash(observed),
+		ObservedAt: now(),
+	}
+}
+
+// Hash returns a hash of the JSON encoding of v. Struct fields are encoded in
+// declaration order and map keys sorted, so equal values hash the same.
+func Hash(v interface{}) string {
+	b, err := json.Marshal(v)
+	if err != nil {
+		return ""
+	}
+	sum := sha256.Sum256(b)
+	return hex.EncodeToString(sum[:16])
+}
+
+// String returns the annotation value of f.
+func (f Fingerprint) String() string {
+	return strings.Join([]string{
+		version, f.Desired, f.Observed, strconv.FormatInt(f.ObservedAt.Unix(), 10),
+	}, ";")
+}
+
+// Parse reads an annotation value written by String.
+func Parse(s string) (Fingerprint, bool) {
+	parts := strings.Split(s, ";")
+	if len(parts) != 4 || parts[0] != version || parts[1] == "" {
+		return Fingerprint{}, false
+	}
+	observedAt, err := strconv.ParseInt(parts[3], 10, 64)
+	if err != nil {
+		return Fingerprint{}, false
+	}
+	return Fingerprint{
+		Desired:    parts[1],
+		Observed:   parts[2],
+		ObservedAt: time.Unix(observedAt, 0),
+	}, true
+}
+
+// Get returns the fingerprint stored on obj, if any.
+func Get(obj metav1.Object) (Fingerprint, bool) {
+	s, ok := obj.GetAnnotations()[Annotation]
+	if !ok {
+		return Fingerprint{}, false
+	}
+	return Parse(s)
+}
+
+// Set stores f on obj.
+func Set(obj metav1.Object, f Fingerprint) {
+	annotations := obj.GetAnnotations()
+	if annotations == nil {
+		annotations = map[string]string{}
+	}
+	annotations[Annotation] = f.String()
+	obj.SetAnnotations(annotations)
+}
+
+// Record stores the fingerprint of desired and observed on obj. An
+// unexpired fingerprint of the same states is kept as is, so that a read
+// finding nothing new leaves the object's metadata unchanged.
+func Record(obj metav1.Object, desired, observed interface{}) {
+	f := New(desired, observed)
+	old, ok := Get(obj)
+	if ok && old.Desired == f.Desired && old.Observed == f.Observed && f.ObservedAt.Sub(old.ObservedAt) < maxAge {
+		return
+	}
+	Set(obj, f)
+}
+
+// Clear removes the fingerprint from obj.
+func Clear(obj metav1.Object) {
+	annotations := obj.GetAnnotations()
+	if _, ok := annotations[Annotation]; !ok {
+		return
+	}
+	delete(annotations, Annotation)
+	obj.SetAnnotations(annotations)
+}
+
+// Fresh returns whether obj carries an unexpired fingerprint of desired, and
+// counts the lookup for kind.
+func Fresh(kind string, obj metav1.Object, desired interface{}) bool {
+	f, ok := Get(obj)
+	fresh := ok && now().Sub(f.ObservedAt) < maxAge && f.Desired == Hash(desired)
+	result := "miss"
+	if fresh {
+		result = "hit"
+	}
+	lookups.WithLabelValues(kind, result).Inc()
+	return fresh
+}
+
+// Same returns whether a and b carry the same fingerprint and it is a
+// fingerprint of desired, i.e. b is the state a was last found in sync with.
+func Same(a, b metav1.Object, desired interface{}) bool {
+	s, ok := a.GetAnnotations()[Annotation]
+	if !ok || s != b.GetAnnotations()[Annotation] {
+		return false
+	}
+	f, ok := Parse(s)
+	return ok && f.Desired == Hash(desired)
+}
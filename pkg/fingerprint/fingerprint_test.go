@@ -0,0 +1,102 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package fingerprint
+
+import (
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+)
+
+type spec struct {
+	Min int
+	Max int
+}
+
+// withClock sets the max age and a settable clock for the duration of the
+// test.
+func withClock(t *testing.T, age time.Duration) *time.Time {
+	t.Helper()
+	clock := time.Unix(1_700_000_000, 0)
+	oldAge, oldNow := maxAge, now
+	maxAge, now = age, func() time.Time { return clock }
+	t.Cleanup(func() { maxAge, now = oldAge, oldNow })
+	return &clock
+}
+
+func TestDisabledByDefault(t *testing.T) {
+	assert.Zero(t, defaultMaxAge)
+}
+
+func TestRoundTrip(t *testing.T) {
+	withClock(t, time.Minute)
+	f := New(spec{1, 2}, spec{1, 2})
+
+	parsed, ok := Parse(f.String())
+	require.True(t, ok)
+	assert.Equal(t, f, parsed)
+
+	_, ok = Parse("v0;a;b;1")
+	assert.False(t, ok)
+}
+
+func TestFreshUntilMaxAge(t *testing.T) {
+	clock := withClock(t, time.Minute)
+	obj := &metav1.ObjectMeta{}
+	Record(obj, spec{1, 2}, spec{1, 2})
+
+	*clock = clock.Add(59 * time.Second)
+	assert.True(t, Fresh("Test", obj, spec{1, 2}))
+	assert.False(t, Fresh("Test", obj, spec{1, 3}))
+
+	*clock = clock.Add(time.Second)
+	assert.False(t, Fresh("Test", obj, spec{1, 2}))
+}
+
+func TestRecordKeepsUnexpiredFingerprint(t *testing.T) {
+	clock := withClock(t, time.Minute)
+	obj := &metav1.ObjectMeta{}
+	Record(obj, spec{1, 2}, spec{1, 2})
+	written := obj.Annotations[Annotation]
+
+	*clock = clock.Add(30 * time.Second)
+	Record(obj, spec{1, 2}, spec{1, 2})
+	assert.Equal(t, written, obj.Annotations[Annotation])
+
+	// A different state, or an expired fingerprint, is rewritten
+	Record(obj, spec{1, 3}, spec{1, 3})
+	assert.NotEqual(t, written, obj.Annotations[Annotation])
+	written = obj.Annotations[Annotation]
+
+	*clock = clock.Add(time.Minute)
+	Record(obj, spec{1, 3}, spec{1, 3})
+	assert.NotEqual(t, written, obj.Annotations[Annotation])
+}
+
+func TestSame(t *testing.T) {
+	withClock(t, time.Minute)
+	a, b := &metav1.ObjectMeta{}, &metav1.ObjectMeta{}
+	Record(a, spec{1, 2}, spec{1, 2})
+	assert.False(t, Same(a, b, spec{1, 2}))
+
+	Set(b, New(spec{1, 2}, spec{1, 2}))
+	assert.True(t, Same(a, b, spec{1, 2}))
+	assert.False(t, Same(a, b, spec{1, 3}))
+
+	Clear(b)
+	assert.NotContains(t, b.Annotations, Annotation)
+}
@@ -0,0 +1,320 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package ratelimit paces the controller's Application Auto Scaling calls
+// when ACK_API_RATE_LIMIT is set.
+//
+// Every API operation gets its own token bucket. A bucket halves its rate
+// when a call is throttled and creeps back towards the configured rate while
+// calls succeed. Reconciles wait for a token in arrival order instead of
+// racing into ThrottlingException. When a call is still throttled, the
+// error is turned into a requeue so the resource is retried later instead
+// of failing its reconcile.
+//
+// Calls carry a priority in their context. Reads made to resync resources
+// that are already synced hold back while other calls to the same operation
+// wait for a token, so that new resources are not stuck behind a wave of
+// resyncs when the rate limit is the bottleneck.
+package ratelimit
+
+import (
+	"context"
+	"math/rand"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	"github.com/aws/aws-sdk-go-v2/aws/retry"
+	"github.com/prometheus/client_golang/prometheus"
+	"golang.org/x/time/rate"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// defaultRate is the calls per second allowed for each operation when
+	// ACK_API_RATE_LIMIT is not set. Limiting is off by default, so that the
+	// controller's throughput is only bounded by the service's own limits
+	// unless a deployment asks for pacing.
+	defaultRate = 0
+	// defaultMinRate is the lowest rate a bucket backs off to when
+	// ACK_API_RATE_LIMIT_MIN is not set.
+	defaultMinRate = 0.5
+	// decreaseFactor is applied to a bucket's rate on every throttled call.
+	decreaseFactor = 0.5
+	// increaseFraction of the configured rate is given back on every
+	// successful call.
+	increaseFraction = 0.05
+	// minRequeueDelay and maxRequeueDelay bound how long a throttled
+	// reconcile waits before it is retried.
+	minRequeueDelay = time.Second
+	maxRequeueDelay = time.Minute
+)
+
+var (
+	queueDepth = prometheus.NewGaugeVec(
+		prometheus.GaugeOpts{
+			Name: "ack_rate_limiter_queue_depth",
+			Help: "Number of calls waiting for a rate limiter token",
+		},
+		[]string{"op_id"},
+	)
+	waitSeconds = prometheus.NewHistogramVec(
+		prometheus.HistogramOpts{
+			Name:    "ack_rate_limiter_wait_seconds",
+			Help:    "Time calls spent waiting for a rate limiter token",
+			Buckets: []float64{0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30},
+		},
+		[]string{"op_id"},
+	)
+	throttles = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_rate_limiter_throttles_total",
+			Help: "Number of calls rejected by AWS with a throttling error",
+		},
+		[]string{"op_id"},
+	)
+	yields = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_rate_limiter_yields_total",
+			Help: "Number of resync calls that held back for calls of a higher priority",
+		},
+		[]string{"op_id"},
+	)
+	currentRate = prometheus.NewGaugeVec(
+		prometheus.GaugeOpts{
+			Name: "ack_rate_limiter_rate",
+			Help: "Calls per second currently allowed by the rate limiter",
+		},
+		[]string{"op_id"},
+	)
+
+	defaultLimiter = New(
+		tuning.Float(tuning.EnvAPIRateLimit, defaultRate),
+		tuning.Float(tuning.EnvAPIRateLimitMin, defaultMinRate),
+	)
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(queueDepth, waitSeconds, throttles, yields, currentRate)
+}
+
+// Priority orders the calls waiting for a token of the same operation.
+type Priority int
+
+const (
+	// PriorityResync is the priority of reads of resources that are
+	// already synced.
+	PriorityResync Priority = iota
+	// PriorityNormal is the priority of every other call.
+	PriorityNormal
+)
+
+type priorityKey struct{}
+
+// WithPriority returns a copy of ctx whose calls have priority p.
+func WithPriority(ctx context.Context, p Priority) context.Context {
+	return context.WithValue(ctx, priorityKey{}, p)
+}
+
+// PriorityFrom returns the priority of calls made with ctx.
+func PriorityFrom(ctx context.Context) Priority {
+	if p, ok := ctx.Value(priorityKey{}).(Priority); ok {
+		return p
+	}
+	return PriorityNormal
+}
+
+// Default returns the limiter shared by every resource manager.
+func Default() *Limiter {
+	return defaultLimiter
+}
+
+// Limiter holds one adaptive token bucket per API operation. The zero rate
+// disables limiting.
+type Limiter struct {
+	maxRate float64
+	minRate float64
+
+	mu      sync.Mutex
+	buckets map[string]*bucket
+}
+
+type bucket struct {
+	op      string
+	limiter *rate.Limiter
+	waiting atomic.Int64
+
+	// mu guards rate, which mirrors limiter.Limit() so that adjustments are
+	// computed from a consistent value
+	mu   sync.Mutex
+	rate float64
+
+	// urgentMu guards urgent, the number of waiting calls of normal
+	// priority, and idle, which is closed when urgent drops to zero
+	urgentMu sync.Mutex
+	urgent   int
+	idle     chan struct{}
+}
+
+// New returns a limiter allowing maxRate calls per second per operation and
+// never backing off below minRate.
+func New(maxRate, minRate float64) *Limiter {
+	if minRate > maxRate {
+		minRate = maxRate
+	}
+	return &Limiter{
+		maxRate: maxRate,
+		minRate: minRate,
+		buckets: map[string]*bucket{},
+	}
+}
+
+func (l *Limiter) bucket(op string) *bucket {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	b, ok := l.buckets[op]
+	if !ok {
+		b = &bucket{
+			op:      op,
+			limiter: rate.NewLimiter(rate.Limit(l.maxRate), burst(l.maxRate)),
+			rate:    l.maxRate,
+		}
+		l.buckets[op] = b
+		currentRate.WithLabelValues(op).Set(l.maxRate)
+	}
+	return b
+}
+
+// burst allows a second's worth of calls at once, and at least one.
+func burst(r float64) int {
+	if r < 1 {
+		return 1
+	}
+	return int(r)
+}
+
+// Wait blocks until a call to op is allowed or ctx is done. Calls of resync
+// priority first wait until no call of normal priority is waiting.
+func (l *Limiter) Wait(ctx context.Context, op string) error {
+	if l.maxRate <= 0 {
+		return nil
+	}
+	b := l.bucket(op)
+	queueDepth.WithLabelValues(op).Set(float64(b.waiting.Add(1)))
+	defer func() {
+		queueDepth.WithLabelValues(op).Set(float64(b.waiting.Add(-1)))
+	}()
+
+	start := time.Now()
+	var err error
+	if PriorityFrom(ctx) == PriorityResync {
+		err = b.yield(ctx)
+	} else {
+		b.hold()
+		defer b.release()
+	}
+	if err == nil {
+		err = b.limiter.Wait(ctx)
+	}
+	waitSeconds.WithLabelValues(op).Observe(time.Since(start).Seconds())
+	return err
+}
+
+// hold registers a waiting call of normal priority.
+func (b *bucket) hold() {
+	b.urgentMu.Lock()
+	defer b.urgentMu.Unlock()
+	if b.urgent == 0 {
+		b.idle = make(chan struct{})
+	}
+	b.urgent++
+}
+
+// release unregisters a call registered by hold.
+func (b *bucket) release() {
+	b.urgentMu.Lock()
+	defer b.urgentMu.Unlock()
+	b.urgent--
+	if b.urgent == 0 {
+		close(b.idle)
+	}
+}
+
+// yield blocks while calls of normal priority are waiting, or until ctx is
+// done.
+func (b *bucket) yield(ctx context.Context) error {
+	b.urgentMu.Lock()
+	idle, busy := b.idle, b.urgent > 0
+	b.urgentMu.Unlock()
+	if !busy {
+		return nil
+	}
+	yields.WithLabelValues(b.op).Inc()
+	select {
+	case <-idle:
+		return nil
+	case <-ctx.Done():
+		return ctx.Err()
+	}
+}
+
+// Observe adapts the rate of op to the outcome of a call and returns the
+// error the caller should report. Throttling errors are wrapped in a requeue
+// whose delay grows with the number of calls already waiting for op.
+func (l *Limiter) Observe(op string, err error) error {
+	if l.maxRate <= 0 {
+		return err
+	}
+	b := l.bucket(op)
+	if err == nil {
+		b.adjust(func(r float64) float64 {
+			return min(r+l.maxRate*increaseFraction, l.maxRate)
+		})
+		return nil
+	}
+	if !IsThrottle(err) {
+		return err
+	}
+
+	throttles.WithLabelValues(op).Inc()
+	r := b.adjust(func(r float64) float64 {
+		return max(r*decreaseFactor, l.minRate)
+	})
+	delay := time.Duration(float64(b.waiting.Load()+1) / r * float64(time.Second))
+	delay += time.Duration(rand.Int63n(int64(time.Second)))
+	delay = min(max(delay, minRequeueDelay), maxRequeueDelay)
+	return ackrequeue.NeededAfter(err, delay)
+}
+
+// adjust applies f to the bucket's rate and returns the new rate.
+func (b *bucket) adjust(f func(float64) float64) float64 {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	next := f(b.rate)
+	if next != b.rate {
+		b.rate = next
+		b.limiter.SetLimit(rate.Limit(next))
+		currentRate.WithLabelValues(b.op).Set(next)
+	}
+	return next
+}
+
+// IsThrottle reports whether err is a throttling error, as classified by
+// the AWS SDK's retryer.
+func IsThrottle(err error) bool {
+	return retry.IsErrorThrottles(retry.DefaultThrottles).IsErrorThrottle(err) == aws.TrueTernary
+}
@@ -0,0 +1,166 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package ratelimit
+
+import (
+	"context"
+	"errors"
+	"testing"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	smithy "github.com/aws/smithy-go"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+var errThrottled = &smithy.GenericAPIError{Code: "ThrottlingException", Message: "Rate exceeded"}
+
+func currentRateOf(l *Limiter, op string) float64 {
+	b := l.bucket(op)
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	return b.rate
+}
+
+// waitAsync starts a Wait for op with ctx and returns the channel its
+// result is sent on.
+func waitAsync(ctx context.Context, l *Limiter, op string) <-chan error {
+	done := make(chan error, 1)
+	go func() { done <- l.Wait(ctx, op) }()
+	return done
+}
+
+func TestLimiter_ZeroRateDisablesLimiting(t *testing.T) {
+	l := New(0, 0)
+
+	for i := 0; i < 100; i++ {
+		require.NoError(t, l.Wait(context.Background(), "op"))
+	}
+	assert.Same(t, errThrottled, l.Observe("op", errThrottled))
+	assert.Empty(t, l.buckets)
+}
+
+func TestLimiter_ResyncYieldsToWaitingNormalCalls(t *testing.T) {
+	l := New(1000, 1)
+	b := l.bucket("op")
+	b.hold()
+
+	done := waitAsync(WithPriority(context.Background(), PriorityResync), l, "op")
+	select {
+	case err := <-done:
+		t.Fatalf("resync call did not yield: %v", err)
+	case <-time.After(50 * time.Millisecond):
+	}
+
+	b.release()
+	select {
+	case err := <-done:
+		require.NoError(t, err)
+	case <-time.After(5 * time.Second):
+		t.Fatal("resync call was not released")
+	}
+}
+
+func TestLimiter_ResyncYieldIsCancellable(t *testing.T) {
+	l := New(1000, 1)
+	b := l.bucket("op")
+	b.hold()
+	defer b.release()
+
+	ctx, cancel := context.WithCancel(WithPriority(context.Background(), PriorityResync))
+	done := waitAsync(ctx, l, "op")
+	cancel()
+
+	assert.ErrorIs(t, <-done, context.Canceled)
+}
+
+func TestLimiter_NormalCallsDoNotWaitForEachOther(t *testing.T) {
+	l := New(1000, 1)
+	b := l.bucket("op")
+	b.hold()
+	defer b.release()
+
+	// Only resync calls look at the calls being held
+	require.NoError(t, l.Wait(context.Background(), "op"))
+	// and only for their own operation
+	require.NoError(t, l.Wait(WithPriority(context.Background(), PriorityResync), "other"))
+}
+
+func TestLimiter_HoldAndReleaseAreBalanced(t *testing.T) {
+	l := New(1000, 1)
+	b := l.bucket("op")
+
+	b.hold()
+	b.hold()
+	b.release()
+	assert.ErrorIs(t, b.yield(cancelledContext()), context.Canceled)
+
+	b.release()
+	assert.NoError(t, b.yield(cancelledContext()))
+}
+
+func cancelledContext() context.Context {
+	ctx, cancel := context.WithCancel(context.Background())
+	cancel()
+	return ctx
+}
+
+func TestLimiter_ThrottlesHalveRateDownToMinimum(t *testing.T) {
+	l := New(10, 0.5)
+
+	for _, want := range []float64{5, 2.5, 1.25, 0.625, 0.5, 0.5} {
+		err := l.Observe("op", errThrottled)
+		var requeue *ackrequeue.RequeueNeededAfter
+		require.True(t, errors.As(err, &requeue))
+		assert.ErrorIs(t, err, errThrottled)
+		assert.GreaterOrEqual(t, requeue.Duration(), minRequeueDelay)
+		assert.LessOrEqual(t, requeue.Duration(), maxRequeueDelay)
+		assert.InDelta(t, want, currentRateOf(l, "op"), 1e-9)
+	}
+}
+
+func TestLimiter_SuccessesRecoverRateUpToMaximum(t *testing.T) {
+	l := New(10, 0.5)
+	l.Observe("op", errThrottled)
+	require.InDelta(t, 5, currentRateOf(l, "op"), 1e-9)
+
+	// Every success gives back 5% of the configured rate
+	for i := 1; i <= 10; i++ {
+		require.NoError(t, l.Observe("op", nil))
+		assert.InDelta(t, 5+0.5*float64(i), currentRateOf(l, "op"), 1e-9)
+	}
+	require.NoError(t, l.Observe("op", nil))
+	assert.InDelta(t, 10, currentRateOf(l, "op"), 1e-9)
+}
+
+func TestLimiter_OtherErrorsLeaveRateAlone(t *testing.T) {
+	l := New(10, 0.5)
+	err := &smithy.GenericAPIError{Code: "ValidationException"}
+
+	assert.Same(t, err, l.Observe("op", err))
+	assert.InDelta(t, 10, currentRateOf(l, "op"), 1e-9)
+}
+
+func TestLimiter_RequeueDelayGrowsWithQueueDepth(t *testing.T) {
+	l := New(1, 1)
+	b := l.bucket("op")
+	b.waiting.Store(20)
+
+	// 21 calls at one call per second, plus up to a second of jitter
+	var requeue *ackrequeue.RequeueNeededAfter
+	require.True(t, errors.As(l.Observe("op", errThrottled), &requeue))
+	assert.GreaterOrEqual(t, requeue.Duration(), 21*time.Second)
+	assert.Less(t, requeue.Duration(), 22*time.Second)
+}
@@ -0,0 +1,201 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package readiness lets a ScalingPolicy reconcile retry soon after its
+// scalable target is registered.
+//
+// A policy created together with its ScalableTarget is often reconciled
+// first, and PutScalingPolicy then fails with ObjectNotFoundException.
+// Left to the runtime, the policy would be retried on the exponential
+// backoff of the work queue, long after the target got registered. Instead,
+// the ScalableTarget resource manager marks every target it registers or
+// finds on the board. A failed policy whose target was marked in the
+// meantime retries right away. When ACK_DEPENDENCY_RETRY_INTERVAL is set,
+// any other is requeued after that interval, doubled with every further
+// failure of the same policy up to ACK_DEPENDENCY_RETRY_MAX_INTERVAL, so
+// that a policy whose target never shows up, e.g. because of a typo in its
+// resource ID, does not call PutScalingPolicy at a fixed rate forever. The
+// interval starts over once the target is marked. Nothing blocks the worker
+// reconciling the policy.
+package readiness
+
+import (
+	"sync"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/prometheus/client_golang/prometheus"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// defaultRetryInterval is how long after its first failed call a
+	// reconcile whose dependency is missing is retried when
+	// ACK_DEPENDENCY_RETRY_INTERVAL is not set. Zero leaves the retries to
+	// the work queue's backoff.
+	defaultRetryInterval = 0
+	// defaultMaxRetryInterval caps the retry interval when
+	// ACK_DEPENDENCY_RETRY_MAX_INTERVAL is not set.
+	defaultMaxRetryInterval = 5 * time.Minute
+)
+
+var (
+	retries = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_dependency_retries_total",
+			Help: "Number of calls that failed because a scalable target was missing, by whether they were retried right away or requeued",
+		},
+		[]string{"result"},
+	)
+
+	defaultBoard = New(
+		tuning.Duration(tuning.EnvDependencyRetryInterval, defaultRetryInterval),
+		tuning.Duration(tuning.EnvDependencyRetryMaxInterval, defaultMaxRetryInterval),
+	)
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(retries)
+}
+
+// Default returns the board shared by every resource manager.
+func Default() *Board {
+	return defaultBoard
+}
+
+// Key identifies a scalable target.
+type Key struct {
+	ServiceNamespace  string
+	ResourceID        string
+	ScalableDimension string
+}
+
+// KeyOf returns the key of the scalable target given by its fields, and
+// false if any of them is missing.
+func KeyOf(serviceNamespace, resourceID, scalableDimension *string) (Key, bool) {
+	if serviceNamespace == nil || resourceID == nil || scalableDimension == nil {
+		return Key{}, false
+	}
+	return Key{*serviceNamespace, *resourceID, *scalableDimension}, true
+}
+
+// Mark is a point in the board's history, taken before a call that may
+// fail because a target is missing.
+type Mark uint64
+
+// Board records when scalable targets were last seen registered.
+type Board struct {
+	retryInterval    time.Duration
+	maxRetryInterval time.Duration
+
+	mu sync.Mutex
+	// seq grows with every target marked ready
+	seq Mark
+	// ready maps targets to the seq they were last marked ready at
+	ready map[Key]Mark
+	// failures counts, for every target not marked ready yet, the requeues
+	// of each reconcile waiting for it
+	failures map[Key]map[string]int
+	// onForget is called with every target dropped by Forget
+	onForget []func(Key)
+}
+
+// New returns a board that requeues reconciles whose target is missing
+// after retryInterval, doubled with every further requeue up to
+// maxRetryInterval. A zero interval leaves them to the work queue's
+// backoff.
+func New(retryInterval, maxRetryInterval time.Duration) *Board {
+	if maxRetryInterval < retryInterval {
+		maxRetryInterval = retryInterval
+	}
+	return &Board{
+		retryInterval:    retryInterval,
+		maxRetryInterval: maxRetryInterval,
+		ready:            map[Key]Mark{},
+		failures:         map[Key]map[string]int{},
+	}
+}
+
+// Mark returns the current point in the board's history.
+func (b *Board) Mark() Mark {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	return b.seq
+}
+
+// Ready records that the target key is registered.
+func (b *Board) Ready(key Key) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	b.seq++
+	b.ready[key] = b.seq
+	delete(b.failures, key)
+}
+
+// Forget drops the target key, e.g. once it is deregistered, and calls the
+// functions registered with OnForget.
+func (b *Board) Forget(key Key) {
+	b.mu.Lock()
+	delete(b.ready, key)
+	delete(b.failures, key)
+	onForget := b.onForget
+	b.mu.Unlock()
+	for _, fn := range onForget {
+		fn(key)
+	}
+}
+
+// OnForget registers fn to be called with every target dropped by Forget,
+// e.g. to invalidate what is cached about it.
+func (b *Board) OnForget(fn func(Key)) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	b.onForget = append(b.onForget, fn)
+}
+
+// Retry is called with err, a call made by the reconcile of waiter that
+// failed because the target key was missing, and the mark taken before the
+// call. It returns true if the target was marked ready after since, in
+// which case the call can be retried right away. Otherwise it returns false
+// and the error to fail the reconcile with: err, as a requeue after the
+// board's retry interval, doubled for every earlier requeue of waiter since
+// the target was last marked, unless that interval is zero.
+func (b *Board) Retry(key Key, waiter string, since Mark, err error) (bool, error) {
+	if b.retryInterval <= 0 {
+		return false, err
+	}
+	b.mu.Lock()
+	if b.ready[key] > since {
+		b.mu.Unlock()
+		retries.WithLabelValues("ready").Inc()
+		return true, nil
+	}
+	waiters := b.failures[key]
+	if waiters == nil {
+		waiters = map[string]int{}
+		b.failures[key] = waiters
+	}
+	interval := b.retryInterval
+	for i := 0; i < waiters[waiter] && interval < b.maxRetryInterval; i++ {
+		interval *= 2
+	}
+	if interval > b.maxRetryInterval {
+		interval = b.maxRetryInterval
+	}
+	waiters[waiter]++
+	b.mu.Unlock()
+	retries.WithLabelValues("requeued").Inc()
+	return false, ackrequeue.NeededAfter(err, interval)
+}
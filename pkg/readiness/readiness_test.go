@@ -0,0 +1,114 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package readiness
+
+import (
+	"errors"
+	"testing"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+var (
+	errNotFound = errors.New("ObjectNotFoundException")
+	target      = Key{"sagemaker", "endpoint/e/variant/v", "sagemaker:variant:DesiredInstanceCount"}
+)
+
+const policy = "default/policy"
+
+// requeueAfter returns the interval err requeues after.
+func requeueAfter(t *testing.T, err error) time.Duration {
+	t.Helper()
+	var requeue *ackrequeue.RequeueNeededAfter
+	require.True(t, errors.As(err, &requeue))
+	return requeue.Duration()
+}
+
+func TestBoard_RetryRequeuesWithoutBlocking(t *testing.T) {
+	b := New(2*time.Second, time.Minute)
+	since := b.Mark()
+
+	retry, err := b.Retry(target, policy, since, errNotFound)
+	assert.False(t, retry)
+	assert.ErrorIs(t, err, errNotFound)
+	assert.Equal(t, 2*time.Second, requeueAfter(t, err))
+}
+
+func TestBoard_RetryBacksOffUpToTheCap(t *testing.T) {
+	b := New(2*time.Second, 10*time.Second)
+
+	var intervals []time.Duration
+	for i := 0; i < 5; i++ {
+		_, err := b.Retry(target, policy, b.Mark(), errNotFound)
+		intervals = append(intervals, requeueAfter(t, err))
+	}
+	assert.Equal(t, []time.Duration{
+		2 * time.Second, 4 * time.Second, 8 * time.Second, 10 * time.Second, 10 * time.Second,
+	}, intervals)
+
+	// Every policy backs off on its own
+	_, err := b.Retry(target, "default/other", b.Mark(), errNotFound)
+	assert.Equal(t, 2*time.Second, requeueAfter(t, err))
+
+	// and starts over once the target is marked
+	b.Ready(target)
+	_, err = b.Retry(target, policy, b.Mark(), errNotFound)
+	assert.Equal(t, 2*time.Second, requeueAfter(t, err))
+}
+
+func TestBoard_RetryRightAwayOnceTargetIsReady(t *testing.T) {
+	b := New(2*time.Second, time.Minute)
+	since := b.Mark()
+	b.Ready(target)
+
+	retry, err := b.Retry(target, policy, since, errNotFound)
+	assert.True(t, retry)
+	assert.NoError(t, err)
+
+	// Only targets marked after the failed call count
+	retry, _ = b.Retry(target, policy, b.Mark(), errNotFound)
+	assert.False(t, retry)
+	// and only the target the call was for
+	other := Key{"ecs", "service/c/s", "ecs:service:DesiredCount"}
+	retry, _ = b.Retry(other, policy, since, errNotFound)
+	assert.False(t, retry)
+}
+
+func TestBoard_ZeroIntervalLeavesRetryToBackoff(t *testing.T) {
+	assert.Zero(t, defaultRetryInterval)
+
+	b := New(0, time.Minute)
+	since := b.Mark()
+	b.Ready(target)
+
+	retry, err := b.Retry(target, policy, since, errNotFound)
+	assert.False(t, retry)
+	assert.Same(t, errNotFound, err)
+}
+
+func TestBoard_ForgetCallsOnForget(t *testing.T) {
+	b := New(2*time.Second, time.Minute)
+	var forgotten []Key
+	b.OnForget(func(key Key) { forgotten = append(forgotten, key) })
+	since := b.Mark()
+	b.Ready(target)
+
+	b.Forget(target)
+	assert.Equal(t, []Key{target}, forgotten)
+	retry, _ := b.Retry(target, policy, since, errNotFound)
+	assert.False(t, retry)
+}
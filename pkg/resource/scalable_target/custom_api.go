@@ -18,7 +18,16 @@ import (
 	"time"
 
 	svcapitypes "github.com/aws-controllers-k8s/applicationautoscaling-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/fingerprint"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/ratelimit"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/readiness"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/sharding"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/startup"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/timing"
+	ackcondition "github.com/aws-controllers-k8s/runtime/pkg/condition"
 	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	corev1 "k8s.io/api/core/v1"
+	"k8s.io/apimachinery/pkg/api/equality"
 	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
 )
 
@@ -60,3 +69,130 @@ func (rm *resourceManager) customCheckRequiredFieldsMissing(
 	return r.ko.Spec.ResourceID == nil
 
 }
+
+// customWaitForRateLimit blocks until the shared rate limiter allows a call
+// to the API operation op
+func (rm *resourceManager) customWaitForRateLimit(ctx context.Context, op string) error {
+	return ratelimit.Default().Wait(ctx, op)
+}
+
+// customObserveRateLimit feeds the outcome of a call to op back to the shared
+// rate limiter and returns the error to report, turning throttling errors
+// into requeues
+func (rm *resourceManager) customObserveRateLimit(op string, err error) error {
+	return ratelimit.Default().Observe(op, err)
+}
+
+// customMarkTargetReady records on the readiness board that the scalable
+// target of ko is registered, unless err is set, so that the ScalingPolicy
+// reconciles waiting for it retry at once
+func (rm *resourceManager) customMarkTargetReady(ko *svcapitypes.ScalableTarget, err error) {
+	if err != nil {
+		return
+	}
+	key, ok := readiness.KeyOf(ko.Spec.ServiceNamespace, ko.Spec.ResourceID, ko.Spec.ScalableDimension)
+	if ok {
+		readiness.Default().Ready(key)
+	}
+}
+
+// customForgetTarget drops the scalable target of ko from the readiness
+// board once it is deregistered
+func (rm *resourceManager) customForgetTarget(ko *svcapitypes.ScalableTarget, err error) {
+	if err != nil {
+		return
+	}
+	key, ok := readiness.KeyOf(ko.Spec.ServiceNamespace, ko.Spec.ResourceID, ko.Spec.ScalableDimension)
+	if ok {
+		readiness.Default().Forget(key)
+	}
+}
+
+// customCheckShard requeues r when it belongs to a shard owned by another
+// replica of the controller
+func (rm *resourceManager) customCheckShard(r *resource) error {
+	return sharding.Check("ScalableTarget", r.ko)
+}
+
+// customStaggerStartup defers the first resync of r after the controller
+// starts when startup staggering is enabled
+func (rm *resourceManager) customStaggerStartup(r *resource) error {
+	stagger := startup.For("ScalableTarget")
+	if stagger == nil {
+		return nil
+	}
+	return stagger.Check(r.ko.Namespace+"/"+r.ko.Name, customIsSynced(r))
+}
+
+// customReadContext returns the context for the AWS reads of r. Reads of a
+// resource that is already synced are resyncs, and give way to the calls
+// made for new and changed resources when the rate limit is reached
+func (rm *resourceManager) customReadContext(ctx context.Context, r *resource) context.Context {
+	if customIsSynced(r) {
+		return ratelimit.WithPriority(ctx, ratelimit.PriorityResync)
+	}
+	return ctx
+}
+
+// customIsSynced returns true if r was synced at the end of its last
+// reconcile
+func customIsSynced(r *resource) bool {
+	cond := ackcondition.Synced(r)
+	return cond != nil && cond.Status == corev1.ConditionTrue
+}
+
+// customStartPhase starts timing a phase of a ScalableTarget reconcile
+func customStartPhase(phase, op string) func(error) {
+	return timing.Start("ScalableTarget", phase, op)
+}
+
+// customStartResolveReferences starts timing the resolution of the
+// references of a ScalableTarget
+func customStartResolveReferences() func(error) {
+	return customStartPhase(timing.PhaseResolveReferences, "")
+}
+
+// customFindUnchanged returns a copy of r as its latest state when its spec
+// fingerprint shows that it has not changed since the last read found it in
+// sync, and nil when the scalable target has to be read from AWS
+func (rm *resourceManager) customFindUnchanged(r *resource) *resource {
+	if !fingerprint.Enabled() || r.ko.DeletionTimestamp != nil || r.ko.Status.CreationTime == nil {
+		return nil
+	}
+	if cond := ackcondition.Synced(r); cond == nil || cond.Status != corev1.ConditionTrue {
+		return nil
+	}
+	if !fingerprint.Fresh("ScalableTarget", r.ko, r.ko.Spec) {
+		return nil
+	}
+	return &resource{r.ko.DeepCopy()}
+}
+
+// customRecordFingerprint stores the fingerprint of r's spec on ko, the
+// scalable target just read from AWS, when the two are in sync, and removes
+// any earlier fingerprint from ko otherwise
+func (rm *resourceManager) customRecordFingerprint(r *resource, ko *svcapitypes.ScalableTarget) {
+	if !fingerprint.Enabled() {
+		return
+	}
+	if !customSpecInSync(&r.ko.Spec, &ko.Spec) {
+		fingerprint.Clear(ko)
+		return
+	}
+	fingerprint.Record(ko, r.ko.Spec, ko.Spec)
+}
+
+// customSpecInSync returns true if the observed spec holds the desired one,
+// with the same server-side defaults newResourceDelta applies, but without
+// changing either spec or timing a compare
+func customSpecInSync(desired, observed *svcapitypes.ScalableTargetSpec) bool {
+	desired = desired.DeepCopy()
+	setSpecDefaults(desired, observed)
+	return equality.Semantic.DeepEqual(desired, observed)
+}
+
+// customFingerprintsMatch returns true if b is the state a was last found in
+// sync with, so that the two cannot differ
+func customFingerprintsMatch(a, b *resource) bool {
+	return fingerprint.Enabled() && fingerprint.Same(a.ko, b.ko, a.ko.Spec)
+}
@@ -0,0 +1,54 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package scalable_target
+
+import (
+	"testing"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	"github.com/stretchr/testify/assert"
+
+	svcapitypes "github.com/aws-controllers-k8s/applicationautoscaling-controller/apis/v1alpha1"
+)
+
+func testSpec() *svcapitypes.ScalableTargetSpec {
+	return &svcapitypes.ScalableTargetSpec{
+		MinCapacity:       aws.Int64(1),
+		MaxCapacity:       aws.Int64(2),
+		ResourceID:        aws.String("endpoint/e/variant/v"),
+		ScalableDimension: aws.String("sagemaker:variant:DesiredInstanceCount"),
+		ServiceNamespace:  aws.String("sagemaker"),
+	}
+}
+
+func TestCustomSpecInSync(t *testing.T) {
+	desired, observed := testSpec(), testSpec()
+	observed.SuspendedState = &svcapitypes.SuspendedState{
+		DynamicScalingInSuspended:  aws.Bool(false),
+		DynamicScalingOutSuspended: aws.Bool(false),
+		ScheduledScalingSuspended:  aws.Bool(false),
+	}
+
+	// A suspended state left unset takes whatever AWS defaults it to
+	assert.True(t, customSpecInSync(desired, observed))
+	assert.Nil(t, desired.SuspendedState, "desired spec was changed")
+
+	desired.SuspendedState = &svcapitypes.SuspendedState{DynamicScalingInSuspended: aws.Bool(true)}
+	assert.False(t, customSpecInSync(desired, observed))
+	assert.Nil(t, desired.SuspendedState.DynamicScalingOutSuspended, "desired spec was changed")
+
+	desired = testSpec()
+	desired.MaxCapacity = aws.Int64(3)
+	assert.False(t, customSpecInSync(desired, observed))
+}
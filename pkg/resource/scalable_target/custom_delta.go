@@ -23,20 +23,28 @@ func customSetDefaults(
 	a *resource,
 	b *resource,
 ) {
-	if ackcompare.IsNil(a.ko.Spec.SuspendedState) && ackcompare.IsNotNil(b.ko.Spec.SuspendedState) {
-		a.ko.Spec.SuspendedState = &svcapitypes.SuspendedState{}
+	setSpecDefaults(&a.ko.Spec, &b.ko.Spec)
+}
+
+// setSpecDefaults fills the suspended state fields left unset in a with the
+// values of b.
+func setSpecDefaults(
+	a *svcapitypes.ScalableTargetSpec,
+	b *svcapitypes.ScalableTargetSpec,
+) {
+	if ackcompare.IsNil(a.SuspendedState) && ackcompare.IsNotNil(b.SuspendedState) {
+		a.SuspendedState = &svcapitypes.SuspendedState{}
 	}
 
-	if ackcompare.IsNotNil(a.ko.Spec.SuspendedState) && ackcompare.IsNotNil(b.ko.Spec.SuspendedState) {
-		if ackcompare.IsNil(a.ko.Spec.SuspendedState.DynamicScalingInSuspended) && ackcompare.IsNotNil(b.ko.Spec.SuspendedState.DynamicScalingInSuspended) {
-			a.ko.Spec.SuspendedState.DynamicScalingInSuspended = b.ko.Spec.SuspendedState.DynamicScalingInSuspended
+	if ackcompare.IsNotNil(a.SuspendedState) && ackcompare.IsNotNil(b.SuspendedState) {
+		if ackcompare.IsNil(a.SuspendedState.DynamicScalingInSuspended) && ackcompare.IsNotNil(b.SuspendedState.DynamicScalingInSuspended) {
+			a.SuspendedState.DynamicScalingInSuspended = b.SuspendedState.DynamicScalingInSuspended
 		}
-		if ackcompare.IsNil(a.ko.Spec.SuspendedState.DynamicScalingOutSuspended) && ackcompare.IsNotNil(b.ko.Spec.SuspendedState.DynamicScalingOutSuspended) {
-			a.ko.Spec.SuspendedState.DynamicScalingOutSuspended = b.ko.Spec.SuspendedState.DynamicScalingOutSuspended
+		if ackcompare.IsNil(a.SuspendedState.DynamicScalingOutSuspended) && ackcompare.IsNotNil(b.SuspendedState.DynamicScalingOutSuspended) {
+			a.SuspendedState.DynamicScalingOutSuspended = b.SuspendedState.DynamicScalingOutSuspended
 		}
-		if ackcompare.IsNil(a.ko.Spec.SuspendedState.ScheduledScalingSuspended) && ackcompare.IsNotNil(b.ko.Spec.SuspendedState.ScheduledScalingSuspended) {
-			a.ko.Spec.SuspendedState.ScheduledScalingSuspended = b.ko.Spec.SuspendedState.ScheduledScalingSuspended
+		if ackcompare.IsNil(a.SuspendedState.ScheduledScalingSuspended) && ackcompare.IsNotNil(b.SuspendedState.ScheduledScalingSuspended) {
+			a.SuspendedState.ScheduledScalingSuspended = b.SuspendedState.ScheduledScalingSuspended
 		}
 	}
-
 }
@@ -0,0 +1,273 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package scalable_target
+
+import (
+	"context"
+	"errors"
+	"sync"
+	"time"
+
+	ackerr "github.com/aws-controllers-k8s/runtime/pkg/errors"
+	ackrtlog "github.com/aws-controllers-k8s/runtime/pkg/runtime/log"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling/types"
+	smithy "github.com/aws/smithy-go"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/ratelimit"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/timing"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// defaultDescribeBatchWindow is how long a read waits for other reads to
+	// join its DescribeScalableTargets call when ACK_DESCRIBE_BATCH_WINDOW is
+	// not set. Zero disables batching, so that a lone read, e.g. of a target
+	// just created on an idle controller, is not held back by the window.
+	defaultDescribeBatchWindow = 0
+	// describeScalableTargetsMaxResourceIDs is the maximum number of
+	// ResourceIds accepted by a single DescribeScalableTargets call.
+	describeScalableTargetsMaxResourceIDs = 50
+	// describeBatchTimeout bounds a batched describe, including pagination.
+	// Batched calls outlive the reconcile that started them, so they cannot
+	// use its context.
+	describeBatchTimeout = 30 * time.Second
+)
+
+var (
+	describeBatchWindow = tuning.Duration(tuning.EnvDescribeBatchWindow, defaultDescribeBatchWindow)
+
+	describeBatchersMu sync.Mutex
+	describeBatchers   = map[*resourceManager]*describeBatcher{}
+)
+
+// describeFunc issues a single DescribeScalableTargets call.
+type describeFunc func(
+	context.Context,
+	*svcsdk.DescribeScalableTargetsInput,
+) (*svcsdk.DescribeScalableTargetsOutput, error)
+
+// describeBatcher coalesces the DescribeScalableTargets calls made by
+// concurrent ScalableTarget reads. Reads arriving within the batch window
+// for the same ServiceNamespace are answered by one multi-ResourceId
+// describe, and each caller picks its own target out of the shared result.
+type describeBatcher struct {
+	window   time.Duration
+	describe describeFunc
+
+	mu      sync.Mutex
+	pending map[svcsdktypes.ServiceNamespace]*describeBatch
+}
+
+// describeBatch is a single in-flight multi-ResourceId describe.
+type describeBatch struct {
+	namespace   svcsdktypes.ServiceNamespace
+	resourceIDs []string
+	seen        map[string]struct{}
+	timer       *time.Timer
+	// priority is the highest rate limiter priority of the reads waiting
+	// on the batch
+	priority ratelimit.Priority
+
+	// done is closed once targets and err are set
+	done    chan struct{}
+	targets []svcsdktypes.ScalableTarget
+	err     error
+}
+
+func newDescribeBatcher(window time.Duration, describe describeFunc) *describeBatcher {
+	return &describeBatcher{
+		window:   window,
+		describe: describe,
+		pending:  map[svcsdktypes.ServiceNamespace]*describeBatch{},
+	}
+}
+
+// describeBatcher returns the batcher shared by all reads going through rm,
+// or nil if batching is disabled.
+func (rm *resourceManager) describeBatcher() *describeBatcher {
+	if describeBatchWindow <= 0 {
+		return nil
+	}
+	describeBatchersMu.Lock()
+	defer describeBatchersMu.Unlock()
+	b, ok := describeBatchers[rm]
+	if !ok {
+		b = newDescribeBatcher(
+			describeBatchWindow,
+			func(
+				ctx context.Context,
+				input *svcsdk.DescribeScalableTargetsInput,
+			) (*svcsdk.DescribeScalableTargetsOutput, error) {
+				if err := rm.customWaitForRateLimit(ctx, "DescribeScalableTargets"); err != nil {
+					return nil, err
+				}
+				resp, err := rm.sdkapi.DescribeScalableTargets(ctx, input)
+				err = rm.customObserveRateLimit("DescribeScalableTargets", err)
+				rm.metrics.RecordAPICall("READ_MANY", "DescribeScalableTargets", err)
+				return resp, err
+			},
+		)
+		describeBatchers[rm] = b
+	}
+	return b
+}
+
+// find returns the scalable target registered for resourceID in namespace,
+// or nil if there is none. An empty dimension matches any dimension.
+func (b *describeBatcher) find(
+	ctx context.Context,
+	namespace svcsdktypes.ServiceNamespace,
+	resourceID string,
+	dimension svcsdktypes.ScalableDimension,
+) (*svcsdktypes.ScalableTarget, error) {
+	b.mu.Lock()
+	batch, ok := b.pending[namespace]
+	if !ok {
+		batch = &describeBatch{
+			namespace: namespace,
+			seen:      map[string]struct{}{},
+			done:      make(chan struct{}),
+		}
+		b.pending[namespace] = batch
+		batch.timer = time.AfterFunc(b.window, func() { b.flush(batch) })
+	}
+	batch.priority = max(batch.priority, ratelimit.PriorityFrom(ctx))
+	if _, ok := batch.seen[resourceID]; !ok {
+		batch.seen[resourceID] = struct{}{}
+		batch.resourceIDs = append(batch.resourceIDs, resourceID)
+	}
+	full := len(batch.resourceIDs) >= describeScalableTargetsMaxResourceIDs
+	if full {
+		// Detach the batch so that later reads start a new one
+		batch.timer.Stop()
+		delete(b.pending, namespace)
+	}
+	b.mu.Unlock()
+	if full {
+		go b.run(batch)
+	}
+
+	select {
+	case <-batch.done:
+	case <-ctx.Done():
+		return nil, ctx.Err()
+	}
+	if batch.err != nil {
+		return nil, batch.err
+	}
+	for i := range batch.targets {
+		target := &batch.targets[i]
+		if aws.ToString(target.ResourceId) != resourceID {
+			continue
+		}
+		if dimension != "" && target.ScalableDimension != dimension {
+			continue
+		}
+		return target, nil
+	}
+	return nil, nil
+}
+
+// flush runs batch when its window expires, unless it was already detached
+// because it filled up.
+func (b *describeBatcher) flush(batch *describeBatch) {
+	b.mu.Lock()
+	if b.pending[batch.namespace] != batch {
+		b.mu.Unlock()
+		return
+	}
+	delete(b.pending, batch.namespace)
+	b.mu.Unlock()
+	b.run(batch)
+}
+
+// run describes every resource ID in batch, following pagination, and
+// releases the waiting callers. batch must already be detached from
+// b.pending so that its resource IDs no longer change.
+func (b *describeBatcher) run(batch *describeBatch) {
+	defer close(batch.done)
+
+	ctx, cancel := context.WithTimeout(
+		ratelimit.WithPriority(context.Background(), batch.priority),
+		describeBatchTimeout,
+	)
+	defer cancel()
+	input := &svcsdk.DescribeScalableTargetsInput{
+		ServiceNamespace: batch.namespace,
+		ResourceIds:      batch.resourceIDs,
+		MaxResults:       aws.Int32(describeScalableTargetsMaxResourceIDs),
+	}
+	for {
+		resp, err := b.describe(ctx, input)
+		if err != nil {
+			batch.err = err
+			return
+		}
+		batch.targets = append(batch.targets, resp.ScalableTargets...)
+		if resp.NextToken == nil {
+			return
+		}
+		input.NextToken = resp.NextToken
+	}
+}
+
+// customFindBatched is the batched counterpart of sdkFind. It is called from
+// the sdk_read_many_post_build_request hook with the single-resource input
+// sdkFind would have sent and, like sdkFind, returns NotFound when no
+// scalable target is registered for the resource.
+func (rm *resourceManager) customFindBatched(
+	ctx context.Context,
+	r *resource,
+	input *svcsdk.DescribeScalableTargetsInput,
+	batcher *describeBatcher,
+) (latest *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.customFindBatched")
+	defer func() {
+		exit(err)
+	}()
+
+	observeRead := customStartPhase(timing.PhaseRead, "DescribeScalableTargets")
+	elem, err := batcher.find(
+		ctx, input.ServiceNamespace, *r.ko.Spec.ResourceID, input.ScalableDimension,
+	)
+	observeRead(err)
+	if err != nil {
+		var awsErr smithy.APIError
+		if errors.As(err, &awsErr) && awsErr.ErrorCode() == "UNKNOWN" {
+			return nil, ackerr.NotFound
+		}
+		return nil, err
+	}
+
+	resp := &svcsdk.DescribeScalableTargetsOutput{}
+	if elem != nil {
+		// The element is shared with the other callers of the batch. The
+		// generated mapping only copies its pointers into the new object,
+		// and nothing writes through them.
+		resp.ScalableTargets = []svcsdktypes.ScalableTarget{*elem}
+	}
+	latest, err = rm.setResourceFromReadManyOutput(r, resp)
+	if err != nil {
+		return nil, err
+	}
+	ko := latest.ko
+	rm.setStatusDefaults(ko)
+	rm.customSetLastModifiedTimeToCreationTime(ko)
+	rm.customRecordFingerprint(r, ko)
+	rm.customMarkTargetReady(ko, nil)
+	return latest, nil
+}
@@ -0,0 +1,238 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package scalable_target
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"sync"
+	"testing"
+	"time"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling/types"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+)
+
+const testDimension = svcsdktypes.ScalableDimensionSageMakerVariantDesiredInstanceCount
+
+// fakeDescribe answers DescribeScalableTargets from a fixed set of targets
+// and records the calls it gets.
+type fakeDescribe struct {
+	mu      sync.Mutex
+	calls   []*svcsdk.DescribeScalableTargetsInput
+	targets []svcsdktypes.ScalableTarget
+	err     error
+	// release, when set, holds every call until it is closed
+	release chan struct{}
+}
+
+func (f *fakeDescribe) describe(
+	ctx context.Context,
+	input *svcsdk.DescribeScalableTargetsInput,
+) (*svcsdk.DescribeScalableTargetsOutput, error) {
+	f.mu.Lock()
+	copied := *input
+	copied.ResourceIds = append([]string(nil), input.ResourceIds...)
+	f.calls = append(f.calls, &copied)
+	f.mu.Unlock()
+	if f.release != nil {
+		<-f.release
+	}
+	if f.err != nil {
+		return nil, f.err
+	}
+	wanted := map[string]bool{}
+	for _, id := range input.ResourceIds {
+		wanted[id] = true
+	}
+	resp := &svcsdk.DescribeScalableTargetsOutput{}
+	for _, target := range f.targets {
+		if wanted[aws.ToString(target.ResourceId)] {
+			resp.ScalableTargets = append(resp.ScalableTargets, target)
+		}
+	}
+	return resp, nil
+}
+
+func (f *fakeDescribe) callCount() int {
+	f.mu.Lock()
+	defer f.mu.Unlock()
+	return len(f.calls)
+}
+
+func target(resourceID string) svcsdktypes.ScalableTarget {
+	return svcsdktypes.ScalableTarget{
+		ServiceNamespace:  svcsdktypes.ServiceNamespaceSagemaker,
+		ResourceId:        aws.String(resourceID),
+		ScalableDimension: testDimension,
+		MinCapacity:       aws.Int32(1),
+		MaxCapacity:       aws.Int32(2),
+	}
+}
+
+type findResult struct {
+	target *svcsdktypes.ScalableTarget
+	err    error
+}
+
+// findAll runs a find for every resource ID concurrently and returns the
+// results in the same order.
+func findAll(ctx context.Context, b *describeBatcher, resourceIDs ...string) []findResult {
+	results := make([]findResult, len(resourceIDs))
+	var wg sync.WaitGroup
+	for i, id := range resourceIDs {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			found, err := b.find(ctx, svcsdktypes.ServiceNamespaceSagemaker, id, testDimension)
+			results[i] = findResult{found, err}
+		}()
+	}
+	wg.Wait()
+	return results
+}
+
+func TestDescribeBatcher_DisabledByDefault(t *testing.T) {
+	assert.Zero(t, defaultDescribeBatchWindow)
+
+	old := describeBatchWindow
+	describeBatchWindow = 0
+	t.Cleanup(func() { describeBatchWindow = old })
+	assert.Nil(t, (&resourceManager{}).describeBatcher())
+}
+
+func TestDescribeBatcher_CoalescesReadsWithinWindow(t *testing.T) {
+	fake := &fakeDescribe{targets: []svcsdktypes.ScalableTarget{target("a"), target("b")}}
+	b := newDescribeBatcher(50*time.Millisecond, fake.describe)
+
+	results := findAll(context.Background(), b, "a", "b", "c", "a")
+
+	require.Equal(t, 1, fake.callCount())
+	assert.ElementsMatch(t, []string{"a", "b", "c"}, fake.calls[0].ResourceIds)
+	for i, want := range []string{"a", "b", "", "a"} {
+		require.NoError(t, results[i].err)
+		if want == "" {
+			assert.Nil(t, results[i].target)
+			continue
+		}
+		require.NotNil(t, results[i].target)
+		assert.Equal(t, want, aws.ToString(results[i].target.ResourceId))
+	}
+}
+
+func TestDescribeBatcher_SeparateWindowsMakeSeparateCalls(t *testing.T) {
+	fake := &fakeDescribe{targets: []svcsdktypes.ScalableTarget{target("a")}}
+	b := newDescribeBatcher(5*time.Millisecond, fake.describe)
+
+	findAll(context.Background(), b, "a")
+	findAll(context.Background(), b, "a")
+
+	assert.Equal(t, 2, fake.callCount())
+}
+
+func TestDescribeBatcher_FullBatchDoesNotWaitForWindow(t *testing.T) {
+	fake := &fakeDescribe{}
+	b := newDescribeBatcher(time.Hour, fake.describe)
+	ids := make([]string, describeScalableTargetsMaxResourceIDs)
+	for i := range ids {
+		ids[i] = fmt.Sprintf("endpoint/e%d/variant/v", i)
+	}
+
+	done := make(chan []findResult)
+	go func() { done <- findAll(context.Background(), b, ids...) }()
+	select {
+	case <-done:
+	case <-time.After(5 * time.Second):
+		t.Fatal("full batch waited for its window")
+	}
+	require.Equal(t, 1, fake.callCount())
+	assert.Len(t, fake.calls[0].ResourceIds, describeScalableTargetsMaxResourceIDs)
+}
+
+func TestDescribeBatcher_FansOutErrorsToEveryCaller(t *testing.T) {
+	describeErr := errors.New("throttled")
+	fake := &fakeDescribe{err: describeErr}
+	b := newDescribeBatcher(20*time.Millisecond, fake.describe)
+
+	results := findAll(context.Background(), b, "a", "b", "c")
+
+	require.Equal(t, 1, fake.callCount())
+	for _, result := range results {
+		assert.ErrorIs(t, result.err, describeErr)
+		assert.Nil(t, result.target)
+	}
+}
+
+func TestDescribeBatcher_CancelledCallerDoesNotAffectOthers(t *testing.T) {
+	fake := &fakeDescribe{
+		targets: []svcsdktypes.ScalableTarget{target("a"), target("b")},
+		release: make(chan struct{}),
+	}
+	b := newDescribeBatcher(10*time.Millisecond, fake.describe)
+
+	ctx, cancel := context.WithCancel(context.Background())
+	cancelled := make(chan error)
+	go func() {
+		_, err := b.find(ctx, svcsdktypes.ServiceNamespaceSagemaker, "a", testDimension)
+		cancelled <- err
+	}()
+	other := make(chan findResult)
+	go func() {
+		found, err := b.find(
+			context.Background(), svcsdktypes.ServiceNamespaceSagemaker, "b", testDimension,
+		)
+		other <- findResult{found, err}
+	}()
+
+	require.Eventually(t, func() bool { return fake.callCount() == 1 }, time.Second, time.Millisecond)
+	cancel()
+	assert.ErrorIs(t, <-cancelled, context.Canceled)
+
+	close(fake.release)
+	result := <-other
+	require.NoError(t, result.err)
+	require.NotNil(t, result.target)
+	assert.Equal(t, "b", aws.ToString(result.target.ResourceId))
+}
+
+func TestDescribeBatcher_FollowsPagination(t *testing.T) {
+	var calls int
+	b := newDescribeBatcher(10*time.Millisecond, func(
+		ctx context.Context,
+		input *svcsdk.DescribeScalableTargetsInput,
+	) (*svcsdk.DescribeScalableTargetsOutput, error) {
+		calls++
+		if input.NextToken == nil {
+			return &svcsdk.DescribeScalableTargetsOutput{
+				ScalableTargets: []svcsdktypes.ScalableTarget{target("a")},
+				NextToken:       aws.String("page-2"),
+			}, nil
+		}
+		return &svcsdk.DescribeScalableTargetsOutput{
+			ScalableTargets: []svcsdktypes.ScalableTarget{target("b")},
+		}, nil
+	})
+
+	results := findAll(context.Background(), b, "a", "b")
+
+	assert.Equal(t, 2, calls)
+	for _, result := range results {
+		require.NoError(t, result.err)
+		assert.NotNil(t, result.target)
+	}
+}
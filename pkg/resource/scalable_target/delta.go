@@ -41,6 +41,10 @@ func newResourceDelta(
 		delta.Add("", a, b)
 		return delta
 	}
+	if customFingerprintsMatch(a, b) {
+		return delta
+	}
+	observeCompare := customStartPhase("compare", "")
 	customSetDefaults(a, b)
 
 	if ackcompare.HasNilDifference(a.ko.Spec.MaxCapacity, b.ko.Spec.MaxCapacity) {
@@ -114,5 +118,6 @@ func newResourceDelta(
 		}
 	}
 
+	observeCompare(nil)
 	return delta
 }
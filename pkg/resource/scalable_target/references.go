@@ -60,11 +60,13 @@ func (rm *resourceManager) ResolveReferences(
 	ctx context.Context,
 	apiReader client.Reader,
 	res acktypes.AWSResource,
-) (acktypes.AWSResource, bool, error) {
+) (_ acktypes.AWSResource, _ bool, err error) {
+	observeResolve := customStartResolveReferences()
+	defer func() { observeResolve(err) }()
 	ko := rm.concreteResource(res).ko
 
 	resourceHasReferences := false
-	err := validateReferenceFields(ko)
+	err = validateReferenceFields(ko)
 	if fieldHasReferences, err := rm.resolveReferenceForRoleARN(ctx, apiReader, ko); err != nil {
 		return &resource{ko}, (resourceHasReferences || fieldHasReferences), err
 	} else {
@@ -75,9 +75,28 @@ func (rm *resourceManager) sdkFind(
 	if err != nil {
 		return nil, err
 	}
+	ctx = rm.customReadContext(ctx, r)
+	if err = rm.customCheckShard(r); err != nil {
+		return nil, err
+	}
+	if err = rm.customStaggerStartup(r); err != nil {
+		return nil, err
+	}
+	if unchanged := rm.customFindUnchanged(r); unchanged != nil {
+		return unchanged, nil
+	}
 	rm.customDescribeScalableTarget(ctx, r, input)
+	if batcher := rm.describeBatcher(); batcher != nil {
+		return rm.customFindBatched(ctx, r, input, batcher)
+	}
+	if err = rm.customWaitForRateLimit(ctx, "DescribeScalableTargets"); err != nil {
+		return nil, err
+	}
+	observeRead := customStartPhase("read", "DescribeScalableTargets")
 	var resp *svcsdk.DescribeScalableTargetsOutput
 	resp, err = rm.sdkapi.DescribeScalableTargets(ctx, input)
+	observeRead(err)
+	err = rm.customObserveRateLimit("DescribeScalableTargets", err)
 	rm.metrics.RecordAPICall("READ_MANY", "DescribeScalableTargets", err)
 	if err != nil {
 		var awsErr smithy.APIError
@@ -161,6 +180,8 @@ func (rm *resourceManager) sdkFind(
 
 	rm.setStatusDefaults(ko)
 	rm.customSetLastModifiedTimeToCreationTime(ko)
+	rm.customRecordFingerprint(r, ko)
+	rm.customMarkTargetReady(ko, nil)
 	return &resource{ko}, nil
 }
 
@@ -206,10 +227,17 @@ func (rm *resourceManager) sdkCreate(
 	if err != nil {
 		return nil, err
 	}
+	if err = rm.customWaitForRateLimit(ctx, "RegisterScalableTarget"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("create", "RegisterScalableTarget")
 
 	var resp *svcsdk.RegisterScalableTargetOutput
 	_ = resp
 	resp, err = rm.sdkapi.RegisterScalableTarget(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("RegisterScalableTarget", err)
+	rm.customMarkTargetReady(desired.ko, err)
 	rm.metrics.RecordAPICall("CREATE", "RegisterScalableTarget", err)
 	if err != nil {
 		return nil, err
@@ -300,10 +328,17 @@ func (rm *resourceManager) sdkUpdate(
 	if err != nil {
 		return nil, err
 	}
+	if err = rm.customWaitForRateLimit(ctx, "RegisterScalableTarget"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("update", "RegisterScalableTarget")
 
 	var resp *svcsdk.RegisterScalableTargetOutput
 	_ = resp
 	resp, err = rm.sdkapi.RegisterScalableTarget(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("RegisterScalableTarget", err)
+	rm.customMarkTargetReady(desired.ko, err)
 	rm.metrics.RecordAPICall("UPDATE", "RegisterScalableTarget", err)
 	if err != nil {
 		return nil, err
@@ -393,9 +428,16 @@ func (rm *resourceManager) sdkDelete(
 	if err != nil {
 		return nil, err
 	}
+	if err = rm.customWaitForRateLimit(ctx, "DeregisterScalableTarget"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("delete", "DeregisterScalableTarget")
 	var resp *svcsdk.DeregisterScalableTargetOutput
 	_ = resp
 	resp, err = rm.sdkapi.DeregisterScalableTarget(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("DeregisterScalableTarget", err)
+	rm.customForgetTarget(r.ko, err)
 	rm.metrics.RecordAPICall("DELETE", "DeregisterScalableTarget", err)
 	return nil, err
 }
@@ -525,3 +567,83 @@ func (rm *resourceManager) terminalAWSError(err error) bool {
 	// No terminal_errors specified for this resource in generator config
 	return false
 }
+
+// setResourceFromReadManyOutput merges the scalable target described in resp
+// into a copy of r, the same way sdkFind does with its own response, and
+// returns NotFound if resp holds none. The describe batcher uses it so that
+// batched reads share the generated field mapping.
+func (rm *resourceManager) setResourceFromReadManyOutput(
+	r *resource,
+	resp *svcsdk.DescribeScalableTargetsOutput,
+) (*resource, error) {
+	ko := r.ko.DeepCopy()
+
+	found := false
+	for _, elem := range resp.ScalableTargets {
+		if elem.CreationTime != nil {
+			ko.Status.CreationTime = &metav1.Time{*elem.CreationTime}
+		} else {
+			ko.Status.CreationTime = nil
+		}
+		if elem.MaxCapacity != nil {
+			maxCapacityCopy := int64(*elem.MaxCapacity)
+			ko.Spec.MaxCapacity = &maxCapacityCopy
+		} else {
+			ko.Spec.MaxCapacity = nil
+		}
+		if elem.MinCapacity != nil {
+			minCapacityCopy := int64(*elem.MinCapacity)
+			ko.Spec.MinCapacity = &minCapacityCopy
+		} else {
+			ko.Spec.MinCapacity = nil
+		}
+		if elem.ResourceId != nil {
+			ko.Spec.ResourceID = elem.ResourceId
+		} else {
+			ko.Spec.ResourceID = nil
+		}
+		if elem.RoleARN != nil {
+			ko.Spec.RoleARN = elem.RoleARN
+		} else {
+			ko.Spec.RoleARN = nil
+		}
+		if elem.ScalableDimension != "" {
+			ko.Spec.ScalableDimension = aws.String(string(elem.ScalableDimension))
+		} else {
+			ko.Spec.ScalableDimension = nil
+		}
+		if elem.ScalableTargetARN != nil {
+			if ko.Status.ACKResourceMetadata == nil {
+				ko.Status.ACKResourceMetadata = &ackv1alpha1.ResourceMetadata{}
+			}
+			tmpARN := ackv1alpha1.AWSResourceName(*elem.ScalableTargetARN)
+			ko.Status.ACKResourceMetadata.ARN = &tmpARN
+		}
+		if elem.ServiceNamespace != "" {
+			ko.Spec.ServiceNamespace = aws.String(string(elem.ServiceNamespace))
+		} else {
+			ko.Spec.ServiceNamespace = nil
+		}
+		if elem.SuspendedState != nil {
+			f9 := &svcapitypes.SuspendedState{}
+			if elem.SuspendedState.DynamicScalingInSuspended != nil {
+				f9.DynamicScalingInSuspended = elem.SuspendedState.DynamicScalingInSuspended
+			}
+			if elem.SuspendedState.DynamicScalingOutSuspended != nil {
+				f9.DynamicScalingOutSuspended = elem.SuspendedState.DynamicScalingOutSuspended
+			}
+			if elem.SuspendedState.ScheduledScalingSuspended != nil {
+				f9.ScheduledScalingSuspended = elem.SuspendedState.ScheduledScalingSuspended
+			}
+			ko.Spec.SuspendedState = f9
+		} else {
+			ko.Spec.SuspendedState = nil
+		}
+		found = true
+		break
+	}
+	if !found {
+		return nil, ackerr.NotFound
+	}
+	return &resource{ko}, nil
+}
@@ -15,10 +15,19 @@ package scaling_policy
 
 import (
 	"context"
+	"errors"
 	"time"
 
 	svcapitypes "github.com/aws-controllers-k8s/applicationautoscaling-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/ratelimit"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/readiness"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/sharding"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/startup"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/timing"
+	ackcondition "github.com/aws-controllers-k8s/runtime/pkg/condition"
 	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	smithy "github.com/aws/smithy-go"
+	corev1 "k8s.io/api/core/v1"
 	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
 )
 
@@ -63,3 +72,108 @@ func (rm *resourceManager) customCheckRequiredFieldsMissing(
 	}
 	return false
 }
+
+// customWaitForRateLimit blocks until the shared rate limiter allows a call
+// to the API operation op
+func (rm *resourceManager) customWaitForRateLimit(ctx context.Context, op string) error {
+	return ratelimit.Default().Wait(ctx, op)
+}
+
+// customObserveRateLimit feeds the outcome of a call to op back to the shared
+// rate limiter and returns the error to report, turning throttling errors
+// into requeues
+func (rm *resourceManager) customObserveRateLimit(op string, err error) error {
+	return ratelimit.Default().Observe(op, err)
+}
+
+// customTargetMark returns the point in the readiness board's history that
+// a PutScalingPolicy about to be sent may have to wait past
+func (rm *resourceManager) customTargetMark() readiness.Mark {
+	return readiness.Default().Mark()
+}
+
+// customPutAfterTarget handles a PutScalingPolicy that failed because the
+// scalable target of desired is not registered yet. If the ScalableTarget
+// controller registered the target since, the call is retried right away;
+// otherwise, when the dependency retry interval is set, the reconcile is
+// requeued after that interval, backed off for every further failure,
+// instead of being left to the work queue's backoff, which would pick the
+// policy up long after the target is there. The failed attempt is recorded here, and
+// the outcome of the retry by the caller.
+func (rm *resourceManager) customPutAfterTarget(
+	ctx context.Context,
+	desired *resource,
+	input *svcsdk.PutScalingPolicyInput,
+	resp *svcsdk.PutScalingPolicyOutput,
+	err error,
+	since readiness.Mark,
+) (*svcsdk.PutScalingPolicyOutput, error) {
+	var awsErr smithy.APIError
+	if err == nil || !errors.As(err, &awsErr) || awsErr.ErrorCode() != "ObjectNotFoundException" {
+		return resp, err
+	}
+	spec := desired.ko.Spec
+	key, ok := readiness.KeyOf(spec.ServiceNamespace, spec.ResourceID, spec.ScalableDimension)
+	if !ok {
+		return resp, err
+	}
+	retry, requeueErr := readiness.Default().Retry(key, desired.ko.Namespace+"/"+desired.ko.Name, since, err)
+	if !retry {
+		return resp, requeueErr
+	}
+	rm.metrics.RecordAPICall("CREATE", "PutScalingPolicy", err)
+
+	if err = rm.customWaitForRateLimit(ctx, "PutScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase(timing.PhaseCreate, "PutScalingPolicy")
+	resp, err = rm.sdkapi.PutScalingPolicy(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("PutScalingPolicy", err)
+	rm.invalidateDescribeCache(desired)
+	return resp, err
+}
+
+// customCheckShard requeues r when it belongs to a shard owned by another
+// replica of the controller
+func (rm *resourceManager) customCheckShard(r *resource) error {
+	return sharding.Check("ScalingPolicy", r.ko)
+}
+
+// customStaggerStartup defers the first resync of r after the controller
+// starts when startup staggering is enabled
+func (rm *resourceManager) customStaggerStartup(r *resource) error {
+	stagger := startup.For("ScalingPolicy")
+	if stagger == nil {
+		return nil
+	}
+	return stagger.Check(r.ko.Namespace+"/"+r.ko.Name, customIsSynced(r))
+}
+
+// customReadContext returns the context for the AWS reads of r. Reads of a
+// resource that is already synced are resyncs, and give way to the calls
+// made for new and changed resources when the rate limit is reached
+func (rm *resourceManager) customReadContext(ctx context.Context, r *resource) context.Context {
+	if customIsSynced(r) {
+		return ratelimit.WithPriority(ctx, ratelimit.PriorityResync)
+	}
+	return ctx
+}
+
+// customIsSynced returns true if r was synced at the end of its last
+// reconcile
+func customIsSynced(r *resource) bool {
+	cond := ackcondition.Synced(r)
+	return cond != nil && cond.Status == corev1.ConditionTrue
+}
+
+// customStartPhase starts timing a phase of a ScalingPolicy reconcile
+func customStartPhase(phase, op string) func(error) {
+	return timing.Start("ScalingPolicy", phase, op)
+}
+
+// customStartResolveReferences starts timing the resolution of the
+// references of a ScalingPolicy
+func customStartResolveReferences() func(error) {
+	return customStartPhase(timing.PhaseResolveReferences, "")
+}
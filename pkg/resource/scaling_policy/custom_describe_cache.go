@@ -0,0 +1,325 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package scaling_policy
+
+import (
+	"context"
+	"errors"
+	"sync"
+	"time"
+
+	ackerr "github.com/aws-controllers-k8s/runtime/pkg/errors"
+	ackrtlog "github.com/aws-controllers-k8s/runtime/pkg/runtime/log"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling/types"
+	smithy "github.com/aws/smithy-go"
+	"github.com/prometheus/client_golang/prometheus"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/ratelimit"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/readiness"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/timing"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// defaultDescribeCacheTTL is how long a DescribeScalingPolicies result is
+	// reused when ACK_POLICY_DESCRIBE_CACHE_TTL is not set. The cache is off
+	// by default: while it is on, reads may miss changes made outside the
+	// controller for up to the TTL.
+	defaultDescribeCacheTTL = 0
+	// describeScalingPoliciesPageSize is the largest MaxResults accepted by
+	// DescribeScalingPolicies.
+	describeScalingPoliciesPageSize = 50
+)
+
+var (
+	describeCacheTTL = tuning.Duration(tuning.EnvPolicyDescribeCacheTTL, defaultDescribeCacheTTL)
+
+	describeCachesMu sync.Mutex
+	describeCaches   = map[*resourceManager]*describeCache{}
+
+	describeCacheHits = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_describe_cache_hits_total",
+			Help: "Number of reads answered from the controller's describe cache",
+		},
+		[]string{"op_id"},
+	)
+	describeCacheMisses = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_describe_cache_misses_total",
+			Help: "Number of reads that had to call the AWS API because the describe cache had no entry",
+		},
+		[]string{"op_id"},
+	)
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(describeCacheHits, describeCacheMisses)
+	readiness.Default().OnForget(invalidateDescribeCaches)
+}
+
+// describeCacheKey identifies the scalable target whose scaling policies are
+// cached.
+type describeCacheKey struct {
+	namespace  svcsdktypes.ServiceNamespace
+	resourceID string
+	dimension  svcsdktypes.ScalableDimension
+}
+
+// describeCacheEntry holds every scaling policy attached to a scalable
+// target. An entry is shared by all the reads that arrive while it is being
+// fetched, and by later reads until it expires or is invalidated.
+type describeCacheEntry struct {
+	// done is closed once policies, err and expires are set
+	done     chan struct{}
+	policies []svcsdktypes.ScalingPolicy
+	err      error
+	expires  time.Time
+}
+
+// describeCache shares DescribeScalingPolicies results between the
+// ScalingPolicy reads of the same scalable target.
+//
+// Every key has a generation that is bumped whenever the controller changes
+// one of the target's policies or deregisters the target. A describe that was in flight when its key
+// was invalidated still answers the reads that were waiting on it, but its
+// result is not kept for later reads.
+type describeCache struct {
+	ttl      time.Duration
+	describe func(context.Context, *svcsdk.DescribeScalingPoliciesInput) (*svcsdk.DescribeScalingPoliciesOutput, error)
+	now      func() time.Time
+
+	mu          sync.Mutex
+	entries     map[describeCacheKey]*describeCacheEntry
+	generations map[describeCacheKey]uint64
+}
+
+func newDescribeCache(
+	ttl time.Duration,
+	describe func(context.Context, *svcsdk.DescribeScalingPoliciesInput) (*svcsdk.DescribeScalingPoliciesOutput, error),
+) *describeCache {
+	return &describeCache{
+		ttl:         ttl,
+		describe:    describe,
+		now:         time.Now,
+		entries:     map[describeCacheKey]*describeCacheEntry{},
+		generations: map[describeCacheKey]uint64{},
+	}
+}
+
+// describeCache returns the cache shared by all reads going through rm, or
+// nil if caching is disabled.
+func (rm *resourceManager) describeCache() *describeCache {
+	if describeCacheTTL <= 0 {
+		return nil
+	}
+	describeCachesMu.Lock()
+	defer describeCachesMu.Unlock()
+	c, ok := describeCaches[rm]
+	if !ok {
+		c = newDescribeCache(
+			describeCacheTTL,
+			func(
+				ctx context.Context,
+				input *svcsdk.DescribeScalingPoliciesInput,
+			) (*svcsdk.DescribeScalingPoliciesOutput, error) {
+				if err := rm.customWaitForRateLimit(ctx, "DescribeScalingPolicies"); err != nil {
+					return nil, err
+				}
+				resp, err := rm.sdkapi.DescribeScalingPolicies(ctx, input)
+				err = rm.customObserveRateLimit("DescribeScalingPolicies", err)
+				rm.metrics.RecordAPICall("READ_MANY", "DescribeScalingPolicies", err)
+				return resp, err
+			},
+		)
+		describeCaches[rm] = c
+	}
+	return c
+}
+
+// invalidateDescribeCache drops the cached policies of the scalable target r
+// belongs to. It is called after every PutScalingPolicy and
+// DeleteScalingPolicy the controller makes, whether or not the call
+// succeeded.
+func (rm *resourceManager) invalidateDescribeCache(r *resource) {
+	if r == nil || rm.requiredFieldsMissingFromReadManyInput(r) {
+		return
+	}
+	if c := rm.describeCache(); c != nil {
+		c.invalidate(describeCacheKey{
+			namespace:  svcsdktypes.ServiceNamespace(*r.ko.Spec.ServiceNamespace),
+			resourceID: *r.ko.Spec.ResourceID,
+			dimension:  svcsdktypes.ScalableDimension(*r.ko.Spec.ScalableDimension),
+		})
+	}
+}
+
+// invalidateDescribeCaches drops the cached policies of the scalable target
+// key from every cache. Deregistering a target deletes its scaling policies,
+// so it is called whenever the ScalableTarget resource manager forgets a
+// target on the readiness board.
+func invalidateDescribeCaches(key readiness.Key) {
+	describeCachesMu.Lock()
+	defer describeCachesMu.Unlock()
+	for _, c := range describeCaches {
+		c.invalidate(describeCacheKey{
+			namespace:  svcsdktypes.ServiceNamespace(key.ServiceNamespace),
+			resourceID: key.ResourceID,
+			dimension:  svcsdktypes.ScalableDimension(key.ScalableDimension),
+		})
+	}
+}
+
+func (c *describeCache) invalidate(key describeCacheKey) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.generations[key]++
+	delete(c.entries, key)
+}
+
+// get returns every scaling policy attached to the scalable target key,
+// describing them only if no live entry exists.
+func (c *describeCache) get(
+	ctx context.Context,
+	key describeCacheKey,
+) ([]svcsdktypes.ScalingPolicy, error) {
+	c.mu.Lock()
+	entry, ok := c.entries[key]
+	if ok {
+		select {
+		case <-entry.done:
+			if entry.err != nil || !c.now().Before(entry.expires) {
+				ok = false
+			}
+		default:
+		}
+	}
+	if ok {
+		c.mu.Unlock()
+		describeCacheHits.WithLabelValues("DescribeScalingPolicies").Inc()
+	} else {
+		entry = &describeCacheEntry{done: make(chan struct{})}
+		c.entries[key] = entry
+		generation := c.generations[key]
+		c.mu.Unlock()
+		describeCacheMisses.WithLabelValues("DescribeScalingPolicies").Inc()
+		c.fill(key, entry, generation, ratelimit.PriorityFrom(ctx))
+	}
+
+	select {
+	case <-entry.done:
+	case <-ctx.Done():
+		return nil, ctx.Err()
+	}
+	return entry.policies, entry.err
+}
+
+// fill describes the policies of key into entry, waiting for the rate limiter
+// with the given priority. Callers waiting on entry are released when it
+// returns.
+func (c *describeCache) fill(
+	key describeCacheKey,
+	entry *describeCacheEntry,
+	generation uint64,
+	priority ratelimit.Priority,
+) {
+	defer close(entry.done)
+
+	// The describe is shared with other reads, so it must not be cancelled
+	// when the read that started it gives up.
+	ctx, cancel := context.WithTimeout(
+		ratelimit.WithPriority(context.Background(), priority),
+		30*time.Second,
+	)
+	defer cancel()
+	input := &svcsdk.DescribeScalingPoliciesInput{
+		ServiceNamespace:  key.namespace,
+		ResourceId:        aws.String(key.resourceID),
+		ScalableDimension: key.dimension,
+		MaxResults:        aws.Int32(describeScalingPoliciesPageSize),
+	}
+	for {
+		resp, err := c.describe(ctx, input)
+		if err != nil {
+			entry.err = err
+			break
+		}
+		entry.policies = append(entry.policies, resp.ScalingPolicies...)
+		if resp.NextToken == nil {
+			break
+		}
+		input.NextToken = resp.NextToken
+	}
+	entry.expires = c.now().Add(c.ttl)
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if entry.err != nil || c.generations[key] != generation {
+		if c.entries[key] == entry {
+			delete(c.entries, key)
+		}
+	}
+}
+
+// customFindCached is the cached counterpart of sdkFind. It is called from
+// the sdk_read_many_post_build_request hook and, like sdkFind, returns
+// NotFound when the policy does not exist.
+func (rm *resourceManager) customFindCached(
+	ctx context.Context,
+	r *resource,
+	input *svcsdk.DescribeScalingPoliciesInput,
+	cache *describeCache,
+) (latest *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.customFindCached")
+	defer func() {
+		exit(err)
+	}()
+
+	observeRead := customStartPhase(timing.PhaseRead, "DescribeScalingPolicies")
+	policies, err := cache.get(ctx, describeCacheKey{
+		namespace:  input.ServiceNamespace,
+		resourceID: aws.ToString(input.ResourceId),
+		dimension:  input.ScalableDimension,
+	})
+	observeRead(err)
+	if err != nil {
+		var awsErr smithy.APIError
+		if errors.As(err, &awsErr) && awsErr.ErrorCode() == "UNKNOWN" {
+			return nil, ackerr.NotFound
+		}
+		return nil, err
+	}
+
+	resp := &svcsdk.DescribeScalingPoliciesOutput{}
+	for i := range policies {
+		if aws.ToString(policies[i].PolicyName) == *r.ko.Spec.PolicyName {
+			resp.ScalingPolicies = append(resp.ScalingPolicies, policies[i])
+			break
+		}
+	}
+	latest, err = rm.setResourceFromReadManyOutput(r, resp)
+	if err != nil {
+		return nil, err
+	}
+	// The cached policies are shared with other reads, so latest must not
+	// keep pointers into them.
+	latest.ko = latest.ko.DeepCopy()
+	rm.setStatusDefaults(latest.ko)
+	rm.customSetLastModifiedTimeToCreationTime(latest.ko)
+	return latest, nil
+}
@@ -0,0 +1,241 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package scaling_policy
+
+import (
+	"context"
+	"errors"
+	"strconv"
+	"sync"
+	"testing"
+	"time"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/applicationautoscaling/types"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/readiness"
+)
+
+var testKey = describeCacheKey{
+	namespace:  svcsdktypes.ServiceNamespaceSagemaker,
+	resourceID: "endpoint/e/variant/v",
+	dimension:  svcsdktypes.ScalableDimensionSageMakerVariantDesiredInstanceCount,
+}
+
+// fakeDescribe answers DescribeScalingPolicies with a policy named after the
+// number of calls made so far, and counts the calls.
+type fakeDescribe struct {
+	mu    sync.Mutex
+	calls int
+	err   error
+	// started, when set, receives a value as every call starts
+	started chan struct{}
+	// release, when set, holds every call until it is closed
+	release chan struct{}
+}
+
+func (f *fakeDescribe) describe(
+	ctx context.Context,
+	input *svcsdk.DescribeScalingPoliciesInput,
+) (*svcsdk.DescribeScalingPoliciesOutput, error) {
+	f.mu.Lock()
+	f.calls++
+	calls := f.calls
+	f.mu.Unlock()
+	if f.started != nil {
+		f.started <- struct{}{}
+	}
+	if f.release != nil {
+		<-f.release
+	}
+	if f.err != nil {
+		return nil, f.err
+	}
+	return &svcsdk.DescribeScalingPoliciesOutput{
+		ScalingPolicies: []svcsdktypes.ScalingPolicy{
+			{PolicyName: aws.String(policyName(calls))},
+		},
+	}, nil
+}
+
+func (f *fakeDescribe) callCount() int {
+	f.mu.Lock()
+	defer f.mu.Unlock()
+	return f.calls
+}
+
+func policyName(call int) string {
+	return "policy-" + strconv.Itoa(call)
+}
+
+// fakeClock is a settable clock for the cache's expiry.
+type fakeClock struct {
+	mu  sync.Mutex
+	now time.Time
+}
+
+func (c *fakeClock) Now() time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return c.now
+}
+
+func (c *fakeClock) Advance(d time.Duration) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.now = c.now.Add(d)
+}
+
+func newTestCache(ttl time.Duration, fake *fakeDescribe) (*describeCache, *fakeClock) {
+	clock := &fakeClock{now: time.Unix(0, 0)}
+	c := newDescribeCache(ttl, fake.describe)
+	c.now = clock.Now
+	return c, clock
+}
+
+func getName(t *testing.T, c *describeCache) string {
+	t.Helper()
+	policies, err := c.get(context.Background(), testKey)
+	require.NoError(t, err)
+	require.Len(t, policies, 1)
+	return aws.ToString(policies[0].PolicyName)
+}
+
+func TestDescribeCache_ReusesEntryUntilTTLExpires(t *testing.T) {
+	fake := &fakeDescribe{}
+	c, clock := newTestCache(5*time.Second, fake)
+
+	assert.Equal(t, policyName(1), getName(t, c))
+	clock.Advance(4 * time.Second)
+	assert.Equal(t, policyName(1), getName(t, c))
+	assert.Equal(t, 1, fake.callCount())
+
+	clock.Advance(time.Second)
+	assert.Equal(t, policyName(2), getName(t, c))
+	assert.Equal(t, 2, fake.callCount())
+}
+
+func TestDescribeCache_InvalidateForcesDescribe(t *testing.T) {
+	fake := &fakeDescribe{}
+	c, _ := newTestCache(time.Hour, fake)
+
+	assert.Equal(t, policyName(1), getName(t, c))
+	c.invalidate(testKey)
+	assert.Equal(t, policyName(2), getName(t, c))
+	assert.Equal(t, 2, fake.callCount())
+}
+
+func TestDescribeCache_InvalidatedFillIsNotKept(t *testing.T) {
+	fake := &fakeDescribe{started: make(chan struct{}), release: make(chan struct{})}
+	c, _ := newTestCache(time.Hour, fake)
+
+	first := make(chan string)
+	go func() { first <- getName(t, c) }()
+	<-fake.started
+	// A write lands while the describe is in flight
+	c.invalidate(testKey)
+	close(fake.release)
+	assert.Equal(t, policyName(1), <-first)
+
+	fake.started = nil
+	assert.Equal(t, policyName(2), getName(t, c))
+}
+
+func TestDescribeCache_ConcurrentReadsShareOneFill(t *testing.T) {
+	fake := &fakeDescribe{started: make(chan struct{}, 1), release: make(chan struct{})}
+	c, _ := newTestCache(time.Hour, fake)
+
+	names := make(chan string, 16)
+	var wg sync.WaitGroup
+	wg.Add(1)
+	go func() {
+		defer wg.Done()
+		names <- getName(t, c)
+	}()
+	<-fake.started
+	for i := 1; i < cap(names); i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			names <- getName(t, c)
+		}()
+	}
+	// Every read either finds the entry still being filled or, once it is
+	// released, the filled one
+	close(fake.release)
+	wg.Wait()
+	close(names)
+
+	assert.Equal(t, 1, fake.callCount())
+	for name := range names {
+		assert.Equal(t, policyName(1), name)
+	}
+}
+
+func TestDescribeCache_ErrorsAreNotCached(t *testing.T) {
+	describeErr := errors.New("throttled")
+	fake := &fakeDescribe{err: describeErr}
+	c, _ := newTestCache(time.Hour, fake)
+
+	_, err := c.get(context.Background(), testKey)
+	assert.ErrorIs(t, err, describeErr)
+
+	fake.err = nil
+	assert.Equal(t, policyName(2), getName(t, c))
+}
+
+func TestDescribeCache_CancelledReadDoesNotCancelFill(t *testing.T) {
+	fake := &fakeDescribe{started: make(chan struct{}, 1), release: make(chan struct{})}
+	c, _ := newTestCache(time.Hour, fake)
+
+	ctx, cancel := context.WithCancel(context.Background())
+	go func() {
+		// The read that starts the fill runs it, so hold it until the
+		// second read has given up
+		_, _ = c.get(context.Background(), testKey)
+	}()
+	<-fake.started
+	cancel()
+	_, err := c.get(ctx, testKey)
+	assert.ErrorIs(t, err, context.Canceled)
+
+	close(fake.release)
+	assert.Equal(t, policyName(1), getName(t, c))
+	assert.Equal(t, 1, fake.callCount())
+}
+
+func TestDescribeCache_DeregisteredTargetIsInvalidated(t *testing.T) {
+	fake := &fakeDescribe{}
+	c, _ := newTestCache(time.Hour, fake)
+	rm := &resourceManager{}
+	describeCachesMu.Lock()
+	describeCaches[rm] = c
+	describeCachesMu.Unlock()
+	defer func() {
+		describeCachesMu.Lock()
+		delete(describeCaches, rm)
+		describeCachesMu.Unlock()
+	}()
+
+	assert.Equal(t, policyName(1), getName(t, c))
+	readiness.Default().Forget(readiness.Key{
+		ServiceNamespace:  string(testKey.namespace),
+		ResourceID:        testKey.resourceID,
+		ScalableDimension: string(testKey.dimension),
+	})
+	assert.Equal(t, policyName(2), getName(t, c))
+}
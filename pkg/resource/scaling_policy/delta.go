@@ -41,6 +41,7 @@ func newResourceDelta(
 		delta.Add("", a, b)
 		return delta
 	}
+	observeCompare := customStartPhase("compare", "")
 
 	if ackcompare.HasNilDifference(a.ko.Spec.PolicyName, b.ko.Spec.PolicyName) {
 		delta.Add("Spec.PolicyName", a.ko.Spec.PolicyName, b.ko.Spec.PolicyName)
@@ -206,5 +207,6 @@ func newResourceDelta(
 		}
 	}
 
+	observeCompare(nil)
 	return delta
 }
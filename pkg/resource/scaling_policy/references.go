@@ -46,7 +46,9 @@ func (rm *resourceManager) ResolveReferences(
 	ctx context.Context,
 	apiReader client.Reader,
 	res acktypes.AWSResource,
-) (acktypes.AWSResource, bool, error) {
+) (_ acktypes.AWSResource, _ bool, err error) {
+	observeResolve := customStartResolveReferences()
+	defer func() { observeResolve(err) }()
 	return res, false, nil
 }
 
@@ -75,9 +75,25 @@ func (rm *resourceManager) sdkFind(
 	if err != nil {
 		return nil, err
 	}
+	ctx = rm.customReadContext(ctx, r)
+	if err = rm.customCheckShard(r); err != nil {
+		return nil, err
+	}
+	if err = rm.customStaggerStartup(r); err != nil {
+		return nil, err
+	}
 	rm.customSetDescribeScalingPoliciesInput(ctx, r, input)
+	if cache := rm.describeCache(); cache != nil {
+		return rm.customFindCached(ctx, r, input, cache)
+	}
+	if err = rm.customWaitForRateLimit(ctx, "DescribeScalingPolicies"); err != nil {
+		return nil, err
+	}
+	observeRead := customStartPhase("read", "DescribeScalingPolicies")
 	var resp *svcsdk.DescribeScalingPoliciesOutput
 	resp, err = rm.sdkapi.DescribeScalingPolicies(ctx, input)
+	observeRead(err)
+	err = rm.customObserveRateLimit("DescribeScalingPolicies", err)
 	rm.metrics.RecordAPICall("READ_MANY", "DescribeScalingPolicies", err)
 	if err != nil {
 		var awsErr smithy.APIError
@@ -301,10 +317,19 @@ func (rm *resourceManager) sdkCreate(
 	if err != nil {
 		return nil, err
 	}
+	targetMark := rm.customTargetMark()
+	if err = rm.customWaitForRateLimit(ctx, "PutScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("create", "PutScalingPolicy")
 
 	var resp *svcsdk.PutScalingPolicyOutput
 	_ = resp
 	resp, err = rm.sdkapi.PutScalingPolicy(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("PutScalingPolicy", err)
+	rm.invalidateDescribeCache(desired)
+	resp, err = rm.customPutAfterTarget(ctx, desired, input, resp, err, targetMark)
 	rm.metrics.RecordAPICall("CREATE", "PutScalingPolicy", err)
 	if err != nil {
 		return nil, err
@@ -499,10 +524,17 @@ func (rm *resourceManager) sdkUpdate(
 	if err != nil {
 		return nil, err
 	}
+	if err = rm.customWaitForRateLimit(ctx, "PutScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("update", "PutScalingPolicy")
 
 	var resp *svcsdk.PutScalingPolicyOutput
 	_ = resp
 	resp, err = rm.sdkapi.PutScalingPolicy(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("PutScalingPolicy", err)
+	rm.invalidateDescribeCache(desired)
 	rm.metrics.RecordAPICall("UPDATE", "PutScalingPolicy", err)
 	if err != nil {
 		return nil, err
@@ -696,9 +728,16 @@ func (rm *resourceManager) sdkDelete(
 	if err != nil {
 		return nil, err
 	}
+	if err = rm.customWaitForRateLimit(ctx, "DeleteScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("delete", "DeleteScalingPolicy")
 	var resp *svcsdk.DeleteScalingPolicyOutput
 	_ = resp
 	resp, err = rm.sdkapi.DeleteScalingPolicy(ctx, input)
+	observeCall(err)
+	err = rm.customObserveRateLimit("DeleteScalingPolicy", err)
+	rm.invalidateDescribeCache(r)
 	rm.metrics.RecordAPICall("DELETE", "DeleteScalingPolicy", err)
 	return nil, err
 }
@@ -831,3 +870,176 @@ func (rm *resourceManager) terminalAWSError(err error) bool {
 	// No terminal_errors specified for this resource in generator config
 	return false
 }
+
+// setResourceFromReadManyOutput merges the scaling policy described in resp
+// into a copy of r, the same way sdkFind does with its own response, and
+// returns NotFound if resp holds none. The describe cache uses it so that
+// cached reads share the generated field mapping.
+func (rm *resourceManager) setResourceFromReadManyOutput(
+	r *resource,
+	resp *svcsdk.DescribeScalingPoliciesOutput,
+) (*resource, error) {
+	ko := r.ko.DeepCopy()
+
+	found := false
+	for _, elem := range resp.ScalingPolicies {
+		if elem.Alarms != nil {
+			f0 := []*svcapitypes.Alarm{}
+			for _, f0iter := range elem.Alarms {
+				f0elem := &svcapitypes.Alarm{}
+				if f0iter.AlarmARN != nil {
+					f0elem.AlarmARN = f0iter.AlarmARN
+				}
+				if f0iter.AlarmName != nil {
+					f0elem.AlarmName = f0iter.AlarmName
+				}
+				f0 = append(f0, f0elem)
+			}
+			ko.Status.Alarms = f0
+		} else {
+			ko.Status.Alarms = nil
+		}
+		if elem.CreationTime != nil {
+			ko.Status.CreationTime = &metav1.Time{*elem.CreationTime}
+		} else {
+			ko.Status.CreationTime = nil
+		}
+		if elem.PolicyARN != nil {
+			if ko.Status.ACKResourceMetadata == nil {
+				ko.Status.ACKResourceMetadata = &ackv1alpha1.ResourceMetadata{}
+			}
+			tmpARN := ackv1alpha1.AWSResourceName(*elem.PolicyARN)
+			ko.Status.ACKResourceMetadata.ARN = &tmpARN
+		}
+		if elem.PolicyName != nil {
+			ko.Spec.PolicyName = elem.PolicyName
+		} else {
+			ko.Spec.PolicyName = nil
+		}
+		if elem.PolicyType != "" {
+			ko.Spec.PolicyType = aws.String(string(elem.PolicyType))
+		} else {
+			ko.Spec.PolicyType = nil
+		}
+		if elem.ResourceId != nil {
+			ko.Spec.ResourceID = elem.ResourceId
+		} else {
+			ko.Spec.ResourceID = nil
+		}
+		if elem.ScalableDimension != "" {
+			ko.Spec.ScalableDimension = aws.String(string(elem.ScalableDimension))
+		} else {
+			ko.Spec.ScalableDimension = nil
+		}
+		if elem.ServiceNamespace != "" {
+			ko.Spec.ServiceNamespace = aws.String(string(elem.ServiceNamespace))
+		} else {
+			ko.Spec.ServiceNamespace = nil
+		}
+		if elem.StepScalingPolicyConfiguration != nil {
+			f9 := &svcapitypes.StepScalingPolicyConfiguration{}
+			if elem.StepScalingPolicyConfiguration.AdjustmentType != "" {
+				f9.AdjustmentType = aws.String(string(elem.StepScalingPolicyConfiguration.AdjustmentType))
+			}
+			if elem.StepScalingPolicyConfiguration.Cooldown != nil {
+				cooldownCopy := int64(*elem.StepScalingPolicyConfiguration.Cooldown)
+				f9.Cooldown = &cooldownCopy
+			}
+			if elem.StepScalingPolicyConfiguration.MetricAggregationType != "" {
+				f9.MetricAggregationType = aws.String(string(elem.StepScalingPolicyConfiguration.MetricAggregationType))
+			}
+			if elem.StepScalingPolicyConfiguration.MinAdjustmentMagnitude != nil {
+				minAdjustmentMagnitudeCopy := int64(*elem.StepScalingPolicyConfiguration.MinAdjustmentMagnitude)
+				f9.MinAdjustmentMagnitude = &minAdjustmentMagnitudeCopy
+			}
+			if elem.StepScalingPolicyConfiguration.StepAdjustments != nil {
+				f9f4 := []*svcapitypes.StepAdjustment{}
+				for _, f9f4iter := range elem.StepScalingPolicyConfiguration.StepAdjustments {
+					f9f4elem := &svcapitypes.StepAdjustment{}
+					if f9f4iter.MetricIntervalLowerBound != nil {
+						f9f4elem.MetricIntervalLowerBound = f9f4iter.MetricIntervalLowerBound
+					}
+					if f9f4iter.MetricIntervalUpperBound != nil {
+						f9f4elem.MetricIntervalUpperBound = f9f4iter.MetricIntervalUpperBound
+					}
+					if f9f4iter.ScalingAdjustment != nil {
+						scalingAdjustmentCopy := int64(*f9f4iter.ScalingAdjustment)
+						f9f4elem.ScalingAdjustment = &scalingAdjustmentCopy
+					}
+					f9f4 = append(f9f4, f9f4elem)
+				}
+				f9.StepAdjustments = f9f4
+			}
+			ko.Spec.StepScalingPolicyConfiguration = f9
+		} else {
+			ko.Spec.StepScalingPolicyConfiguration = nil
+		}
+		if elem.TargetTrackingScalingPolicyConfiguration != nil {
+			f10 := &svcapitypes.TargetTrackingScalingPolicyConfiguration{}
+			if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification != nil {
+				f10f0 := &svcapitypes.CustomizedMetricSpecification{}
+				if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Dimensions != nil {
+					f10f0f0 := []*svcapitypes.MetricDimension{}
+					for _, f10f0f0iter := range elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Dimensions {
+						f10f0f0elem := &svcapitypes.MetricDimension{}
+						if f10f0f0iter.Name != nil {
+							f10f0f0elem.Name = f10f0f0iter.Name
+						}
+						if f10f0f0iter.Value != nil {
+							f10f0f0elem.Value = f10f0f0iter.Value
+						}
+						f10f0f0 = append(f10f0f0, f10f0f0elem)
+					}
+					f10f0.Dimensions = f10f0f0
+				}
+				if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.MetricName != nil {
+					f10f0.MetricName = elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.MetricName
+				}
+				if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Namespace != nil {
+					f10f0.Namespace = elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Namespace
+				}
+				if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Statistic != "" {
+					f10f0.Statistic = aws.String(string(elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Statistic))
+				}
+				if elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Unit != nil {
+					f10f0.Unit = elem.TargetTrackingScalingPolicyConfiguration.CustomizedMetricSpecification.Unit
+				}
+				f10.CustomizedMetricSpecification = f10f0
+			}
+			if elem.TargetTrackingScalingPolicyConfiguration.DisableScaleIn != nil {
+				f10.DisableScaleIn = elem.TargetTrackingScalingPolicyConfiguration.DisableScaleIn
+			}
+			if elem.TargetTrackingScalingPolicyConfiguration.PredefinedMetricSpecification != nil {
+				f10f2 := &svcapitypes.PredefinedMetricSpecification{}
+				if elem.TargetTrackingScalingPolicyConfiguration.PredefinedMetricSpecification.PredefinedMetricType != "" {
+					f10f2.PredefinedMetricType = aws.String(string(elem.TargetTrackingScalingPolicyConfiguration.PredefinedMetricSpecification.PredefinedMetricType))
+				}
+				if elem.TargetTrackingScalingPolicyConfiguration.PredefinedMetricSpecification.ResourceLabel != nil {
+					f10f2.ResourceLabel = elem.TargetTrackingScalingPolicyConfiguration.PredefinedMetricSpecification.ResourceLabel
+				}
+				f10.PredefinedMetricSpecification = f10f2
+			}
+			if elem.TargetTrackingScalingPolicyConfiguration.ScaleInCooldown != nil {
+				scaleInCooldownCopy := int64(*elem.TargetTrackingScalingPolicyConfiguration.ScaleInCooldown)
+				f10.ScaleInCooldown = &scaleInCooldownCopy
+			}
+			if elem.TargetTrackingScalingPolicyConfiguration.ScaleOutCooldown != nil {
+				scaleOutCooldownCopy := int64(*elem.TargetTrackingScalingPolicyConfiguration.ScaleOutCooldown)
+				f10.ScaleOutCooldown = &scaleOutCooldownCopy
+			}
+			if elem.TargetTrackingScalingPolicyConfiguration.TargetValue != nil {
+				f10.TargetValue = elem.TargetTrackingScalingPolicyConfiguration.TargetValue
+			}
+			ko.Spec.TargetTrackingScalingPolicyConfiguration = f10
+		} else {
+			ko.Spec.TargetTrackingScalingPolicyConfiguration = nil
+		}
+		found = true
+		break
+	}
+	if !found {
+		return nil, ackerr.NotFound
+	}
+
+	return &resource{ko}, nil
+}
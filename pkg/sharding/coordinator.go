@@ -0,0 +1,432 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package sharding
+
+import (
+	"context"
+	"fmt"
+	"hash/fnv"
+	"sort"
+	"strconv"
+	"sync"
+	"time"
+
+	"github.com/go-logr/logr"
+	coordinationv1 "k8s.io/api/coordination/v1"
+	apierrors "k8s.io/apimachinery/pkg/api/errors"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	"k8s.io/client-go/kubernetes"
+	coordinationv1client "k8s.io/client-go/kubernetes/typed/coordination/v1"
+	"k8s.io/client-go/rest"
+	ctrlrtlog "sigs.k8s.io/controller-runtime/pkg/log"
+)
+
+const (
+	// groupLabel marks the leases of one group of replicas
+	groupLabel = "applicationautoscaling.services.k8s.aws/shard-group"
+	// roleLabel tells member leases from shard leases
+	roleLabel = "applicationautoscaling.services.k8s.aws/shard-role"
+	// shardLabel holds the shard number of a shard lease
+	shardLabel = "applicationautoscaling.services.k8s.aws/shard"
+
+	roleMember = "member"
+	roleShard  = "shard"
+
+	// releaseTimeout bounds handing back the leases on shutdown
+	releaseTimeout = 5 * time.Second
+)
+
+// Coordinator keeps the shard leases of one replica. It is a manager
+// Runnable that runs on every replica, leader or not.
+type Coordinator struct {
+	cfg    Config
+	leases coordinationv1client.LeaseInterface
+	log    logr.Logger
+	now    func() time.Time
+
+	mu sync.Mutex
+	// owned maps the shards this replica holds to when their lease was last
+	// renewed
+	owned map[int]time.Time
+	// waiting holds, for every shard, the resources this replica deferred
+	// and when it last did so
+	waiting []map[string]time.Time
+	// synced is set once the first sync has taken this replica's share
+	synced bool
+}
+
+// NewCoordinator returns the coordinator of the replica described by cfg,
+// keeping its leases through the API server at config.
+func NewCoordinator(config *rest.Config, cfg Config) (*Coordinator, error) {
+	clientset, err := kubernetes.NewForConfig(config)
+	if err != nil {
+		return nil, err
+	}
+	return newCoordinator(clientset.CoordinationV1().Leases(cfg.Namespace), cfg), nil
+}
+
+func newCoordinator(leases coordinationv1client.LeaseInterface, cfg Config) *Coordinator {
+	waiting := make([]map[string]time.Time, cfg.Shards)
+	for i := range waiting {
+		waiting[i] = map[string]time.Time{}
+	}
+	return &Coordinator{
+		cfg:     cfg,
+		leases:  leases,
+		log:     ctrlrtlog.Log.WithName("sharding").WithValues("identity", cfg.Identity),
+		now:     time.Now,
+		owned:   map[int]time.Time{},
+		waiting: waiting,
+	}
+}
+
+// NeedLeaderElection returns false: every replica takes part in sharding.
+func (c *Coordinator) NeedLeaderElection() bool {
+	return false
+}
+
+// Start renews leases and rebalances shards every renew interval until ctx
+// is done, then hands back every shard so that the remaining replicas can
+// take them over without waiting for the leases to expire.
+func (c *Coordinator) Start(ctx context.Context) error {
+	c.log.Info("starting shard coordinator", "shards", c.cfg.Shards, "label", c.cfg.Label)
+	ticker := time.NewTicker(c.cfg.RenewInterval)
+	defer ticker.Stop()
+	for {
+		if err := c.sync(ctx); err != nil && ctx.Err() == nil {
+			c.log.Error(err, "unable to sync shard leases")
+		}
+		select {
+		case <-ctx.Done():
+			releaseCtx, cancel := context.WithTimeout(context.Background(), releaseTimeout)
+			defer cancel()
+			c.leave(releaseCtx)
+			return nil
+		case <-ticker.C:
+		}
+	}
+}
+
+func (c *Coordinator) memberLeaseName() string {
+	return c.cfg.Group + "-member-" + c.cfg.Identity
+}
+
+func (c *Coordinator) shardLeaseName(shard int) string {
+	return fmt.Sprintf("%s-shard-%d", c.cfg.Group, shard)
+}
+
+// sync renews this replica's leases and moves it towards its share of the
+// shards: surplus shards are released and missing ones taken from the
+// shards nobody holds.
+func (c *Coordinator) sync(ctx context.Context) error {
+	now := c.now()
+	if err := c.heartbeat(ctx, now); err != nil {
+		return err
+	}
+	list, err := c.leases.List(ctx, metav1.ListOptions{
+		LabelSelector: groupLabel + "=" + c.cfg.Group,
+	})
+	if err != nil {
+		return err
+	}
+
+	var live []string
+	shards := map[int]*coordinationv1.Lease{}
+	for i := range list.Items {
+		lease := &list.Items[i]
+		switch lease.Labels[roleLabel] {
+		case roleMember:
+			if !expired(lease, now) {
+				live = append(live, holder(lease))
+			}
+		case roleShard:
+			shard, err := strconv.Atoi(lease.Labels[shardLabel])
+			if err == nil && shard >= 0 && shard < c.cfg.Shards {
+				shards[shard] = lease
+			}
+		}
+	}
+	members.Set(float64(len(live)))
+	share := c.share(live)
+
+	var held, free []int
+	for shard := 0; shard < c.cfg.Shards; shard++ {
+		lease := shards[shard]
+		switch {
+		case lease == nil || holder(lease) == "" || expired(lease, now):
+			free = append(free, shard)
+		case holder(lease) == c.cfg.Identity:
+			held = append(held, shard)
+		default:
+			c.drop(shard, "lost")
+		}
+	}
+
+	// Keep the shards this replica prefers, so that shards only move when
+	// the set of replicas changes
+	c.byPreference(held)
+	holding := 0
+	for i, shard := range held {
+		if i < share {
+			if err := c.renew(ctx, shards[shard], now); err != nil {
+				c.log.Error(err, "unable to renew shard lease", "shard", shard)
+				c.drop(shard, "lost")
+				continue
+			}
+			holding++
+			continue
+		}
+		c.drop(shard, "released")
+		if err := c.release(ctx, shards[shard]); err != nil {
+			c.log.Error(err, "unable to release shard lease", "shard", shard)
+		}
+	}
+
+	c.byPreference(free)
+	for _, shard := range free {
+		if holding >= share {
+			break
+		}
+		ok, err := c.acquire(ctx, shard, shards[shard], now)
+		if err != nil {
+			c.log.Error(err, "unable to acquire shard lease", "shard", shard)
+			continue
+		}
+		if ok {
+			holding++
+		}
+	}
+
+	c.prune(now)
+	c.mu.Lock()
+	c.synced = true
+	c.mu.Unlock()
+	return nil
+}
+
+// share returns how many shards this replica should hold among live
+// replicas: an even split, with the remainder going to the replicas that
+// sort first.
+func (c *Coordinator) share(live []string) int {
+	sort.Strings(live)
+	rank := sort.SearchStrings(live, c.cfg.Identity)
+	if rank == len(live) || live[rank] != c.cfg.Identity {
+		// Our own member lease was not listed yet, so count ourselves in
+		live = append(live[:rank], append([]string{c.cfg.Identity}, live[rank:]...)...)
+	}
+	share := c.cfg.Shards / len(live)
+	if rank < c.cfg.Shards%len(live) {
+		share++
+	}
+	return share
+}
+
+// byPreference sorts shards by how strongly this replica prefers them, a
+// rendezvous hash of the replica and the shard.
+func (c *Coordinator) byPreference(shards []int) {
+	score := func(shard int) uint64 {
+		h := fnv.New64a()
+		h.Write([]byte(c.cfg.Identity + "/" + strconv.Itoa(shard)))
+		return h.Sum64()
+	}
+	sort.Slice(shards, func(i, j int) bool {
+		return score(shards[i]) > score(shards[j])
+	})
+}
+
+// heartbeat creates or renews the member lease announcing this replica.
+func (c *Coordinator) heartbeat(ctx context.Context, now time.Time) error {
+	lease, err := c.leases.Get(ctx, c.memberLeaseName(), metav1.GetOptions{})
+	if apierrors.IsNotFound(err) {
+		_, err = c.leases.Create(ctx, c.newLease(c.memberLeaseName(), roleMember, "", now), metav1.CreateOptions{})
+		return err
+	}
+	if err != nil {
+		return err
+	}
+	lease = lease.DeepCopy()
+	c.hold(lease, now)
+	_, err = c.leases.Update(ctx, lease, metav1.UpdateOptions{})
+	return err
+}
+
+// acquire takes the free lease of shard, creating it if it does not exist
+// yet. It returns false if another replica got to it first.
+func (c *Coordinator) acquire(
+	ctx context.Context,
+	shard int,
+	lease *coordinationv1.Lease,
+	now time.Time,
+) (bool, error) {
+	var err error
+	if lease == nil {
+		lease = c.newLease(c.shardLeaseName(shard), roleShard, strconv.Itoa(shard), now)
+		_, err = c.leases.Create(ctx, lease, metav1.CreateOptions{})
+	} else {
+		lease = lease.DeepCopy()
+		count := int32(1)
+		if lease.Spec.LeaseTransitions != nil {
+			count += *lease.Spec.LeaseTransitions
+		}
+		lease.Spec.LeaseTransitions = &count
+		lease.Spec.AcquireTime = &metav1.MicroTime{Time: now}
+		c.hold(lease, now)
+		// The update carries the resource version of the listed lease, so
+		// only one of several replicas racing for the shard gets it
+		_, err = c.leases.Update(ctx, lease, metav1.UpdateOptions{})
+	}
+	if apierrors.IsConflict(err) || apierrors.IsAlreadyExists(err) {
+		return false, nil
+	}
+	if err != nil {
+		return false, err
+	}
+	c.log.Info("acquired shard", "shard", shard)
+	transitions.WithLabelValues("acquired").Inc()
+	c.mu.Lock()
+	c.owned[shard] = now
+	queueDepth.WithLabelValues(strconv.Itoa(shard)).Set(float64(len(c.waiting[shard])))
+	c.mu.Unlock()
+	owned.WithLabelValues(strconv.Itoa(shard)).Set(1)
+	return true, nil
+}
+
+// renew extends the lease of a shard this replica holds.
+func (c *Coordinator) renew(ctx context.Context, lease *coordinationv1.Lease, now time.Time) error {
+	lease = lease.DeepCopy()
+	c.hold(lease, now)
+	if _, err := c.leases.Update(ctx, lease, metav1.UpdateOptions{}); err != nil {
+		return err
+	}
+	shard, _ := strconv.Atoi(lease.Labels[shardLabel])
+	c.mu.Lock()
+	c.owned[shard] = now
+	c.mu.Unlock()
+	owned.WithLabelValues(strconv.Itoa(shard)).Set(1)
+	return nil
+}
+
+// release hands back the lease of a shard. The shard must already have been
+// dropped, so that no reconcile starts on it while another replica takes it.
+func (c *Coordinator) release(ctx context.Context, lease *coordinationv1.Lease) error {
+	lease = lease.DeepCopy()
+	lease.Spec.HolderIdentity = nil
+	_, err := c.leases.Update(ctx, lease, metav1.UpdateOptions{})
+	if apierrors.IsConflict(err) || apierrors.IsNotFound(err) {
+		return nil
+	}
+	return err
+}
+
+// drop stops treating shard as owned by this replica.
+func (c *Coordinator) drop(shard int, result string) {
+	c.mu.Lock()
+	_, ok := c.owned[shard]
+	delete(c.owned, shard)
+	c.mu.Unlock()
+	if !ok {
+		return
+	}
+	c.log.Info("shard no longer owned", "shard", shard, "result", result)
+	transitions.WithLabelValues(result).Inc()
+	owned.WithLabelValues(strconv.Itoa(shard)).Set(0)
+	queueDepth.WithLabelValues(strconv.Itoa(shard)).Set(0)
+}
+
+// leave releases every shard and deletes the member lease, so that the
+// other replicas rebalance on their next sync.
+func (c *Coordinator) leave(ctx context.Context) {
+	list, err := c.leases.List(ctx, metav1.ListOptions{
+		LabelSelector: groupLabel + "=" + c.cfg.Group + "," + roleLabel + "=" + roleShard,
+	})
+	if err == nil {
+		for i := range list.Items {
+			lease := &list.Items[i]
+			if holder(lease) != c.cfg.Identity {
+				continue
+			}
+			shard, _ := strconv.Atoi(lease.Labels[shardLabel])
+			c.drop(shard, "released")
+			if err := c.release(ctx, lease); err != nil {
+				c.log.Error(err, "unable to release shard lease", "shard", shard)
+			}
+		}
+	}
+	err = c.leases.Delete(ctx, c.memberLeaseName(), metav1.DeleteOptions{})
+	if err != nil && !apierrors.IsNotFound(err) {
+		c.log.Error(err, "unable to delete member lease")
+	}
+}
+
+// prune forgets deferred resources that were not seen again for a while.
+// Every resource of a shard owned elsewhere comes back once per requeue
+// interval, so those are resources that were deleted.
+func (c *Coordinator) prune(now time.Time) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	for shard, waiting := range c.waiting {
+		for key, seen := range waiting {
+			if now.Sub(seen) > 2*c.cfg.RequeueInterval+c.cfg.LeaseDuration {
+				delete(waiting, key)
+			}
+		}
+		if _, ok := c.owned[shard]; ok {
+			queueDepth.WithLabelValues(strconv.Itoa(shard)).Set(float64(len(waiting)))
+		}
+	}
+}
+
+func (c *Coordinator) newLease(name, role, shard string, now time.Time) *coordinationv1.Lease {
+	lease := &coordinationv1.Lease{
+		ObjectMeta: metav1.ObjectMeta{
+			Name:      name,
+			Namespace: c.cfg.Namespace,
+			Labels: map[string]string{
+				groupLabel: c.cfg.Group,
+				roleLabel:  role,
+			},
+		},
+	}
+	if shard != "" {
+		lease.Labels[shardLabel] = shard
+	}
+	lease.Spec.AcquireTime = &metav1.MicroTime{Time: now}
+	c.hold(lease, now)
+	return lease
+}
+
+// hold makes this replica the holder of lease as of now.
+func (c *Coordinator) hold(lease *coordinationv1.Lease, now time.Time) {
+	identity := c.cfg.Identity
+	seconds := int32(c.cfg.LeaseDuration / time.Second)
+	lease.Spec.HolderIdentity = &identity
+	lease.Spec.LeaseDurationSeconds = &seconds
+	lease.Spec.RenewTime = &metav1.MicroTime{Time: now}
+}
+
+func holder(lease *coordinationv1.Lease) string {
+	if lease.Spec.HolderIdentity == nil {
+		return ""
+	}
+	return *lease.Spec.HolderIdentity
+}
+
+// expired returns true if lease was not renewed within its duration.
+func expired(lease *coordinationv1.Lease, now time.Time) bool {
+	if lease.Spec.RenewTime == nil || lease.Spec.LeaseDurationSeconds == nil {
+		return true
+	}
+	duration := time.Duration(*lease.Spec.LeaseDurationSeconds) * time.Second
+	return now.After(lease.Spec.RenewTime.Add(duration))
+}
@@ -0,0 +1,236 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package sharding
+
+import (
+	"context"
+	"errors"
+	"sort"
+	"sync"
+	"testing"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	"k8s.io/client-go/kubernetes/fake"
+	coordinationv1client "k8s.io/client-go/kubernetes/typed/coordination/v1"
+)
+
+const (
+	testShards        = 8
+	testLeaseDuration = 15 * time.Second
+)
+
+// testClock is a clock shared by the coordinators of a test.
+type testClock struct {
+	mu  sync.Mutex
+	now time.Time
+}
+
+func (c *testClock) Now() time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return c.now
+}
+
+func (c *testClock) Advance(d time.Duration) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.now = c.now.Add(d)
+}
+
+type testCluster struct {
+	leases coordinationv1client.LeaseInterface
+	clock  *testClock
+}
+
+func newTestCluster() *testCluster {
+	return &testCluster{
+		leases: fake.NewClientset().CoordinationV1().Leases("ack-system"),
+		clock:  &testClock{now: time.Unix(1_700_000_000, 0)},
+	}
+}
+
+func (tc *testCluster) replica(identity string) *Coordinator {
+	c := newCoordinator(tc.leases, Config{
+		Shards:          testShards,
+		Identity:        identity,
+		Namespace:       "ack-system",
+		Group:           "ack-test",
+		LeaseDuration:   testLeaseDuration,
+		RenewInterval:   5 * time.Second,
+		RequeueInterval: 30 * time.Second,
+	})
+	c.now = tc.clock.Now
+	return c
+}
+
+// sync runs one sync of every replica in turn, the way their renew loops
+// would within one renew interval.
+func (tc *testCluster) sync(t *testing.T, replicas ...*Coordinator) {
+	t.Helper()
+	for _, c := range replicas {
+		require.NoError(t, c.sync(context.Background()))
+	}
+}
+
+func ownedShards(c *Coordinator) []int {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	var shards []int
+	for shard := range c.owned {
+		if c.ownsLocked(shard) {
+			shards = append(shards, shard)
+		}
+	}
+	sort.Ints(shards)
+	return shards
+}
+
+// objectIn returns a resource whose namespace hashes onto shard.
+func objectIn(t *testing.T, shard int) *metav1.ObjectMeta {
+	t.Helper()
+	for _, key := range keys(1000) {
+		if Shard(key, testShards) == shard {
+			return &metav1.ObjectMeta{Namespace: key, Name: "target"}
+		}
+	}
+	t.Fatalf("no namespace hashes onto shard %d", shard)
+	return nil
+}
+
+// assertPartition checks that every shard is owned by exactly one replica.
+func assertPartition(t *testing.T, replicas ...*Coordinator) {
+	t.Helper()
+	owners := map[int]string{}
+	for _, c := range replicas {
+		for _, shard := range ownedShards(c) {
+			if other, ok := owners[shard]; ok {
+				t.Errorf("shard %d owned by both %s and %s", shard, other, c.cfg.Identity)
+			}
+			owners[shard] = c.cfg.Identity
+		}
+	}
+	assert.Len(t, owners, testShards)
+}
+
+func TestCoordinator_SingleReplicaOwnsEveryShard(t *testing.T) {
+	tc := newTestCluster()
+	a := tc.replica("a")
+
+	obj := objectIn(t, 3)
+	assert.False(t, a.Owns(obj), "shards owned before the first sync")
+	var requeue *ackrequeue.RequeueNeededAfter
+	require.True(t, errors.As(a.Check("ScalableTarget", obj), &requeue))
+	// Before the first sync, deferred resources are looked at again soon
+	assert.Equal(t, a.cfg.RenewInterval, requeue.Duration())
+
+	tc.sync(t, a)
+	assert.Len(t, ownedShards(a), testShards)
+	assert.True(t, a.Owns(obj))
+	assert.NoError(t, a.Check("ScalableTarget", obj))
+}
+
+func TestCoordinator_JoiningReplicaGetsItsShare(t *testing.T) {
+	tc := newTestCluster()
+	a, b := tc.replica("a"), tc.replica("b")
+	tc.sync(t, a)
+
+	// b announces itself but every shard is still held by a
+	tc.sync(t, b)
+	assert.Empty(t, ownedShards(b))
+	// a sees b and hands back its surplus, which b then takes
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a, b)
+
+	assert.Len(t, ownedShards(a), testShards/2)
+	assert.Len(t, ownedShards(b), testShards/2)
+	assertPartition(t, a, b)
+
+	// Further syncs leave the split alone
+	before := ownedShards(a)
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a, b)
+	assert.Equal(t, before, ownedShards(a))
+}
+
+func TestCoordinator_LeavingReplicaHandsOverItsShards(t *testing.T) {
+	tc := newTestCluster()
+	a, b := tc.replica("a"), tc.replica("b")
+	tc.sync(t, a, b)
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a, b)
+	require.Len(t, ownedShards(b), testShards/2)
+
+	b.leave(context.Background())
+	assert.Empty(t, ownedShards(b))
+
+	// a takes b's shards over on its next sync, without waiting for the
+	// leases to expire
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a)
+	assert.Len(t, ownedShards(a), testShards)
+}
+
+func TestCoordinator_ExpiredLeasesAreTakenOver(t *testing.T) {
+	tc := newTestCluster()
+	a, b := tc.replica("a"), tc.replica("b")
+	tc.sync(t, a, b)
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a, b)
+	shardOfB := ownedShards(b)[0]
+	obj := objectIn(t, shardOfB)
+
+	// b stops renewing, e.g. because its pod hangs
+	tc.clock.Advance(testLeaseDuration + time.Second)
+	assert.False(t, b.Owns(obj), "b still owns a shard whose lease it failed to renew")
+
+	tc.sync(t, a)
+	assert.Len(t, ownedShards(a), testShards)
+	assert.True(t, a.Owns(obj))
+}
+
+func TestCoordinator_RebalanceFencesInFlightReconcile(t *testing.T) {
+	tc := newTestCluster()
+	a, b := tc.replica("a"), tc.replica("b")
+	SetDefault(a)
+	defer SetDefault(nil)
+	tc.sync(t, a, b)
+
+	// a starts reconciling a resource of the shard it prefers least, which
+	// is one it hands over once b is there
+	shards := []int{0, 1, 2, 3, 4, 5, 6, 7}
+	a.byPreference(shards)
+	obj := objectIn(t, shards[len(shards)-1])
+	require.NoError(t, Check("ScalableTarget", obj))
+	require.NoError(t, Fence(obj))
+
+	// The shards are rebalanced before the reconcile gets to its writes
+	tc.clock.Advance(5 * time.Second)
+	tc.sync(t, a, b)
+	require.False(t, a.Owns(obj))
+	assert.True(t, b.Owns(obj))
+	assertPartition(t, a, b)
+
+	// The writes a's reconcile still has to make are fenced
+	err := Fence(obj)
+	assert.ErrorIs(t, err, ErrNotOwned)
+	var requeue *ackrequeue.RequeueNeededAfter
+	require.True(t, errors.As(err, &requeue))
+	assert.Equal(t, a.cfg.RequeueInterval, requeue.Duration())
+	// and so is its next reconcile
+	assert.ErrorIs(t, Check("ScalableTarget", obj), ErrNotOwned)
+}
@@ -0,0 +1,289 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package sharding splits the resources of the controller across replicas.
+//
+// Without it the controller runs as a single active replica, elected with a
+// leader lease, and every resource goes through that replica's workers.
+// With ACK_SHARDS set, every replica is active instead. Resources are hashed
+// by their namespace, or by the value of a label, onto a fixed number of
+// shards with a jump consistent hash, and each shard is owned by the replica
+// holding its coordination.k8s.io Lease. Replicas announce themselves with a
+// member lease and take or hand back shard leases until each one holds an
+// even share, so shards move when replicas join or leave.
+//
+// A replica still sees every resource, since all replicas watch the same
+// objects. Reads of resources of a shard it does not own are requeued
+// before anything is sent to AWS, and writes to them are fenced by the
+// manager's client, so only the owner reconciles them. A shard can change
+// hands while one of its resources is being reconciled, so the fence is
+// checked again on every write.
+package sharding
+
+import (
+	"errors"
+	"hash/fnv"
+	"os"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/prometheus/client_golang/prometheus"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+const (
+	// defaultLeaseDuration is how long a shard lease stays valid without
+	// being renewed when ACK_SHARD_LEASE_DURATION is not set.
+	defaultLeaseDuration = 15 * time.Second
+	// defaultRenewInterval is how often leases are renewed when
+	// ACK_SHARD_RENEW_INTERVAL is not set.
+	defaultRenewInterval = 5 * time.Second
+	// defaultRequeueInterval is how long a resource of a shard owned by
+	// another replica waits before it is looked at again when
+	// ACK_SHARD_REQUEUE_INTERVAL is not set. It bounds how long a shard
+	// that changed hands waits for its first reconciles.
+	defaultRequeueInterval = 30 * time.Second
+
+	keyNamespace   = "namespace"
+	keyLabelPrefix = "label:"
+)
+
+// ErrNotOwned is wrapped in the requeue returned for a resource of a shard
+// owned by another replica.
+var ErrNotOwned = errors.New("resource belongs to a shard owned by another replica")
+
+var (
+	owned = prometheus.NewGaugeVec(
+		prometheus.GaugeOpts{
+			Name: "ack_shard_owned",
+			Help: "Whether this replica owns the shard",
+		},
+		[]string{"shard"},
+	)
+	queueDepth = prometheus.NewGaugeVec(
+		prometheus.GaugeOpts{
+			Name: "ack_shard_queue_depth",
+			Help: "Number of resources of an owned shard waiting for their first reconcile by this replica",
+		},
+		[]string{"shard"},
+	)
+	reconciles = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_shard_reconciles_total",
+			Help: "Number of reads of resources by shard and whether this replica owned the shard",
+		},
+		[]string{"kind", "shard", "result"},
+	)
+	members = prometheus.NewGauge(
+		prometheus.GaugeOpts{
+			Name: "ack_shard_members",
+			Help: "Number of live replicas sharing the shards",
+		},
+	)
+	transitions = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_shard_transitions_total",
+			Help: "Number of shards acquired, released or lost by this replica",
+		},
+		[]string{"result"},
+	)
+
+	defaultMu          sync.RWMutex
+	defaultCoordinator *Coordinator
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(owned, queueDepth, reconciles, members, transitions)
+}
+
+// Config is the sharding setup of one replica.
+type Config struct {
+	// Shards is the number of shards. Zero disables sharding.
+	Shards int
+	// Label is the label whose value resources are hashed by. Resources
+	// without it, and all resources when Label is empty, are hashed by
+	// their namespace.
+	Label string
+	// Identity names this replica in the leases. It must be unique among
+	// the replicas and a valid Kubernetes object name.
+	Identity string
+	// Namespace is where the leases are kept.
+	Namespace string
+	// Group prefixes the lease names, so that several controllers can
+	// keep their leases in the same namespace.
+	Group string
+
+	LeaseDuration   time.Duration
+	RenewInterval   time.Duration
+	RequeueInterval time.Duration
+}
+
+// ConfigFromEnv reads the sharding settings from the environment. group
+// prefixes the lease names, and namespace is where the leases are kept,
+// the controller's own namespace if empty. Replicas are named after their
+// host name, which is the pod name.
+func ConfigFromEnv(group, namespace string) Config {
+	if namespace == "" {
+		namespace = os.Getenv("ACK_SYSTEM_NAMESPACE")
+	}
+	identity, _ := os.Hostname()
+	cfg := Config{
+		Shards:          tuning.Int(tuning.EnvShards, 0),
+		Identity:        identity,
+		Namespace:       namespace,
+		Group:           group,
+		LeaseDuration:   tuning.Duration(tuning.EnvShardLeaseDuration, defaultLeaseDuration),
+		RenewInterval:   tuning.Duration(tuning.EnvShardRenewInterval, defaultRenewInterval),
+		RequeueInterval: tuning.Duration(tuning.EnvShardRequeueInterval, defaultRequeueInterval),
+	}
+	if key := tuning.String(tuning.EnvShardKey, keyNamespace); strings.HasPrefix(key, keyLabelPrefix) {
+		cfg.Label = strings.TrimPrefix(key, keyLabelPrefix)
+	}
+	return cfg
+}
+
+// Enabled returns true if resources are sharded.
+func (c Config) Enabled() bool {
+	return c.Shards > 0
+}
+
+// ShardOf returns the shard of obj.
+func (c Config) ShardOf(obj metav1.Object) int {
+	key := obj.GetNamespace()
+	if c.Label != "" {
+		if v, ok := obj.GetLabels()[c.Label]; ok {
+			key = v
+		}
+	}
+	return Shard(key, c.Shards)
+}
+
+// Shard hashes key onto one of shards shards. Changing the number of shards
+// only moves the keys that have to move: going from n to n+1 shards moves
+// about a 1/(n+1) share of them, all to the new shard.
+func Shard(key string, shards int) int {
+	if shards <= 1 {
+		return 0
+	}
+	h := fnv.New64a()
+	h.Write([]byte(key))
+	return jumpHash(h.Sum64(), shards)
+}
+
+// jumpHash is the jump consistent hash of Lamping and Veach.
+func jumpHash(key uint64, buckets int) int {
+	b, j := int64(-1), int64(0)
+	for j < int64(buckets) {
+		b = j
+		key = key*2862933555777941757 + 1
+		j = int64(float64(b+1) * (float64(int64(1)<<31) / float64((key>>33)+1)))
+	}
+	return int(b)
+}
+
+// SetDefault makes c the coordinator consulted by Check and Owns.
+func SetDefault(c *Coordinator) {
+	defaultMu.Lock()
+	defer defaultMu.Unlock()
+	defaultCoordinator = c
+}
+
+// Default returns the coordinator set by SetDefault, or nil if sharding is
+// disabled.
+func Default() *Coordinator {
+	defaultMu.RLock()
+	defer defaultMu.RUnlock()
+	return defaultCoordinator
+}
+
+// Check returns a requeue if obj, a resource of kind, belongs to a shard
+// this replica does not own, and nil if it can be reconciled here.
+func Check(kind string, obj metav1.Object) error {
+	c := Default()
+	if c == nil {
+		return nil
+	}
+	return c.Check(kind, obj)
+}
+
+// Owns returns true if this replica owns the shard of obj, which is always
+// the case when sharding is disabled.
+func Owns(obj metav1.Object) bool {
+	c := Default()
+	if c == nil {
+		return true
+	}
+	return c.Owns(obj)
+}
+
+// Fence returns a requeue if this replica does not own the shard of obj,
+// and nil otherwise. Unlike Check, it does not count obj as deferred: it is
+// meant for writes made from a reconcile that already passed Check, when
+// the shard may have changed hands since.
+func Fence(obj metav1.Object) error {
+	c := Default()
+	if c == nil || c.Owns(obj) {
+		return nil
+	}
+	return ackrequeue.NeededAfter(ErrNotOwned, c.cfg.RequeueInterval)
+}
+
+// Check returns a requeue if obj, a resource of kind, belongs to a shard c
+// does not own, and nil if it can be reconciled here.
+func (c *Coordinator) Check(kind string, obj metav1.Object) error {
+	shard := c.cfg.ShardOf(obj)
+	label := strconv.Itoa(shard)
+	key := kind + "/" + obj.GetNamespace() + "/" + obj.GetName()
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	waiting := c.waiting[shard]
+	if c.ownsLocked(shard) {
+		if _, ok := waiting[key]; ok {
+			delete(waiting, key)
+			queueDepth.WithLabelValues(label).Set(float64(len(waiting)))
+		}
+		reconciles.WithLabelValues(kind, label, "owned").Inc()
+		return nil
+	}
+	// Remember the resource so that, should this replica acquire the shard,
+	// the resources it has yet to get to show up in the queue depth
+	waiting[key] = c.now()
+	reconciles.WithLabelValues(kind, label, "deferred").Inc()
+	if !c.synced {
+		// The shards are not split yet; look again once they are
+		return ackrequeue.NeededAfter(ErrNotOwned, c.cfg.RenewInterval)
+	}
+	return ackrequeue.NeededAfter(ErrNotOwned, c.cfg.RequeueInterval)
+}
+
+// Owns returns true if c owns the shard of obj.
+func (c *Coordinator) Owns(obj metav1.Object) bool {
+	shard := c.cfg.ShardOf(obj)
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return c.ownsLocked(shard)
+}
+
+// ownsLocked returns true if c holds the lease of shard and renewed it
+// recently enough that no other replica can have taken it over.
+func (c *Coordinator) ownsLocked(shard int) bool {
+	renewed, ok := c.owned[shard]
+	return ok && c.now().Sub(renewed) < c.cfg.LeaseDuration
+}
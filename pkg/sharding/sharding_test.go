@@ -0,0 +1,88 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package sharding
+
+import (
+	"strconv"
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+)
+
+func keys(n int) []string {
+	out := make([]string, n)
+	for i := range out {
+		out[i] = "namespace-" + strconv.Itoa(i)
+	}
+	return out
+}
+
+func TestShard_InRangeAndStable(t *testing.T) {
+	for _, key := range keys(1000) {
+		shard := Shard(key, 16)
+		assert.GreaterOrEqual(t, shard, 0)
+		assert.Less(t, shard, 16)
+		assert.Equal(t, shard, Shard(key, 16))
+	}
+	assert.Equal(t, 0, Shard("anything", 1))
+	assert.Equal(t, 0, Shard("anything", 0))
+}
+
+func TestShard_SpreadsKeysEvenly(t *testing.T) {
+	const shards, n = 8, 8000
+	counts := make([]int, shards)
+	for _, key := range keys(n) {
+		counts[Shard(key, shards)]++
+	}
+	for shard, count := range counts {
+		// Within 20% of an even split
+		assert.InDelta(t, n/shards, count, n/shards/5, "shard %d", shard)
+	}
+}
+
+func TestShard_AddingAShardOnlyMovesKeysToIt(t *testing.T) {
+	const n = 4000
+	moved := 0
+	for _, key := range keys(n) {
+		before, after := Shard(key, 8), Shard(key, 9)
+		if before != after {
+			assert.Equal(t, 8, after, "key %s moved between existing shards", key)
+			moved++
+		}
+	}
+	// About a ninth of the keys move
+	assert.InDelta(t, n/9, moved, n/9/4)
+}
+
+func TestConfig_ShardOf(t *testing.T) {
+	byNamespace := Config{Shards: 16}
+	byLabel := Config{Shards: 16, Label: "team"}
+	labelled := &metav1.ObjectMeta{Namespace: "ns-a", Labels: map[string]string{"team": "payments"}}
+	unlabelled := &metav1.ObjectMeta{Namespace: "ns-a"}
+
+	assert.Equal(t, Shard("ns-a", 16), byNamespace.ShardOf(labelled))
+	assert.Equal(t, Shard("payments", 16), byLabel.ShardOf(labelled))
+	// Resources without the label fall back to their namespace
+	assert.Equal(t, Shard("ns-a", 16), byLabel.ShardOf(unlabelled))
+}
+
+func TestDisabledShardingOwnsEverything(t *testing.T) {
+	SetDefault(nil)
+	obj := &metav1.ObjectMeta{Namespace: "ns-a", Name: "target"}
+
+	assert.True(t, Owns(obj))
+	assert.NoError(t, Check("ScalableTarget", obj))
+	assert.NoError(t, Fence(obj))
+}
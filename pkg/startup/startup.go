@@ -0,0 +1,168 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package startup spreads the first resync of existing resources after the
+// controller starts.
+//
+// Without it every resource is read from AWS as soon as the informers list
+// it, which bursts both the AWS API and the Kubernetes API server when a
+// controller with thousands of resources restarts. With a stagger window
+// set, resources that are not yet synced are still reconciled immediately,
+// while resources that were already synced are requeued to a point in the
+// window derived from their name, so they trickle in at an even rate.
+package startup
+
+import (
+	"errors"
+	"hash/fnv"
+	"sync"
+	"time"
+
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/prometheus/client_golang/prometheus"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+// ErrStaggered is wrapped in the requeue returned for a deferred resync.
+var ErrStaggered = errors.New("initial resync deferred by startup stagger")
+
+var (
+	deferred = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_startup_resync_deferred_total",
+			Help: "Number of resources whose first resync after startup was deferred",
+		},
+		[]string{"kind"},
+	)
+	released = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_startup_resync_released_total",
+			Help: "Number of resources whose first resync after startup has run",
+		},
+		[]string{"kind"},
+	)
+	pending = prometheus.NewGaugeVec(
+		prometheus.GaugeOpts{
+			Name: "ack_startup_resync_pending",
+			Help: "Number of deferred resources still waiting for their first resync",
+		},
+		[]string{"kind"},
+	)
+
+	processStart = time.Now()
+	window       = tuning.Duration(tuning.EnvStartupStaggerWindow, 0)
+
+	staggersMu sync.Mutex
+	staggers   = map[string]*Stagger{}
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(deferred, released, pending)
+}
+
+// For returns the stagger shared by every resource of kind, or nil if
+// staggering is disabled.
+func For(kind string) *Stagger {
+	if window <= 0 {
+		return nil
+	}
+	staggersMu.Lock()
+	defer staggersMu.Unlock()
+	s, ok := staggers[kind]
+	if !ok {
+		s = New(kind, processStart, window)
+		staggers[kind] = s
+	}
+	return s
+}
+
+// Stagger decides when each resource of one kind gets its first resync.
+type Stagger struct {
+	kind   string
+	start  time.Time
+	window time.Duration
+	now    func() time.Time
+
+	mu sync.Mutex
+	// seen maps the resources already handled to whether they are still
+	// waiting for a deferred resync
+	seen map[string]bool
+	done bool
+}
+
+// New returns a stagger spreading the first resyncs of kind over window,
+// counted from start.
+func New(kind string, start time.Time, window time.Duration) *Stagger {
+	return &Stagger{
+		kind:   kind,
+		start:  start,
+		window: window,
+		now:    time.Now,
+		seen:   map[string]bool{},
+	}
+}
+
+// Check returns a requeue if the resync of the resource identified by key
+// should happen later, and nil if it can run now. synced tells whether the
+// resource was already synced before the controller started; unsynced
+// resources are never deferred.
+func (s *Stagger) Check(key string, synced bool) error {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if s.done {
+		return nil
+	}
+	elapsed := s.now().Sub(s.start)
+	if elapsed >= s.window {
+		// Past the window nothing is deferred any more, so the bookkeeping
+		// can go
+		s.done = true
+		s.seen = nil
+		return nil
+	}
+
+	waiting, ok := s.seen[key]
+	if ok {
+		if waiting {
+			s.seen[key] = false
+			pending.WithLabelValues(s.kind).Dec()
+			released.WithLabelValues(s.kind).Inc()
+		}
+		return nil
+	}
+	if !synced {
+		s.seen[key] = false
+		released.WithLabelValues(s.kind).Inc()
+		return nil
+	}
+
+	delay := s.slot(key) - elapsed
+	if delay <= 0 {
+		s.seen[key] = false
+		released.WithLabelValues(s.kind).Inc()
+		return nil
+	}
+	s.seen[key] = true
+	deferred.WithLabelValues(s.kind).Inc()
+	pending.WithLabelValues(s.kind).Inc()
+	return ackrequeue.NeededAfter(ErrStaggered, delay)
+}
+
+// slot returns the offset into the window at which key is resynced.
+func (s *Stagger) slot(key string) time.Duration {
+	h := fnv.New64a()
+	h.Write([]byte(key))
+	return time.Duration(h.Sum64() % uint64(s.window))
+}
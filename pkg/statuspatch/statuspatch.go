@@ -0,0 +1,263 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package statuspatch drops status patches that would not change anything.
+//
+// The ACK runtime patches a resource's status several times in a reconcile,
+// e.g. right after creating the AWS resource and again once the reconcile
+// ends, and always once per resync. It computes each patch against the
+// resource as the reconcile first saw it, so a patch can repeat what an
+// earlier patch of the same reconcile already wrote, or only reorder
+// conditions. Every one of those is still a request to the API server.
+//
+// When ACK_SKIP_UNCHANGED_STATUS_PATCHES is true, the client returned by
+// NewClient applies each status merge patch to the resource in the informer
+// cache first, and only sends it if the resulting status is semantically
+// different: conditions are compared regardless of their order, and empty
+// values the same as missing ones. Patches that change the status are sent
+// unchanged, so the write made right after a create, which records the ARN,
+// still happens at once. The skipping is off by default: the informer cache
+// can lag behind the API server, and a patch skipped against a stale copy
+// is lost until the next resync writes the status again.
+//
+// When the controller is sharded, status patches of resources whose shard
+// this replica does not own are dropped as well, so that a replica that
+// looked at such a resource never overwrites the status its owner wrote.
+// Other writes to those resources, such as the finalizer and annotation
+// updates the runtime makes, fail with a requeue instead, which ends the
+// reconcile before it goes any further.
+package statuspatch
+
+import (
+	"context"
+	"encoding/json"
+	"reflect"
+	"sort"
+
+	jsonpatch "github.com/evanphx/json-patch/v5"
+	"github.com/prometheus/client_golang/prometheus"
+	"k8s.io/apimachinery/pkg/types"
+	"k8s.io/client-go/rest"
+	"sigs.k8s.io/controller-runtime/pkg/client"
+	"sigs.k8s.io/controller-runtime/pkg/client/apiutil"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	svcapitypes "github.com/aws-controllers-k8s/applicationautoscaling-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/sharding"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/timing"
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/tuning"
+)
+
+var (
+	patches = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_status_patches_total",
+			Help: "Number of status patches by whether they were sent, skipped as unchanged or fenced off another replica's shard",
+		},
+		[]string{"kind", "result"},
+	)
+
+	fencedWrites = prometheus.NewCounterVec(
+		prometheus.CounterOpts{
+			Name: "ack_fenced_writes_total",
+			Help: "Number of metadata writes refused because the resource belongs to another replica's shard",
+		},
+		[]string{"kind"},
+	)
+
+	enabled = tuning.Bool(tuning.EnvSkipUnchangedStatusPatches, false)
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(patches, fencedWrites)
+}
+
+// NewClient creates the manager's client, wrapped so that the status patches
+// of resources of shards owned by other replicas, and unchanged ones when
+// enabled, are skipped, and other writes to those resources are fenced. It can be used
+// as ctrlrt.Options.NewClient.
+func NewClient(config *rest.Config, options client.Options) (client.Client, error) {
+	c, err := client.New(config, options)
+	if err != nil {
+		return nil, err
+	}
+	return &skippingClient{Client: c}, nil
+}
+
+// skippingClient is a client whose status writer skips unchanged and fenced
+// patches, and which fences the writes to the controller's own resources.
+type skippingClient struct {
+	client.Client
+}
+
+// Patch sends patch unless obj belongs to a shard owned by another replica.
+func (c *skippingClient) Patch(
+	ctx context.Context,
+	obj client.Object,
+	patch client.Patch,
+	opts ...client.PatchOption,
+) error {
+	if err := c.fence(obj); err != nil {
+		return err
+	}
+	return c.Client.Patch(ctx, obj, patch, opts...)
+}
+
+// Update sends obj unless it belongs to a shard owned by another replica.
+func (c *skippingClient) Update(
+	ctx context.Context,
+	obj client.Object,
+	opts ...client.UpdateOption,
+) error {
+	if err := c.fence(obj); err != nil {
+		return err
+	}
+	return c.Client.Update(ctx, obj, opts...)
+}
+
+// fence returns a requeue if obj is one of the controller's resources and
+// belongs to a shard owned by another replica. Objects of other API groups
+// are not sharded and are never fenced.
+func (c *skippingClient) fence(obj client.Object) error {
+	gvk, err := apiutil.GVKForObject(obj, c.Scheme())
+	if err != nil || gvk.Group != svcapitypes.GroupVersion.Group {
+		return nil
+	}
+	if err := sharding.Fence(obj); err != nil {
+		fencedWrites.WithLabelValues(gvk.Kind).Inc()
+		return err
+	}
+	return nil
+}
+
+func (c *skippingClient) Status() client.SubResourceWriter {
+	return &statusWriter{SubResourceWriter: c.Client.Status(), client: c.Client}
+}
+
+type statusWriter struct {
+	client.SubResourceWriter
+	client client.Client
+}
+
+// Patch sends patch unless obj belongs to a shard owned by another replica,
+// or applying it to the cached copy of obj leaves the status semantically
+// unchanged. The time it takes is recorded as the status patch phase of the
+// reconcile.
+func (w *statusWriter) Patch(
+	ctx context.Context,
+	obj client.Object,
+	patch client.Patch,
+	opts ...client.SubResourcePatchOption,
+) (err error) {
+	kind := ""
+	if gvk, err := apiutil.GVKForObject(obj, w.client.Scheme()); err == nil {
+		kind = gvk.Kind
+	}
+	observePatch := timing.Start(kind, timing.PhaseStatusPatch, "")
+	defer func() { observePatch(err) }()
+	if !sharding.Owns(obj) {
+		patches.WithLabelValues(kind, "fenced").Inc()
+		return nil
+	}
+	if enabled && len(opts) == 0 && w.unchanged(ctx, obj, patch) {
+		patches.WithLabelValues(kind, "skipped").Inc()
+		return nil
+	}
+	patches.WithLabelValues(kind, "sent").Inc()
+	return w.SubResourceWriter.Patch(ctx, obj, patch, opts...)
+}
+
+// unchanged returns true if patch would not change the status of the cached
+// copy of obj. Any error reading or applying the patch counts as a change.
+func (w *statusWriter) unchanged(ctx context.Context, obj client.Object, patch client.Patch) bool {
+	if patch.Type() != types.MergePatchType {
+		return false
+	}
+	data, err := patch.Data(obj)
+	if err != nil {
+		return false
+	}
+	current, ok := obj.DeepCopyObject().(client.Object)
+	if !ok {
+		return false
+	}
+	if err := w.client.Get(ctx, client.ObjectKeyFromObject(obj), current); err != nil {
+		return false
+	}
+	base, err := json.Marshal(current)
+	if err != nil {
+		return false
+	}
+	patched, err := jsonpatch.MergePatch(base, data)
+	if err != nil {
+		return false
+	}
+	var before, after map[string]interface{}
+	if json.Unmarshal(base, &before) != nil || json.Unmarshal(patched, &after) != nil {
+		return false
+	}
+	if !reflect.DeepEqual(normalize(before["status"]), normalize(after["status"])) {
+		return false
+	}
+	// The caller expects obj to reflect the server's copy after a patch
+	obj.SetResourceVersion(current.GetResourceVersion())
+	return true
+}
+
+// normalize drops empty values from v and sorts lists of conditions by type,
+// so that semantically equal statuses compare equal.
+func normalize(v interface{}) interface{} {
+	switch v := v.(type) {
+	case map[string]interface{}:
+		out := map[string]interface{}{}
+		for key, value := range v {
+			if value = normalize(value); value != nil {
+				out[key] = value
+			}
+		}
+		if len(out) == 0 {
+			return nil
+		}
+		return out
+	case []interface{}:
+		if len(v) == 0 {
+			return nil
+		}
+		out := make([]interface{}, len(v))
+		for i, value := range v {
+			out[i] = normalize(value)
+		}
+		sort.SliceStable(out, func(i, j int) bool {
+			return conditionType(out[i]) < conditionType(out[j])
+		})
+		return out
+	case string:
+		if v == "" {
+			return nil
+		}
+		return v
+	default:
+		return v
+	}
+}
+
+// conditionType returns the type of a condition, or "" for anything else,
+// which leaves lists of other values in their original order.
+func conditionType(v interface{}) string {
+	m, ok := v.(map[string]interface{})
+	if !ok {
+		return ""
+	}
+	t, _ := m["type"].(string)
+	return t
+}
@@ -0,0 +1,100 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package timing records how long each phase of a reconcile takes.
+//
+// The phases timed here are reading the resource from AWS, comparing desired
+// and latest state, and the create, update and delete calls, which the
+// resource managers run themselves, as well as resolving references, timed
+// by the resource managers' ResolveReferences, and patching the status,
+// timed by the client returned by statuspatch.NewClient.
+package timing
+
+import (
+	"errors"
+	"time"
+
+	ackerr "github.com/aws-controllers-k8s/runtime/pkg/errors"
+	ackrequeue "github.com/aws-controllers-k8s/runtime/pkg/requeue"
+	"github.com/prometheus/client_golang/prometheus"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+
+	"github.com/aws-controllers-k8s/applicationautoscaling-controller/pkg/ratelimit"
+)
+
+// Phases of a reconcile
+const (
+	PhaseRead    = "read"
+	PhaseCompare = "compare"
+	PhaseCreate  = "create"
+	PhaseUpdate  = "update"
+	PhaseDelete  = "delete"
+	// PhaseResolveReferences reads the resources referenced from the spec
+	// from the Kubernetes API server
+	PhaseResolveReferences = "resolve_references"
+	// PhaseStatusPatch writes the status back to the Kubernetes API server
+	PhaseStatusPatch = "status_patch"
+)
+
+// Outcomes of a phase
+const (
+	OutcomeSuccess   = "success"
+	OutcomeNotFound  = "not_found"
+	OutcomeThrottled = "throttled"
+	OutcomeRequeued  = "requeued"
+	OutcomeError     = "error"
+)
+
+var phaseSeconds = prometheus.NewHistogramVec(
+	prometheus.HistogramOpts{
+		Name:    "ack_reconcile_phase_seconds",
+		Help:    "Time spent in each phase of a reconcile",
+		Buckets: []float64{0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30},
+	},
+	[]string{"kind", "phase", "op_id", "outcome"},
+)
+
+func init() {
+	ctrlrtmetrics.Registry.MustRegister(phaseSeconds)
+}
+
+// Start starts timing phase of a reconcile of kind, which calls the AWS API
+// operation op (empty for phases that make no call). The returned function
+// stops the timer and records the outcome derived from the phase's error.
+func Start(kind, phase, op string) func(error) {
+	start := time.Now()
+	return func(err error) {
+		phaseSeconds.WithLabelValues(kind, phase, op, Outcome(err)).Observe(
+			time.Since(start).Seconds(),
+		)
+	}
+}
+
+// Outcome classifies the error a phase ended with.
+func Outcome(err error) string {
+	if err == nil {
+		return OutcomeSuccess
+	}
+	if err == ackerr.NotFound {
+		return OutcomeNotFound
+	}
+	if ratelimit.IsThrottle(err) {
+		return OutcomeThrottled
+	}
+	var requeueNeeded *ackrequeue.RequeueNeeded
+	var requeueNeededAfter *ackrequeue.RequeueNeededAfter
+	if errors.As(err, &requeueNeeded) || errors.As(err, &requeueNeededAfter) {
+		return OutcomeRequeued
+	}
+	return OutcomeError
+}
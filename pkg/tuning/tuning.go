@@ -0,0 +1,155 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package tuning reads the controller's performance settings.
+//
+// The settings are environment variables rather than flags so that they can
+// be set through the Helm chart's `deployment.extraEnvVars` without changing
+// the generated controller entrypoint. Unset or unparseable values fall back
+// to the supplied default.
+package tuning
+
+import (
+	"os"
+	"strconv"
+	"time"
+)
+
+const (
+	// EnvDescribeBatchWindow is how long ScalableTarget reads wait for other
+	// reads to join a single DescribeScalableTargets call. Zero, the default,
+	// disables batching; a window of a few tens of milliseconds, e.g. 25ms,
+	// suits large fleets.
+	EnvDescribeBatchWindow = "ACK_DESCRIBE_BATCH_WINDOW"
+	// EnvPolicyDescribeCacheTTL is how long a DescribeScalingPolicies result
+	// is shared by ScalingPolicy reads of the same scalable target. Zero, the
+	// default, disables the cache.
+	EnvPolicyDescribeCacheTTL = "ACK_POLICY_DESCRIBE_CACHE_TTL"
+	// EnvAPIRateLimit is the number of calls per second allowed for each
+	// Application Auto Scaling operation. Zero, the default, disables rate
+	// limiting.
+	EnvAPIRateLimit = "ACK_API_RATE_LIMIT"
+	// EnvAPIRateLimitMin is the lowest rate an operation backs off to after
+	// being throttled.
+	EnvAPIRateLimitMin = "ACK_API_RATE_LIMIT_MIN"
+	// EnvStartupStaggerWindow is the window over which already-synced
+	// resources get their first resync after the controller starts. Zero,
+	// the default, resyncs everything at once.
+	EnvStartupStaggerWindow = "ACK_STARTUP_STAGGER_WINDOW"
+	// EnvSpecFingerprintMaxAge is how long a resync may trust the spec
+	// fingerprint of a synced resource instead of reading it from AWS. Zero,
+	// the default, disables the fingerprint.
+	EnvSpecFingerprintMaxAge = "ACK_SPEC_FINGERPRINT_MAX_AGE"
+	// EnvSkipUnchangedStatusPatches turns on, when true, the skipping of
+	// status patches that would leave the cached status unchanged. False, the
+	// default, sends every status patch.
+	EnvSkipUnchangedStatusPatches = "ACK_SKIP_UNCHANGED_STATUS_PATCHES"
+	// EnvShards is the number of shards resources are partitioned into
+	// across the controller replicas. Zero, the default, disables sharding.
+	EnvShards = "ACK_SHARDS"
+	// EnvShardKey selects what a resource is hashed by to pick its shard:
+	// "namespace", the default, or "label:<name>" for the value of a label.
+	EnvShardKey = "ACK_SHARD_KEY"
+	// EnvShardLeaseDuration is how long a shard stays with a replica that
+	// stopped renewing its lease.
+	EnvShardLeaseDuration = "ACK_SHARD_LEASE_DURATION"
+	// EnvShardRenewInterval is how often a replica renews its leases and
+	// rebalances shards.
+	EnvShardRenewInterval = "ACK_SHARD_RENEW_INTERVAL"
+	// EnvShardRequeueInterval is how long a replica waits before looking
+	// again at a resource of a shard it does not own.
+	EnvShardRequeueInterval = "ACK_SHARD_REQUEUE_INTERVAL"
+	// EnvDependencyRetryInterval is how long after its first failed call a
+	// ScalingPolicy whose scalable target is not registered yet is retried.
+	// The interval doubles with every further failure. Zero, the default,
+	// leaves the retries to the work queue's backoff.
+	EnvDependencyRetryInterval = "ACK_DEPENDENCY_RETRY_INTERVAL"
+	// EnvDependencyRetryMaxInterval caps the interval set with
+	// EnvDependencyRetryInterval. It defaults to five minutes.
+	EnvDependencyRetryMaxInterval = "ACK_DEPENDENCY_RETRY_MAX_INTERVAL"
+	// EnvPriorityQueue turns off, when false, the priority work queues that
+	// reconcile new and changed resources ahead of unchanged ones.
+	EnvPriorityQueue = "ACK_PRIORITY_QUEUE"
+	// EnvCacheTrim turns on, when true, the dropping of managedFields and
+	// unused annotations from the objects held by the informer cache.
+	EnvCacheTrim = "ACK_CACHE_TRIM"
+	// EnvCacheKeepAnnotations is a comma-separated list of annotations kept
+	// in the informer cache when it is trimmed, on top of those in the
+	// services.k8s.aws domain.
+	EnvCacheKeepAnnotations = "ACK_CACHE_KEEP_ANNOTATIONS"
+)
+
+// Duration returns the duration stored in the environment variable name, or
+// def if it is unset or not a valid duration.
+func Duration(name string, def time.Duration) time.Duration {
+	v, ok := os.LookupEnv(name)
+	if !ok {
+		return def
+	}
+	d, err := time.ParseDuration(v)
+	if err != nil {
+		return def
+	}
+	return d
+}
+
+// Int returns the integer stored in the environment variable name, or def if
+// it is unset or not a valid integer.
+func Int(name string, def int) int {
+	v, ok := os.LookupEnv(name)
+	if !ok {
+		return def
+	}
+	i, err := strconv.Atoi(v)
+	if err != nil {
+		return def
+	}
+	return i
+}
+
+// Float returns the number stored in the environment variable name, or def if
+// it is unset or not a valid number.
+func Float(name string, def float64) float64 {
+	v, ok := os.LookupEnv(name)
+	if !ok {
+		return def
+	}
+	f, err := strconv.ParseFloat(v, 64)
+	if err != nil {
+		return def
+	}
+	return f
+}
+
+// Bool returns the boolean stored in the environment variable name, or def if
+// it is unset or not a valid boolean.
+func Bool(name string, def bool) bool {
+	v, ok := os.LookupEnv(name)
+	if !ok {
+		return def
+	}
+	b, err := strconv.ParseBool(v)
+	if err != nil {
+		return def
+	}
+	return b
+}
+
+// String returns the value of the environment variable name, or def if it is
+// unset or empty.
+func String(name string, def string) string {
+	if v := os.Getenv(name); v != "" {
+		return v
+	}
+	return def
+}
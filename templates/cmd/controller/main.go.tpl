@@ -0,0 +1,257 @@
+{{ template "boilerplate" }}
+
+// Code generated by ack-generate. DO NOT EDIT.
+
+package main
+
+import (
+	"context"
+	"os"
+{{/* Import the go types from service controllers whose resources are
+referenced in this service controller, so that they can be read through the
+scheme. */}}
+{{- $servicePackageName := .ServicePackageName }}
+{{- $apiVersion := .APIVersion }}
+{{- range $referencedServiceName := .ReferencedServiceNames }}
+{{- if not (eq $referencedServiceName $servicePackageName) }}
+	{{ $referencedServiceName }}apitypes "github.com/aws-controllers-k8s/{{ $referencedServiceName }}-controller/apis/{{ $apiVersion }}"
+{{- end }}
+{{- end }}
+	ackv1alpha1 "github.com/aws-controllers-k8s/runtime/apis/core/v1alpha1"
+	ackcfg "github.com/aws-controllers-k8s/runtime/pkg/config"
+	ackrt "github.com/aws-controllers-k8s/runtime/pkg/runtime"
+	acktypes "github.com/aws-controllers-k8s/runtime/pkg/types"
+	ackrtutil "github.com/aws-controllers-k8s/runtime/pkg/util"
+	ackrtwebhook "github.com/aws-controllers-k8s/runtime/pkg/webhook"
+	flag "github.com/spf13/pflag"
+	"k8s.io/apimachinery/pkg/runtime"
+	"k8s.io/apimachinery/pkg/runtime/schema"
+	clientgoscheme "k8s.io/client-go/kubernetes/scheme"
+	ctrlrt "sigs.k8s.io/controller-runtime"
+	ctrlrtcache "sigs.k8s.io/controller-runtime/pkg/cache"
+	ctrlrtconfig "sigs.k8s.io/controller-runtime/pkg/config"
+	ctrlrthealthz "sigs.k8s.io/controller-runtime/pkg/healthz"
+	ctrlrtmetrics "sigs.k8s.io/controller-runtime/pkg/metrics"
+	metricsserver "sigs.k8s.io/controller-runtime/pkg/metrics/server"
+	ctrlrtwebhook "sigs.k8s.io/controller-runtime/pkg/webhook"
+
+	svctypes "github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/apis/{{ .APIVersion }}"
+	svcresource "github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/resource"
+{{ range $crdName := .SnakeCasedCRDNames }}
+	_ "github.com/aws-controllers-k8s/{{ $servicePackageName }}-controller/pkg/resource/{{ $crdName }}"
+{{- end }}
+
+	"github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/cachetrim"
+	"github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/sharding"
+	"github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/statuspatch"
+	"github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/tuning"
+	"github.com/aws-controllers-k8s/{{ .ServicePackageName }}-controller/pkg/version"
+)
+
+var (
+	awsServiceAPIGroup = "{{ .APIGroup }}"
+	awsServiceAlias    = "{{ .ServicePackageName }}"
+	scheme             = runtime.NewScheme()
+	setupLog           = ctrlrt.Log.WithName("setup")
+)
+
+func init() {
+	_ = clientgoscheme.AddToScheme(scheme)
+
+	_ = svctypes.AddToScheme(scheme)
+	_ = ackv1alpha1.AddToScheme(scheme)
+{{- range $referencedServiceName := .ReferencedServiceNames }}
+{{- if not (eq $referencedServiceName $servicePackageName) }}
+	_ = {{ $referencedServiceName }}apitypes.AddToScheme(scheme)
+{{- end }}
+{{- end }}
+}
+
+func main() {
+	var ackCfg ackcfg.Config
+	ackCfg.BindFlags()
+	flag.Parse()
+	ackCfg.SetupLogger()
+
+	managerFactories := svcresource.GetManagerFactories()
+	resourceGVKs := make([]schema.GroupVersionKind, 0, len(managerFactories))
+	for _, mf := range managerFactories {
+		resourceGVKs = append(resourceGVKs, mf.ResourceDescriptor().GroupVersionKind())
+	}
+
+	ctx := context.Background()
+	if err := ackCfg.Validate(ctx, ackcfg.WithGVKs(resourceGVKs)); err != nil {
+		setupLog.Error(
+			err, "Unable to create controller manager",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+
+	host, port, err := ackrtutil.GetHostPort(ackCfg.WebhookServerAddr)
+	if err != nil {
+		setupLog.Error(
+			err, "Unable to parse webhook server address.",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+
+	watchNamespaces := make(map[string]ctrlrtcache.Config, 0)
+	namespaces, err := ackCfg.GetWatchNamespaces()
+	if err != nil {
+		setupLog.Error(
+			err, "Unable to parse watch namespaces.",
+			"aws.service", ackCfg.WatchNamespace,
+		)
+		os.Exit(1)
+	}
+
+	for _, namespace := range namespaces {
+		watchNamespaces[namespace] = ctrlrtcache.Config{}
+	}
+	watchSelectors, err := ackCfg.ParseWatchSelectors()
+	if err != nil {
+		setupLog.Error(
+			err, "Unable to parse watch selectors.",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+	shardCfg := sharding.ConfigFromEnv("ack-"+awsServiceAlias, ackCfg.LeaderElectionNamespace)
+	if shardCfg.Enabled() && ackCfg.EnableLeaderElection {
+		// Every replica is active when sharded; the shard leases take the
+		// place of the leader lease
+		setupLog.Info(
+			"leader election is disabled in sharded mode",
+			"aws.service", awsServiceAlias,
+		)
+	}
+	// The priority queue reconciles resources that were created or changed
+	// ahead of the unchanged ones delivered by the initial list and by
+	// informer resyncs
+	usePriorityQueue := tuning.Bool(tuning.EnvPriorityQueue, true)
+	cacheOptions := ctrlrtcache.Options{
+		Scheme:               scheme,
+		DefaultNamespaces:    watchNamespaces,
+		DefaultLabelSelector: watchSelectors,
+	}
+	if cachetrim.Enabled() {
+		cachetrim.Apply(
+			&cacheOptions,
+			&svctypes.ScalableTarget{},
+			&svctypes.ScalingPolicy{},
+		)
+	}
+	mgr, err := ctrlrt.NewManager(ctrlrt.GetConfigOrDie(), ctrlrt.Options{
+		Scheme:    scheme,
+		NewClient: statuspatch.NewClient,
+		Controller: ctrlrtconfig.Controller{
+			UsePriorityQueue: &usePriorityQueue,
+		},
+		Cache: cacheOptions,
+		WebhookServer: &ctrlrtwebhook.DefaultServer{
+			Options: ctrlrtwebhook.Options{
+				Port: port,
+				Host: host,
+			},
+		},
+		Metrics:                 metricsserver.Options{BindAddress: ackCfg.MetricsAddr},
+		LeaderElection:          ackCfg.EnableLeaderElection && !shardCfg.Enabled(),
+		LeaderElectionID:        "ack-" + awsServiceAPIGroup,
+		LeaderElectionNamespace: ackCfg.LeaderElectionNamespace,
+		HealthProbeBindAddress:  ackCfg.HealthzAddr,
+		LivenessEndpointName:    "/healthz",
+		ReadinessEndpointName:   "/readyz",
+	})
+	if err != nil {
+		setupLog.Error(
+			err, "unable to create controller manager",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+
+	if shardCfg.Enabled() {
+		coordinator, err := sharding.NewCoordinator(mgr.GetConfig(), shardCfg)
+		if err == nil {
+			err = mgr.Add(coordinator)
+		}
+		if err != nil {
+			setupLog.Error(
+				err, "unable to set up shard coordinator",
+				"aws.service", awsServiceAlias,
+			)
+			os.Exit(1)
+		}
+		sharding.SetDefault(coordinator)
+	}
+
+	stopChan := ctrlrt.SetupSignalHandler()
+
+	setupLog.Info(
+		"initializing service controller",
+		"aws.service", awsServiceAlias,
+	)
+	sc := ackrt.NewServiceController(
+		awsServiceAlias, awsServiceAPIGroup,
+		acktypes.VersionInfo{
+			version.GitCommit,
+			version.GitVersion,
+			version.BuildDate,
+		},
+	).WithLogger(
+		ctrlrt.Log,
+	).WithResourceManagerFactories(
+		svcresource.GetManagerFactories(),
+	).WithPrometheusRegistry(
+		ctrlrtmetrics.Registry,
+	)
+
+	if ackCfg.EnableWebhookServer {
+		webhooks := ackrtwebhook.GetWebhooks()
+		for _, webhook := range webhooks {
+			if err := webhook.Setup(mgr); err != nil {
+				setupLog.Error(
+					err, "unable to register webhook "+webhook.UID(),
+					"aws.service", awsServiceAlias,
+				)
+			}
+		}
+	}
+
+	if err = sc.BindControllerManager(mgr, ackCfg); err != nil {
+		setupLog.Error(
+			err, "unable bind to controller manager to service controller",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+
+	if err = mgr.AddHealthzCheck("health", ctrlrthealthz.Ping); err != nil {
+		setupLog.Error(
+			err, "unable to set up health check",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+	if err = mgr.AddReadyzCheck("check", ctrlrthealthz.Ping); err != nil {
+		setupLog.Error(
+			err, "unable to set up ready check",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+
+	setupLog.Info(
+		"starting manager",
+		"aws.service", awsServiceAlias,
+	)
+	if err := mgr.Start(stopChan); err != nil {
+		setupLog.Error(
+			err, "unable to start controller manager",
+			"aws.service", awsServiceAlias,
+		)
+		os.Exit(1)
+	}
+}
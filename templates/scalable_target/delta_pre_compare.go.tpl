@@ -0,0 +1,5 @@
+	if customFingerprintsMatch(a, b) {
+		return delta
+	}
+	observeCompare := customStartPhase("compare", "")
+	customSetDefaults(a, b)
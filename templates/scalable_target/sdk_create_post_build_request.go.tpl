@@ -0,0 +1,4 @@
+	if err = rm.customWaitForRateLimit(ctx, "RegisterScalableTarget"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("create", "RegisterScalableTarget")
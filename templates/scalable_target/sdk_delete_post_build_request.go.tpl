@@ -0,0 +1,4 @@
+	if err = rm.customWaitForRateLimit(ctx, "DeregisterScalableTarget"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("delete", "DeregisterScalableTarget")
@@ -0,0 +1,3 @@
+	observeCall(err)
+	err = rm.customObserveRateLimit("DeregisterScalableTarget", err)
+	rm.customForgetTarget(r.ko, err)
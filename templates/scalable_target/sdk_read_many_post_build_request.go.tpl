@@ -0,0 +1,18 @@
+	ctx = rm.customReadContext(ctx, r)
+	if err = rm.customCheckShard(r); err != nil {
+		return nil, err
+	}
+	if err = rm.customStaggerStartup(r); err != nil {
+		return nil, err
+	}
+	if unchanged := rm.customFindUnchanged(r); unchanged != nil {
+		return unchanged, nil
+	}
+	rm.customDescribeScalableTarget(ctx, r, input)
+	if batcher := rm.describeBatcher(); batcher != nil {
+		return rm.customFindBatched(ctx, r, input, batcher)
+	}
+	if err = rm.customWaitForRateLimit(ctx, "DescribeScalableTargets"); err != nil {
+		return nil, err
+	}
+	observeRead := customStartPhase("read", "DescribeScalableTargets")
@@ -0,0 +1,2 @@
+	observeRead(err)
+	err = rm.customObserveRateLimit("DescribeScalableTargets", err)
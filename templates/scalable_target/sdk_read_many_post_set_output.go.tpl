@@ -0,0 +1,3 @@
+	rm.customSetLastModifiedTimeToCreationTime(ko)
+	rm.customRecordFingerprint(r, ko)
+	rm.customMarkTargetReady(ko, nil)
@@ -0,0 +1,3 @@
+	observeCall(err)
+	err = rm.customObserveRateLimit("RegisterScalableTarget", err)
+	rm.customMarkTargetReady(desired.ko, err)
@@ -0,0 +1,5 @@
+	targetMark := rm.customTargetMark()
+	if err = rm.customWaitForRateLimit(ctx, "PutScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("create", "PutScalingPolicy")
@@ -0,0 +1,4 @@
+	observeCall(err)
+	err = rm.customObserveRateLimit("PutScalingPolicy", err)
+	rm.invalidateDescribeCache(desired)
+	resp, err = rm.customPutAfterTarget(ctx, desired, input, resp, err, targetMark)
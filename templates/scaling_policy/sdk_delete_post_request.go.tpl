@@ -0,0 +1,3 @@
+	observeCall(err)
+	err = rm.customObserveRateLimit("DeleteScalingPolicy", err)
+	rm.invalidateDescribeCache(r)
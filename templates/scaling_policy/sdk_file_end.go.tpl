@@ -0,0 +1,13 @@
+// setResourceFromReadManyOutput merges the scaling policy described in resp
+// into a copy of r, the same way sdkFind does with its own response, and
+// returns NotFound if resp holds none. The describe cache uses it so that
+// cached reads share the generated field mapping.
+func (rm *resourceManager) setResourceFromReadManyOutput(
+	r *resource,
+	resp *svcsdk.DescribeScalingPoliciesOutput,
+) (*resource, error) {
+	ko := r.ko.DeepCopy()
+
+{{ GoCodeSetReadManyOutput .CRD "resp" "ko" 1 }}
+	return &resource{ko}, nil
+}
@@ -0,0 +1,15 @@
+	ctx = rm.customReadContext(ctx, r)
+	if err = rm.customCheckShard(r); err != nil {
+		return nil, err
+	}
+	if err = rm.customStaggerStartup(r); err != nil {
+		return nil, err
+	}
+	rm.customSetDescribeScalingPoliciesInput(ctx, r, input)
+	if cache := rm.describeCache(); cache != nil {
+		return rm.customFindCached(ctx, r, input, cache)
+	}
+	if err = rm.customWaitForRateLimit(ctx, "DescribeScalingPolicies"); err != nil {
+		return nil, err
+	}
+	observeRead := customStartPhase("read", "DescribeScalingPolicies")
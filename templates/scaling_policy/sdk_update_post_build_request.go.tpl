@@ -0,0 +1,4 @@
+	if err = rm.customWaitForRateLimit(ctx, "PutScalingPolicy"); err != nil {
+		return nil, err
+	}
+	observeCall := customStartPhase("update", "PutScalingPolicy")
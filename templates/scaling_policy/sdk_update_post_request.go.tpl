@@ -0,0 +1,3 @@
+	observeCall(err)
+	err = rm.customObserveRateLimit("PutScalingPolicy", err)
+	rm.invalidateDescribeCache(desired)
@@ -0,0 +1,152 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Counts the DescribeScalableTargets calls the controller makes for a fleet
+of ScalableTargets, to compare runs with and without read batching.
+
+Batching is off by default. Run it once against a controller started
+without ``ACK_DESCRIBE_BATCH_WINDOW`` and once with batching enabled through
+the Helm chart's ``deployment.extraEnvVars``, e.g.
+``ACK_DESCRIBE_BATCH_WINDOW=25ms``, then compare the two reports::
+
+    python -m e2e.benchmarks.describe_batching run --targets 200 \\
+        --label unbatched --output unbatched.json
+    python -m e2e.benchmarks.describe_batching run --targets 200 \\
+        --label batched --output batched.json
+    python -m e2e.benchmarks.describe_batching compare unbatched.json batched.json
+
+Besides the calls made while the fleet converges, ``--observe`` keeps counting
+for that many seconds afterwards so that steady-state resyncs are included.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import asdict
+from typing import Dict, Optional
+
+from e2e.common import metrics
+
+DESCRIBE_OPERATION = "DescribeScalableTargets"
+TARGET_CONTROLLER = "scalabletarget"
+
+
+def _reconciles(samples) -> float:
+    return metrics.sum_by(
+        samples, "controller_runtime_reconcile_total", "controller"
+    ).get(TARGET_CONTROLLER, 0.0)
+
+
+def run(
+    targets: int,
+    label: str,
+    observe: float = 0,
+    timeout: float = 900,
+    metrics_url: Optional[str] = None,
+) -> Dict:
+    """Creates `targets` ScalableTargets, waits for them to sync and returns
+    the describe calls and reconciles counted over the run.
+    """
+    from e2e.common.scale import ScaleHarness
+
+    harness = ScaleHarness(targets, 0, metrics_url=metrics_url)
+    try:
+        before = metrics.scrape(metrics_url)
+        report = harness.run(timeout=timeout)
+        if observe > 0:
+            time.sleep(observe)
+        after = metrics.scrape(metrics_url)
+    finally:
+        harness.cleanup()
+
+    calls = metrics.diff(
+        metrics.api_call_counts(after), metrics.api_call_counts(before)
+    ).get(DESCRIBE_OPERATION, 0.0)
+    reconciles = _reconciles(after) - _reconciles(before)
+    return {
+        "label": label,
+        "targets": targets,
+        "observe_seconds": observe,
+        "wall_seconds": report.wall_seconds,
+        "unsynced": len(report.unsynced) + len(report.failed),
+        "describe_calls": calls,
+        "describe_calls_per_target": calls / targets if targets else 0.0,
+        "reconciles": reconciles,
+        "describe_calls_per_reconcile": calls / reconciles if reconciles else 0.0,
+        "target_time_to_synced": asdict(report.target_time_to_synced),
+    }
+
+
+def compare(before: Dict, after: Dict) -> Dict:
+    """Returns how much `after` reduced the describe calls of `before`."""
+
+    def reduction(key: str) -> Optional[float]:
+        if not before.get(key):
+            return None
+        return 1 - after.get(key, 0.0) / before[key]
+
+    return {
+        "before": before["label"],
+        "after": after["label"],
+        "describe_calls": [before["describe_calls"], after["describe_calls"]],
+        "describe_calls_per_target": [
+            before["describe_calls_per_target"],
+            after["describe_calls_per_target"],
+        ],
+        "describe_calls_reduction": reduction("describe_calls"),
+        "describe_calls_per_reconcile_reduction": reduction(
+            "describe_calls_per_reconcile"
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run")
+    run_parser.add_argument("--targets", type=int, default=100)
+    run_parser.add_argument("--label", required=True)
+    run_parser.add_argument("--observe", type=float, default=0)
+    run_parser.add_argument("--timeout", type=float, default=900)
+    run_parser.add_argument("--metrics-url", default=None)
+    run_parser.add_argument("--output", default=None)
+
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO)
+
+    if args.command == "run":
+        result = run(
+            args.targets, args.label, args.observe, args.timeout, args.metrics_url
+        )
+    else:
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        result = compare(before, after)
+
+    text = json.dumps(result, indent=2)
+    if getattr(args, "output", None):
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Measures how the controller's memory grows with the number of objects it
+caches.
+
+Creates synthetic ScalableTargets and ScalingPolicies from the
+``e2e/resources`` templates in steps. After every step it restarts the
+controller, so that its memory reflects an informer cache filled from a
+list rather than the garbage of the reconciles that created the fleet,
+waits for every object to be reconciled, and samples the resident set size
+and Go heap from the metrics endpoint. The memory per 1,000 objects is the
+slope of a least-squares fit over the steps, so the controller's fixed
+footprint does not count. Run it once with ``ACK_CACHE_TRIM`` unset and once
+with it set to compare::
+
+    python -m e2e.benchmarks.informer_memory --targets 0 2500 5000 10000 \\
+        --label baseline --output baseline.json
+    python -m e2e.benchmarks.informer_memory --targets 0 2500 5000 10000 \\
+        --label trimmed --output trimmed.json
+
+Point the controller at a local Application Auto Scaling stand-in. The
+objects carry a kubectl last-applied-configuration annotation, as they would
+when applied with kubectl or a GitOps tool, unless ``--no-last-applied`` is
+given. The metrics endpoint (ACK_CONTROLLER_METRICS_URL) has to stay
+reachable across the restarts.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from e2e import CRD_GROUP, CRD_VERSION, load_autoscaling_resource
+from e2e.benchmarks.startup_stagger import RECONCILE_TOTAL_METRIC, restart_deployment
+from e2e.common import metrics
+
+RSS_METRIC = "process_resident_memory_bytes"
+HEAP_METRIC = "go_memstats_heap_inuse_bytes"
+LAST_APPLIED_ANNOTATION = "kubectl.kubernetes.io/last-applied-configuration"
+BENCHMARK_LABEL = "applicationautoscaling.services.k8s.aws/benchmark"
+BENCHMARK_NAME = "informer-memory"
+
+TARGET_SPEC_FILE = "sagemaker_endpoint_autoscaling_target"
+POLICY_SPEC_FILE = "sagemaker_endpoint_autoscaling_policy"
+# plural: controller name
+CONTROLLERS = {"scalabletargets": "scalabletarget", "scalingpolicies": "scalingpolicy"}
+
+
+def synthetic_objects(
+    prefix: str, index: int, policies: int, last_applied: bool
+) -> List[Tuple[str, Dict]]:
+    """Renders the target numbered `index` and its `policies` policies from
+    the resource templates, as (plural, object) pairs.
+    """
+    resource_id = f"endpoint/{prefix}-{index}/variant/variant-1"
+    rendered = [
+        (
+            "scalabletargets",
+            load_autoscaling_resource(
+                TARGET_SPEC_FILE,
+                {
+                    "SCALABLETARGET_NAME": f"{prefix}-target-{index}",
+                    "RESOURCE_ID": resource_id,
+                },
+            ),
+        )
+    ]
+    for j in range(policies):
+        rendered.append(
+            (
+                "scalingpolicies",
+                load_autoscaling_resource(
+                    POLICY_SPEC_FILE,
+                    {
+                        "SCALINGPOLICY_NAME": f"{prefix}-policy-{index}-{j}",
+                        "RESOURCE_ID": resource_id,
+                    },
+                ),
+            )
+        )
+    for _, obj in rendered:
+        metadata = obj.setdefault("metadata", {})
+        metadata.setdefault("labels", {})[BENCHMARK_LABEL] = BENCHMARK_NAME
+        if last_applied:
+            metadata.setdefault("annotations", {})[LAST_APPLIED_ANNOTATION] = json.dumps(
+                obj, separators=(",", ":"), sort_keys=True
+            )
+    return rendered
+
+
+def per_thousand(points: Sequence[Tuple[int, float]]) -> Optional[float]:
+    """Returns the least-squares slope of (objects, bytes) points, in bytes
+    per 1,000 objects.
+    """
+    if len({n for n, _ in points}) < 2:
+        return None
+    mean_n = statistics.fmean(n for n, _ in points)
+    mean_b = statistics.fmean(b for _, b in points)
+    covariance = sum((n - mean_n) * (b - mean_b) for n, b in points)
+    variance = sum((n - mean_n) ** 2 for n, _ in points)
+    return 1000 * covariance / variance
+
+
+def _custom_objects_api():
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    return client.CustomObjectsApi(k8s._get_k8s_api_client())
+
+
+def create_fleet(
+    namespace: str,
+    prefix: str,
+    indexes: range,
+    policies: int,
+    last_applied: bool,
+    max_workers: int,
+):
+    api = _custom_objects_api()
+
+    def create(index: int):
+        for plural, obj in synthetic_objects(prefix, index, policies, last_applied):
+            api.create_namespaced_custom_object(
+                CRD_GROUP, CRD_VERSION, namespace, plural, obj
+            )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(create, indexes))
+
+
+def delete_fleet(namespace: str, timeout: float):
+    """Deletes the policies and then the targets created by the benchmark,
+    and waits for their finalizers to be processed.
+    """
+    api = _custom_objects_api()
+    selector = f"{BENCHMARK_LABEL}={BENCHMARK_NAME}"
+    deadline = time.monotonic() + timeout
+    for plural in ("scalingpolicies", "scalabletargets"):
+        api.delete_collection_namespaced_custom_object(
+            CRD_GROUP, CRD_VERSION, namespace, plural, label_selector=selector
+        )
+        while time.monotonic() < deadline:
+            items = api.list_namespaced_custom_object(
+                CRD_GROUP, CRD_VERSION, namespace, plural, label_selector=selector
+            )["items"]
+            if not items:
+                break
+            time.sleep(2)
+        else:
+            logging.warning(f"{plural} still present after cleanup timeout")
+
+
+def measure(
+    expected: Dict[str, int],
+    samples: int,
+    timeout: float,
+    interval: float,
+    metrics_url: Optional[str] = None,
+) -> Dict:
+    """Waits until the restarted controller has reconciled every object, then
+    returns the median of `samples` memory readings taken `interval` seconds
+    apart.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        time.sleep(interval)
+        try:
+            scraped = metrics.scrape(metrics_url)
+        except OSError:
+            # The old pod is gone and the new one is not serving yet
+            continue
+        reconciles = metrics.sum_by(scraped, RECONCILE_TOTAL_METRIC, "controller")
+        if all(
+            reconciles.get(CONTROLLERS[plural], 0.0) >= count
+            for plural, count in expected.items()
+        ):
+            break
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"fleet not reconciled after restart: {reconciles}")
+
+    rss, heap = [], []
+    for _ in range(samples):
+        scraped = metrics.scrape(metrics_url)
+        rss.append(sum(scraped.get(RSS_METRIC, {}).values()))
+        heap.append(sum(scraped.get(HEAP_METRIC, {}).values()))
+        time.sleep(interval)
+    return {"rss_bytes": statistics.median(rss), "heap_inuse_bytes": statistics.median(heap)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", required=True)
+    parser.add_argument(
+        "--targets",
+        type=int,
+        nargs="+",
+        default=[0, 2500, 5000, 10000],
+        help="Number of ScalableTargets at each step, in increasing order",
+    )
+    parser.add_argument("--policies", type=int, default=1)
+    parser.add_argument("--namespace", default="default")
+    parser.add_argument("--prefix", default="memory-bench")
+    parser.add_argument("--no-last-applied", dest="last_applied", action="store_false")
+    parser.add_argument("--deployment", default="ack-applicationautoscaling-controller")
+    parser.add_argument("--deployment-namespace", default="ack-system")
+    parser.add_argument("--max-workers", type=int, default=32)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--interval", type=float, default=2)
+    parser.add_argument("--metrics-url", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO)
+
+    steps = []
+    created = 0
+    try:
+        for targets in sorted(args.targets):
+            create_fleet(
+                args.namespace,
+                args.prefix,
+                range(created, targets),
+                args.policies,
+                args.last_applied,
+                args.max_workers,
+            )
+            created = max(created, targets)
+            expected = {
+                "scalabletargets": created,
+                "scalingpolicies": created * args.policies,
+            }
+            restart_deployment(args.deployment, args.deployment_namespace)
+            step = measure(
+                expected, args.samples, args.timeout, args.interval, args.metrics_url
+            )
+            step.update({"targets": created, "objects": sum(expected.values())})
+            logging.info(f"memory at {step['objects']} objects: {step}")
+            steps.append(step)
+    finally:
+        delete_fleet(args.namespace, args.timeout)
+
+    result = {
+        "label": args.label,
+        "policies_per_target": args.policies,
+        "last_applied": args.last_applied,
+        "steps": steps,
+        "rss_bytes_per_1000_objects": per_thousand(
+            [(s["objects"], s["rss_bytes"]) for s in steps]
+        ),
+        "heap_inuse_bytes_per_1000_objects": per_thousand(
+            [(s["objects"], s["heap_inuse_bytes"]) for s in steps]
+        ),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Counts the AWS calls and API server writes of resyncing unchanged
+ScalableTargets, to measure the spec fingerprint fast path.
+
+Each round restarts the controller, which resyncs every resource, and
+counts the outbound AWS calls it makes and the writes to the ScalableTargets
+(MODIFIED watch events) until all of them have been reconciled again. Run it
+once against a controller started without ``ACK_SPEC_FINGERPRINT_MAX_AGE``
+and once with the fingerprint enabled, e.g. set to ``10m``::
+
+    python -m e2e.benchmarks.resync_fingerprint --create 1000 --rounds 3 \\
+        --label full-read --output full-read.json
+    python -m e2e.benchmarks.resync_fingerprint --create 1000 --rounds 3 \\
+        --label fingerprint --output fingerprint.json
+
+A warm-up round runs first and is not counted, so that fingerprints left
+behind by the initial sync are written before measuring.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, Optional
+
+from e2e import CRD_GROUP, CRD_VERSION
+from e2e.benchmarks.startup_stagger import restart_deployment
+from e2e.common import metrics
+from e2e.common.watch_events import WatchEventCounter
+
+PLURAL = "scalabletargets"
+TARGET_CONTROLLER = "scalabletarget"
+LOOKUPS_METRIC = "ack_spec_fingerprint_lookups_total"
+RECONCILE_TOTAL_METRIC = "controller_runtime_reconcile_total"
+
+
+def count_targets(namespace: str) -> int:
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+    return len(
+        api.list_namespaced_custom_object(CRD_GROUP, CRD_VERSION, namespace, PLURAL)[
+            "items"
+        ]
+    )
+
+
+def resync_round(
+    targets: int,
+    namespace: str,
+    deployment: str,
+    deployment_namespace: str,
+    timeout: float,
+    interval: float,
+    metrics_url: Optional[str] = None,
+    settle: float = 5,
+) -> Dict:
+    """Restarts the controller and counts what the resync of `targets`
+    ScalableTargets costs. Counters start from zero in the new process.
+    """
+    writes = WatchEventCounter([PLURAL], namespace).start()
+    restart_deployment(deployment, deployment_namespace)
+    start = time.monotonic()
+    deadline = start + timeout
+    samples = {}
+    done_at = None
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        try:
+            samples = metrics.scrape(metrics_url)
+        except OSError:
+            continue
+        reconciles = metrics.sum_by(samples, RECONCILE_TOTAL_METRIC, "controller")
+        if reconciles.get(TARGET_CONTROLLER, 0.0) >= targets:
+            done_at = time.monotonic()
+            break
+    # Writes triggered by the last reconciles may still be in flight
+    time.sleep(settle)
+    samples = metrics.scrape(metrics_url)
+    writes.stop()
+
+    return {
+        "time_to_all_resynced": done_at - start if done_at is not None else None,
+        "reconciles": metrics.sum_by(samples, RECONCILE_TOTAL_METRIC, "controller").get(
+            TARGET_CONTROLLER, 0.0
+        ),
+        "aws_calls": metrics.api_call_counts(samples),
+        "fingerprint_lookups": metrics.sum_by(
+            samples, LOOKUPS_METRIC, "result", kind="ScalableTarget"
+        ),
+        "api_server_writes": writes.modified(PLURAL),
+    }
+
+
+def summarize(label: str, targets: int, rounds) -> Dict:
+    resyncs = targets * len(rounds)
+    aws_calls = sum(sum(r["aws_calls"].values()) for r in rounds)
+    writes = sum(r["api_server_writes"] for r in rounds)
+    hits = sum(r["fingerprint_lookups"].get("hit", 0.0) for r in rounds)
+    return {
+        "label": label,
+        "targets": targets,
+        "rounds": rounds,
+        "aws_calls_per_resync": aws_calls / resyncs if resyncs else 0.0,
+        "api_server_writes_per_resync": writes / resyncs if resyncs else 0.0,
+        "fingerprint_hit_ratio": hits / resyncs if resyncs else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", required=True)
+    parser.add_argument("--namespace", default="default")
+    parser.add_argument("--deployment", default="ack-applicationautoscaling-controller")
+    parser.add_argument("--deployment-namespace", default="ack-system")
+    parser.add_argument(
+        "--create",
+        type=int,
+        default=0,
+        help="Create this many ScalableTargets first and delete them afterwards",
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--metrics-url", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO)
+
+    harness = None
+    if args.create:
+        from e2e.common.scale import ScaleHarness
+
+        harness = ScaleHarness(
+            args.create, 0, namespace=args.namespace, metrics_url=args.metrics_url
+        )
+        harness.run(timeout=args.timeout)
+    try:
+        targets = count_targets(args.namespace)
+        rounds = []
+        for i in range(args.warmup + args.rounds):
+            result = resync_round(
+                targets,
+                args.namespace,
+                args.deployment,
+                args.deployment_namespace,
+                args.timeout,
+                args.interval,
+                args.metrics_url,
+            )
+            logging.info(f"Round {i}: {json.dumps(result)}")
+            if i >= args.warmup:
+                rounds.append(result)
+    finally:
+        if harness is not None:
+            harness.cleanup()
+    result = summarize(args.label, targets, rounds)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Measures how the controller's throughput scales with the number of
+replicas in sharded mode.
+
+Install the controller with ``sharding.enabled=true`` and point it at a local
+Application Auto Scaling stand-in with some latency per call, so that the
+controller's workers rather than the stand-in are the bottleneck::
+
+    python -m e2e.standins.applicationautoscaling --latency 0.2
+
+For every replica count the benchmark scales the controller Deployment,
+waits for the shard leases to be spread evenly over the replicas, creates a
+fleet of ScalableTargets and ScalingPolicies in namespaces chosen to land on
+every shard equally, and times how long the fleet takes to sync::
+
+    python -m e2e.benchmarks.sharded_throughput --replicas 1 2 4 \\
+        --targets-per-namespace 25 --min-efficiency 0.7 --output sharded.json
+
+While the fleet syncs every replica is scraped for the per-shard queue depth,
+and afterwards for the reconciles each shard got and who owned it. The run
+fails if the throughput at the highest replica count is less than
+``--min-efficiency`` times the linear extrapolation of the first.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from e2e import CRD_GROUP, CRD_VERSION
+from e2e.common import metrics, sharding
+
+QUEUE_DEPTH_METRIC = "ack_shard_queue_depth"
+RECONCILES_METRIC = "ack_shard_reconciles_total"
+OWNED_METRIC = "ack_shard_owned"
+CONTROLLER_SELECTOR = "app.kubernetes.io/name=ack-applicationautoscaling-controller"
+PLURALS = ("scalingpolicies", "scalabletargets")
+
+
+def _api_client():
+    from acktest.k8s import resource as k8s
+
+    return k8s._get_k8s_api_client()
+
+
+def scale_deployment(name: str, namespace: str, replicas: int):
+    from kubernetes import client
+
+    client.AppsV1Api(_api_client()).patch_namespaced_deployment_scale(
+        name, namespace, {"spec": {"replicas": replicas}}
+    )
+
+
+def controller_pods(namespace: str, selector: str) -> List[str]:
+    from kubernetes import client
+
+    pods = client.CoreV1Api(_api_client()).list_namespaced_pod(
+        namespace, label_selector=selector
+    )
+    return [
+        pod.metadata.name
+        for pod in pods.items
+        if pod.status.phase == "Running" and pod.metadata.deletion_timestamp is None
+    ]
+
+
+def wait_for_ownership(
+    lease_namespace: str, group: str, replicas: int, shards: int, timeout: float
+) -> sharding.ShardOwnership:
+    """Waits until `replicas` replicas are live and hold even shares of the
+    shards.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        owned = sharding.ownership(sharding.list_leases(lease_namespace, group), group)
+        if len(owned.members) == replicas and owned.balanced(shards):
+            return owned
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"shards not balanced over {replicas} replicas: "
+                f"{len(owned.members)} live, owners {owned.owners}"
+            )
+        time.sleep(2)
+
+
+def create_namespaces(names: Sequence[str]):
+    from kubernetes import client
+    from kubernetes.client.rest import ApiException
+
+    api = client.CoreV1Api(_api_client())
+    for name in names:
+        try:
+            api.create_namespace({"metadata": {"name": name}})
+        except ApiException as ex:
+            if ex.status != 409:
+                raise
+
+
+def delete_namespaces(names: Sequence[str]):
+    from kubernetes import client
+
+    api = client.CoreV1Api(_api_client())
+    for name in names:
+        api.delete_namespace(name)
+
+
+def wait_drained(namespaces: Sequence[str], timeout: float):
+    """Waits until the resources deleted by the harnesses are gone, so that
+    their deletion does not load the next run.
+    """
+    from kubernetes import client
+
+    api = client.CustomObjectsApi(_api_client())
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        left = sum(
+            len(api.list_namespaced_custom_object(CRD_GROUP, CRD_VERSION, ns, plural)["items"])
+            for ns in namespaces
+            for plural in PLURALS
+        )
+        if not left:
+            return
+        time.sleep(2)
+    logging.warning("resources still present after cleanup timeout")
+
+
+class ShardSampler:
+    """Scrapes every controller replica in the background and keeps the
+    highest queue depth seen for each shard.
+    """
+
+    def __init__(self, namespace: str, selector: str, port: int, interval: float):
+        self.namespace = namespace
+        self.selector = selector
+        self.port = port
+        self.interval = interval
+        self.peak_queue_depth: Dict[str, float] = defaultdict(float)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def scrape_all(self) -> Dict[str, Dict]:
+        samples = {}
+        for pod in controller_pods(self.namespace, self.selector):
+            try:
+                samples[pod] = metrics.scrape_pod(pod, self.namespace, self.port)
+            except Exception as ex:
+                logging.warning(f"unable to scrape {pod}: {ex}")
+        return samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for samples in self.scrape_all().values():
+                for shard, depth in metrics.sum_by(
+                    samples, QUEUE_DEPTH_METRIC, "shard"
+                ).items():
+                    self.peak_queue_depth[shard] = max(self.peak_queue_depth[shard], depth)
+
+    def __enter__(self) -> "ShardSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def shard_counters(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict:
+    """Returns, per replica, the shards it owns and the reconciles each shard
+    got during the run.
+    """
+    replicas = {}
+    for pod, samples in after.items():
+        previous = before.get(pod, {})
+        replicas[pod] = {
+            "owned": sorted(
+                int(shard)
+                for shard, value in metrics.sum_by(samples, OWNED_METRIC, "shard").items()
+                if value
+            ),
+            "reconciles": metrics.diff(
+                metrics.sum_by(samples, RECONCILES_METRIC, "shard", result="owned"),
+                metrics.sum_by(previous, RECONCILES_METRIC, "shard", result="owned"),
+            ),
+            "deferred": sum(
+                metrics.diff(
+                    metrics.sum_by(samples, RECONCILES_METRIC, "shard", result="deferred"),
+                    metrics.sum_by(previous, RECONCILES_METRIC, "shard", result="deferred"),
+                ).values()
+            ),
+        }
+    return replicas
+
+
+def run_once(args, replicas: int, namespaces: List[str]) -> Dict:
+    from e2e.common.scale import ScaleHarness
+
+    scale_deployment(args.deployment, args.deployment_namespace, replicas)
+    owned = wait_for_ownership(
+        args.lease_namespace or args.deployment_namespace,
+        args.lease_group,
+        replicas,
+        args.shards,
+        args.timeout,
+    )
+    logging.info(f"{replicas} replicas own {owned.owners}")
+
+    harnesses = [
+        ScaleHarness(
+            args.targets_per_namespace,
+            args.policies,
+            namespace=ns,
+            collect_metrics=False,
+        )
+        for ns in namespaces
+    ]
+    sampler = ShardSampler(
+        args.deployment_namespace, args.selector, args.metrics_port, args.interval
+    )
+    before = sampler.scrape_all()
+    try:
+        with sampler, ThreadPoolExecutor(max_workers=len(harnesses)) as executor:
+            reports = list(executor.map(lambda h: h.run(timeout=args.timeout), harnesses))
+        after = sampler.scrape_all()
+    finally:
+        for harness in harnesses:
+            harness.cleanup()
+        wait_drained(namespaces, args.timeout)
+
+    resources = sum(r.targets * (1 + r.policies_per_target) for r in reports)
+    unsynced = sum(len(r.unsynced) + len(r.failed) for r in reports)
+    wall = max(r.wall_seconds for r in reports)
+    return {
+        "replicas": replicas,
+        "resources": resources,
+        "unsynced": unsynced,
+        "wall_seconds": wall,
+        "throughput": (resources - unsynced) / wall if wall else None,
+        "peak_queue_depth": dict(sampler.peak_queue_depth),
+        "shards": shard_counters(before, after),
+    }
+
+
+def scaling(runs: List[Dict]) -> List[Dict]:
+    """Adds to every run its speedup over the first run and how close that
+    is to linear scaling.
+    """
+    base = runs[0]
+    for run in runs:
+        if base["throughput"] and run["throughput"]:
+            run["speedup"] = run["throughput"] / base["throughput"]
+            run["efficiency"] = run["speedup"] / (run["replicas"] / base["replicas"])
+        else:
+            run["speedup"] = run["efficiency"] = None
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--namespaces-per-shard", type=int, default=1)
+    parser.add_argument("--targets-per-namespace", type=int, default=25)
+    parser.add_argument("--policies", type=int, default=1)
+    parser.add_argument("--namespace-prefix", default="ack-shard-bench")
+    parser.add_argument("--deployment", default="ack-applicationautoscaling-controller")
+    parser.add_argument("--deployment-namespace", default="ack-system")
+    parser.add_argument("--selector", default=CONTROLLER_SELECTOR)
+    parser.add_argument("--metrics-port", type=int, default=8080)
+    parser.add_argument(
+        "--lease-namespace",
+        default=None,
+        help="Namespace of the shard leases, the deployment's by default",
+    )
+    parser.add_argument("--lease-group", default=sharding.DEFAULT_LEASE_GROUP)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--interval", type=float, default=2)
+    parser.add_argument("--min-efficiency", type=float, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO)
+
+    namespaces = sharding.balanced_namespaces(
+        args.namespace_prefix, args.shards, args.namespaces_per_shard
+    )
+    create_namespaces(namespaces)
+    try:
+        runs = scaling([run_once(args, replicas, namespaces) for replicas in args.replicas])
+    finally:
+        delete_namespaces(namespaces)
+
+    result = {"shards": args.shards, "namespaces": len(namespaces), "runs": runs}
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+    efficiency: Optional[float] = runs[-1]["efficiency"]
+    if args.min_efficiency is not None and (
+        efficiency is None or efficiency < args.min_efficiency
+    ):
+        logging.error(
+            f"scaling efficiency {efficiency} at {runs[-1]['replicas']} replicas "
+            f"is below {args.min_efficiency}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Measures how the controller resyncs an existing fleet after a restart.
+
+Restarts the controller deployment and samples its metrics endpoint until
+every ScalableTarget and ScalingPolicy in the namespace has been reconciled
+again. It reports the time that took and the peak rate of outbound AWS
+calls. Run it once with ``ACK_STARTUP_STAGGER_WINDOW`` unset and once with
+it set to compare::
+
+    python -m e2e.benchmarks.startup_stagger --create 500 --policies 1 \\
+        --label baseline --output baseline.json
+    python -m e2e.benchmarks.startup_stagger --create 500 --policies 1 \\
+        --label staggered --output staggered.json
+
+The metrics endpoint (ACK_CONTROLLER_METRICS_URL) has to stay reachable
+across the restart, e.g. through a Service rather than a port-forward to
+the old pod.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+from e2e import CRD_GROUP, CRD_VERSION
+from e2e.common import metrics
+
+RESOURCES = {
+    # plural: (controller name, kind)
+    "scalabletargets": ("scalabletarget", "ScalableTarget"),
+    "scalingpolicies": ("scalingpolicy", "ScalingPolicy"),
+}
+DEFERRED_METRIC = "ack_startup_resync_deferred_total"
+PENDING_METRIC = "ack_startup_resync_pending"
+RECONCILE_TOTAL_METRIC = "controller_runtime_reconcile_total"
+
+
+def count_resources(namespace: str) -> Dict[str, int]:
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+    return {
+        plural: len(
+            api.list_namespaced_custom_object(
+                CRD_GROUP, CRD_VERSION, namespace, plural
+            )["items"]
+        )
+        for plural in RESOURCES
+    }
+
+
+def restart_deployment(name: str, namespace: str):
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    client.AppsV1Api(k8s._get_k8s_api_client()).patch_namespaced_deployment(
+        name,
+        namespace,
+        {
+            "spec": {
+                "template": {
+                    "metadata": {
+                        "annotations": {"kubectl.kubernetes.io/restartedAt": now}
+                    }
+                }
+            }
+        },
+    )
+
+
+def resynced(samples, expected: Dict[str, int]) -> bool:
+    """Reports whether every resource has had a real resync: each one is
+    reconciled once, plus once more for every deferred resync.
+    """
+    reconciles = metrics.sum_by(samples, RECONCILE_TOTAL_METRIC, "controller")
+    deferred = metrics.sum_by(samples, DEFERRED_METRIC, "kind")
+    pending = metrics.sum_by(samples, PENDING_METRIC, "kind")
+    for plural, count in expected.items():
+        controller, kind = RESOURCES[plural]
+        if pending.get(kind, 0.0) > 0:
+            return False
+        if reconciles.get(controller, 0.0) < count + deferred.get(kind, 0.0):
+            return False
+    return True
+
+
+def measure(
+    expected: Dict[str, int],
+    timeout: float,
+    interval: float,
+    metrics_url: Optional[str] = None,
+) -> Dict:
+    """Samples the metrics endpoint every `interval` seconds until the fleet
+    has resynced and returns the timings and request rates observed.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    rates: List[float] = []
+    previous = None
+    previous_at = None
+    done_at = None
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        try:
+            samples = metrics.scrape(metrics_url)
+        except OSError:
+            # The old pod is gone and the new one is not serving yet
+            previous = None
+            continue
+        now = time.monotonic()
+        calls = sum(metrics.api_call_counts(samples).values())
+        if previous is not None and calls >= previous:
+            rates.append((calls - previous) / (now - previous_at))
+        previous, previous_at = calls, now
+        if resynced(samples, expected):
+            done_at = now
+            break
+
+    return {
+        "time_to_all_resynced": done_at - start if done_at is not None else None,
+        "peak_requests_per_second": max(rates) if rates else None,
+        "mean_requests_per_second": sum(rates) / len(rates) if rates else None,
+        "samples": len(rates),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", required=True)
+    parser.add_argument("--namespace", default="default")
+    parser.add_argument("--deployment", default="ack-applicationautoscaling-controller")
+    parser.add_argument("--deployment-namespace", default="ack-system")
+    parser.add_argument(
+        "--create",
+        type=int,
+        default=0,
+        help="Create this many ScalableTargets first and delete them afterwards",
+    )
+    parser.add_argument("--policies", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--metrics-url", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO)
+
+    harness = None
+    if args.create:
+        from e2e.common.scale import ScaleHarness
+
+        harness = ScaleHarness(
+            args.create,
+            args.policies,
+            namespace=args.namespace,
+            metrics_url=args.metrics_url,
+        )
+        harness.run(timeout=args.timeout)
+    try:
+        expected = count_resources(args.namespace)
+        restart_deployment(args.deployment, args.deployment_namespace)
+        result = measure(expected, args.timeout, args.interval, args.metrics_url)
+    finally:
+        if harness is not None:
+            harness.cleanup()
+    result.update({"label": args.label, "resources": expected})
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
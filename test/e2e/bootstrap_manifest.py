@@ -0,0 +1,263 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Content-addressed manifest of the bootstrapped resources.
+
+The manifest is a small JSON file written next to the bootstrap pickle. For
+every bootstrapped resource it records a hash of the resource's desired state
+together with its outputs (names, ARNs), and it records a digest of the data
+bucket contents. A later bootstrap only re-applies the resources whose desired
+state changed and only re-syncs the data bucket when its source changed, and
+readers can look up outputs without unpickling the bootstrap file.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from acktest.bootstrapping.iam import Role
+from acktest.bootstrapping.s3 import Bucket
+from e2e.common.aws_clients import get_client
+
+MANIFEST_VERSION = 1
+DEFAULT_BOOTSTRAP_FILE_NAME = "bootstrap.pkl"
+
+_OUTPUT_TYPES = (str, int, float, bool)
+
+
+def manifest_file_name(bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME) -> str:
+    return Path(bootstrap_file_name).stem + ".manifest.json"
+
+
+def desired_state_hash(resource) -> str:
+    """Returns a hash of the fields `resource` was constructed with.
+
+    Bootstrappable resources are dataclasses whose init fields describe the
+    desired state and whose other fields are outputs filled in by
+    `bootstrap()`, so only the init fields are hashed.
+    """
+    desired = {
+        f.name: getattr(resource, f.name, None)
+        for f in dataclasses.fields(resource)
+        if f.init
+    }
+    material = json.dumps(
+        {"kind": type(resource).__qualname__, "desired": desired},
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def resource_outputs(resource) -> Dict[str, Any]:
+    """Returns the scalar outputs `bootstrap()` set on `resource`."""
+    outputs = {}
+    for f in dataclasses.fields(resource):
+        if f.init:
+            continue
+        value = getattr(resource, f.name, None)
+        if isinstance(value, _OUTPUT_TYPES):
+            outputs[f.name] = value
+    return outputs
+
+
+def resource_exists(resource) -> bool:
+    """Returns whether a previously bootstrapped `resource` still exists.
+
+    Resources of a kind that cannot be probed are assumed to exist.
+    """
+    try:
+        if isinstance(resource, Bucket):
+            get_client("s3").head_bucket(Bucket=resource.name)
+        elif isinstance(resource, Role):
+            get_client("iam").get_role(RoleName=resource.name)
+    except ClientError:
+        return False
+    return True
+
+
+@dataclass
+class ResourceEntry:
+    kind: str
+    desired: str
+    outputs: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, resource) -> "ResourceEntry":
+        return cls(
+            kind=type(resource).__qualname__,
+            desired=desired_state_hash(resource),
+            outputs=resource_outputs(resource),
+        )
+
+
+@dataclass
+class DataBucketEntry:
+    bucket: str
+    source: str
+    digest: str
+
+
+@dataclass
+class BootstrapManifest:
+    """What was bootstrapped, and from which desired state."""
+
+    bootstrap_file: str = DEFAULT_BOOTSTRAP_FILE_NAME
+    resources: Dict[str, ResourceEntry] = field(default_factory=dict)
+    data_bucket: Optional[DataBucketEntry] = None
+    # Size and modification time of the bootstrap file when the manifest was
+    # written, used to notice a bootstrap file the manifest does not describe
+    pickle_size: int = 0
+    pickle_mtime_ns: int = 0
+    version: int = MANIFEST_VERSION
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+    ) -> Optional["BootstrapManifest"]:
+        """Reads the manifest for `bootstrap_file_name` in `directory`.
+
+        Returns None when there is no manifest or it was written by an
+        incompatible version.
+        """
+        path = Path(directory) / manifest_file_name(bootstrap_file_name)
+        try:
+            with open(path) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        data_bucket = data.get("data_bucket")
+        return cls(
+            bootstrap_file=data.get("bootstrap_file", bootstrap_file_name),
+            resources={
+                name: ResourceEntry(**entry)
+                for name, entry in data.get("resources", {}).items()
+            },
+            data_bucket=DataBucketEntry(**data_bucket) if data_bucket else None,
+            pickle_size=data.get("pickle_size", 0),
+            pickle_mtime_ns=data.get("pickle_mtime_ns", 0),
+        )
+
+    def matches_pickle(self, directory: Path) -> bool:
+        """Returns whether the bootstrap file in `directory` is the one this
+        manifest was written for. Only the file's metadata is read.
+        """
+        try:
+            stat = os.stat(Path(directory) / self.bootstrap_file)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (self.pickle_size, self.pickle_mtime_ns)
+
+    def write(self, directory: Path):
+        """Writes the manifest next to the bootstrap file, which must already
+        have been serialized to `directory`.
+        """
+        stat = os.stat(Path(directory) / self.bootstrap_file)
+        self.pickle_size, self.pickle_mtime_ns = stat.st_size, stat.st_mtime_ns
+        path = Path(directory) / manifest_file_name(self.bootstrap_file)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as stream:
+            json.dump(dataclasses.asdict(self), stream, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def remove(directory: Path, bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME):
+        try:
+            os.remove(Path(directory) / manifest_file_name(bootstrap_file_name))
+        except FileNotFoundError:
+            pass
+
+    def record(self, name: str, resource):
+        self.resources[name] = ResourceEntry.of(resource)
+
+
+@dataclass
+class IncrementalBootstrapReport:
+    applied: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    replaced: List[str] = field(default_factory=list)
+
+
+def load_previous(
+    resources_type,
+    directory: Path,
+    bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+):
+    """Returns the previously bootstrapped resources and their manifest, or
+    (None, None) when there is no manifest matching the bootstrap file.
+    """
+    manifest = BootstrapManifest.load(directory, bootstrap_file_name)
+    if manifest is None or not manifest.matches_pickle(directory):
+        return None, None
+    try:
+        previous = resources_type.deserialize(
+            directory, bootstrap_file_name=bootstrap_file_name
+        )
+    except Exception as ex:
+        logging.warning(f"Ignoring unreadable bootstrap file {bootstrap_file_name}: {ex}")
+        return None, None
+    return previous, manifest
+
+
+def bootstrap_incrementally(
+    resources,
+    previous=None,
+    previous_manifest: Optional[BootstrapManifest] = None,
+    exists: Callable[[Any], bool] = resource_exists,
+    bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+):
+    """Bootstraps the resources declared on `resources`, reusing every one
+    whose desired state matches `previous_manifest` and that still exists.
+
+    Reused resources are taken from `previous` so that their outputs carry
+    over. A resource whose desired state changed is bootstrapped again and
+    the one it replaces is cleaned up afterwards. Returns the manifest of the
+    result, without a data bucket entry, and a report of what was done.
+    """
+    manifest = BootstrapManifest(bootstrap_file=bootstrap_file_name)
+    report = IncrementalBootstrapReport()
+    for f in dataclasses.fields(resources):
+        name = f.name
+        resource = getattr(resources, name)
+        old = getattr(previous, name, None) if previous is not None else None
+        entry = previous_manifest.resources.get(name) if previous_manifest else None
+
+        unchanged = entry is not None and entry.desired == desired_state_hash(resource)
+        if old is not None and unchanged and exists(old):
+            setattr(resources, name, old)
+            report.reused.append(name)
+        else:
+            resource.bootstrap()
+            report.applied.append(name)
+            if old is not None and entry is not None and not unchanged:
+                try:
+                    old.cleanup()
+                except Exception as ex:
+                    logging.warning(f"Failed to clean up replaced {name}: {ex}")
+                report.replaced.append(name)
+        manifest.record(name, getattr(resources, name))
+
+    logging.info(
+        f"Bootstrapped {report.applied or 'nothing'}, reused {report.reused or 'nothing'}"
+    )
+    return manifest, report
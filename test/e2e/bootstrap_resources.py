@@ -13,13 +13,24 @@
 
 """Declares the structure of the bootstrapped resources and provides a loader
 for them.
+
+Tests read the bootstrapped resources through a `BootstrapState`, which
+resolves attributes lazily: outputs such as bucket names and role ARNs come
+from the versioned JSON manifest written by the bootstrap, and the bootstrap
+pickle is only deserialized for anything the manifest does not record.
+Nothing is read until an attribute is first accessed.
 """
 
+import dataclasses
+import threading
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
 from acktest.bootstrapping import Resources
 from acktest.bootstrapping.iam import Role
 from acktest.bootstrapping.s3 import Bucket
 from e2e import bootstrap_directory
+from e2e.bootstrap_manifest import BootstrapManifest, DEFAULT_BOOTSTRAP_FILE_NAME
 
 SAGEMAKER_SOURCE_DATA_BUCKET = "source-data-bucket-592697580195-us-west-2"
 
@@ -30,13 +41,115 @@ class TestBootstrapResources(Resources):
     SageMakerExecutionRole: Role
 
 
-_bootstrap_resources = None
+class BootstrappedResource:
+    """Attribute view of one bootstrapped resource."""
+
+    def __init__(self, state: "BootstrapState", name: str):
+        self._state = state
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        manifest = self._state.manifest()
+        if manifest is not None:
+            entry = manifest.resources.get(self._name)
+            if entry is not None and attr in entry.outputs:
+                return entry.outputs[attr]
+        return getattr(getattr(self._state.resources(), self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"BootstrappedResource({self._name!r})"
+
+
+class BootstrapState:
+    """Lazily loaded view of the resources written by the bootstrap.
+
+    Each resource declared on `resources_type` is available as an attribute
+    returning a `BootstrappedResource`. The manifest and the pickle are each
+    read at most once, on first use.
+    """
+
+    def __init__(
+        self,
+        directory: Path = bootstrap_directory,
+        bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+        resources_type=TestBootstrapResources,
+    ):
+        self._directory = directory
+        self._bootstrap_file_name = bootstrap_file_name
+        self._resources_type = resources_type
+        self._names = {f.name for f in dataclasses.fields(resources_type)}
+        self._lock = threading.Lock()
+        self._manifest_loaded = False
+        self._manifest: Optional[BootstrapManifest] = None
+        self._resources = None
+
+    def manifest(self) -> Optional[BootstrapManifest]:
+        """Returns the manifest describing the bootstrap file, or None if
+        there is none or it describes a different bootstrap file.
+        """
+        with self._lock:
+            if not self._manifest_loaded:
+                manifest = BootstrapManifest.load(self._directory, self._bootstrap_file_name)
+                if manifest is not None and manifest.matches_pickle(self._directory):
+                    self._manifest = manifest
+                self._manifest_loaded = True
+            return self._manifest
+
+    def resources(self):
+        """Returns the deserialized bootstrap file."""
+        with self._lock:
+            if self._resources is None:
+                self._resources = self._resources_type.deserialize(
+                    self._directory, bootstrap_file_name=self._bootstrap_file_name
+                )
+            return self._resources
+
+    def __getattr__(self, name: str) -> BootstrappedResource:
+        if name.startswith("_") or name not in self._names:
+            raise AttributeError(name)
+        return BootstrappedResource(self, name)
+
+
+_bootstrap_states: Dict[str, BootstrapState] = {}
+_bootstrap_states_lock = threading.Lock()
+
+
+def get_bootstrap_resources(
+    bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+) -> BootstrapState:
+    with _bootstrap_states_lock:
+        state = _bootstrap_states.get(bootstrap_file_name)
+        if state is None:
+            state = BootstrapState(bootstrap_directory, bootstrap_file_name)
+            _bootstrap_states[bootstrap_file_name] = state
+        return state
+
+
+def reset_bootstrap_resources():
+    """Forgets the loaded bootstrap state so that it is read again, e.g. after
+    the bootstrap file was rewritten.
+    """
+    with _bootstrap_states_lock:
+        _bootstrap_states.clear()
+
+
+def get_bootstrap_manifest(
+    bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME,
+) -> Optional[BootstrapManifest]:
+    """Returns the manifest written alongside the bootstrap file, or None if
+    there is none or it no longer describes the bootstrap file. The bootstrap
+    file itself is not deserialized.
+    """
+    return get_bootstrap_resources(bootstrap_file_name).manifest()
 
 
-def get_bootstrap_resources(bootstrap_file_name: str = "bootstrap.pkl"):
-    global _bootstrap_resources
-    if _bootstrap_resources is None:
-        _bootstrap_resources = TestBootstrapResources.deserialize(
-            bootstrap_directory, bootstrap_file_name=bootstrap_file_name
-        )
-    return _bootstrap_resources
+def get_bootstrap_output(
+    resource_name: str, output: str, bootstrap_file_name: str = DEFAULT_BOOTSTRAP_FILE_NAME
+) -> Any:
+    """Returns the `output` field (e.g. ``name`` or ``arn``) of the
+    bootstrapped resource `resource_name`, read from the manifest when
+    possible and from the bootstrap file otherwise.
+    """
+    return getattr(getattr(get_bootstrap_resources(bootstrap_file_name), resource_name), output)
@@ -0,0 +1,329 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Scaling activity timelines, used to benchmark how fast a scaling policy
+reacts.
+
+`collect` streams the DescribeScalingActivities history of one scalable
+target into an `ActivityTimeline`, which keeps every field in a typed array
+column rather than one dict per activity. `ActivityTimeline.analyze` then
+reports, for the activities that changed capacity:
+
+- the time from the CloudWatch alarm that triggered the activity to the start
+  of the activity, when the alarm history is known,
+- how long each activity took,
+- the capacity change it made, and
+- whether it started before the ScaleInCooldown or ScaleOutCooldown of the
+  policy had expired since the previous activity in the same direction.
+
+Timelines can be built from a live account with `collect` or from a recorded
+fixture with `load_activities`, so the analysis is testable offline.
+"""
+
+import datetime
+import json
+import math
+import re
+import statistics
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from e2e.common import describe
+from e2e.common.aws_clients import get_client
+
+ALARM_CAUSE = re.compile(r"monitor alarm (\S+) in state ALARM")
+TARGET_CAPACITY = re.compile(r"\bto (\d+)\b")
+
+STATUS_CODES = (
+    "Pending",
+    "InProgress",
+    "Successful",
+    "Overridden",
+    "Unfulfilled",
+    "Failed",
+)
+
+
+def _epoch(value) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    return float(value)
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Returns the nearest-rank percentile `q` of `values`, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else None,
+        "p50": _percentile(values, 50),
+        "p90": _percentile(values, 90),
+        "max": max(values) if values else None,
+    }
+
+
+@dataclass
+class Cooldowns:
+    scale_in: float = 0.0
+    scale_out: float = 0.0
+
+    @classmethod
+    def from_policy(cls, policy: Mapping) -> "Cooldowns":
+        """Reads the cooldowns of a scaling policy, given either as a
+        DescribeScalingPolicies item or as the spec of a ScalingPolicy
+        resource.
+        """
+        for key in (
+            "TargetTrackingScalingPolicyConfiguration",
+            "targetTrackingScalingPolicyConfiguration",
+        ):
+            if key in policy:
+                config = policy[key]
+                return cls(
+                    scale_in=config.get("ScaleInCooldown", config.get("scaleInCooldown", 0)),
+                    scale_out=config.get("ScaleOutCooldown", config.get("scaleOutCooldown", 0)),
+                )
+        for key in ("StepScalingPolicyConfiguration", "stepScalingPolicyConfiguration"):
+            if key in policy:
+                config = policy[key]
+                cooldown = config.get("Cooldown", config.get("cooldown", 0))
+                return cls(scale_in=cooldown, scale_out=cooldown)
+        return cls()
+
+
+@dataclass
+class CooldownViolation:
+    activity_id: str
+    direction: str
+    gap: float
+    cooldown: float
+
+
+@dataclass
+class ActivityAnalysis:
+    activities: int
+    scaled: int
+    scale_outs: int
+    scale_ins: int
+    alarm_to_start: Dict[str, Optional[float]]
+    duration: Dict[str, Optional[float]]
+    capacity_deltas: List[int]
+    cooldown_violations: List[CooldownViolation] = field(default_factory=list)
+
+    @property
+    def cooldown_adherence(self) -> float:
+        """Returns the fraction of capacity changes that respected the cooldown."""
+        if not self.scaled:
+            return 1.0
+        return 1 - len(self.cooldown_violations) / self.scaled
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), cooldown_adherence=self.cooldown_adherence)
+
+
+class ActivityTimeline:
+    """Scaling activities of one scalable target, stored column by column.
+
+    Times are epoch seconds, NaN when unknown. Capacities are -1 when the
+    activity does not say what capacity it set.
+    """
+
+    def __init__(self):
+        self.activity_ids: List[str] = []
+        self.start = array("d")
+        self.end = array("d")
+        self.alarm = array("d")
+        self.capacity = array("i")
+        self.status = array("b")
+        self.scaled = array("b")
+        self._alarm_names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.activity_ids)
+
+    def append(self, activity: Mapping):
+        cause = activity.get("Cause", "")
+        alarm = ALARM_CAUSE.search(cause)
+        if alarm:
+            self._alarm_names[len(self)] = alarm.group(1)
+        target = TARGET_CAPACITY.search(activity.get("Description", ""))
+        status = activity.get("StatusCode")
+
+        self.activity_ids.append(activity["ActivityId"])
+        self.start.append(_epoch(activity.get("StartTime")))
+        self.end.append(_epoch(activity.get("EndTime")))
+        self.alarm.append(math.nan)
+        self.capacity.append(int(target.group(1)) if target else -1)
+        self.status.append(STATUS_CODES.index(status) if status in STATUS_CODES else -1)
+        self.scaled.append(0 if activity.get("NotScaledReasons") else 1)
+
+    def extend(self, activities: Iterable[Mapping]):
+        for activity in activities:
+            self.append(activity)
+
+    def alarm_names(self) -> List[str]:
+        return sorted(set(self._alarm_names.values()))
+
+    def attach_alarm_history(self, history: Mapping[str, Sequence[float]]):
+        """Sets the alarm time of every activity triggered by an alarm in
+        `history` to the last time that alarm went into ALARM before the
+        activity started. `history` maps alarm names to those times.
+        """
+        for index, name in self._alarm_names.items():
+            before = [
+                _epoch(t) for t in history.get(name, ()) if _epoch(t) <= self.start[index]
+            ]
+            if before:
+                self.alarm[index] = max(before)
+
+    def _order(self) -> List[int]:
+        return sorted(range(len(self)), key=lambda i: self.start[i])
+
+    def analyze(
+        self,
+        cooldowns: Optional[Cooldowns] = None,
+        initial_capacity: Optional[int] = None,
+    ) -> ActivityAnalysis:
+        """Analyzes the activities that changed capacity, oldest first.
+
+        The capacity before the first activity is `initial_capacity` when
+        given; otherwise the first capacity change cannot be measured.
+        """
+        cooldowns = cooldowns or Cooldowns()
+        latencies: List[float] = []
+        durations: List[float] = []
+        deltas: List[int] = []
+        violations: List[CooldownViolation] = []
+        last_end: Dict[str, float] = {}
+        previous = initial_capacity
+        scale_outs = scale_ins = scaled = 0
+
+        for i in self._order():
+            if not self.scaled[i] or self.capacity[i] < 0:
+                continue
+            scaled += 1
+            start, end = self.start[i], self.end[i]
+            if not math.isnan(self.alarm[i]):
+                latencies.append(start - self.alarm[i])
+            if not math.isnan(end):
+                durations.append(end - start)
+
+            direction = None
+            if previous is not None and self.capacity[i] != previous:
+                delta = self.capacity[i] - previous
+                deltas.append(delta)
+                direction = "out" if delta > 0 else "in"
+            previous = self.capacity[i]
+            if direction is None:
+                continue
+            if direction == "out":
+                scale_outs += 1
+                cooldown = cooldowns.scale_out
+            else:
+                scale_ins += 1
+                cooldown = cooldowns.scale_in
+            if direction in last_end:
+                gap = start - last_end[direction]
+                if gap < cooldown:
+                    violations.append(
+                        CooldownViolation(self.activity_ids[i], direction, gap, cooldown)
+                    )
+            last_end[direction] = end if not math.isnan(end) else start
+
+        return ActivityAnalysis(
+            activities=len(self),
+            scaled=scaled,
+            scale_outs=scale_outs,
+            scale_ins=scale_ins,
+            alarm_to_start=_distribution(latencies),
+            duration=_distribution(durations),
+            capacity_deltas=deltas,
+            cooldown_violations=violations,
+        )
+
+
+def load_activities(path: str) -> List[Dict]:
+    """Reads recorded activities, either a DescribeScalingActivities response
+    or a plain list of activities.
+    """
+    with open(path) as f:
+        recorded = json.load(f)
+    if isinstance(recorded, dict):
+        return recorded["ScalingActivities"]
+    return recorded
+
+
+def alarm_history(
+    alarm_names: Iterable[str],
+    since: Optional[datetime.datetime] = None,
+    client=None,
+) -> Dict[str, List[float]]:
+    """Returns the times each alarm went into ALARM, from CloudWatch."""
+    client = client or get_client("cloudwatch")
+    params = {"HistoryItemType": "StateUpdate"}
+    if since is not None:
+        params["StartDate"] = since
+    history: Dict[str, List[float]] = {}
+    paginator = client.get_paginator("describe_alarm_history")
+    for name in alarm_names:
+        times = history.setdefault(name, [])
+        for page in paginator.paginate(AlarmName=name, **params):
+            for item in page["AlarmHistoryItems"]:
+                data = json.loads(item.get("HistoryData") or "{}")
+                if data.get("newState", {}).get("stateValue") == "ALARM":
+                    times.append(_epoch(item["Timestamp"]))
+    return history
+
+
+def collect(
+    resource_id: str,
+    namespace: str = "sagemaker",
+    dimension: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    with_alarms: bool = True,
+    client=None,
+    cloudwatch_client=None,
+) -> ActivityTimeline:
+    """Builds the timeline of the scaling activities of `resource_id` that
+    started at or after `since`.
+    """
+    timeline = ActivityTimeline()
+    cutoff = since.timestamp() if since is not None else -math.inf
+    for activity in describe.scaling_activities(
+        namespace,
+        resource_id=resource_id,
+        dimension=dimension,
+        include_not_scaled=True,
+        prefetch=True,
+        client=client,
+    ):
+        # Activities are returned newest first
+        if _epoch(activity.get("StartTime")) < cutoff:
+            break
+        timeline.append(activity)
+    if with_alarms and timeline.alarm_names():
+        timeline.attach_alarm_history(
+            alarm_history(timeline.alarm_names(), since, cloudwatch_client)
+        )
+    return timeline
@@ -0,0 +1,156 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Process-wide registry of boto3 clients shared by the integration tests.
+
+boto3 clients are thread-safe once built, so a single client per service,
+region and set of credentials is reused instead of paying session creation,
+endpoint resolution and a fresh connection pool on every helper call.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+
+@dataclass
+class ClientRegistryStats:
+    created: int = 0
+    reused: int = 0
+    invalidated: int = 0
+
+
+class ClientRegistry:
+    """Caches boto3 clients keyed by service, region and credentials.
+
+    When the credentials resolved for a service and region change (for
+    example after an STS session is rotated), clients built with the old
+    credentials are dropped and a new one is created.
+    """
+
+    def __init__(
+        self,
+        session: Optional[boto3.session.Session] = None,
+        max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+    ):
+        self._session = session
+        self._max_pool_connections = max_pool_connections
+        self._clients: Dict[Tuple[str, str, str], object] = {}
+        self._endpoint_urls: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = ClientRegistryStats()
+
+    def _get_session(self) -> boto3.session.Session:
+        if self._session is None:
+            self._session = boto3.session.Session()
+        return self._session
+
+    def _credentials_fingerprint(self) -> str:
+        credentials = self._get_session().get_credentials()
+        if credentials is None:
+            return ""
+        frozen = credentials.get_frozen_credentials()
+        material = f"{frozen.access_key}:{frozen.secret_key}:{frozen.token or ''}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def endpoint_url(self, service_name: str) -> Optional[str]:
+        """Returns the endpoint override for `service_name`, if any.
+
+        Overrides set with `set_endpoint_url` win over the
+        ``AWS_ENDPOINT_URL_<SERVICE>`` environment variable, where
+        ``<SERVICE>`` is the upper-cased client name with dashes replaced by
+        underscores (e.g. ``AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING``).
+        """
+        if service_name in self._endpoint_urls:
+            return self._endpoint_urls[service_name]
+        env_name = "AWS_ENDPOINT_URL_" + service_name.upper().replace("-", "_")
+        return os.environ.get(env_name) or None
+
+    def set_endpoint_url(self, service_name: str, endpoint_url: Optional[str]):
+        """Points clients for `service_name` at `endpoint_url`, or back at
+        the default endpoint when it is None.
+        """
+        with self._lock:
+            if endpoint_url is None:
+                self._endpoint_urls.pop(service_name, None)
+            else:
+                self._endpoint_urls[service_name] = endpoint_url
+            stale = [k for k in self._clients if k[0] == service_name]
+            for k in stale:
+                del self._clients[k]
+            self.stats.invalidated += len(stale)
+
+    def client(self, service_name: str, region_name: Optional[str] = None):
+        with self._lock:
+            session = self._get_session()
+            region = region_name or session.region_name or ""
+            fingerprint = self._credentials_fingerprint()
+            key = (service_name, region, fingerprint)
+
+            client = self._clients.get(key)
+            if client is not None:
+                self.stats.reused += 1
+                return client
+
+            stale = [
+                k
+                for k in self._clients
+                if k[0] == service_name and k[1] == region and k[2] != fingerprint
+            ]
+            for k in stale:
+                del self._clients[k]
+            self.stats.invalidated += len(stale)
+
+            client = session.client(
+                service_name,
+                region_name=region or None,
+                endpoint_url=self.endpoint_url(service_name),
+                config=Config(max_pool_connections=self._max_pool_connections),
+            )
+            self._clients[key] = client
+            self.stats.created += 1
+            return client
+
+    def configure(self, max_pool_connections: int):
+        """Sets the connection pool size used by clients created from now on
+        and drops every cached client so the new size takes effect.
+        """
+        with self._lock:
+            self._max_pool_connections = max_pool_connections
+            self.stats.invalidated += len(self._clients)
+            self._clients.clear()
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._endpoint_urls.clear()
+            self._session = None
+            self.stats = ClientRegistryStats()
+
+
+_registry = ClientRegistry()
+
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """Returns the shared client for `service_name` in `region_name`."""
+    return _registry.client(service_name, region_name)
+
+
+def client_registry() -> ClientRegistry:
+    return _registry
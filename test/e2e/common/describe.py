@@ -0,0 +1,205 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Streaming iterators over the Application Auto Scaling describe operations.
+
+Each iterator follows NextToken and yields one item at a time. At most the
+current page is held in memory, plus the next one when `prefetch` is set, so
+memory stays flat whatever the size of the account. With `prefetch`, the next
+page is requested on a background thread while the caller works through the
+current one.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from e2e.common.aws_clients import get_client
+
+# Largest MaxResults accepted by the describe operations
+MAX_RESULTS = 50
+# Largest number of ResourceIds accepted by DescribeScalableTargets
+MAX_RESOURCE_IDS = 50
+
+
+def iter_pages(
+    fetch: Callable[..., Dict],
+    params: Dict[str, Any],
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+) -> Iterator[Dict]:
+    """Yields every response page of the describe call `fetch` with `params`.
+
+    `fetch` is a bound client method, e.g. ``client.describe_scalable_targets``.
+    """
+    params = dict(params)
+    if max_results is not None:
+        params["MaxResults"] = min(max_results, MAX_RESULTS)
+    if not prefetch:
+        while True:
+            page = fetch(**params)
+            yield page
+            if not page.get("NextToken"):
+                return
+            params["NextToken"] = page["NextToken"]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(fetch, **params)
+        while pending is not None:
+            page = pending.result()
+            pending = None
+            if page.get("NextToken"):
+                params["NextToken"] = page["NextToken"]
+                pending = executor.submit(fetch, **params)
+            try:
+                yield page
+            except GeneratorExit:
+                if pending is not None:
+                    pending.cancel()
+                raise
+
+
+def iter_items(
+    fetch: Callable[..., Dict],
+    params: Dict[str, Any],
+    result_key: str,
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+) -> Iterator[Dict]:
+    for page in iter_pages(fetch, params, max_results, prefetch):
+        yield from page[result_key]
+
+
+def _filters(**filters) -> Dict[str, Any]:
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def _chunks(values: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def scalable_targets(
+    namespace: str,
+    resource_ids: Optional[Iterable[str]] = None,
+    dimension: Optional[str] = None,
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+    client=None,
+) -> Iterator[Dict]:
+    """Yields the scalable targets of `namespace`, optionally restricted to
+    `resource_ids` and `dimension`. More than 50 resource IDs are described
+    in several calls.
+    """
+    client = client or get_client("application-autoscaling")
+    params = _filters(ServiceNamespace=namespace, ScalableDimension=dimension)
+    if resource_ids is None:
+        yield from iter_items(
+            client.describe_scalable_targets,
+            params,
+            "ScalableTargets",
+            max_results,
+            prefetch,
+        )
+        return
+    for chunk in _chunks(sorted(set(resource_ids)), MAX_RESOURCE_IDS):
+        yield from iter_items(
+            client.describe_scalable_targets,
+            dict(params, ResourceIds=chunk),
+            "ScalableTargets",
+            max_results,
+            prefetch,
+        )
+
+
+def scaling_policies(
+    namespace: str,
+    resource_id: Optional[str] = None,
+    dimension: Optional[str] = None,
+    policy_names: Optional[List[str]] = None,
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+    client=None,
+) -> Iterator[Dict]:
+    """Yields the scaling policies of `namespace`, optionally restricted to a
+    resource, a dimension and a list of policy names.
+    """
+    client = client or get_client("application-autoscaling")
+    params = _filters(
+        ServiceNamespace=namespace,
+        ResourceId=resource_id,
+        ScalableDimension=dimension,
+        PolicyNames=policy_names,
+    )
+    return iter_items(
+        client.describe_scaling_policies,
+        params,
+        "ScalingPolicies",
+        max_results,
+        prefetch,
+    )
+
+
+def scaling_activities(
+    namespace: str,
+    resource_id: Optional[str] = None,
+    dimension: Optional[str] = None,
+    include_not_scaled: bool = False,
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+    client=None,
+) -> Iterator[Dict]:
+    """Yields the scaling activities of `namespace`, newest first, optionally
+    restricted to a resource and a dimension.
+    """
+    client = client or get_client("application-autoscaling")
+    params = _filters(
+        ServiceNamespace=namespace,
+        ResourceId=resource_id,
+        ScalableDimension=dimension,
+    )
+    if include_not_scaled:
+        params["IncludeNotScaledActivities"] = True
+    return iter_items(
+        client.describe_scaling_activities,
+        params,
+        "ScalingActivities",
+        max_results,
+        prefetch,
+    )
+
+
+def scheduled_actions(
+    namespace: str,
+    resource_id: Optional[str] = None,
+    dimension: Optional[str] = None,
+    action_names: Optional[List[str]] = None,
+    max_results: Optional[int] = None,
+    prefetch: bool = False,
+    client=None,
+) -> Iterator[Dict]:
+    """Yields the scheduled actions of `namespace`, optionally restricted to a
+    resource, a dimension and a list of action names.
+    """
+    client = client or get_client("application-autoscaling")
+    params = _filters(
+        ServiceNamespace=namespace,
+        ResourceId=resource_id,
+        ScalableDimension=dimension,
+        ScheduledActionNames=action_names,
+    )
+    return iter_items(
+        client.describe_scheduled_actions,
+        params,
+        "ScheduledActions",
+        max_results,
+        prefetch,
+    )
@@ -0,0 +1,436 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Pool of warm SageMaker endpoints shared by test sessions.
+
+The autoscaling tests only need some InService endpoint variant to register
+scalable targets against, and creating one takes many minutes. Pool members
+are ordinary endpoints carrying pool tags. They outlive the session that
+created them and are leased to one test at a time:
+
+* A pool is scoped to one machine, or more precisely to one state
+  directory (`workers.state_id`): its members carry the id of the state
+  directory that created them, and other machines using the same pool name
+  never see them. Tags offer no compare-and-swap, so leases are only safe
+  between processes that share `cross_worker_lock`, which serializes
+  acquisition.
+* A lease is the pair of lease tags on the endpoint: an owner and an
+  expiry time. A lease whose expiry has passed counts as free, so a session
+  that dies never holds an endpoint for longer than the lease TTL.
+* Returning a lease resets the endpoint. The scaling policies and scalable
+  targets registered on its variant are removed, and the lease tags are
+  replaced with the time of release.
+* Members that stayed idle past the idle TTL, were created from a different
+  spec, or failed are deleted by `collect_idle`. Their deletions run
+  concurrently through a single provisioner, which logs the critical path of
+  the teardown like it does for setup.
+
+A new endpoint is only created when no member is free. A session that
+knows how many endpoints its test modules will lease can `prewarm` the pool
+first, so that the missing endpoints are created concurrently through a
+single provisioner rather than one after the other as modules start.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import botocore
+
+from e2e.common.aws_clients import get_client
+from e2e.common.provisioner import Provisioner, ProvisioningError
+from e2e.common.workers import cross_worker_lock, run_id, state_id, unique_name, worker_id
+
+POOL_TAG = "ack-test-endpoint-pool"
+SCOPE_TAG = "ack-test-endpoint-pool-scope"
+SPEC_TAG = "ack-test-endpoint-spec"
+LEASE_OWNER_TAG = "ack-test-lease-owner"
+LEASE_EXPIRES_TAG = "ack-test-lease-expires"
+RELEASED_TAG = "ack-test-released"
+
+LEASE_TTL_ENV = "ACK_TEST_ENDPOINT_LEASE_TTL"
+IDLE_TTL_ENV = "ACK_TEST_ENDPOINT_IDLE_TTL"
+
+DEFAULT_POOL = "appautoscaling"
+DEFAULT_LEASE_TTL = 2 * 60 * 60
+DEFAULT_IDLE_TTL = 24 * 60 * 60
+VARIANT_NAME = "variant-1"
+SERVICE_NAMESPACE = "sagemaker"
+ENDPOINT_NAME_LENGTH = 48
+
+
+@dataclass
+class PoolMember:
+    name: str
+    arn: str
+    status: str
+    created: float
+    tags: Dict[str, str] = field(default_factory=dict)
+
+    def lease_expires(self) -> float:
+        return float(self.tags.get(LEASE_EXPIRES_TAG) or 0)
+
+    def leased(self, now: float) -> bool:
+        return bool(self.tags.get(LEASE_OWNER_TAG)) and self.lease_expires() > now
+
+    def idle_since(self) -> float:
+        return float(self.tags.get(RELEASED_TAG) or self.created)
+
+
+@dataclass
+class EndpointLease:
+    pool: str
+    endpoint_name: str
+    endpoint_arn: str
+    owner: str
+    expires: float
+    variant_name: str = VARIANT_NAME
+
+    @property
+    def resource_id(self) -> str:
+        return f"endpoint/{self.endpoint_name}/variant/{self.variant_name}"
+
+    @property
+    def model_name(self) -> str:
+        return self.endpoint_name + "-model"
+
+    @property
+    def endpoint_config_name(self) -> str:
+        return self.endpoint_name + "-config"
+
+
+class LeaseLostError(Exception):
+    pass
+
+
+def spec_digest(spec: Dict[str, str]) -> str:
+    """Returns a short digest of the values an endpoint is created from."""
+    material = json.dumps(spec, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def default_spec() -> Dict[str, str]:
+    from e2e.replacement_values import REPLACEMENT_VALUES
+
+    return {
+        key: REPLACEMENT_VALUES[key]
+        for key in (
+            "SAGEMAKER_DATA_BUCKET",
+            "SAGEMAKER_EXECUTION_ROLE_ARN",
+            "SAGEMAKER_XGBOOST_IMAGE_URI",
+            "ENDPOINT_INSTANCE_TYPE",
+        )
+    }
+
+
+def add_pool_endpoint_setup(
+    provisioner: Provisioner, lease: EndpointLease, tags: Dict[str, str]
+):
+    """Adds the steps that create the model, endpoint config and endpoint
+    behind `lease`, and wait for the endpoint to be InService, to
+    `provisioner`.
+    """
+    from e2e.common.sagemaker_utils import add_sagemaker_endpoint_setup
+
+    add_sagemaker_endpoint_setup(
+        provisioner,
+        lease.model_name,
+        lease.variant_name,
+        lease.endpoint_config_name,
+        lease.endpoint_name,
+        "InService",
+        tags=tags,
+    )
+
+
+def add_pool_endpoint_teardown(provisioner: Provisioner, name: str):
+    """Adds the steps that delete the endpoint `name`, its config and its
+    model to `provisioner`.
+    """
+    from e2e.common.sagemaker_utils import add_sagemaker_endpoint_teardown
+
+    add_sagemaker_endpoint_teardown(provisioner, name + "-model", name + "-config", name)
+
+
+class EndpointPool:
+    """Leases warm SageMaker endpoints, creating one only when none is free."""
+
+    def __init__(
+        self,
+        name: str = DEFAULT_POOL,
+        lease_ttl: Optional[float] = None,
+        idle_ttl: Optional[float] = None,
+        spec: Optional[Dict[str, str]] = None,
+        add_endpoint_setup: Callable[
+            [Provisioner, EndpointLease, Dict[str, str]], None
+        ] = add_pool_endpoint_setup,
+        add_endpoint_teardown: Callable[
+            [Provisioner, str], None
+        ] = add_pool_endpoint_teardown,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.lease_ttl = lease_ttl or float(os.environ.get(LEASE_TTL_ENV) or DEFAULT_LEASE_TTL)
+        self.idle_ttl = idle_ttl or float(os.environ.get(IDLE_TTL_ENV) or DEFAULT_IDLE_TTL)
+        self._spec = spec
+        self.add_endpoint_setup = add_endpoint_setup
+        self.add_endpoint_teardown = add_endpoint_teardown
+        self.clock = clock
+        self.owner = f"{run_id()}/{worker_id()}"
+        self.scope = state_id()
+
+    @property
+    def name_prefix(self) -> str:
+        return f"ack-pool-{self.name}"
+
+    def spec(self) -> Dict[str, str]:
+        # Resolved on first use, since the default reads the bootstrap state
+        if self._spec is None:
+            self._spec = default_spec()
+        return self._spec
+
+    def _sagemaker(self):
+        return get_client("sagemaker")
+
+    def members(self) -> List[PoolMember]:
+        """Returns every endpoint of this pool created on this machine,
+        whatever its state.
+        """
+        client = self._sagemaker()
+        members = []
+        paginator = client.get_paginator("list_endpoints")
+        for page in paginator.paginate(NameContains=self.name_prefix):
+            for endpoint in page["Endpoints"]:
+                tags = self._tags(endpoint["EndpointArn"])
+                if tags.get(POOL_TAG) != self.name or tags.get(SCOPE_TAG) != self.scope:
+                    continue
+                created = endpoint["CreationTime"]
+                members.append(
+                    PoolMember(
+                        endpoint["EndpointName"],
+                        endpoint["EndpointArn"],
+                        endpoint["EndpointStatus"],
+                        created.timestamp() if hasattr(created, "timestamp") else created,
+                        tags,
+                    )
+                )
+        return members
+
+    def _tags(self, arn: str) -> Dict[str, str]:
+        response = self._sagemaker().list_tags(ResourceArn=arn)
+        return {tag["Key"]: tag["Value"] for tag in response.get("Tags", [])}
+
+    def _lease_tags(self, expires: float) -> Dict[str, str]:
+        return {LEASE_OWNER_TAG: self.owner, LEASE_EXPIRES_TAG: str(int(expires))}
+
+    def _write_lease(self, member: PoolMember) -> EndpointLease:
+        # Only called under the pool's lock, which every process that can see
+        # the member shares
+        expires = self.clock() + self.lease_ttl
+        self._sagemaker().add_tags(
+            ResourceArn=member.arn,
+            Tags=[{"Key": k, "Value": v} for k, v in self._lease_tags(expires).items()],
+        )
+        return EndpointLease(self.name, member.name, member.arn, self.owner, expires)
+
+    def acquire(self) -> EndpointLease:
+        """Leases a free InService member, or creates a new member when there
+        is none and waits for it to be InService.
+        """
+        digest = spec_digest(self.spec())
+        with cross_worker_lock(f"endpoint-pool-{self.name}"):
+            now = self.clock()
+            for member in self.members():
+                if member.status != "InService" or member.leased(now):
+                    continue
+                if member.tags.get(SPEC_TAG) != digest:
+                    continue
+                lease = self._write_lease(member)
+                if member.tags.get(LEASE_OWNER_TAG):
+                    # The previous holder never returned it
+                    self.reset(lease)
+                logging.info(f"Leased pooled endpoint {lease.endpoint_name}")
+                return lease
+
+        # Creating takes minutes, so it happens outside the lock. The lease
+        # tags are set at creation, so nobody else picks the new member up.
+        lease, tags = self._new_member(digest, leased=True)
+        logging.info(f"No free pooled endpoint, creating {lease.endpoint_name}")
+        failed = self._create_members([(lease, tags)])
+        if failed:
+            raise failed[lease.endpoint_name]
+        lease.endpoint_arn = self._sagemaker().describe_endpoint(
+            EndpointName=lease.endpoint_name
+        )["EndpointArn"]
+        return lease
+
+    def prewarm(self, count: int) -> List[str]:
+        """Makes sure at least `count` members are free or being created,
+        creating the missing ones concurrently, and returns the names of the
+        members it created.
+
+        Members that fail to come up are deleted and left out; `acquire`
+        creates another one when it finds none free.
+        """
+        digest = spec_digest(self.spec())
+        with cross_worker_lock(f"endpoint-pool-{self.name}"):
+            now = self.clock()
+            available = sum(
+                1
+                for member in self.members()
+                if member.status in ("Creating", "InService")
+                and not member.leased(now)
+                and member.tags.get(SPEC_TAG) == digest
+            )
+        missing = [self._new_member(digest, leased=False) for _ in range(count - available)]
+        if not missing:
+            return []
+        logging.info(f"Prewarming {len(missing)} pooled endpoints")
+        failed = self._create_members(missing)
+        for name, error in failed.items():
+            logging.warning(f"Unable to prewarm pooled endpoint {name}: {error}")
+        return [lease.endpoint_name for lease, _ in missing if lease.endpoint_name not in failed]
+
+    def _new_member(self, digest: str, leased: bool) -> Tuple[EndpointLease, Dict[str, str]]:
+        name = unique_name(self.name_prefix, ENDPOINT_NAME_LENGTH)
+        expires = self.clock() + self.lease_ttl
+        lease = EndpointLease(self.name, name, "", self.owner, expires)
+        tags = {POOL_TAG: self.name, SCOPE_TAG: self.scope, SPEC_TAG: digest}
+        if leased:
+            tags.update(self._lease_tags(expires))
+        return lease, tags
+
+    def _create_members(
+        self, members: List[Tuple[EndpointLease, Dict[str, str]]]
+    ) -> Dict[str, BaseException]:
+        """Creates `members` through a single provisioner, so that their
+        setup steps run concurrently, and deletes the ones that failed.
+        Returns the error of every failed member by endpoint name.
+        """
+        provisioner = Provisioner(max_workers=max(len(members), 1) * 2)
+        for lease, tags in members:
+            self.add_endpoint_setup(provisioner, lease, tags)
+        try:
+            provisioner.run()
+            return {}
+        except ProvisioningError as ex:
+            failed: Dict[str, BaseException] = {}
+            for step, error in ex.errors.items():
+                failed.setdefault(step.rsplit("/", 1)[0], error)
+            self._delete_members(list(failed))
+            return failed
+
+    def _delete_members(self, names: List[str]) -> List[str]:
+        """Deletes the endpoints `names` through a single provisioner, so that
+        their teardown steps run concurrently, and returns the names of the
+        endpoints that were deleted.
+        """
+        if not names:
+            return []
+        provisioner = Provisioner(max_workers=len(names) * 3)
+        for name in names:
+            self.add_endpoint_teardown(provisioner, name)
+        try:
+            provisioner.run()
+            return names
+        except ProvisioningError as ex:
+            failed = {step.rsplit("/", 1)[0] for step in ex.errors}
+            for step, error in ex.errors.items():
+                logging.warning(f"Unable to delete pooled endpoint: {step}: {error}")
+            return [name for name in names if name not in failed]
+
+    def renew(self, lease: EndpointLease):
+        """Extends `lease` by another lease TTL."""
+        if self._tags(lease.endpoint_arn).get(LEASE_OWNER_TAG) != lease.owner:
+            raise LeaseLostError(f"Lease on {lease.endpoint_name} was taken over")
+        lease.expires = self.clock() + self.lease_ttl
+        self._sagemaker().add_tags(
+            ResourceArn=lease.endpoint_arn,
+            Tags=[{"Key": LEASE_EXPIRES_TAG, "Value": str(int(lease.expires))}],
+        )
+
+    def reset(self, lease: EndpointLease):
+        """Removes every scaling policy and scalable target registered on the
+        leased variant.
+        """
+        client = get_client("application-autoscaling")
+        paginator = client.get_paginator("describe_scaling_policies")
+        for page in paginator.paginate(
+            ServiceNamespace=SERVICE_NAMESPACE, ResourceId=lease.resource_id
+        ):
+            for policy in page["ScalingPolicies"]:
+                client.delete_scaling_policy(
+                    PolicyName=policy["PolicyName"],
+                    ServiceNamespace=SERVICE_NAMESPACE,
+                    ResourceId=lease.resource_id,
+                    ScalableDimension=policy["ScalableDimension"],
+                )
+        paginator = client.get_paginator("describe_scalable_targets")
+        for page in paginator.paginate(
+            ServiceNamespace=SERVICE_NAMESPACE, ResourceIds=[lease.resource_id]
+        ):
+            for target in page["ScalableTargets"]:
+                client.deregister_scalable_target(
+                    ServiceNamespace=SERVICE_NAMESPACE,
+                    ResourceId=lease.resource_id,
+                    ScalableDimension=target["ScalableDimension"],
+                )
+
+    def release(self, lease: EndpointLease):
+        """Resets the leased endpoint and returns it to the pool."""
+        if self._tags(lease.endpoint_arn).get(LEASE_OWNER_TAG) != lease.owner:
+            logging.warning(f"Lease on {lease.endpoint_name} was taken over, not releasing")
+            return
+        self.reset(lease)
+        client = self._sagemaker()
+        client.add_tags(
+            ResourceArn=lease.endpoint_arn,
+            Tags=[{"Key": RELEASED_TAG, "Value": str(int(self.clock()))}],
+        )
+        client.delete_tags(
+            ResourceArn=lease.endpoint_arn, TagKeys=[LEASE_OWNER_TAG, LEASE_EXPIRES_TAG]
+        )
+        logging.info(f"Returned pooled endpoint {lease.endpoint_name}")
+
+    def release_endpoint(self, endpoint: str, owner: str):
+        """Releases the lease `owner` holds on `endpoint`, if it still holds
+        one. Used to clean up after sessions that did not release their
+        leases.
+        """
+        try:
+            arn = self._sagemaker().describe_endpoint(EndpointName=endpoint)["EndpointArn"]
+        except botocore.exceptions.ClientError:
+            return
+        self.release(EndpointLease(self.name, endpoint, arn, owner, 0))
+
+    def collect_idle(self) -> List[str]:
+        """Deletes the members that are not leased and either stayed idle past
+        the idle TTL, were created from a different spec or failed. Returns
+        the names of the deleted endpoints.
+        """
+        now = self.clock()
+        digest = spec_digest(self.spec())
+        collected = []
+        with cross_worker_lock(f"endpoint-pool-{self.name}"):
+            for member in self.members():
+                if member.leased(now) or member.status in ("Creating", "Updating"):
+                    continue
+                stale = member.tags.get(SPEC_TAG) != digest
+                idle = now - member.idle_since() > self.idle_ttl
+                if stale or idle or member.status == "Failed":
+                    logging.info(f"Deleting idle pooled endpoint {member.name}")
+                    collected.append(member.name)
+            return self._delete_members(collected)
@@ -0,0 +1,349 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Bulk cleanup of scalable targets and scaling policies leaked by tests.
+
+The janitor pages through DescribeScalingPolicies and DescribeScalableTargets
+for every ServiceNamespace and selects the resources owned by tests. A
+resource is selected when its ResourceId has a path segment starting with
+one of the name prefixes, or, for a policy, when its name starts with one of
+them. It must also be older than the age threshold, so that resources of
+runs still in progress are left alone. Policies are deleted before targets,
+concurrently and under a shared rate limit; a target is only deregistered
+once all of its selected policies are gone. Run it as::
+
+    python -m e2e.common.janitor --older-than 21600 --dry-run
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import botocore
+
+from e2e.common.aws_clients import get_client
+
+# Prefixes of the names the tests, the scale harness and the endpoint pool
+# give to the resources they register targets for
+DEFAULT_PREFIXES = ("sagemaker-endpoint", "sagemaker-scal", "ack-scale-", "ack-pool-")
+DEFAULT_MIN_AGE = 6 * 60 * 60
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TPS = 5.0
+MAX_ATTEMPTS = 6
+
+THROTTLING_CODES = {"ThrottlingException", "Throttling", "TooManyRequestsException"}
+# Already gone, which is what the janitor wanted anyway
+NOT_FOUND_CODES = {"ObjectNotFoundException"}
+
+TargetKey = Tuple[str, str, str]
+
+
+class RateLimiter:
+    """Token bucket shared by the janitor's delete threads."""
+
+    def __init__(self, tps: float, clock: Callable[[], float] = time.monotonic):
+        self.tps = tps
+        self._clock = clock
+        self._tokens = tps
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.tps, self._tokens + (now - self._updated) * self.tps)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.tps
+            time.sleep(delay)
+
+
+@dataclass
+class JanitorReport:
+    dry_run: bool
+    scanned_namespaces: int = 0
+    scanned_targets: int = 0
+    scanned_policies: int = 0
+    matched: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    deleted_policies: List[str] = field(default_factory=list)
+    deregistered_targets: List[str] = field(default_factory=list)
+    skipped_targets: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    throttled: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        verb = "Would delete" if self.dry_run else "Deleted"
+        policies = sum(m.get("policies", 0) for m in self.matched.values())
+        targets = sum(m.get("targets", 0) for m in self.matched.values())
+        if self.dry_run:
+            done = f"{policies} policies and {targets} targets"
+        else:
+            done = (
+                f"{len(self.deleted_policies)} policies and "
+                f"{len(self.deregistered_targets)} targets"
+            )
+        return (
+            f"{verb} {done} out of {self.scanned_policies} policies and "
+            f"{self.scanned_targets} targets in {self.scanned_namespaces} namespaces; "
+            f"{len(self.failed)} failed, {len(self.skipped_targets)} targets skipped, "
+            f"{self.throttled} throttled calls, {self.seconds:.1f}s"
+        )
+
+
+def service_namespaces(client) -> List[str]:
+    """Returns every ServiceNamespace the API model knows about."""
+    return list(client.meta.service_model.shape_for("ServiceNamespace").enum)
+
+
+def _age_seconds(created, now: float) -> float:
+    if isinstance(created, datetime.datetime):
+        created = created.timestamp()
+    return now - float(created)
+
+
+def _target_key(resource: Dict) -> TargetKey:
+    return (resource["ServiceNamespace"], resource["ResourceId"], resource["ScalableDimension"])
+
+
+def owned_by_tests(resource_id: str, prefixes: Sequence[str], name: str = "") -> bool:
+    """Returns whether `resource_id` (or the policy `name`) was created by the
+    tests, judging by its name.
+    """
+    if name and name.startswith(tuple(prefixes)):
+        return True
+    return any(segment.startswith(tuple(prefixes)) for segment in resource_id.split("/"))
+
+
+class Janitor:
+    """Finds and deletes the scalable targets and scaling policies left
+    behind by tests.
+    """
+
+    def __init__(
+        self,
+        prefixes: Sequence[str] = DEFAULT_PREFIXES,
+        min_age: float = DEFAULT_MIN_AGE,
+        namespaces: Optional[Iterable[str]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        tps: float = DEFAULT_TPS,
+        dry_run: bool = False,
+        client=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.prefixes = tuple(prefixes)
+        self.min_age = min_age
+        self.namespaces = list(namespaces) if namespaces is not None else None
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(tps)
+        self.dry_run = dry_run
+        self.client = client or get_client("application-autoscaling")
+        self.clock = clock
+        self._report_lock = threading.Lock()
+
+    def _selected(self, resource_id: str, created, now: float, name: str = "") -> bool:
+        return (
+            owned_by_tests(resource_id, self.prefixes, name)
+            and _age_seconds(created, now) >= self.min_age
+        )
+
+    def _call(self, report: JanitorReport, operation: Callable, **params):
+        """Calls `operation` under the rate limit, retrying throttled calls
+        with jittered exponential backoff.
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            self.limiter.wait()
+            try:
+                return operation(**params)
+            except botocore.exceptions.ClientError as error:
+                code = error.response["Error"]["Code"]
+                if code not in THROTTLING_CODES or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                with self._report_lock:
+                    report.throttled += 1
+                time.sleep(random.uniform(0, min(20, 0.5 * 2 ** attempt)))
+
+    def _scan(
+        self, namespace: str, report: JanitorReport, now: float
+    ) -> Tuple[List[Dict], List[Dict], Set[TargetKey]]:
+        """Returns the selected policies and targets of `namespace`, and the
+        targets carrying policies that were not selected.
+        """
+        policies = []
+        kept: Set[TargetKey] = set()
+        paginator = self.client.get_paginator("describe_scaling_policies")
+        for page in paginator.paginate(ServiceNamespace=namespace):
+            for policy in page["ScalingPolicies"]:
+                report.scanned_policies += 1
+                if self._selected(
+                    policy["ResourceId"], policy["CreationTime"], now, policy["PolicyName"]
+                ):
+                    policies.append(policy)
+                else:
+                    kept.add(_target_key(policy))
+
+        targets = []
+        paginator = self.client.get_paginator("describe_scalable_targets")
+        for page in paginator.paginate(ServiceNamespace=namespace):
+            for target in page["ScalableTargets"]:
+                report.scanned_targets += 1
+                if self._selected(target["ResourceId"], target["CreationTime"], now):
+                    targets.append(target)
+        return policies, targets, kept
+
+    def _delete_policy(self, report: JanitorReport, policy: Dict) -> bool:
+        description = "policy " + "/".join(_target_key(policy) + (policy["PolicyName"],))
+        try:
+            self._call(
+                report,
+                self.client.delete_scaling_policy,
+                PolicyName=policy["PolicyName"],
+                ServiceNamespace=policy["ServiceNamespace"],
+                ResourceId=policy["ResourceId"],
+                ScalableDimension=policy["ScalableDimension"],
+            )
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] not in NOT_FOUND_CODES:
+                with self._report_lock:
+                    report.failed[description] = str(error)
+                return False
+        with self._report_lock:
+            report.deleted_policies.append(description)
+        return True
+
+    def _deregister_target(self, report: JanitorReport, target: Dict) -> bool:
+        description = "target " + "/".join(_target_key(target))
+        try:
+            self._call(
+                report,
+                self.client.deregister_scalable_target,
+                ServiceNamespace=target["ServiceNamespace"],
+                ResourceId=target["ResourceId"],
+                ScalableDimension=target["ScalableDimension"],
+            )
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] not in NOT_FOUND_CODES:
+                with self._report_lock:
+                    report.failed[description] = str(error)
+                return False
+        with self._report_lock:
+            report.deregistered_targets.append(description)
+        return True
+
+    def run(self) -> JanitorReport:
+        """Scans every namespace and deletes (or, in dry-run mode, only
+        reports) the selected policies and then the selected targets.
+        """
+        start = time.monotonic()
+        now = self.clock()
+        report = JanitorReport(dry_run=self.dry_run)
+        namespaces = self.namespaces or service_namespaces(self.client)
+
+        policies: List[Dict] = []
+        targets: List[Dict] = []
+        # Deregistering a target also deletes its policies, so targets that
+        # carry a policy the janitor must not delete are left alone
+        blocked: Set[TargetKey] = set()
+        for namespace in namespaces:
+            found_policies, found_targets, kept = self._scan(namespace, report, now)
+            report.scanned_namespaces += 1
+            if found_policies or found_targets:
+                report.matched[namespace] = {
+                    "policies": len(found_policies),
+                    "targets": len(found_targets),
+                }
+            policies.extend(found_policies)
+            targets.extend(found_targets)
+            blocked |= kept
+
+        if self.dry_run:
+            report.skipped_targets = [
+                "/".join(_target_key(t)) for t in targets if _target_key(t) in blocked
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(
+                    executor.map(lambda p: (p, self._delete_policy(report, p)), policies)
+                )
+                # A target only goes once every policy on it is gone
+                blocked |= {_target_key(p) for p, deleted in results if not deleted}
+                ready = []
+                for target in targets:
+                    if _target_key(target) in blocked:
+                        report.skipped_targets.append("/".join(_target_key(target)))
+                    else:
+                        ready.append(target)
+                list(executor.map(lambda t: self._deregister_target(report, t), ready))
+
+        report.seconds = time.monotonic() - start
+        logging.info(report.summary())
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        default=[],
+        help="Name prefix of test-owned resources; may be repeated",
+    )
+    parser.add_argument(
+        "--older-than",
+        type=float,
+        default=DEFAULT_MIN_AGE,
+        help="Only select resources created at least this many seconds ago",
+    )
+    parser.add_argument(
+        "--namespace",
+        action="append",
+        default=[],
+        help="ServiceNamespace to scan; may be repeated, defaults to all",
+    )
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--tps", type=float, default=DEFAULT_TPS)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    report = Janitor(
+        prefixes=args.prefix or DEFAULT_PREFIXES,
+        min_age=args.older_than,
+        namespaces=args.namespace or None,
+        max_workers=args.max_workers,
+        tps=args.tps,
+        dry_run=args.dry_run,
+    ).run()
+    output = json.dumps(report.to_dict(), indent=2, sort_keys=True)
+    if args.report:
+        with open(args.report, "w") as stream:
+            stream.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
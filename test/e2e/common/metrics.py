@@ -0,0 +1,145 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Reads the controller's Prometheus metrics endpoint.
+"""
+
+import math
+import os
+import re
+import urllib.request
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+DEFAULT_METRICS_URL = "http://127.0.0.1:8080/metrics"
+
+API_REQUESTS_METRIC = "ack_outbound_api_requests_total"
+RECONCILE_TIME_METRIC = "controller_runtime_reconcile_time_seconds"
+
+_SAMPLE_RE = re.compile(
+    r"^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>.*)\})?\s+(?P<value>\S+)"
+)
+_LABEL_RE = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"')
+
+Labels = FrozenSet[Tuple[str, str]]
+
+
+def metrics_url() -> str:
+    return os.environ.get("ACK_CONTROLLER_METRICS_URL", DEFAULT_METRICS_URL)
+
+
+def parse_metrics(text: str) -> Dict[str, Dict[Labels, float]]:
+    """Parses the Prometheus text exposition format into
+    ``{metric name: {labels: value}}``.
+    """
+    samples: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_RE.match(line)
+        if match is None:
+            continue
+        labels = frozenset(
+            (m.group("key"), m.group("value"))
+            for m in _LABEL_RE.finditer(match.group("labels") or "")
+        )
+        samples[match.group("name")][labels] = float(match.group("value"))
+    return dict(samples)
+
+
+def scrape(url: Optional[str] = None, timeout: float = 10) -> Dict[str, Dict[Labels, float]]:
+    with urllib.request.urlopen(url or metrics_url(), timeout=timeout) as response:
+        return parse_metrics(response.read().decode())
+
+
+def scrape_pod(
+    name: str, namespace: str, port: int = 8080
+) -> Dict[str, Dict[Labels, float]]:
+    """Scrapes one controller pod through the API server's pod proxy, for
+    when several replicas sit behind the metrics service.
+    """
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    text = client.CoreV1Api(
+        k8s._get_k8s_api_client()
+    ).connect_get_namespaced_pod_proxy_with_path(f"{name}:{port}", namespace, "metrics")
+    return parse_metrics(text)
+
+
+def sum_by(
+    samples: Dict[str, Dict[Labels, float]], name: str, label: str, **match: str
+) -> Dict[str, float]:
+    """Sums the series of `name` whose labels include `match`, grouped by the
+    value of `label`.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for labels, value in samples.get(name, {}).items():
+        labels_dict = dict(labels)
+        if all(labels_dict.get(k) == v for k, v in match.items()):
+            totals[labels_dict.get(label, "")] += value
+    return dict(totals)
+
+
+def diff(after: Dict[str, float], before: Dict[str, float]) -> Dict[str, float]:
+    return {k: v - before.get(k, 0.0) for k, v in after.items() if v != before.get(k, 0.0)}
+
+
+def api_call_counts(samples: Dict[str, Dict[Labels, float]]) -> Dict[str, float]:
+    """Returns outbound AWS API calls made by the controller keyed by
+    operation name.
+    """
+    return sum_by(samples, API_REQUESTS_METRIC, "op_id")
+
+
+def histogram_buckets(
+    samples: Dict[str, Dict[Labels, float]], name: str, **match: str
+) -> List[Tuple[float, float]]:
+    """Returns the cumulative ``(upper bound, count)`` buckets of histogram
+    `name`, summed over every series matching `match`.
+    """
+    buckets: Dict[float, float] = defaultdict(float)
+    for labels, value in samples.get(f"{name}_bucket", {}).items():
+        labels_dict = dict(labels)
+        if not all(labels_dict.get(k) == v for k, v in match.items()):
+            continue
+        le = labels_dict["le"]
+        buckets[math.inf if le == "+Inf" else float(le)] += value
+    return sorted(buckets.items())
+
+
+def diff_buckets(
+    after: Sequence[Tuple[float, float]], before: Sequence[Tuple[float, float]]
+) -> List[Tuple[float, float]]:
+    previous = dict(before)
+    return [(le, count - previous.get(le, 0.0)) for le, count in after]
+
+
+def histogram_quantile(q: float, buckets: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Estimates quantile `q` from cumulative buckets the same way PromQL's
+    histogram_quantile does, interpolating linearly within a bucket.
+    """
+    if not buckets or buckets[-1][1] == 0:
+        return None
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if math.isinf(upper_bound):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            return lower_bound + (upper_bound - lower_bound) * (
+                (rank - lower_count) / (count - lower_count)
+            )
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
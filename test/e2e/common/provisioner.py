@@ -0,0 +1,180 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Runs provisioning steps as a dependency graph on a thread pool.
+
+Independent steps run concurrently while every step still waits for the
+steps it depends on. Each run reports per-step timings and its critical path.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class Step:
+    name: str
+    action: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StepTiming:
+    name: str
+    started: float
+    finished: float
+    error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class ProvisionReport:
+    """Timings of a single provisioner run."""
+
+    steps: Dict[str, StepTiming] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    results: Dict[str, Any] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+
+    def summary(self) -> str:
+        path = " -> ".join(self.critical_path) or "<empty>"
+        return (
+            f"{len(self.steps)} steps in {self.wall_seconds:.1f}s, "
+            f"critical path {self.critical_path_seconds:.1f}s: {path}"
+        )
+
+
+class ProvisioningError(Exception):
+    def __init__(self, report: ProvisionReport, errors: Dict[str, BaseException]):
+        self.report = report
+        self.errors = errors
+        failed = ", ".join(f"{name}: {err}" for name, err in errors.items())
+        super().__init__(f"Provisioning failed: {failed}")
+
+
+class Provisioner:
+    """Collects steps and runs them respecting their dependencies."""
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._steps: Dict[str, Step] = {}
+
+    def add(
+        self, name: str, action: Callable[[], Any], depends_on: Iterable[str] = ()
+    ) -> "Provisioner":
+        if name in self._steps:
+            raise ValueError(f"Duplicate provisioning step {name}")
+        self._steps[name] = Step(name, action, tuple(depends_on))
+        return self
+
+    def _validate(self):
+        for step in self._steps.values():
+            for dep in step.depends_on:
+                if dep not in self._steps:
+                    raise ValueError(f"Step {step.name} depends on unknown step {dep}")
+
+        # Kahn's algorithm; anything left over is part of a cycle
+        indegree = {name: len(step.depends_on) for name, step in self._steps.items()}
+        ready = [name for name, deg in indegree.items() if deg == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for other in self._steps.values():
+                if name in other.depends_on:
+                    indegree[other.name] -= 1
+                    if indegree[other.name] == 0:
+                        ready.append(other.name)
+        if visited != len(self._steps):
+            raise ValueError("Provisioning steps contain a dependency cycle")
+
+    def _critical_path(self, report: ProvisionReport) -> Tuple[List[str], float]:
+        longest: Dict[str, Tuple[float, List[str]]] = {}
+
+        def visit(name: str) -> Tuple[float, List[str]]:
+            if name not in longest:
+                best: Tuple[float, List[str]] = (0.0, [])
+                for dep in self._steps[name].depends_on:
+                    if dep in report.steps:
+                        candidate = visit(dep)
+                        if candidate[0] > best[0]:
+                            best = candidate
+                duration = report.steps[name].duration
+                longest[name] = (best[0] + duration, best[1] + [name])
+            return longest[name]
+
+        paths = [visit(name) for name in report.steps]
+        if not paths:
+            return [], 0.0
+        seconds, path = max(paths, key=lambda p: p[0])
+        return path, seconds
+
+    def run(self) -> ProvisionReport:
+        """Runs every step and returns the report.
+
+        If a step raises, steps depending on it are skipped, the remaining
+        independent steps still run, and a `ProvisioningError` carrying the
+        report is raised at the end.
+        """
+        self._validate()
+        report = ProvisionReport()
+        errors: Dict[str, BaseException] = {}
+        pending = dict(self._steps)
+        done = set()
+        start = time.monotonic()
+
+        def timed(step: Step):
+            started = time.monotonic()
+            try:
+                result = step.action()
+            except BaseException as ex:
+                return StepTiming(step.name, started, time.monotonic(), ex), None
+            return StepTiming(step.name, started, time.monotonic()), result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if any(dep in errors or dep in report.skipped for dep in step.depends_on):
+                        report.skipped.append(name)
+                        del pending[name]
+                    elif all(dep in done for dep in step.depends_on):
+                        running[executor.submit(timed, step)] = name
+                        del pending[name]
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    timing, result = future.result()
+                    report.steps[name] = timing
+                    if timing.error is not None:
+                        errors[name] = timing.error
+                    else:
+                        report.results[name] = result
+                        done.add(name)
+
+        report.wall_seconds = time.monotonic() - start
+        report.critical_path, report.critical_path_seconds = self._critical_path(report)
+        logging.info(f"Provisioning finished: {report.summary()}")
+        if errors:
+            raise ProvisioningError(report, errors)
+        return report
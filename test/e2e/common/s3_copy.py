@@ -0,0 +1,266 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Concurrent server-side copy of one S3 bucket into another.
+
+Objects are copied with CopyObject, or with a multipart UploadPartCopy for
+objects above the multipart threshold, fanned out over a thread pool. The
+data never leaves S3, so buckets in different regions are copied without
+staging them on local disk. Objects whose size and ETag already match at
+the destination are skipped, and `sync_bucket` only returns once every
+source object is visible at the destination.
+"""
+
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from e2e.common.aws_clients import get_client
+from e2e.common.waiter import Backoff, poll_until
+
+DEFAULT_MAX_WORKERS = 16
+# S3 caps CopyObject at 5 GiB; staying well below that keeps single copies
+# short and lets large objects use several connections
+DEFAULT_MULTIPART_THRESHOLD = 256 * 1024 * 1024
+DEFAULT_PART_SIZE = 128 * 1024 * 1024
+# Stored on multipart copies, whose ETag never matches the source's
+SOURCE_ETAG_METADATA = "source-etag"
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    etag: str
+
+
+@dataclass
+class CopyReport:
+    copied: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    bytes_copied: int = 0
+    seconds: float = 0.0
+    # contents_digest of the source objects the sync worked from
+    source_digest: str = ""
+
+
+def bucket_region(client, bucket: str) -> str:
+    """Returns the region `bucket` lives in."""
+    response = client.head_bucket(Bucket=bucket)
+    return response["ResponseMetadata"]["HTTPHeaders"].get("x-amz-bucket-region", "")
+
+
+def list_objects(client, bucket: str, prefix: str = "") -> Dict[str, ObjectInfo]:
+    objects = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            objects[item["Key"]] = ObjectInfo(item["Key"], item["Size"], item["ETag"])
+    return objects
+
+
+def contents_digest(objects: Dict[str, ObjectInfo]) -> str:
+    """Returns a digest of the keys, sizes and ETags of `objects` that changes
+    whenever any object is added, removed or rewritten.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(objects):
+        obj = objects[key]
+        digest.update(f"{obj.key}\0{obj.size}\0{obj.etag}\n".encode())
+    return digest.hexdigest()
+
+
+class S3Copier:
+    """Copies the objects of one bucket into another, server side."""
+
+    def __init__(
+        self,
+        source_client=None,
+        destination_client=None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        part_size: int = DEFAULT_PART_SIZE,
+    ):
+        self.source_client = source_client
+        self.destination_client = destination_client
+        self.max_workers = max_workers
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+
+    def _source_client(self, source_bucket: str):
+        if self.source_client is not None:
+            return self.source_client
+        return get_client("s3", bucket_region(get_client("s3"), source_bucket) or None)
+
+    def _clients(self, source_bucket: str, destination_bucket: str):
+        # Each side talks to its own bucket's region, which is what makes the
+        # server-side copy work across regions
+        source = self._source_client(source_bucket)
+        destination = self.destination_client
+        if destination is None:
+            destination = get_client(
+                "s3", bucket_region(get_client("s3"), destination_bucket) or None
+            )
+        return source, destination
+
+    def _up_to_date(
+        self,
+        client,
+        bucket: str,
+        source: ObjectInfo,
+        existing: Optional[ObjectInfo],
+    ) -> bool:
+        if existing is None or existing.size != source.size:
+            return False
+        if existing.etag == source.etag:
+            return True
+        # A multipart copy has its own ETag, so compare the one recorded
+        # when it was made
+        if "-" not in existing.etag:
+            return False
+        metadata = client.head_object(Bucket=bucket, Key=source.key).get("Metadata", {})
+        return metadata.get(SOURCE_ETAG_METADATA) == source.etag
+
+    def _copy(self, client, source_bucket: str, destination_bucket: str, obj: ObjectInfo):
+        copy_source = {"Bucket": source_bucket, "Key": obj.key}
+        if obj.size < self.multipart_threshold:
+            client.copy_object(
+                CopySource=copy_source, Bucket=destination_bucket, Key=obj.key
+            )
+            return
+
+        upload_id = client.create_multipart_upload(
+            Bucket=destination_bucket,
+            Key=obj.key,
+            Metadata={SOURCE_ETAG_METADATA: obj.etag},
+        )["UploadId"]
+        try:
+            ranges = [
+                (number, start, min(start + self.part_size, obj.size) - 1)
+                for number, start in enumerate(range(0, obj.size, self.part_size), 1)
+            ]
+            with ThreadPoolExecutor(max_workers=min(len(ranges), self.max_workers)) as executor:
+                etags = list(
+                    executor.map(
+                        lambda r: client.upload_part_copy(
+                            CopySource=copy_source,
+                            CopySourceRange=f"bytes={r[1]}-{r[2]}",
+                            Bucket=destination_bucket,
+                            Key=obj.key,
+                            PartNumber=r[0],
+                            UploadId=upload_id,
+                        )["CopyPartResult"]["ETag"],
+                        ranges,
+                    )
+                )
+            client.complete_multipart_upload(
+                Bucket=destination_bucket,
+                Key=obj.key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": number, "ETag": etag}
+                        for (number, _, _), etag in zip(ranges, etags)
+                    ]
+                },
+            )
+        except Exception:
+            client.abort_multipart_upload(
+                Bucket=destination_bucket, Key=obj.key, UploadId=upload_id
+            )
+            raise
+
+    def source_digest(self, source_bucket: str, prefix: str = "") -> str:
+        """Returns the `contents_digest` of the objects under `prefix` in
+        `source_bucket`, without looking at any destination.
+        """
+        client = self._source_client(source_bucket)
+        return contents_digest(list_objects(client, source_bucket, prefix))
+
+    def sync(
+        self,
+        source_bucket: str,
+        destination_bucket: str,
+        prefix: str = "",
+        include: Optional[Callable[[ObjectInfo], bool]] = None,
+        timeout: float = 300,
+    ) -> CopyReport:
+        """Copies every object under `prefix` (optionally filtered by `include`)
+        that is missing or different at the destination, then waits up to
+        `timeout` seconds for all of them to be listed there.
+        """
+        start = time.monotonic()
+        report = CopyReport()
+        source_client, destination_client = self._clients(source_bucket, destination_bucket)
+        source_objects = list_objects(source_client, source_bucket, prefix)
+        report.source_digest = contents_digest(source_objects)
+        existing = list_objects(destination_client, destination_bucket, prefix)
+        wanted = [o for o in source_objects.values() if include is None or include(o)]
+
+        pending = []
+        for obj in wanted:
+            if self._up_to_date(destination_client, destination_bucket, obj, existing.get(obj.key)):
+                report.skipped.append(obj.key)
+            else:
+                pending.append(obj)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._copy, destination_client, source_bucket, destination_bucket, obj
+                ): obj
+                for obj in pending
+            }
+            for future in as_completed(futures):
+                obj = futures[future]
+                try:
+                    future.result()
+                except Exception as ex:
+                    report.failed[obj.key] = str(ex)
+                    continue
+                report.copied.append(obj.key)
+                report.bytes_copied += obj.size
+
+        if report.copied:
+            self._wait_for(destination_client, destination_bucket, prefix, report, timeout)
+        report.seconds = time.monotonic() - start
+        logging.info(
+            f"Copied {len(report.copied)} objects ({report.bytes_copied} bytes) from "
+            f"{source_bucket} to {destination_bucket}, skipped {len(report.skipped)}, "
+            f"failed {len(report.failed)} in {report.seconds:.1f}s"
+        )
+        return report
+
+    def _wait_for(self, client, bucket: str, prefix: str, report: CopyReport, timeout: float):
+        expected = set(report.copied)
+        result = poll_until(
+            lambda: set(list_objects(client, bucket, prefix)),
+            lambda listed: expected <= listed,
+            timeout,
+            backoff=Backoff(initial=1, maximum=10),
+            description=f"{len(expected)} objects copied to {bucket}",
+        )
+        if not result.satisfied:
+            for key in expected - (result.value or set()):
+                report.failed[key] = "not visible at the destination after copying"
+            report.copied = [k for k in report.copied if k not in report.failed]
+
+
+def sync_bucket(source_bucket: str, destination_bucket: str, **kwargs) -> CopyReport:
+    """Copies `source_bucket` into `destination_bucket` with the default
+    `S3Copier`.
+    """
+    return S3Copier().sync(source_bucket, destination_bucket, **kwargs)
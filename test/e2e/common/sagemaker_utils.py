@@ -12,18 +12,20 @@
 # permissions and limitations under the License.
 
 import pytest
-from typing import Dict, Any
+import botocore
+from typing import Dict, Any, Optional
 from pathlib import Path
-import time
-import boto3
 
 from acktest.k8s import resource as k8s
 from acktest.resources import load_resource_file
 from e2e.replacement_values import REPLACEMENT_VALUES
+from e2e.common.aws_clients import get_client
+from e2e.common.provisioner import Provisioner
+from e2e.common.waiter import Backoff, poll_until
 
 
 def sagemaker_client():
-    return boto3.client("sagemaker")
+    return get_client("sagemaker")
 
 
 def wait_for_status(
@@ -33,18 +35,20 @@ def wait_for_status(
     get_status_method,
     *method_args,
 ):
-    actual_status = None
-    for _ in range(wait_periods):
-        time.sleep(period_length)
-        actual_status = get_status_method(*method_args)
-        if actual_status == expected_status:
-            break
-    else:
-        logging.error(
-            f"Wait for status: {expected_status} timed out. Actual status: {actual_status}"
-        )
-
-    return actual_status
+    """Waits up to `wait_periods` * `period_length` seconds for
+    `get_status_method` to report `expected_status`.
+
+    The status is probed immediately and then with exponential backoff capped
+    at `period_length`, so the wait ends as soon as the status is reached.
+    """
+    result = poll_until(
+        lambda: get_status_method(*method_args),
+        lambda status: status == expected_status,
+        timeout=wait_periods * period_length,
+        backoff=Backoff(initial=min(5, period_length), maximum=period_length),
+        description=f"status {expected_status}",
+    )
+    return result.value
 
 
 def get_endpoint_sagemaker_status(endpoint_name):
@@ -105,12 +109,99 @@ def sagemaker_make_endpoint_config(model_name, variant_name, endpoint_config_nam
     return endpoint_config_input, endpoint_config_response
 
 
-def sagemaker_make_endpoint(endpoint_name, endpoint_config_name):
+def sagemaker_make_endpoint(endpoint_name, endpoint_config_name, tags=None):
     endpoint_input = {
         "EndpointName": endpoint_name,
         "EndpointConfigName": endpoint_config_name,
     }
+    if tags:
+        endpoint_input["Tags"] = [{"Key": k, "Value": v} for k, v in tags.items()]
     endpoint_response = sagemaker_client().create_endpoint(**endpoint_input)
     assert endpoint_response.get("EndpointArn", None) is not None
 
     return endpoint_input, endpoint_response
+
+
+def add_sagemaker_endpoint_setup(
+    provisioner: Provisioner,
+    model_name,
+    variant_name,
+    endpoint_config_name,
+    endpoint_name,
+    expected_status: str = "InService",
+    tags: Optional[Dict[str, str]] = None,
+):
+    """Adds the steps that create a SageMaker endpoint, and wait for it to
+    reach `expected_status`, to `provisioner`. `tags` are set on the
+    endpoint.
+
+    The steps for one endpoint are chained, but steps for different endpoints
+    are independent and run concurrently.
+    """
+    provisioner.add(
+        f"{endpoint_name}/model", lambda: sagemaker_make_model(model_name)
+    )
+    provisioner.add(
+        f"{endpoint_name}/endpoint-config",
+        lambda: sagemaker_make_endpoint_config(
+            model_name, variant_name, endpoint_config_name
+        ),
+        depends_on=[f"{endpoint_name}/model"],
+    )
+    provisioner.add(
+        f"{endpoint_name}/endpoint",
+        lambda: sagemaker_make_endpoint(endpoint_name, endpoint_config_name, tags),
+        depends_on=[f"{endpoint_name}/endpoint-config"],
+    )
+    provisioner.add(
+        f"{endpoint_name}/status",
+        lambda: wait_sagemaker_endpoint_status(endpoint_name, expected_status),
+        depends_on=[f"{endpoint_name}/endpoint"],
+    )
+
+
+def _delete_if_exists(delete, **kwargs):
+    """Calls `delete`, ignoring the error SageMaker returns for a resource
+    that no longer exists.
+    """
+    try:
+        delete(**kwargs)
+    except botocore.exceptions.ClientError as error:
+        if error.response["Error"]["Code"] != "ValidationException":
+            raise
+
+
+def add_sagemaker_endpoint_teardown(
+    provisioner: Provisioner, model_name, endpoint_config_name, endpoint_name
+):
+    """Adds the steps that delete a SageMaker endpoint, its config and its
+    model, ignoring the ones that no longer exist, to `provisioner`.
+
+    SageMaker does not require the endpoint to be gone before its config or
+    model are deleted, so all three deletions run concurrently.
+    """
+    client = sagemaker_client()
+    provisioner.add(
+        f"{endpoint_name}/delete-endpoint",
+        lambda: _delete_if_exists(client.delete_endpoint, EndpointName=endpoint_name),
+    )
+    provisioner.add(
+        f"{endpoint_name}/delete-endpoint-config",
+        lambda: _delete_if_exists(
+            client.delete_endpoint_config, EndpointConfigName=endpoint_config_name
+        ),
+    )
+    provisioner.add(
+        f"{endpoint_name}/delete-model",
+        lambda: _delete_if_exists(client.delete_model, ModelName=model_name),
+    )
+
+
+def delete_sagemaker_endpoint(model_name, endpoint_config_name, endpoint_name):
+    """Deletes a SageMaker endpoint, its config and its model, ignoring the
+    ones that no longer exist.
+    """
+    client = sagemaker_client()
+    _delete_if_exists(client.delete_endpoint, EndpointName=endpoint_name)
+    _delete_if_exists(client.delete_endpoint_config, EndpointConfigName=endpoint_config_name)
+    _delete_if_exists(client.delete_model, ModelName=model_name)
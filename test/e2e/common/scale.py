@@ -0,0 +1,365 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Load harness that creates N ScalableTargets with M ScalingPolicies each
+and measures how the controller converges.
+
+The harness only talks to the cluster in the current kubeconfig and to the
+controller's metrics endpoint, so it runs unchanged against a kind or envtest
+cluster whose controller points at a local Application Auto Scaling endpoint.
+"""
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from acktest.k8s import resource as k8s
+
+from e2e import CRD_GROUP, CRD_VERSION, create_applicationautoscaling_resource
+from e2e.replacement_values import REPLACEMENT_VALUES
+from e2e.common import metrics, timing
+from e2e.common.workers import unique_name
+
+TARGET_RESOURCE_PLURAL = "scalabletargets"
+POLICY_RESOURCE_PLURAL = "scalingpolicies"
+TARGET_SPEC_FILE = "sagemaker_endpoint_autoscaling_target"
+POLICY_SPEC_FILE = "sagemaker_endpoint_autoscaling_policy"
+
+TARGET_OPERATIONS = (
+    "DescribeScalableTargets",
+    "RegisterScalableTarget",
+    "DeregisterScalableTarget",
+)
+POLICY_OPERATIONS = (
+    "DescribeScalingPolicies",
+    "PutScalingPolicy",
+    "DeleteScalingPolicy",
+)
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of `values`, with `q` in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@dataclass
+class ScaleResource:
+    plural: str
+    name: str
+    resource_id: str
+    reference: object = None
+    submitted: Optional[float] = None
+    synced: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def time_to_synced(self) -> Optional[float]:
+        if self.submitted is None or self.synced is None:
+            return None
+        return self.synced - self.submitted
+
+
+@dataclass
+class LatencySummary:
+    count: int = 0
+    p50: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+    @classmethod
+    def of(cls, values: Sequence[float]) -> "LatencySummary":
+        return cls(
+            len(values),
+            percentile(values, 50),
+            percentile(values, 99),
+            max(values) if values else None,
+        )
+
+
+@dataclass
+class ScaleReport:
+    targets: int
+    policies_per_target: int
+    wall_seconds: float = 0.0
+    unsynced: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    target_time_to_synced: LatencySummary = field(default_factory=LatencySummary)
+    policy_time_to_synced: LatencySummary = field(default_factory=LatencySummary)
+    # How long after its target each policy reported an ARN
+    policy_lag_behind_target: LatencySummary = field(default_factory=LatencySummary)
+    reconcile_latency: Dict[str, LatencySummary] = field(default_factory=dict)
+    api_calls: Dict[str, float] = field(default_factory=dict)
+    api_calls_per_resource: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def has_arn(resource: Optional[Dict]) -> bool:
+    if not resource:
+        return False
+    metadata = resource.get("status", {}).get("ackResourceMetadata") or {}
+    return bool(metadata.get("arn"))
+
+
+def event_resource(event: Dict) -> Optional[Dict]:
+    """Returns the resource carried by a watch event, or None for an ERROR
+    event, whose object is a Status rather than a resource, e.g. once the
+    watch's resource version is too old.
+    """
+    if event.get("type") == "ERROR":
+        return None
+    return event["object"]
+
+
+def lags_behind_targets(
+    targets: Sequence[ScaleResource], policies: Sequence[ScaleResource]
+) -> List[float]:
+    """Returns, for every synced policy whose target synced too, how long
+    after the target it reported an ARN.
+    """
+    target_synced = {
+        t.resource_id: t.synced for t in targets if t.synced is not None
+    }
+    return [
+        p.synced - target_synced[p.resource_id]
+        for p in policies
+        if p.synced is not None and p.resource_id in target_synced
+    ]
+
+
+class ScaleHarness:
+    """Creates a fleet of targets and policies and records when each one
+    first reports an ARN.
+    """
+
+    def __init__(
+        self,
+        targets: int,
+        policies_per_target: int,
+        namespace: str = "default",
+        max_workers: int = 16,
+        name_prefix: Optional[str] = None,
+        metrics_url: Optional[str] = None,
+        collect_metrics: bool = True,
+        policies_first: bool = False,
+    ):
+        self.targets = targets
+        self.policies_per_target = policies_per_target
+        self.namespace = namespace
+        self.max_workers = max_workers
+        # The prefix is part of every ResourceId, so it must differ between
+        # workers
+        self.name_prefix = name_prefix or unique_name("ack-scale", 24)
+        self.metrics_url = metrics_url
+        # Off when several controller replicas sit behind the metrics URL,
+        # since each scrape would then read a different one
+        self.collect_metrics = collect_metrics
+        # Submits the policies before their targets, so that every policy is
+        # reconciled while its target is not registered yet
+        self.policies_first = policies_first
+        self.target_resources: List[ScaleResource] = []
+        self.policy_resources: List[ScaleResource] = []
+        self._lock = threading.Lock()
+
+    def _build_fleet(self):
+        for i in range(self.targets):
+            resource_id = f"endpoint/{self.name_prefix}-{i}/variant/variant-1"
+            self.target_resources.append(
+                ScaleResource(
+                    TARGET_RESOURCE_PLURAL, f"{self.name_prefix}-target-{i}", resource_id
+                )
+            )
+            for j in range(self.policies_per_target):
+                self.policy_resources.append(
+                    ScaleResource(
+                        POLICY_RESOURCE_PLURAL,
+                        f"{self.name_prefix}-policy-{i}-{j}",
+                        resource_id,
+                    )
+                )
+
+    def _create(self, resource: ScaleResource):
+        replacements = REPLACEMENT_VALUES.copy()
+        replacements["RESOURCE_ID"] = resource.resource_id
+        if resource.plural == TARGET_RESOURCE_PLURAL:
+            replacements["SCALABLETARGET_NAME"] = resource.name
+            spec_file = TARGET_SPEC_FILE
+        else:
+            replacements["SCALINGPOLICY_NAME"] = resource.name
+            spec_file = POLICY_SPEC_FILE
+
+        resource.submitted = time.monotonic()
+        try:
+            reference, _, _ = create_applicationautoscaling_resource(
+                resource_plural=resource.plural,
+                resource_name=resource.name,
+                spec_file=spec_file,
+                replacements=replacements,
+                namespace=self.namespace,
+            )
+            resource.reference = reference
+        except Exception as ex:
+            resource.error = str(ex)
+
+    def _watch(self, plural: str, resources: List[ScaleResource], deadline: float):
+        from kubernetes import client, watch
+
+        by_name = {r.name: r for r in resources}
+        remaining = set(by_name)
+        api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+        while remaining and time.monotonic() < deadline:
+            w = watch.Watch()
+            for event in w.stream(
+                api.list_namespaced_custom_object,
+                CRD_GROUP,
+                CRD_VERSION,
+                self.namespace,
+                plural,
+                timeout_seconds=max(int(deadline - time.monotonic()), 1),
+            ):
+                resource = event_resource(event)
+                if resource is None:
+                    logging.warning(f"Watch of {plural} failed, reopening it: {event['object']}")
+                    w.stop()
+                    # Give the API server a moment before watching again
+                    time.sleep(1)
+                    break
+                name = resource["metadata"]["name"]
+                if name in remaining and has_arn(resource):
+                    with self._lock:
+                        by_name[name].synced = time.monotonic()
+                    remaining.discard(name)
+                if not remaining or time.monotonic() >= deadline:
+                    w.stop()
+                    break
+
+    def run(self, timeout: float = 600) -> ScaleReport:
+        """Creates the fleet and waits up to `timeout` seconds for every
+        resource to report an ARN.
+        """
+        self._build_fleet()
+        report = ScaleReport(self.targets, self.policies_per_target)
+        before = metrics.scrape(self.metrics_url) if self.collect_metrics else {}
+
+        start = time.monotonic()
+        deadline = start + timeout
+        watchers = [
+            threading.Thread(
+                target=self._watch,
+                args=(TARGET_RESOURCE_PLURAL, self.target_resources, deadline),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._watch,
+                args=(POLICY_RESOURCE_PLURAL, self.policy_resources, deadline),
+                daemon=True,
+            ),
+        ]
+        for watcher in watchers:
+            watcher.start()
+
+        if self.policies_first:
+            submissions = self.policy_resources + self.target_resources
+        else:
+            submissions = self.target_resources + self.policy_resources
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._create, submissions))
+
+        for watcher in watchers:
+            watcher.join(max(deadline - time.monotonic(), 0))
+        report.wall_seconds = time.monotonic() - start
+
+        after = metrics.scrape(self.metrics_url) if self.collect_metrics else {}
+        self._summarize(report, before, after)
+        self._record_timings(report)
+        logging.info(f"Scale run finished: {report.to_dict()}")
+        return report
+
+    def _summarize(self, report: ScaleReport, before, after):
+        all_resources = self.target_resources + self.policy_resources
+        report.failed = {r.name: r.error for r in all_resources if r.error}
+        report.unsynced = [
+            r.name for r in all_resources if r.synced is None and not r.error
+        ]
+        report.target_time_to_synced = LatencySummary.of(
+            [r.time_to_synced for r in self.target_resources if r.time_to_synced is not None]
+        )
+        report.policy_time_to_synced = LatencySummary.of(
+            [r.time_to_synced for r in self.policy_resources if r.time_to_synced is not None]
+        )
+        report.policy_lag_behind_target = LatencySummary.of(
+            lags_behind_targets(self.target_resources, self.policy_resources)
+        )
+
+        report.api_calls = metrics.diff(
+            metrics.api_call_counts(after), metrics.api_call_counts(before)
+        )
+        for op, count in report.api_calls.items():
+            if op in TARGET_OPERATIONS and self.target_resources:
+                report.api_calls_per_resource[op] = count / len(self.target_resources)
+            elif op in POLICY_OPERATIONS and self.policy_resources:
+                report.api_calls_per_resource[op] = count / len(self.policy_resources)
+
+        controllers = {
+            dict(labels).get("controller")
+            for labels in after.get(f"{metrics.RECONCILE_TIME_METRIC}_count", {})
+        }
+        for controller in sorted(c for c in controllers if c):
+            buckets = metrics.diff_buckets(
+                metrics.histogram_buckets(
+                    after, metrics.RECONCILE_TIME_METRIC, controller=controller
+                ),
+                metrics.histogram_buckets(
+                    before, metrics.RECONCILE_TIME_METRIC, controller=controller
+                ),
+            )
+            report.reconcile_latency[controller] = LatencySummary(
+                int(buckets[-1][1]) if buckets else 0,
+                metrics.histogram_quantile(0.5, buckets),
+                metrics.histogram_quantile(0.99, buckets),
+            )
+
+    def _record_timings(self, report: ScaleReport):
+        labels = {"targets": self.targets, "policies_per_target": self.policies_per_target}
+        timing.record("scale_wall", report.wall_seconds, **labels)
+        for kind, summary in (
+            ("target", report.target_time_to_synced),
+            ("policy", report.policy_time_to_synced),
+        ):
+            for quantile in ("p50", "p99", "max"):
+                value = getattr(summary, quantile)
+                if value is not None:
+                    timing.record(
+                        f"{kind}_time_to_synced_{quantile}", value, **labels
+                    )
+
+    def cleanup(self):
+        """Deletes every policy and then every target created by `run`."""
+
+        def delete(resource: ScaleResource):
+            if resource.reference is not None and k8s.get_resource_exists(
+                resource.reference
+            ):
+                k8s.delete_custom_resource(resource.reference)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(delete, self.policy_resources))
+            list(executor.map(delete, self.target_resources))
@@ -0,0 +1,148 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Helpers for tests of the controller's sharded mode.
+
+With ``ACK_SHARDS`` set, the controller hashes every resource by its
+namespace (or a label) onto a shard and each replica reconciles the shards
+whose coordination.k8s.io Lease it holds. `shard_of` computes the same hash
+as the controller, so that a test can spread its resources evenly over the
+shards, and `ownership` reads who owns what from the leases.
+"""
+
+import datetime
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_LEASE_GROUP = "ack-applicationautoscaling"
+
+GROUP_LABEL = "applicationautoscaling.services.k8s.aws/shard-group"
+ROLE_LABEL = "applicationautoscaling.services.k8s.aws/shard-role"
+SHARD_LABEL = "applicationautoscaling.services.k8s.aws/shard"
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK = (1 << 64) - 1
+
+
+def _fnv1a64(data: bytes) -> int:
+    h = _FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * _FNV_PRIME) & _MASK
+    return h
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash of Lamping and Veach, as in pkg/sharding."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Returns the shard the controller puts resources hashed by `key` in."""
+    if shards <= 1:
+        return 0
+    return jump_hash(_fnv1a64(key.encode()), shards)
+
+
+def balanced_namespaces(prefix: str, shards: int, per_shard: int = 1) -> List[str]:
+    """Returns `per_shard` namespace names for every shard, so that resources
+    spread evenly over the namespaces also spread evenly over the shards.
+    """
+    picked: Dict[int, List[str]] = {shard: [] for shard in range(shards)}
+    for i in itertools.count():
+        name = f"{prefix}-{i}"
+        names = picked[shard_of(name, shards)]
+        if len(names) < per_shard:
+            names.append(name)
+            if all(len(n) == per_shard for n in picked.values()):
+                break
+    return [name for shard in range(shards) for name in picked[shard]]
+
+
+def _parse_time(value) -> Optional[datetime.datetime]:
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _expired(spec: Dict, now: datetime.datetime) -> bool:
+    renewed = _parse_time(spec.get("renewTime"))
+    duration = spec.get("leaseDurationSeconds")
+    if renewed is None or duration is None:
+        return True
+    return now > renewed + datetime.timedelta(seconds=duration)
+
+
+@dataclass
+class ShardOwnership:
+    # live replicas, by name
+    members: List[str] = field(default_factory=list)
+    # shard -> replica holding a valid lease on it
+    owners: Dict[int, str] = field(default_factory=dict)
+
+    def shards_of(self, member: str) -> List[int]:
+        return sorted(s for s, owner in self.owners.items() if owner == member)
+
+    def balanced(self, shards: int) -> bool:
+        """Returns whether every shard is owned by a live replica and the
+        replicas hold even shares.
+        """
+        if not self.members or len(self.owners) != shards:
+            return False
+        if any(owner not in self.members for owner in self.owners.values()):
+            return False
+        counts = [len(self.shards_of(m)) for m in self.members]
+        return max(counts) - min(counts) <= 1
+
+
+def ownership(
+    leases: Iterable[Dict],
+    group: str = DEFAULT_LEASE_GROUP,
+    now: Optional[datetime.datetime] = None,
+) -> ShardOwnership:
+    """Reads the live replicas and shard owners of `group` from `leases`,
+    given as serialized Lease objects.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    result = ShardOwnership()
+    for lease in leases:
+        labels = lease.get("metadata", {}).get("labels") or {}
+        if labels.get(GROUP_LABEL) != group:
+            continue
+        spec = lease.get("spec") or {}
+        holder = spec.get("holderIdentity")
+        if not holder or _expired(spec, now):
+            continue
+        if labels.get(ROLE_LABEL) == "member":
+            result.members.append(holder)
+        elif labels.get(ROLE_LABEL) == "shard":
+            result.owners[int(labels[SHARD_LABEL])] = holder
+    result.members.sort()
+    return result
+
+
+def list_leases(namespace: str, group: str = DEFAULT_LEASE_GROUP) -> List[Dict]:
+    """Lists the sharding leases of `group` in `namespace`."""
+    from acktest.k8s import resource as k8s
+    from kubernetes import client
+
+    api_client = k8s._get_k8s_api_client()
+    leases = client.CoordinationV1Api(api_client).list_namespaced_lease(
+        namespace, label_selector=f"{GROUP_LABEL}={group}"
+    )
+    return api_client.sanitize_for_serialization(leases)["items"]
@@ -0,0 +1,466 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline simulator of target tracking and step scaling policies.
+
+Replays a metric time series against a scaling policy and the capacity
+bounds of its scalable target, without deploying either. The series holds
+the aggregate demand on the target, e.g. the invocations per minute of the
+whole variant, one datapoint per row. The metric the policy sees is the
+demand divided by the capacity serving at that time.
+
+The simulation follows the Application Auto Scaling semantics closely enough
+to compare policies with each other:
+
+- Target tracking scales out when the metric stays above the target value for
+  `scale_out_datapoints` datapoints, and scales in when it stays below 90% of
+  it for `scale_in_datapoints` datapoints. The new capacity is the one that
+  brings the metric back to the target value. Scale-in waits for both the
+  scale-in cooldown and the scale-out cooldown to expire.
+- Step scaling runs the step adjustment matching the distance between the
+  metric and the alarm threshold for as long as the alarm is breached, at most
+  once per cooldown.
+- Added capacity serves traffic after `provisioning_delay` seconds but is
+  billed from the moment it is requested.
+
+`sweep` runs one simulation per combination of parameters, in parallel
+across processes.
+"""
+
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import yaml
+
+TARGET_TRACKING = "TargetTrackingScaling"
+STEP_SCALING = "StepScaling"
+
+# Target tracking scales in below this fraction of the target value
+SCALE_IN_THRESHOLD = 0.9
+DEFAULT_DATAPOINT_SECONDS = 60.0
+
+
+def _get(config: Mapping, name: str, default=None):
+    """Reads `name` from an API shape (PascalCase) or a resource spec
+    (camelCase).
+    """
+    if name in config:
+        return config[name]
+    return config.get(name[0].lower() + name[1:], default)
+
+
+def _epoch(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+@dataclass(frozen=True)
+class StepAdjustment:
+    scaling_adjustment: int
+    lower_bound: float = -math.inf
+    upper_bound: float = math.inf
+
+    def matches(self, distance: float) -> bool:
+        return self.lower_bound <= distance < self.upper_bound
+
+
+@dataclass(frozen=True)
+class SimulationPolicy:
+    policy_type: str = TARGET_TRACKING
+    target_value: float = 70.0
+    scale_in_cooldown: float = 300.0
+    scale_out_cooldown: float = 300.0
+    disable_scale_in: bool = False
+    scale_out_datapoints: int = 3
+    scale_in_datapoints: int = 15
+    # Step scaling only
+    step_adjustments: Tuple[StepAdjustment, ...] = ()
+    adjustment_type: str = "ChangeInCapacity"
+    min_adjustment_magnitude: int = 0
+    cooldown: float = 300.0
+    alarm_threshold: Optional[float] = None
+    alarm_comparison: str = "GreaterThanOrEqualToThreshold"
+
+    @classmethod
+    def from_policy(cls, policy: Any, **overrides) -> "SimulationPolicy":
+        """Builds the simulated policy from a `ScalingPolicy` of
+        `e2e.common.targets`, a PutScalingPolicy request or DescribeScalingPolicies
+        item, or the spec of a ScalingPolicy resource. Step scaling policies
+        also need the `alarm_threshold` of the alarm that triggers them.
+        """
+        if hasattr(policy, "request"):
+            policy = policy.request()
+        policy_type = _get(policy, "PolicyType", TARGET_TRACKING)
+        params: Dict[str, Any] = {"policy_type": policy_type}
+        if policy_type == TARGET_TRACKING:
+            config = _get(policy, "TargetTrackingScalingPolicyConfiguration", {})
+            params.update(
+                target_value=float(_get(config, "TargetValue")),
+                scale_in_cooldown=float(_get(config, "ScaleInCooldown", 300)),
+                scale_out_cooldown=float(_get(config, "ScaleOutCooldown", 300)),
+                disable_scale_in=bool(_get(config, "DisableScaleIn", False)),
+            )
+        elif policy_type == STEP_SCALING:
+            config = _get(policy, "StepScalingPolicyConfiguration", {})
+            params.update(
+                adjustment_type=_get(config, "AdjustmentType", "ChangeInCapacity"),
+                min_adjustment_magnitude=int(_get(config, "MinAdjustmentMagnitude", 0)),
+                cooldown=float(_get(config, "Cooldown", 300)),
+                step_adjustments=tuple(
+                    StepAdjustment(
+                        int(_get(step, "ScalingAdjustment")),
+                        float(_get(step, "MetricIntervalLowerBound", -math.inf)),
+                        float(_get(step, "MetricIntervalUpperBound", math.inf)),
+                    )
+                    for step in _get(config, "StepAdjustments", [])
+                ),
+            )
+        else:
+            raise ValueError(f"cannot simulate {policy_type} policies")
+        params.update(overrides)
+        simulated = cls(**params)
+        if simulated.policy_type == STEP_SCALING and simulated.alarm_threshold is None:
+            raise ValueError("step scaling policies need an alarm_threshold")
+        return simulated
+
+
+def capacity_bounds(target: Any) -> Tuple[int, int]:
+    """Returns the MinCapacity and MaxCapacity of a `ScalableTarget` of
+    `e2e.common.targets`, a RegisterScalableTarget request or the spec of a
+    ScalableTarget resource.
+    """
+    if hasattr(target, "min_capacity"):
+        return target.min_capacity, target.max_capacity
+    return int(_get(target, "MinCapacity")), int(_get(target, "MaxCapacity"))
+
+
+@dataclass
+class MetricSeries:
+    times: array = field(default_factory=lambda: array("d"))
+    values: array = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def of(cls, values: Iterable[float], period: float = DEFAULT_DATAPOINT_SECONDS):
+        values = array("d", values)
+        return cls(array("d", (i * period for i in range(len(values)))), values)
+
+
+def load_series(path: str, time_column: str = "timestamp", value_column: str = "value"):
+    """Reads a metric series from a CSV file, or from a Parquet file when
+    pyarrow is installed. Times are epoch seconds or ISO 8601 strings.
+    """
+    series = MetricSeries()
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("reading Parquet series requires pyarrow") from error
+        table = pq.read_table(path, columns=[time_column, value_column])
+        for batch in table.to_batches():
+            for t, v in zip(batch.column(0).to_pylist(), batch.column(1).to_pylist()):
+                series.times.append(t.timestamp() if hasattr(t, "timestamp") else float(t))
+                series.values.append(float(v))
+        return series
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            series.times.append(_epoch(row[time_column]))
+            series.values.append(float(row[value_column]))
+    return series
+
+
+@dataclass
+class SimulationResult:
+    capacity: array
+    metric: array
+    instance_hours: float
+    slo_breach_minutes: float
+    scale_outs: int
+    scale_ins: int
+
+    @property
+    def peak_capacity(self) -> int:
+        return max(self.capacity) if self.capacity else 0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "instance_hours": self.instance_hours,
+            "slo_breach_minutes": self.slo_breach_minutes,
+            "scale_outs": self.scale_outs,
+            "scale_ins": self.scale_ins,
+            "peak_capacity": self.peak_capacity,
+        }
+
+
+def _breached(metric: float, threshold: float, comparison: str) -> bool:
+    if comparison == "GreaterThanOrEqualToThreshold":
+        return metric >= threshold
+    if comparison == "GreaterThanThreshold":
+        return metric > threshold
+    if comparison == "LessThanThreshold":
+        return metric < threshold
+    if comparison == "LessThanOrEqualToThreshold":
+        return metric <= threshold
+    raise ValueError(f"unknown comparison {comparison}")
+
+
+def _step_capacity(policy: SimulationPolicy, capacity: int, adjustment: int) -> int:
+    if policy.adjustment_type == "ExactCapacity":
+        return adjustment
+    if policy.adjustment_type == "PercentChangeInCapacity":
+        change = capacity * adjustment / 100
+        # Fractions are rounded away from zero below 1 and towards it above
+        if -1 < change < 1:
+            change = math.copysign(1, change) if change else 0
+        change = int(change)
+        if abs(change) < policy.min_adjustment_magnitude:
+            change = int(math.copysign(policy.min_adjustment_magnitude, change))
+        return capacity + change
+    return capacity + adjustment
+
+
+def simulate(
+    series: MetricSeries,
+    policy: SimulationPolicy,
+    min_capacity: int,
+    max_capacity: int,
+    initial_capacity: Optional[int] = None,
+    slo_threshold: Optional[float] = None,
+    provisioning_delay: float = 0.0,
+) -> SimulationResult:
+    """Replays `series` against `policy`.
+
+    Minutes in which the metric exceeds `slo_threshold` count as SLO breaches;
+    the threshold defaults to the target value or the alarm threshold.
+    """
+    if slo_threshold is None:
+        slo_threshold = (
+            policy.target_value
+            if policy.policy_type == TARGET_TRACKING
+            else policy.alarm_threshold
+        )
+    times, demand = series.times, series.values
+    n = len(times)
+    capacity_timeline = array("i", bytes(4 * n))
+    metric_timeline = array("d", bytes(8 * n))
+
+    def clamp(value: int) -> int:
+        return max(min_capacity, min(max_capacity, value))
+
+    desired = serving = clamp(min_capacity if initial_capacity is None else initial_capacity)
+    serving_at = -math.inf
+    last_out = last_in = -math.inf
+    high = low = 0
+    instance_seconds = breach_seconds = 0.0
+    scale_outs = scale_ins = 0
+    target_tracking = policy.policy_type == TARGET_TRACKING
+
+    for i in range(n):
+        t = times[i]
+        if i + 1 < n:
+            dt = times[i + 1] - t
+        else:
+            dt = t - times[i - 1] if i else DEFAULT_DATAPOINT_SECONDS
+        if serving != desired and t >= serving_at:
+            serving = desired
+        if serving:
+            metric = demand[i] / serving
+        else:
+            metric = math.inf if demand[i] > 0 else 0.0
+        capacity_timeline[i] = serving
+        metric_timeline[i] = metric
+        instance_seconds += max(serving, desired) * dt
+        if metric > slo_threshold:
+            breach_seconds += dt
+
+        new = desired
+        if target_tracking:
+            high = high + 1 if metric > policy.target_value else 0
+            low = low + 1 if metric < SCALE_IN_THRESHOLD * policy.target_value else 0
+            needed = clamp(math.ceil(demand[i] / policy.target_value))
+            if (
+                high >= policy.scale_out_datapoints
+                and t - last_out >= policy.scale_out_cooldown
+                and needed > desired
+            ):
+                new = needed
+            elif (
+                low >= policy.scale_in_datapoints
+                and not policy.disable_scale_in
+                and t - last_in >= policy.scale_in_cooldown
+                and t - last_out >= policy.scale_out_cooldown
+                and needed < desired
+            ):
+                new = needed
+        else:
+            breached = _breached(metric, policy.alarm_threshold, policy.alarm_comparison)
+            high = high + 1 if breached else 0
+            if high >= policy.scale_out_datapoints and t - max(last_out, last_in) >= policy.cooldown:
+                distance = metric - policy.alarm_threshold
+                for step in policy.step_adjustments:
+                    if step.matches(distance):
+                        new = clamp(_step_capacity(policy, desired, step.scaling_adjustment))
+                        break
+
+        if new > desired:
+            desired = new
+            serving_at = t + provisioning_delay
+            last_out = t
+            if target_tracking:
+                high = 0
+            scale_outs += 1
+        elif new < desired:
+            desired = serving = new
+            last_in = t
+            low = 0
+            scale_ins += 1
+
+    return SimulationResult(
+        capacity=capacity_timeline,
+        metric=metric_timeline,
+        instance_hours=instance_seconds / 3600,
+        slo_breach_minutes=breach_seconds / 60,
+        scale_outs=scale_outs,
+        scale_ins=scale_ins,
+    )
+
+
+# Parameters a sweep may vary besides the fields of SimulationPolicy
+SIMULATION_PARAMETERS = (
+    "min_capacity",
+    "max_capacity",
+    "initial_capacity",
+    "slo_threshold",
+    "provisioning_delay",
+)
+
+_sweep_series: Optional[MetricSeries] = None
+
+
+def _set_sweep_series(series: MetricSeries):
+    global _sweep_series
+    _sweep_series = series
+
+
+def _run_sweep_case(case: Tuple[SimulationPolicy, Dict[str, Any]]) -> Dict[str, float]:
+    policy, params = case
+    return simulate(_sweep_series, policy, **params).summary()
+
+
+def sweep(
+    series: MetricSeries,
+    policy: SimulationPolicy,
+    min_capacity: int,
+    max_capacity: int,
+    grid: Mapping[str, Sequence[Any]],
+    processes: Optional[int] = None,
+    **simulate_params,
+) -> List[Dict[str, Any]]:
+    """Simulates every combination of the values in `grid`, which maps
+    SimulationPolicy fields or `simulate` parameters to the values to try.
+    Returns one entry per combination with its parameters and summary.
+
+    The series is sent to each worker process once rather than with every
+    combination.
+    """
+    policy_fields = {f.name for f in fields(SimulationPolicy)}
+    unknown = set(grid) - policy_fields - set(SIMULATION_PARAMETERS)
+    if unknown:
+        raise ValueError(f"cannot sweep {', '.join(sorted(unknown))}")
+
+    names = list(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    cases = []
+    for combination in combinations:
+        params = dict(simulate_params, min_capacity=min_capacity, max_capacity=max_capacity)
+        params.update({k: v for k, v in combination.items() if k not in policy_fields})
+        overrides = {k: v for k, v in combination.items() if k in policy_fields}
+        cases.append((replace(policy, **overrides), params))
+
+    if processes == 1:
+        _set_sweep_series(series)
+        summaries = [_run_sweep_case(case) for case in cases]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_set_sweep_series, initargs=(series,)
+        ) as executor:
+            summaries = list(executor.map(_run_sweep_case, cases, chunksize=4))
+    return [
+        {"parameters": combination, **summary}
+        for combination, summary in zip(combinations, summaries)
+    ]
+
+
+def _load_spec(path: str) -> Dict:
+    with open(path) as f:
+        document = yaml.safe_load(f)
+    return document.get("spec", document)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policy", required=True, help="ScalingPolicy manifest")
+    parser.add_argument("--target", required=True, help="ScalableTarget manifest")
+    parser.add_argument("--series", required=True, help="CSV or Parquet metric series")
+    parser.add_argument("--alarm-threshold", type=float)
+    parser.add_argument("--slo-threshold", type=float)
+    parser.add_argument("--provisioning-delay", type=float, default=0.0)
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="PARAMETER=V1,V2,...",
+        help="Values to sweep for a parameter; may be repeated",
+    )
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.alarm_threshold is not None:
+        overrides["alarm_threshold"] = args.alarm_threshold
+    policy = SimulationPolicy.from_policy(_load_spec(args.policy), **overrides)
+    min_capacity, max_capacity = capacity_bounds(_load_spec(args.target))
+    series = load_series(args.series)
+    params = {
+        "slo_threshold": args.slo_threshold,
+        "provisioning_delay": args.provisioning_delay,
+    }
+    if args.sweep:
+        grid = {}
+        for option in args.sweep:
+            name, values = option.split("=", 1)
+            grid[name] = [json.loads(v) for v in values.split(",")]
+        output = sweep(
+            series, policy, min_capacity, max_capacity, grid, args.processes, **params
+        )
+    else:
+        output = dict(
+            simulate(series, policy, min_capacity, max_capacity, **params).summary(),
+            policy=asdict(policy),
+        )
+    print(json.dumps(output, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
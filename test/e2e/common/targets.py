@@ -0,0 +1,378 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Table-driven helpers for scalable targets and scaling policies of any
+service namespace.
+
+Each supported kind of scalable resource is described once in
+`TARGET_TYPES`: its ServiceNamespace, its ScalableDimension, the format of
+its ResourceId and the predefined metric used for target tracking. The batch
+helpers accept targets and policies of any mix of types. Writes run
+concurrently. Reads are grouped by namespace and use a single paginated
+describe per namespace, so verifying a fleet costs O(namespaces) calls
+rather than O(targets).
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import botocore
+
+from e2e.common.aws_clients import get_client
+
+DEFAULT_MAX_WORKERS = 8
+# Up to this many ResourceIds are passed to DescribeScalableTargets;
+# larger sets describe the whole namespace instead
+DESCRIBE_MAX_RESOURCE_IDS = 50
+
+
+class TargetKey(NamedTuple):
+    namespace: str
+    resource_id: str
+    dimension: str
+
+
+@dataclass(frozen=True)
+class TargetType:
+    name: str
+    namespace: str
+    dimension: str
+    resource_id_format: str
+    predefined_metric: Optional[str] = None
+
+    def resource_id(self, **parts: str) -> str:
+        """Formats the ResourceId of a resource of this type, e.g.
+        ``ECS_SERVICE.resource_id(cluster="c", service="s")``.
+        """
+        return self.resource_id_format.format(**parts)
+
+    def key(self, resource_id: str) -> TargetKey:
+        return TargetKey(self.namespace, resource_id, self.dimension)
+
+
+SAGEMAKER_VARIANT = TargetType(
+    "sagemaker-variant",
+    "sagemaker",
+    "sagemaker:variant:DesiredInstanceCount",
+    "endpoint/{endpoint}/variant/{variant}",
+    "SageMakerVariantInvocationsPerInstance",
+)
+SAGEMAKER_INFERENCE_COMPONENT = TargetType(
+    "sagemaker-inference-component",
+    "sagemaker",
+    "sagemaker:inference-component:DesiredCopyCount",
+    "inference-component/{component}",
+    "SageMakerInferenceComponentInvocationsPerCopy",
+)
+ECS_SERVICE = TargetType(
+    "ecs-service",
+    "ecs",
+    "ecs:service:DesiredCount",
+    "service/{cluster}/{service}",
+    "ECSServiceAverageCPUUtilization",
+)
+DYNAMODB_TABLE_READ = TargetType(
+    "dynamodb-table-read",
+    "dynamodb",
+    "dynamodb:table:ReadCapacityUnits",
+    "table/{table}",
+    "DynamoDBReadCapacityUtilization",
+)
+DYNAMODB_TABLE_WRITE = TargetType(
+    "dynamodb-table-write",
+    "dynamodb",
+    "dynamodb:table:WriteCapacityUnits",
+    "table/{table}",
+    "DynamoDBWriteCapacityUtilization",
+)
+DYNAMODB_INDEX_READ = TargetType(
+    "dynamodb-index-read",
+    "dynamodb",
+    "dynamodb:index:ReadCapacityUnits",
+    "table/{table}/index/{index}",
+    "DynamoDBReadCapacityUtilization",
+)
+DYNAMODB_INDEX_WRITE = TargetType(
+    "dynamodb-index-write",
+    "dynamodb",
+    "dynamodb:index:WriteCapacityUnits",
+    "table/{table}/index/{index}",
+    "DynamoDBWriteCapacityUtilization",
+)
+LAMBDA_PROVISIONED_CONCURRENCY = TargetType(
+    "lambda-provisioned-concurrency",
+    "lambda",
+    "lambda:function:ProvisionedConcurrency",
+    "function:{function}:{qualifier}",
+    "LambdaProvisionedConcurrencyUtilization",
+)
+AURORA_REPLICAS = TargetType(
+    "aurora-replicas",
+    "rds",
+    "rds:cluster:ReadReplicaCount",
+    "cluster:{cluster}",
+    "RDSReaderAverageCPUUtilization",
+)
+SPOT_FLEET = TargetType(
+    "spot-fleet",
+    "ec2",
+    "ec2:spot-fleet-request:TargetCapacity",
+    "spot-fleet-request/{request}",
+    "EC2SpotFleetRequestAverageCPUUtilization",
+)
+APPSTREAM_FLEET = TargetType(
+    "appstream-fleet",
+    "appstream",
+    "appstream:fleet:DesiredCapacity",
+    "fleet/{fleet}",
+    "AppStreamAverageCapacityUtilization",
+)
+ELASTICACHE_NODE_GROUPS = TargetType(
+    "elasticache-node-groups",
+    "elasticache",
+    "elasticache:replication-group:NodeGroups",
+    "replication-group/{group}",
+    "ElastiCachePrimaryEngineCPUUtilization",
+)
+KAFKA_BROKER_STORAGE = TargetType(
+    "kafka-broker-storage",
+    "kafka",
+    "kafka:broker-storage:VolumeSize",
+    "{cluster_arn}",
+    "KafkaBrokerStorageUtilization",
+)
+
+TARGET_TYPES: Dict[str, TargetType] = {
+    t.name: t
+    for t in (
+        SAGEMAKER_VARIANT,
+        SAGEMAKER_INFERENCE_COMPONENT,
+        ECS_SERVICE,
+        DYNAMODB_TABLE_READ,
+        DYNAMODB_TABLE_WRITE,
+        DYNAMODB_INDEX_READ,
+        DYNAMODB_INDEX_WRITE,
+        LAMBDA_PROVISIONED_CONCURRENCY,
+        AURORA_REPLICAS,
+        SPOT_FLEET,
+        APPSTREAM_FLEET,
+        ELASTICACHE_NODE_GROUPS,
+        KAFKA_BROKER_STORAGE,
+    )
+}
+
+
+@dataclass
+class ScalableTarget:
+    type: TargetType
+    resource_id: str
+    min_capacity: int = 1
+    max_capacity: int = 2
+
+    @property
+    def key(self) -> TargetKey:
+        return self.type.key(self.resource_id)
+
+
+@dataclass
+class ScalingPolicy:
+    target: ScalableTarget
+    name: str
+    policy_type: str = "TargetTrackingScaling"
+    configuration: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def target_tracking(
+        cls,
+        target: ScalableTarget,
+        name: str,
+        target_value: float = 70.0,
+        scale_in_cooldown: int = 300,
+        scale_out_cooldown: int = 300,
+    ) -> "ScalingPolicy":
+        """Returns a target tracking policy on the predefined metric of the
+        target's type.
+        """
+        if target.type.predefined_metric is None:
+            raise ValueError(f"{target.type.name} has no predefined metric")
+        return cls(
+            target,
+            name,
+            configuration={
+                "TargetValue": target_value,
+                "ScaleInCooldown": scale_in_cooldown,
+                "ScaleOutCooldown": scale_out_cooldown,
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": target.type.predefined_metric,
+                },
+            },
+        )
+
+    def request(self) -> Dict[str, Any]:
+        key = self.target.key
+        params = {
+            "PolicyName": self.name,
+            "ServiceNamespace": key.namespace,
+            "ResourceId": key.resource_id,
+            "ScalableDimension": key.dimension,
+            "PolicyType": self.policy_type,
+        }
+        if self.policy_type == "TargetTrackingScaling":
+            params["TargetTrackingScalingPolicyConfiguration"] = self.configuration
+        elif self.policy_type == "StepScaling":
+            params["StepScalingPolicyConfiguration"] = self.configuration
+        elif self.configuration:
+            params[f"{self.policy_type}PolicyConfiguration"] = self.configuration
+        return params
+
+
+@dataclass
+class BatchResult:
+    succeeded: List[Any] = field(default_factory=list)
+    failed: Dict[Any, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def _client(client):
+    return client or get_client("application-autoscaling")
+
+
+def _run_batch(items: List[Any], key, action, max_workers: int) -> BatchResult:
+    result = BatchResult()
+
+    def run(item):
+        try:
+            action(item)
+        except botocore.exceptions.ClientError as error:
+            return item, str(error)
+        return item, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item, error in executor.map(run, items):
+            if error is None:
+                result.succeeded.append(key(item))
+            else:
+                result.failed[key(item)] = error
+    return result
+
+
+def register_targets(
+    targets: Iterable[ScalableTarget], max_workers: int = DEFAULT_MAX_WORKERS, client=None
+) -> BatchResult:
+    client = _client(client)
+    return _run_batch(
+        list(targets),
+        lambda t: t.key,
+        lambda t: client.register_scalable_target(
+            ServiceNamespace=t.key.namespace,
+            ResourceId=t.resource_id,
+            ScalableDimension=t.key.dimension,
+            MinCapacity=t.min_capacity,
+            MaxCapacity=t.max_capacity,
+        ),
+        max_workers,
+    )
+
+
+def deregister_targets(
+    keys: Iterable[TargetKey], max_workers: int = DEFAULT_MAX_WORKERS, client=None
+) -> BatchResult:
+    client = _client(client)
+    return _run_batch(
+        list(keys),
+        lambda k: k,
+        lambda k: client.deregister_scalable_target(
+            ServiceNamespace=k.namespace, ResourceId=k.resource_id, ScalableDimension=k.dimension
+        ),
+        max_workers,
+    )
+
+
+def put_policies(
+    policies: Iterable[ScalingPolicy], max_workers: int = DEFAULT_MAX_WORKERS, client=None
+) -> BatchResult:
+    client = _client(client)
+    return _run_batch(
+        list(policies),
+        lambda p: (p.target.key, p.name),
+        lambda p: client.put_scaling_policy(**p.request()),
+        max_workers,
+    )
+
+
+def delete_policies(
+    policies: Iterable[ScalingPolicy], max_workers: int = DEFAULT_MAX_WORKERS, client=None
+) -> BatchResult:
+    client = _client(client)
+    return _run_batch(
+        list(policies),
+        lambda p: (p.target.key, p.name),
+        lambda p: client.delete_scaling_policy(
+            PolicyName=p.name,
+            ServiceNamespace=p.target.key.namespace,
+            ResourceId=p.target.resource_id,
+            ScalableDimension=p.target.key.dimension,
+        ),
+        max_workers,
+    )
+
+
+def _by_namespace(keys: Iterable[TargetKey]) -> Dict[str, List[TargetKey]]:
+    grouped: Dict[str, List[TargetKey]] = defaultdict(list)
+    for key in keys:
+        grouped[key.namespace].append(key)
+    return grouped
+
+
+def describe_targets(keys: Iterable[TargetKey], client=None) -> Dict[TargetKey, Optional[Dict]]:
+    """Returns the description of every target in `keys`, or None for the
+    ones that are not registered, with one paginated describe per namespace.
+    """
+    client = _client(client)
+    keys = list(keys)
+    found: Dict[TargetKey, Optional[Dict]] = {key: None for key in keys}
+    for namespace, wanted in _by_namespace(keys).items():
+        params = {"ServiceNamespace": namespace}
+        resource_ids = sorted({k.resource_id for k in wanted})
+        if len(resource_ids) <= DESCRIBE_MAX_RESOURCE_IDS:
+            params["ResourceIds"] = resource_ids
+        paginator = client.get_paginator("describe_scalable_targets")
+        for page in paginator.paginate(**params):
+            for target in page["ScalableTargets"]:
+                key = TargetKey(namespace, target["ResourceId"], target["ScalableDimension"])
+                if key in found:
+                    found[key] = target
+    return found
+
+
+def describe_policies(
+    keys: Iterable[TargetKey], client=None
+) -> Dict[TargetKey, Dict[str, Dict]]:
+    """Returns the policies attached to every target in `keys`, by policy
+    name, with one paginated describe per namespace.
+    """
+    client = _client(client)
+    keys = list(keys)
+    found: Dict[TargetKey, Dict[str, Dict]] = {key: {} for key in keys}
+    for namespace in _by_namespace(keys):
+        paginator = client.get_paginator("describe_scaling_policies")
+        for page in paginator.paginate(ServiceNamespace=namespace):
+            for policy in page["ScalingPolicies"]:
+                key = TargetKey(namespace, policy["ResourceId"], policy["ScalableDimension"])
+                if key in found:
+                    found[key][policy["PolicyName"]] = policy
+    return found
@@ -0,0 +1,135 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Per-test timing report for the integration tests.
+
+The report lists, for every test, how long its setup, call and teardown
+took, every wait it made through `e2e.common.waiter`, and any measurement
+recorded with `record` (for example the time a resource took to converge).
+``conftest.py`` writes it as JSON at the end of the session when
+``--timing-report`` (or ``ACK_TEST_TIMING_REPORT``) names a file.
+"""
+
+import datetime
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from e2e.common import waiter
+
+
+@dataclass
+class Measurement:
+    name: str
+    seconds: float
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class TestTiming:
+    nodeid: str
+    outcome: str = "passed"
+    phases: Dict[str, float] = field(default_factory=dict)
+    waits: List[Dict] = field(default_factory=list)
+    measurements: List[Measurement] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.phases.values())
+
+
+class TimingReport:
+    """Collects the timings of one test session."""
+
+    def __init__(self):
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self._start = time.monotonic()
+        self.tests: List[TestTiming] = []
+        # Measurements recorded outside of any test, e.g. by session fixtures
+        self.measurements: List[Measurement] = []
+        self._current: Optional[TestTiming] = None
+        self._waits_before = 0
+        self._lock = threading.Lock()
+
+    def begin(self, nodeid: str):
+        with self._lock:
+            self._current = TestTiming(nodeid)
+            self.tests.append(self._current)
+            self._waits_before = len(waiter.wait_results())
+
+    def add_phase(self, nodeid: str, when: str, seconds: float, outcome: str):
+        with self._lock:
+            test = self._find(nodeid)
+            if test is None:
+                return
+            test.phases[when] = seconds
+            if outcome != "passed":
+                test.outcome = outcome
+
+    def end(self, nodeid: str):
+        with self._lock:
+            test = self._find(nodeid)
+            if test is None:
+                return
+            test.waits = [
+                {
+                    "description": w.description,
+                    "satisfied": w.satisfied,
+                    "seconds": w.elapsed,
+                    "attempts": w.attempts,
+                }
+                for w in waiter.wait_results()[self._waits_before :]
+            ]
+            if test is self._current:
+                self._current = None
+
+    def record(self, name: str, seconds: float, **labels: str):
+        with self._lock:
+            measurement = Measurement(name, seconds, {k: str(v) for k, v in labels.items()})
+            target = self._current.measurements if self._current else self.measurements
+            target.append(measurement)
+
+    def _find(self, nodeid: str) -> Optional[TestTiming]:
+        for test in reversed(self.tests):
+            if test.nodeid == nodeid:
+                return test
+        return None
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "started": self.started.isoformat(),
+                "wall_seconds": time.monotonic() - self._start,
+                "tests": [
+                    dict(asdict(test), seconds=test.seconds) for test in self.tests
+                ],
+                "measurements": [asdict(m) for m in self.measurements],
+            }
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+_report = TimingReport()
+
+
+def timing_report() -> TimingReport:
+    return _report
+
+
+def record(name: str, seconds: float, **labels: str):
+    """Adds a measurement to the test that is currently running."""
+    _report.record(name, seconds, **labels)
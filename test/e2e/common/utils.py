@@ -12,102 +12,84 @@
 # permissions and limitations under the License.
 
 
-import boto3
+from e2e.common import describe
+from e2e.common.aws_clients import get_client
+from e2e.common.targets import SAGEMAKER_VARIANT, ScalableTarget, ScalingPolicy
 
 
 def application_autoscaling_client():
-    return boto3.client("application-autoscaling")
+    return get_client("application-autoscaling")
 
 
-def sagemaker_endpoint_register_scalable_target(resource_id):
-    target_input = {
-        "ServiceNamespace": "sagemaker",
-        "ResourceId": resource_id,
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-        "MinCapacity": 1,
-        "MaxCapacity": 2,
-    }
+def _sagemaker_variant(resource_id):
+    return ScalableTarget(SAGEMAKER_VARIANT, resource_id, min_capacity=1, max_capacity=2)
+
 
+def sagemaker_endpoint_register_scalable_target(resource_id):
+    target = _sagemaker_variant(resource_id)
     target_response = application_autoscaling_client().register_scalable_target(
-        **target_input
+        ServiceNamespace=target.key.namespace,
+        ResourceId=target.resource_id,
+        ScalableDimension=target.key.dimension,
+        MinCapacity=target.min_capacity,
+        MaxCapacity=target.max_capacity,
     )
     return target_response
 
 
 def sagemaker_endpoint_put_scaling_policy(resource_id, policy_name):
-    policy_input = {
-        "PolicyName": policy_name,
-        "ServiceNamespace": "sagemaker",
-        "ResourceId": resource_id,
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-        "PolicyType": "TargetTrackingScaling",
-        "TargetTrackingScalingPolicyConfiguration": {
-            "TargetValue": 70.0,
-            "ScaleInCooldown": 700,
-            "ScaleOutCooldown": 300,
-            "PredefinedMetricSpecification": {
-                "PredefinedMetricType": "SageMakerVariantInvocationsPerInstance",
-            },
-        },
-    }
-
+    policy = ScalingPolicy.target_tracking(
+        _sagemaker_variant(resource_id),
+        policy_name,
+        target_value=70.0,
+        scale_in_cooldown=700,
+        scale_out_cooldown=300,
+    )
     policy_response = application_autoscaling_client().put_scaling_policy(
-        **policy_input
+        **policy.request()
     )
     return policy_response
 
 
 def sagemaker_endpoint_deregister_scalable_target(resource_id):
-    target_input = {
-        "ServiceNamespace": "sagemaker",
-        "ResourceId": resource_id,
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-    }
-
     describe_response = sagemaker_endpoint_describe_scalable_target(resource_id)
     if len(describe_response["ScalableTargets"]) > 0:
-        application_autoscaling_client().deregister_scalable_target(**target_input)
+        application_autoscaling_client().deregister_scalable_target(
+            ServiceNamespace=SAGEMAKER_VARIANT.namespace,
+            ResourceId=resource_id,
+            ScalableDimension=SAGEMAKER_VARIANT.dimension,
+        )
 
 
 def sagemaker_endpoint_describe_scalable_target(resource_id):
-    target_input = {
-        "ServiceNamespace": "sagemaker",
-        "ResourceIds": [
-            resource_id,
-        ],
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-    }
-
-    target_response = application_autoscaling_client().describe_scalable_targets(
-        **target_input
+    targets = describe.scalable_targets(
+        SAGEMAKER_VARIANT.namespace,
+        resource_ids=[resource_id],
+        dimension=SAGEMAKER_VARIANT.dimension,
+        client=application_autoscaling_client(),
     )
-    return target_response
+    return {"ScalableTargets": list(targets)}
 
 
 def sagemaker_endpoint_delete_scaling_policy(resource_id, policy_name):
-    policy_input = {
-        "ServiceNamespace": "sagemaker",
-        "ResourceId": resource_id,
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-        "PolicyName": policy_name,
-    }
-
     describe_response = sagemaker_endpoint_describe_scaling_policy(
         resource_id, policy_name
     )
     if len(describe_response["ScalingPolicies"]) > 0:
-        application_autoscaling_client().delete_scaling_policy(**policy_input)
+        application_autoscaling_client().delete_scaling_policy(
+            ServiceNamespace=SAGEMAKER_VARIANT.namespace,
+            ResourceId=resource_id,
+            ScalableDimension=SAGEMAKER_VARIANT.dimension,
+            PolicyName=policy_name,
+        )
 
 
 def sagemaker_endpoint_describe_scaling_policy(resource_id, policy_name):
-    policy_input = {
-        "ServiceNamespace": "sagemaker",
-        "ResourceId": resource_id,
-        "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
-        "PolicyNames": [policy_name],
-    }
-
-    policy_response = application_autoscaling_client().describe_scaling_policies(
-        **policy_input
+    policies = describe.scaling_policies(
+        SAGEMAKER_VARIANT.namespace,
+        resource_id=resource_id,
+        dimension=SAGEMAKER_VARIANT.dimension,
+        policy_names=[policy_name],
+        client=application_autoscaling_client(),
     )
-    return policy_response
+    return {"ScalingPolicies": list(policies)}
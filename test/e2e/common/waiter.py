@@ -0,0 +1,286 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Waiters used by the integration tests.
+
+Custom resources are observed through a Kubernetes watch stream and AWS state
+is probed with exponential backoff plus jitter, so every wait returns as soon
+as its condition holds instead of after a fixed sleep. The clock and the watch
+source are injectable so the waiters can be exercised offline.
+"""
+
+import abc
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class Clock:
+    """Wall-clock time source used by the waiters."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FakeClock(Clock):
+    """Clock that only moves when slept on, for offline tests."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 0)
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@dataclass
+class Backoff:
+    """Exponential backoff with jitter.
+
+    The n-th delay ``d = min(initial * multiplier**n, maximum)`` is drawn
+    uniformly from ``[d * (1 - jitter), d]``. The default jitter of 0.5 keeps
+    every delay at least half its nominal value; a jitter of 1 gives full
+    jitter.
+    """
+
+    initial: float = 1.0
+    maximum: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+
+    def delays(self, rng: Optional[random.Random] = None) -> Iterator[float]:
+        rng = rng or random
+        delay = self.initial
+        while True:
+            capped = min(delay, self.maximum)
+            yield capped - rng.uniform(0, capped * self.jitter)
+            delay *= self.multiplier
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a single wait."""
+
+    description: str
+    satisfied: bool
+    value: Any
+    elapsed: float
+    attempts: int
+
+
+_wait_results: List[WaitResult] = []
+_wait_results_lock = threading.Lock()
+
+
+def _record(result: WaitResult) -> WaitResult:
+    with _wait_results_lock:
+        _wait_results.append(result)
+    if result.satisfied:
+        logging.info(
+            f"Wait for {result.description} finished after {result.elapsed:.1f}s ({result.attempts} attempts)"
+        )
+    else:
+        logging.error(
+            f"Wait for {result.description} timed out after {result.elapsed:.1f}s ({result.attempts} attempts). Last value: {result.value}"
+        )
+    return result
+
+
+def wait_results() -> List[WaitResult]:
+    """Returns every wait recorded by this process, oldest first."""
+    with _wait_results_lock:
+        return list(_wait_results)
+
+
+def poll_until(
+    probe: Callable[[], Any],
+    predicate: Callable[[Any], bool],
+    timeout: float,
+    backoff: Optional[Backoff] = None,
+    clock: Optional[Clock] = None,
+    rng: Optional[random.Random] = None,
+    description: str = "condition",
+) -> WaitResult:
+    """Calls `probe` until `predicate` holds for its result or `timeout`
+    seconds have elapsed.
+
+    The first probe happens immediately; later probes are spaced by `backoff`
+    and never sleep past the deadline.
+    """
+    clock = clock or Clock()
+    backoff = backoff or Backoff()
+    start = clock.monotonic()
+    deadline = start + timeout
+    delays = backoff.delays(rng)
+
+    attempts = 0
+    value = None
+    while True:
+        attempts += 1
+        value = probe()
+        if predicate(value):
+            return _record(
+                WaitResult(description, True, value, clock.monotonic() - start, attempts)
+            )
+        remaining = deadline - clock.monotonic()
+        if remaining <= 0:
+            break
+        clock.sleep(min(next(delays), remaining))
+
+    return _record(
+        WaitResult(description, False, value, clock.monotonic() - start, attempts)
+    )
+
+
+class WatchSource(abc.ABC):
+    """Streams successive states of a single custom resource."""
+
+    @abc.abstractmethod
+    def stream(self, reference, timeout: float) -> Iterator[Dict]:
+        """Yields the resource each time it changes, or None once it is
+        deleted, for up to `timeout` seconds.
+        """
+
+
+class KubernetesWatchSource(WatchSource):
+    """Watches a custom resource through the Kubernetes API server.
+
+    The watch is opened without a resource version, so the current state of
+    the object is delivered first as a synthetic ADDED event.
+    """
+
+    def __init__(self, api_client=None):
+        self._api_client = api_client
+
+    def stream(self, reference, timeout: float) -> Iterator[Dict]:
+        from kubernetes import client, watch
+        from acktest.k8s import resource as k8s
+
+        api = client.CustomObjectsApi(self._api_client or k8s._get_k8s_api_client())
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                api.list_namespaced_custom_object,
+                reference.group,
+                reference.version,
+                reference.namespace,
+                reference.plural,
+                field_selector=f"metadata.name={reference.name}",
+                timeout_seconds=max(int(timeout), 1),
+            ):
+                if event["type"] == "DELETED":
+                    yield None
+                    continue
+                yield event["object"]
+        finally:
+            w.stop()
+
+
+class FakeWatchSource(WatchSource):
+    """Replays a scripted sequence of ``(delay_seconds, object)`` events.
+
+    Each delay is applied to the supplied `FakeClock` before the object is
+    delivered, mimicking events trickling in from the API server. Once the
+    script is exhausted the stream holds until its timeout, like a real watch
+    with nothing left to report.
+    """
+
+    def __init__(self, events, clock: FakeClock):
+        self.events = list(events)
+        self.clock = clock
+        self.opened = 0
+
+    def stream(self, reference, timeout: float) -> Iterator[Dict]:
+        self.opened += 1
+        waited = 0.0
+        while self.events and waited + self.events[0][0] <= timeout:
+            delay, obj = self.events.pop(0)
+            self.clock.advance(delay)
+            waited += delay
+            yield obj
+        self.clock.advance(timeout - waited)
+
+
+_default_watch_source: Optional[WatchSource] = None
+
+
+def default_watch_source() -> WatchSource:
+    global _default_watch_source
+    if _default_watch_source is None:
+        _default_watch_source = KubernetesWatchSource()
+    return _default_watch_source
+
+
+def watch_until(
+    reference,
+    predicate: Callable[[Optional[Dict]], bool],
+    timeout: float,
+    source: Optional[WatchSource] = None,
+    backoff: Optional[Backoff] = None,
+    clock: Optional[Clock] = None,
+    rng: Optional[random.Random] = None,
+    description: Optional[str] = None,
+) -> WaitResult:
+    """Watches `reference` until `predicate` holds for the observed object
+    or `timeout` seconds have elapsed.
+
+    The stream is reopened if the server closes it before the deadline,
+    after a delay drawn from `backoff` as in `poll_until`, so that a stream
+    that keeps closing straight away is not reopened in a busy loop.
+    """
+    clock = clock or Clock()
+    source = source or default_watch_source()
+    backoff = backoff or Backoff()
+    description = description or f"{reference.plural}/{reference.name}"
+    start = clock.monotonic()
+    deadline = start + timeout
+    delays = backoff.delays(rng)
+
+    attempts = 0
+    obj = None
+    opened = False
+    while True:
+        remaining = deadline - clock.monotonic()
+        if remaining <= 0:
+            break
+        if opened:
+            clock.sleep(min(next(delays), remaining))
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                break
+        opened = True
+        for obj in source.stream(reference, remaining):
+            attempts += 1
+            if predicate(obj):
+                return _record(
+                    WaitResult(description, True, obj, clock.monotonic() - start, attempts)
+                )
+            if clock.monotonic() >= deadline:
+                break
+
+    return _record(
+        WaitResult(description, False, obj, clock.monotonic() - start, attempts)
+    )
@@ -0,0 +1,122 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Counts the watch events of the controller's custom resources, to measure
+how often they are written.
+
+Every write to a resource, whether to its spec, metadata or status, shows up
+as one MODIFIED event, so the counts are the API server write load caused
+by a piece of a test::
+
+    with WatchEventCounter(["scalabletargets"], settle=30) as events:
+        k8s.patch_custom_resource(reference, spec)
+        ...
+    assert events.modified("scalabletargets", name) <= 3
+
+Writes can trail the condition a test waits for, e.g. the status patch that
+ends the reconcile, or a reconcile triggered by it. `settle` keeps counting
+for that many seconds after the block ends, so those writes count too.
+"""
+
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from e2e import CRD_GROUP, CRD_VERSION
+
+# How long each watch request lasts before it is resumed
+WATCH_TIMEOUT_SECONDS = 5
+
+
+class WatchEventCounter:
+    """Counts watch events by resource while running."""
+
+    def __init__(self, plurals: Iterable[str], namespace: str = "default", settle: float = 0):
+        self.plurals = list(plurals)
+        self.namespace = namespace
+        self.settle = settle
+        self._counts: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "WatchEventCounter":
+        from acktest.k8s import resource as k8s
+        from kubernetes import client
+
+        api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+        for plural in self.plurals:
+            # Start from the current state so that only later events count
+            listed = api.list_namespaced_custom_object(
+                CRD_GROUP, CRD_VERSION, self.namespace, plural
+            )
+            thread = threading.Thread(
+                target=self._watch,
+                args=(api, plural, listed["metadata"]["resourceVersion"]),
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _watch(self, api, plural: str, resource_version: str):
+        from kubernetes import watch
+
+        stream = watch.Watch()
+        while not self._stop.is_set():
+            for event in stream.stream(
+                api.list_namespaced_custom_object,
+                CRD_GROUP,
+                CRD_VERSION,
+                self.namespace,
+                plural,
+                resource_version=resource_version,
+                timeout_seconds=WATCH_TIMEOUT_SECONDS,
+            ):
+                metadata = event["object"]["metadata"]
+                # Resume from the last event when the watch times out
+                resource_version = metadata["resourceVersion"]
+                with self._lock:
+                    self._counts[(plural, metadata["name"])][event["type"]] += 1
+                if self._stop.is_set():
+                    stream.stop()
+                    break
+
+    def stop(self) -> Dict[Tuple[str, str], Counter]:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=WATCH_TIMEOUT_SECONDS * 2)
+        return self.counts()
+
+    def counts(self) -> Dict[Tuple[str, str], Counter]:
+        with self._lock:
+            return {key: Counter(counts) for key, counts in self._counts.items()}
+
+    def modified(self, plural: str, name: Optional[str] = None) -> int:
+        """Returns the writes to the resource `name`, or to every resource of
+        `plural` when no name is given.
+        """
+        return sum(
+            counts["MODIFIED"]
+            for (p, n), counts in self.counts().items()
+            if p == plural and (name is None or n == name)
+        )
+
+    def __enter__(self) -> "WatchEventCounter":
+        return self.start()
+
+    def __exit__(self, exc_type, *exc):
+        # There is nothing to measure once the block has failed
+        if exc_type is None and self.settle > 0:
+            time.sleep(self.settle)
+        self.stop()
@@ -0,0 +1,407 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Coordination between the worker processes of a parallel test run.
+
+The suite can be spread over several processes with pytest-xdist
+(``pytest -n auto --dist loadscope``). Workers coordinate through files in a
+shared state directory:
+
+* `cross_worker_lock` serializes work that must happen once per run, such as
+  bootstrapping the shared resources (`shared_bootstrap`).
+* `unique_name` embeds the worker and a per-process counter in every name,
+  and `claim_resource_id` guarantees that no two workers ever use the same
+  Application Auto Scaling ResourceId.
+* Each worker writes a ledger of the AWS and Kubernetes resources it creates
+  and releases each entry once the resource is torn down. Entries left in the
+  ledger of a worker that is no longer running are removed by
+  `cleanup_worker_resources`, which `service_cleanup` calls.
+"""
+
+import errno
+import fcntl
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import string
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+RUN_ID_ENV = "ACK_TEST_RUN_ID"
+STATE_DIR_ENV = "ACK_TEST_STATE_DIR"
+XDIST_WORKER_ENV = "PYTEST_XDIST_WORKER"
+XDIST_WORKER_COUNT_ENV = "PYTEST_XDIST_WORKER_COUNT"
+
+MAIN_WORKER = "main"
+# Lowest number of random characters `unique_name` appends
+MIN_RANDOM_SUFFIX = 5
+
+_name_counter = itertools.count()
+_ledger: Optional["WorkerLedger"] = None
+_ledger_lock = threading.Lock()
+
+
+def worker_id() -> str:
+    """Returns the xdist worker id (``gw0``, ``gw1``...) or ``main`` when the
+    suite is not distributed.
+    """
+    return os.environ.get(XDIST_WORKER_ENV) or MAIN_WORKER
+
+
+def worker_count() -> int:
+    return int(os.environ.get(XDIST_WORKER_COUNT_ENV) or 1)
+
+
+def run_id() -> str:
+    """Returns the id shared by every worker of the current run.
+
+    The controlling process sets it in `ensure_run_id` before any worker is
+    started, and workers inherit it through the environment.
+    """
+    return os.environ.get(RUN_ID_ENV) or ensure_run_id()
+
+
+def ensure_run_id() -> str:
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def state_directory() -> Path:
+    directory = os.environ.get(STATE_DIR_ENV)
+    if directory:
+        path = Path(directory)
+    else:
+        path = Path(tempfile.gettempdir()) / "ack-applicationautoscaling-e2e"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def state_id() -> str:
+    """Returns the id of the state directory, shared by every process that
+    uses it and so by every session run on the same machine.
+    """
+    path = state_directory() / "state-id"
+    with cross_worker_lock("state-id"):
+        if not path.exists():
+            path.write_text(uuid.uuid4().hex[:12])
+        return path.read_text().strip()
+
+
+def run_directory(run: Optional[str] = None) -> Path:
+    path = state_directory() / "runs" / (run or run_id())
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def cross_worker_lock(name: str) -> Iterator[None]:
+    """Holds an exclusive lock named `name` shared by every process using the
+    same state directory.
+    """
+    locks = state_directory() / "locks"
+    locks.mkdir(exist_ok=True)
+    with open(locks / f"{name}.lock", "w") as stream:
+        fcntl.flock(stream, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(stream, fcntl.LOCK_UN)
+
+
+def _worker_tag() -> str:
+    worker = worker_id()
+    if worker.startswith("gw"):
+        return "w" + worker[2:]
+    return "m"
+
+
+def unique_name(prefix: str, max_length: int = 32) -> str:
+    """Returns a name starting with `prefix` that no other worker of this run
+    can produce, followed by a random suffix that keeps names from different
+    runs apart.
+
+    `prefix` is shortened if needed to fit `max_length`.
+    """
+    tag = f"{_worker_tag()}{next(_name_counter)}"
+    room = max_length - len(tag) - MIN_RANDOM_SUFFIX - 2
+    if room < 1:
+        raise ValueError(f"max_length {max_length} is too short for a unique name")
+    prefix = prefix[:room].rstrip("-")
+    suffix_length = max_length - len(prefix) - len(tag) - 2
+    suffix = "".join(
+        random.choice(string.ascii_lowercase + string.digits) for _ in range(suffix_length)
+    )
+    return f"{prefix}-{tag}-{suffix}"
+
+
+class ResourceIdClaimedError(Exception):
+    pass
+
+
+def claim_resource_id(resource_id: str):
+    """Claims `resource_id` for this worker for the rest of the run, or
+    until it is released with `release_resource_id`.
+
+    Raises `ResourceIdClaimedError` if another worker already claimed it.
+    Claiming the same id again from the same worker is allowed.
+    """
+    claims = run_directory() / "claims"
+    claims.mkdir(exist_ok=True)
+    path = claims / hashlib.sha256(resource_id.encode()).hexdigest()
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError as ex:
+        if ex.errno != errno.EEXIST:
+            raise
+        owner = path.read_text().split("\n", 1)[0]
+        if owner != worker_id():
+            raise ResourceIdClaimedError(
+                f"ResourceId {resource_id} is already used by worker {owner}"
+            )
+        return
+    with os.fdopen(fd, "w") as stream:
+        stream.write(f"{worker_id()}\n{resource_id}\n")
+
+
+def release_resource_id(resource_id: str):
+    """Gives up this worker's claim on `resource_id`, so that another worker
+    can use it, e.g. once a pooled endpoint was returned.
+    """
+    path = run_directory() / "claims" / hashlib.sha256(resource_id.encode()).hexdigest()
+    try:
+        owner = path.read_text().split("\n", 1)[0]
+    except FileNotFoundError:
+        return
+    if owner == worker_id():
+        path.unlink()
+
+
+class WorkerLedger:
+    """Append-only record of the resources created by one worker.
+
+    While the ledger is open, the worker holds a lock on it, which is how
+    `cleanup_worker_resources` tells running workers from finished ones.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._alive = open(path.with_suffix(".alive"), "w")
+        fcntl.flock(self._alive, fcntl.LOCK_EX)
+
+    def record(self, kind: str, **fields) -> str:
+        """Records a resource of `kind` described by `fields` and returns the
+        token to release it with.
+        """
+        token = uuid.uuid4().hex
+        self._append({"token": token, "kind": kind, "fields": fields})
+        return token
+
+    def release(self, token: str):
+        self._append({"release": token})
+
+    def _append(self, entry: Dict):
+        with self._lock, open(self.path, "a") as stream:
+            stream.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def close(self):
+        fcntl.flock(self._alive, fcntl.LOCK_UN)
+        self._alive.close()
+
+
+def ledger() -> WorkerLedger:
+    """Returns this worker's ledger for the current run."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = WorkerLedger(run_directory() / f"{worker_id()}.jsonl")
+        return _ledger
+
+
+def outstanding(path: Path) -> List[Dict]:
+    """Returns the entries of the ledger at `path` that were not released."""
+    entries: Dict[str, Dict] = {}
+    with open(path) as stream:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "release" in entry:
+                entries.pop(entry["release"], None)
+            else:
+                entries[entry["token"]] = entry
+    return list(entries.values())
+
+
+def _worker_running(ledger_path: Path) -> bool:
+    alive = ledger_path.with_suffix(".alive")
+    if not alive.exists():
+        return False
+    with open(alive, "a") as stream:
+        try:
+            fcntl.flock(stream, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(stream, fcntl.LOCK_UN)
+    return False
+
+
+_cleaners: Dict[str, Callable[..., None]] = {}
+
+
+def register_cleaner(kind: str, cleaner: Callable[..., None]):
+    """Registers the function that deletes a leftover resource of `kind`. It
+    is called with the fields the resource was recorded with.
+    """
+    _cleaners[kind] = cleaner
+
+
+def _delete_custom_resource(plural: str, name: str, namespace: str = "default"):
+    from acktest.k8s import resource as k8s
+    from e2e import CRD_GROUP, CRD_VERSION
+
+    reference = k8s.CustomResourceReference(
+        CRD_GROUP, CRD_VERSION, plural, name, namespace=namespace
+    )
+    if k8s.get_resource_exists(reference):
+        k8s.delete_custom_resource(reference)
+
+
+def _delete_sagemaker_endpoint(model: str, endpoint_config: str, endpoint: str):
+    from e2e.common.sagemaker_utils import delete_sagemaker_endpoint
+
+    delete_sagemaker_endpoint(model, endpoint_config, endpoint)
+
+
+def _release_endpoint_lease(pool: str, endpoint: str, owner: str):
+    from e2e.common.endpoint_pool import EndpointPool
+
+    EndpointPool(pool).release_endpoint(endpoint, owner)
+
+
+register_cleaner("custom_resource", _delete_custom_resource)
+register_cleaner("sagemaker_endpoint", _delete_sagemaker_endpoint)
+register_cleaner("endpoint_lease", _release_endpoint_lease)
+
+
+def _clean(entries: List[Dict], result: Dict[str, List[str]]) -> bool:
+    """Deletes the resources described by ledger `entries`, custom resources
+    first so that the controller can still tear down what they own. Returns
+    whether every deletion succeeded.
+    """
+    ok = True
+    for entry in sorted(entries, key=lambda e: e["kind"] != "custom_resource"):
+        description = f"{entry['kind']} {entry['fields']}"
+        cleaner = _cleaners.get(entry["kind"])
+        try:
+            if cleaner is None:
+                raise KeyError(f"no cleaner registered for {entry['kind']}")
+            cleaner(**entry["fields"])
+        except Exception as ex:
+            logging.warning(f"Failed to clean up leftover {description}: {ex}")
+            result["failed"].append(description)
+            ok = False
+            continue
+        logging.info(f"Cleaned up leftover {description}")
+        result["deleted"].append(description)
+    return ok
+
+
+def cleanup_worker_resources(run: Optional[str] = None) -> Dict[str, List[str]]:
+    """Deletes the resources left in the ledgers of workers that are no longer
+    running, for run `run` or for every run in the state directory.
+
+    Returns the resources deleted and failed and the workers skipped because
+    they are still running. A run's state is removed once nothing is left in
+    it.
+    """
+    runs_directory = state_directory() / "runs"
+    if run is not None:
+        runs = [runs_directory / run]
+    elif runs_directory.exists():
+        runs = [p for p in runs_directory.iterdir() if p.is_dir()]
+    else:
+        runs = []
+
+    result: Dict[str, List[str]] = {"deleted": [], "failed": [], "skipped": []}
+    for directory in runs:
+        if not directory.exists():
+            continue
+        clean = True
+        for path in sorted(directory.glob("*.jsonl")):
+            if _worker_running(path):
+                result["skipped"].append(f"{directory.name}/{path.stem}")
+                clean = False
+                continue
+            if _clean(outstanding(path), result):
+                path.write_text("")
+            else:
+                clean = False
+        if clean:
+            _remove_tree(directory)
+    return result
+
+
+def cleanup_own_resources() -> Dict[str, List[str]]:
+    """Deletes the resources this worker recorded and never released."""
+    result: Dict[str, List[str]] = {"deleted": [], "failed": [], "skipped": []}
+    with _ledger_lock:
+        own = _ledger
+    if own is not None and own.path.exists():
+        entries = outstanding(own.path)
+        if _clean(entries, result):
+            for entry in entries:
+                own.release(entry["token"])
+    return result
+
+
+def _remove_tree(directory: Path):
+    for path in sorted(directory.rglob("*"), reverse=True):
+        if path.is_dir():
+            path.rmdir()
+        else:
+            path.unlink()
+    directory.rmdir()
+
+
+def shared_bootstrap():
+    """Bootstraps the shared test resources once for all workers and returns
+    them.
+
+    The first worker to get here bootstraps under a cross-worker lock; the
+    others wait for it and then read the state it wrote. A bootstrap that is
+    already in place, for example one done by the test runner before pytest
+    started, is used as is.
+    """
+    from e2e import bootstrap_directory
+    from e2e.bootstrap_manifest import BootstrapManifest
+    from e2e.bootstrap_resources import get_bootstrap_resources, reset_bootstrap_resources
+
+    def current() -> bool:
+        manifest = BootstrapManifest.load(bootstrap_directory)
+        return manifest is not None and manifest.matches_pickle(bootstrap_directory)
+
+    if not current():
+        with cross_worker_lock("bootstrap"):
+            if not current():
+                from e2e.service_bootstrap import bootstrap_and_save
+
+                bootstrap_and_save(bootstrap_directory)
+                reset_bootstrap_resources()
+    return get_bootstrap_resources()
@@ -11,6 +11,8 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import contextlib
+import logging
 import os
 import pytest
 
@@ -21,9 +23,20 @@ def pytest_addoption(parser):
     parser.addoption(
         "--runslow", action="store_true", default=False, help="run slow tests"
     )
+    parser.addoption(
+        "--timing-report",
+        default=os.environ.get("ACK_TEST_TIMING_REPORT"),
+        help="write a JSON report of test, wait and convergence timings to this file",
+    )
 
 
 def pytest_configure(config):
+    from e2e.common.workers import ensure_run_id
+
+    # Set in the controlling process before pytest-xdist starts any worker,
+    # so that every worker of the run shares it
+    ensure_run_id()
+
     config.addinivalue_line("markers", "canary: mark test to also run in canary tests")
     config.addinivalue_line(
         "markers", "service(arg): mark test associated with a given service"
@@ -40,7 +53,124 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(skip_slow)
 
 
+def pytest_runtest_logstart(nodeid, location):
+    from e2e.common.timing import timing_report
+
+    timing_report().begin(nodeid)
+
+
+def pytest_runtest_logreport(report):
+    from e2e.common.timing import timing_report
+
+    timing_report().add_phase(report.nodeid, report.when, report.duration, report.outcome)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    from e2e.common.timing import timing_report
+
+    timing_report().end(nodeid)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from e2e.common import workers
+
+    path = session.config.getoption("--timing-report")
+    if path:
+        from e2e.common.timing import timing_report
+
+        # Each pytest-xdist worker writes its own report next to the
+        # requested one
+        if workers.worker_id() != workers.MAIN_WORKER:
+            path = f"{path}.{workers.worker_id()}"
+        timing_report().write(path)
+
+    # Remove whatever this worker's fixtures failed to tear down
+    leftovers = workers.cleanup_own_resources()
+    if leftovers["failed"]:
+        logging.warning(f"Failed to clean up {leftovers['failed']}")
+
+
+# Bootstrap the shared test resources once per run, however many pytest-xdist
+# workers there are
+@pytest.fixture(scope="session")
+def shared_bootstrap():
+    from e2e.common.workers import shared_bootstrap
+
+    return shared_bootstrap()
+
+
+# Lease warm SageMaker endpoints from the pool shared across sessions. Every
+# test module of the session that leases an endpoint gets one, so the
+# endpoints they need are created up front and concurrently.
+@pytest.fixture(scope="session")
+def endpoint_pool(request, shared_bootstrap):
+    from e2e.common.endpoint_pool import EndpointPool
+
+    pool = EndpointPool()
+    pool.collect_idle()
+    modules = {
+        item.module
+        for item in request.session.items
+        if "sagemaker_endpoint" in getattr(item, "fixturenames", ())
+    }
+    pool.prewarm(len(modules))
+    return pool
+
+
 # Provide a k8s client to interact with the integration test cluster
 @pytest.fixture(scope="class")
 def k8s_client():
     return k8s._get_k8s_api_client()
+
+
+@contextlib.contextmanager
+def _standin_env(monkeypatch, service: str, server):
+    """Runs the stand-in `server` and points the shared boto3 clients of
+    `service` at it for the duration of the block.
+    """
+    from e2e.common.aws_clients import client_registry
+
+    # The stand-ins do not check signatures, but boto3 still needs
+    # credentials and a region to sign with
+    for name, value in (
+        ("AWS_ACCESS_KEY_ID", "standin"),
+        ("AWS_SECRET_ACCESS_KEY", "standin"),
+        ("AWS_DEFAULT_REGION", "us-west-2"),
+    ):
+        if not os.environ.get(name):
+            monkeypatch.setenv(name, value)
+
+    with server:
+        client_registry().set_endpoint_url(service, server.endpoint_url)
+        try:
+            yield server
+        finally:
+            client_registry().set_endpoint_url(service, None)
+
+
+# Run a local Application Auto Scaling stand-in and point the shared boto3
+# clients at it
+@pytest.fixture
+def applicationautoscaling_standin(monkeypatch):
+    from e2e.standins.applicationautoscaling import StandInServer
+
+    with _standin_env(monkeypatch, "application-autoscaling", StandInServer()) as server:
+        yield server
+
+
+# Run a local S3 stand-in and point the shared boto3 clients at it
+@pytest.fixture
+def s3_standin(monkeypatch):
+    from e2e.standins.s3 import S3StandInServer
+
+    with _standin_env(monkeypatch, "s3", S3StandInServer()) as server:
+        yield server
+
+
+# Run a local SageMaker stand-in and point the shared boto3 clients at it
+@pytest.fixture
+def sagemaker_standin(monkeypatch):
+    from e2e.standins.sagemaker import SageMakerStandInServer
+
+    with _standin_env(monkeypatch, "sagemaker", SageMakerStandInServer()) as server:
+        yield server
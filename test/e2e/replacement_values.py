@@ -12,8 +12,17 @@
 # permissions and limitations under the License.
 """Stores the values used by each of the integration tests for replacing the
 Application Auto Scaling-specific test variables.
+
+Values are resolved on first access and memoized, so importing this module
+(for example while collecting tests) does not read the bootstrap state or
+look up the region.
 """
 
+import functools
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict
+
 from acktest.aws.identity import get_region
 from e2e.bootstrap_resources import get_bootstrap_resources
 
@@ -47,9 +56,53 @@ ENDPOINT_INSTANCE_TYPES = {
     "eu-north-1": "ml.m5.large",
 }
 
-REPLACEMENT_VALUES = {
-    "SAGEMAKER_DATA_BUCKET": get_bootstrap_resources().DataBucket.name,
-    "SAGEMAKER_EXECUTION_ROLE_ARN": get_bootstrap_resources().SageMakerExecutionRole.arn,
-    "SAGEMAKER_XGBOOST_IMAGE_URI": f"{SAGEMAKER_XGBOOST_IMAGE_URIS[get_region()]}/sagemaker-xgboost:1.0-1-cpu-py3",
-    "ENDPOINT_INSTANCE_TYPE": ENDPOINT_INSTANCE_TYPES.get(get_region(), 'ml.c5.large'),
-}
+
+
+class LazyReplacementValues(Mapping):
+    """Read-only mapping whose values are computed by a resolver the first
+    time each key is looked up.
+    """
+
+    def __init__(self, resolvers: Dict[str, Callable[[], Any]]):
+        self._resolvers = dict(resolvers)
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        resolver = self._resolvers[key]
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = resolver()
+            return self._values[key]
+
+    def __iter__(self):
+        return iter(self._resolvers)
+
+    def __len__(self) -> int:
+        return len(self._resolvers)
+
+    def copy(self) -> Dict[str, Any]:
+        """Returns a plain dict with every value resolved."""
+        return dict(self)
+
+    def resolved(self) -> Dict[str, Any]:
+        """Returns the values resolved so far."""
+        with self._lock:
+            return dict(self._values)
+
+
+@functools.lru_cache(maxsize=None)
+def _region() -> str:
+    return get_region()
+
+
+REPLACEMENT_VALUES = LazyReplacementValues({
+    "SAGEMAKER_DATA_BUCKET": lambda: get_bootstrap_resources().DataBucket.name,
+    "SAGEMAKER_EXECUTION_ROLE_ARN": lambda: get_bootstrap_resources().SageMakerExecutionRole.arn,
+    "SAGEMAKER_XGBOOST_IMAGE_URI": lambda: f"{SAGEMAKER_XGBOOST_IMAGE_URIS[_region()]}/sagemaker-xgboost:1.0-1-cpu-py3",
+    "ENDPOINT_INSTANCE_TYPE": lambda: ENDPOINT_INSTANCE_TYPES.get(_region(), 'ml.c5.large'),
+})
@@ -14,24 +14,31 @@
 integration tests.
 """
 
-import boto3
 import logging
-from time import sleep
-import json, yaml, os
-import time
-import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
 
-from acktest import resources
 from acktest.bootstrapping import Resources, BootstrapFailureException
 from acktest.bootstrapping.iam import Role
 from acktest.bootstrapping.s3 import Bucket
 from acktest.aws.identity import get_region, get_account_id
 from e2e import bootstrap_directory
-from acktest.aws.s3 import duplicate_bucket_contents
+from e2e.bootstrap_manifest import (
+    BootstrapManifest,
+    DataBucketEntry,
+    bootstrap_incrementally,
+    load_previous,
+)
 from e2e.bootstrap_resources import TestBootstrapResources, SAGEMAKER_SOURCE_DATA_BUCKET
+from e2e.common.s3_copy import S3Copier
 
 
-def service_bootstrap() -> Resources:
+def bootstrap(
+    directory: Path = bootstrap_directory,
+) -> Tuple[TestBootstrapResources, BootstrapManifest]:
+    """Bootstraps the test resources, re-applying only what changed since the
+    bootstrap recorded in `directory`, and returns them with their manifest.
+    """
     logging.getLogger().setLevel(logging.INFO)
 
     region = get_region()
@@ -49,51 +56,51 @@ def service_bootstrap() -> Resources:
             ],
         ),
     )
+    previous, previous_manifest = load_previous(TestBootstrapResources, directory)
     try:
-        resources.bootstrap()
-        sync_data_bucket(resources.DataBucket)
+        manifest, _ = bootstrap_incrementally(resources, previous, previous_manifest)
+        manifest.data_bucket = sync_data_bucket(
+            resources.DataBucket,
+            previous_manifest.data_bucket if previous_manifest else None,
+        )
     except BootstrapFailureException as ex:
         exit(254)
+    return resources, manifest
+
+
+def bootstrap_and_save(directory: Path = bootstrap_directory) -> TestBootstrapResources:
+    """Bootstraps the test resources and writes their state to `directory`."""
+    resources, manifest = bootstrap(directory)
+    resources.serialize(directory)
+    manifest.write(directory)
     return resources
 
 
-def sync_data_bucket(bucket) -> str:
-    bucket_name = bucket.name
-    region = get_region()
-    s3_resource = boto3.resource("s3", region_name=region)
-
-    source_bucket = s3_resource.Bucket(SAGEMAKER_SOURCE_DATA_BUCKET)
-    destination_bucket = s3_resource.Bucket(bucket_name)
-    temp_dir = "/tmp/ack_s3_data"
-    # awscli is not installed in test-infra container hence use boto3 to copy in us-west-2
-    if region == "us-west-2":
-        duplicate_bucket_contents(source_bucket, destination_bucket)
-        # above method does an async copy
-        # TODO: find a way to remove random wait
-        sleep(180)
-    else:
-        # workaround to copy if buckets are across regions
-        # TODO: check if there is a better way and merge to test-infra
-        subprocess.call(["mkdir", f"{temp_dir}"])
-        subprocess.call(
-            [
-                "aws",
-                "s3",
-                "sync",
-                f"s3://{SAGEMAKER_SOURCE_DATA_BUCKET}",
-                f"./{temp_dir}/",
-                "--quiet",
-            ]
-        )
-        subprocess.call(
-            ["aws", "s3", "sync", f"./{temp_dir}/", f"s3://{bucket_name}", "--quiet"]
+def service_bootstrap() -> Resources:
+    resources, _ = bootstrap()
+    return resources
+
+
+def sync_data_bucket(bucket, previous: Optional[DataBucketEntry] = None) -> DataBucketEntry:
+    copier = S3Copier()
+    digest = copier.source_digest(SAGEMAKER_SOURCE_DATA_BUCKET)
+    if previous == DataBucketEntry(bucket.name, SAGEMAKER_SOURCE_DATA_BUCKET, digest):
+        logging.info("Data bucket is up to date")
+        return previous
+
+    # Server-side copy that also works across regions, skips objects that
+    # are already up to date and returns once the copies are visible
+    report = copier.sync(SAGEMAKER_SOURCE_DATA_BUCKET, bucket.name)
+    if report.failed:
+        logging.error(f"Failed to copy to data bucket: {report.failed}")
+        raise BootstrapFailureException(
+            f"Failed to copy {len(report.failed)} objects to {bucket.name}"
         )
     logging.info(f"Synced data bucket")
 
-    return bucket
+    return DataBucketEntry(bucket.name, SAGEMAKER_SOURCE_DATA_BUCKET, report.source_digest)
 
 
 if __name__ == "__main__":
-    config = service_bootstrap()
     # Write config to current directory by default
-    config.serialize(bootstrap_directory)
+    bootstrap_and_save(bootstrap_directory)
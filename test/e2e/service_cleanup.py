@@ -18,13 +18,38 @@ import logging
 from acktest.bootstrapping import Resources
 
 from e2e import bootstrap_directory
+from e2e.bootstrap_manifest import BootstrapManifest
+from e2e.common.endpoint_pool import EndpointPool
+from e2e.common.janitor import Janitor
+from e2e.common.workers import cleanup_worker_resources, cross_worker_lock
 
 
 def service_cleanup():
     logging.getLogger().setLevel(logging.INFO)
 
-    resources = Resources.deserialize(bootstrap_directory)
-    resources.cleanup()
+    with cross_worker_lock("bootstrap"):
+        # Resources left behind by test workers that crashed or were
+        # interrupted, which may still depend on the bootstrapped ones
+        leftovers = cleanup_worker_resources()
+        if leftovers["skipped"]:
+            # The bootstrapped resources are still in use
+            logging.warning(
+                f"Test workers still running, skipping cleanup: {leftovers['skipped']}"
+            )
+            return
+
+        # Targets and policies leaked by earlier aborted runs
+        report = Janitor().run()
+        if report.failed:
+            logging.warning(f"Failed to delete leaked resources: {report.failed}")
+
+        # Pooled endpoints outlive the session; only the idle ones go
+        EndpointPool().collect_idle()
+
+        resources = Resources.deserialize(bootstrap_directory)
+        resources.cleanup()
+        # The resources are gone, so the next bootstrap must not reuse them
+        BootstrapManifest.remove(bootstrap_directory)
 
 
 if __name__ == "__main__":
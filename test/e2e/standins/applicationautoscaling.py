@@ -0,0 +1,608 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Local stand-in for the Application Auto Scaling API.
+
+Speaks the awsJson1_1 protocol used by both boto3 and aws-sdk-go-v2, so the
+Python helpers (through the shared client registry) and the controller
+(through ``--aws-endpoint-url``) can both be pointed at it. It runs either
+in-process via `StandInServer` or as a sidecar::
+
+    python -m e2e.standins.applicationautoscaling --port 4566
+
+Besides the API itself, ``GET /_standin/stats`` returns per-operation call and
+throttle counts, ``POST /_standin/reset`` clears state and counters, and
+``POST /_standin/config`` changes ``tps_limits``, ``throttle_probability`` or
+``latency`` of a running stand-in.
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+TARGET_PREFIX = "AnyScaleFrontendService."
+
+DEFAULT_REGION = "us-west-2"
+DEFAULT_ACCOUNT_ID = "123456789012"
+DEFAULT_PAGE_SIZE = 50
+
+
+class APIError(Exception):
+    def __init__(self, code: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour knobs of the stand-in.
+
+    `latency` (plus up to `latency_jitter`) seconds are added to every call.
+    `tps_limits` caps each named operation with a token bucket, and
+    `throttle_probability` throttles a random fraction of every call; both
+    answer with ThrottlingException. `page_size` caps MaxResults so callers
+    have to follow NextToken.
+    """
+
+    region: str = DEFAULT_REGION
+    account_id: str = DEFAULT_ACCOUNT_ID
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    tps_limits: Dict[str, float] = field(default_factory=dict)
+    throttle_probability: float = 0.0
+    page_size: int = DEFAULT_PAGE_SIZE
+    seed: Optional[int] = None
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+TargetKey = Tuple[str, str, str]
+PolicyKey = Tuple[str, str, str, str]
+ScheduledActionKey = Tuple[str, str, str, str]
+
+
+class ApplicationAutoScalingBackend:
+    """In-memory state and operation handlers of the stand-in."""
+
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self._lock = threading.RLock()
+        self._rng = random.Random(self.config.seed)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.targets: Dict[TargetKey, Dict] = {}
+            self.policies: Dict[PolicyKey, Dict] = {}
+            self.scheduled_actions: Dict[ScheduledActionKey, Dict] = {}
+            # Scaling activities are never generated by the stand-in; tests
+            # seed them with `add_activity`
+            self.activities: List[Dict] = []
+            self.calls: Dict[str, int] = defaultdict(int)
+            self.throttled: Dict[str, int] = defaultdict(int)
+            self.requests: List[Tuple[str, Dict]] = []
+            self._buckets = {
+                op: _TokenBucket(rate) for op, rate in self.config.tps_limits.items()
+            }
+
+    def configure(
+        self,
+        tps_limits: Optional[Dict[str, float]] = None,
+        throttle_probability: Optional[float] = None,
+        latency: Optional[float] = None,
+    ):
+        """Changes throttling and latency without clearing any state."""
+        with self._lock:
+            if tps_limits is not None:
+                self.config.tps_limits = dict(tps_limits)
+                self._buckets = {
+                    op: _TokenBucket(rate) for op, rate in tps_limits.items()
+                }
+            if throttle_probability is not None:
+                self.config.throttle_probability = throttle_probability
+            if latency is not None:
+                self.config.latency = latency
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "throttled": dict(self.throttled),
+                "targets": len(self.targets),
+                "policies": len(self.policies),
+                "scheduled_actions": len(self.scheduled_actions),
+                "activities": len(self.activities),
+            }
+
+    def add_activity(self, activity: Dict):
+        """Records a scaling activity, returned newest first by
+        DescribeScalingActivities.
+        """
+        with self._lock:
+            self.activities.insert(0, dict(activity))
+
+    def handle(self, operation: str, params: Dict) -> Dict:
+        delay = self.config.latency
+        if self.config.latency_jitter:
+            delay += self._rng.uniform(0, self.config.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.calls[operation] += 1
+            self.requests.append((operation, params))
+            bucket = self._buckets.get(operation)
+            throttled = (bucket is not None and not bucket.take()) or (
+                self._rng.random() < self.config.throttle_probability
+            )
+            if throttled:
+                self.throttled[operation] += 1
+                raise APIError("ThrottlingException", "Rate exceeded")
+
+            handler = getattr(self, f"_op_{operation}", None)
+            if handler is None:
+                raise APIError(
+                    "UnknownOperationException", f"Unsupported operation {operation}"
+                )
+            return handler(params)
+
+    def _paginate(self, items: List[Dict], params: Dict, key: str) -> Dict:
+        max_results = min(
+            params.get("MaxResults") or DEFAULT_PAGE_SIZE, self.config.page_size
+        )
+        try:
+            start = int(params.get("NextToken") or 0)
+        except ValueError:
+            raise APIError("InvalidNextTokenException", "Invalid NextToken")
+        page = items[start : start + max_results]
+        result = {key: page}
+        if start + max_results < len(items):
+            result["NextToken"] = str(start + max_results)
+        return result
+
+    @staticmethod
+    def _require(params: Dict, *names: str):
+        for name in names:
+            if not params.get(name):
+                raise APIError("ValidationException", f"{name} is required")
+
+    @staticmethod
+    def _target_key(params: Dict) -> TargetKey:
+        return (
+            params["ServiceNamespace"],
+            params["ResourceId"],
+            params["ScalableDimension"],
+        )
+
+    def _op_RegisterScalableTarget(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace", "ResourceId", "ScalableDimension")
+        key = self._target_key(params)
+        existing = self.targets.get(key)
+        if existing is None and ("MinCapacity" not in params or "MaxCapacity" not in params):
+            raise APIError(
+                "ValidationException",
+                "MinCapacity and MaxCapacity are required to register a new scalable target",
+            )
+        # Validate against the capacities the target would end up with, so a
+        # rejected call leaves the target as it was
+        current = existing or {}
+        min_capacity = params.get("MinCapacity", current.get("MinCapacity"))
+        max_capacity = params.get("MaxCapacity", current.get("MaxCapacity"))
+        if min_capacity > max_capacity:
+            raise APIError(
+                "ValidationException", "MinCapacity cannot be greater than MaxCapacity"
+            )
+
+        target = existing
+        if target is None:
+            namespace = params["ServiceNamespace"]
+            target = {
+                "ServiceNamespace": namespace,
+                "ResourceId": params["ResourceId"],
+                "ScalableDimension": params["ScalableDimension"],
+                "RoleARN": (
+                    f"arn:aws:iam::{self.config.account_id}:role/aws-service-role/"
+                    f"{namespace}.application-autoscaling.amazonaws.com/"
+                    f"AWSServiceRoleForApplicationAutoScaling_{namespace}"
+                ),
+                "CreationTime": time.time(),
+                "SuspendedState": {
+                    "DynamicScalingInSuspended": False,
+                    "DynamicScalingOutSuspended": False,
+                    "ScheduledScalingSuspended": False,
+                },
+                "ScalableTargetARN": (
+                    f"arn:aws:application-autoscaling:{self.config.region}:"
+                    f"{self.config.account_id}:scalable-target/{uuid.uuid4().hex}"
+                ),
+            }
+            self.targets[key] = target
+        for name in ("MinCapacity", "MaxCapacity", "RoleARN"):
+            if name in params:
+                target[name] = params[name]
+        if "SuspendedState" in params:
+            target["SuspendedState"].update(params["SuspendedState"])
+        return {"ScalableTargetARN": target["ScalableTargetARN"]}
+
+    def _op_DescribeScalableTargets(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace")
+        resource_ids = params.get("ResourceIds")
+        dimension = params.get("ScalableDimension")
+        items = [
+            dict(t)
+            for t in self.targets.values()
+            if t["ServiceNamespace"] == params["ServiceNamespace"]
+            and (not resource_ids or t["ResourceId"] in resource_ids)
+            and (not dimension or t["ScalableDimension"] == dimension)
+        ]
+        return self._paginate(items, params, "ScalableTargets")
+
+    def _op_DeregisterScalableTarget(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace", "ResourceId", "ScalableDimension")
+        key = self._target_key(params)
+        if key not in self.targets:
+            raise APIError(
+                "ObjectNotFoundException",
+                f"No scalable target found for service namespace: {key[0]}, "
+                f"resource ID: {key[1]}, scalable dimension: {key[2]}",
+            )
+        del self.targets[key]
+        for policy_key in [k for k in self.policies if k[:3] == key]:
+            del self.policies[policy_key]
+        for action_key in [k for k in self.scheduled_actions if k[:3] == key]:
+            del self.scheduled_actions[action_key]
+        return {}
+
+    def _op_PutScalingPolicy(self, params: Dict) -> Dict:
+        self._require(
+            params, "PolicyName", "ServiceNamespace", "ResourceId", "ScalableDimension"
+        )
+        key = self._target_key(params)
+        if key not in self.targets:
+            raise APIError(
+                "ObjectNotFoundException",
+                f"No scalable target registered for service namespace: {key[0]}, "
+                f"resource ID: {key[1]}, scalable dimension: {key[2]}",
+            )
+        policy_key = key + (params["PolicyName"],)
+        policy = self.policies.get(policy_key)
+        if policy is None:
+            policy = {
+                "PolicyARN": (
+                    f"arn:aws:autoscaling:{self.config.region}:{self.config.account_id}:"
+                    f"scalingPolicy:{uuid.uuid4()}:resource/{key[0]}/{key[1]}:"
+                    f"policyName/{params['PolicyName']}"
+                ),
+                "PolicyName": params["PolicyName"],
+                "ServiceNamespace": key[0],
+                "ResourceId": key[1],
+                "ScalableDimension": key[2],
+                "CreationTime": time.time(),
+                "Alarms": [],
+            }
+            self.policies[policy_key] = policy
+        policy["PolicyType"] = params.get("PolicyType", "StepScaling")
+        for name in (
+            "StepScalingPolicyConfiguration",
+            "TargetTrackingScalingPolicyConfiguration",
+        ):
+            if name in params:
+                policy[name] = params[name]
+            else:
+                policy.pop(name, None)
+        return {"PolicyARN": policy["PolicyARN"], "Alarms": policy["Alarms"]}
+
+    def _op_DescribeScalingPolicies(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace")
+        names = params.get("PolicyNames")
+        resource_id = params.get("ResourceId")
+        dimension = params.get("ScalableDimension")
+        items = [
+            dict(p)
+            for p in self.policies.values()
+            if p["ServiceNamespace"] == params["ServiceNamespace"]
+            and (not names or p["PolicyName"] in names)
+            and (not resource_id or p["ResourceId"] == resource_id)
+            and (not dimension or p["ScalableDimension"] == dimension)
+        ]
+        return self._paginate(items, params, "ScalingPolicies")
+
+    def _op_DeleteScalingPolicy(self, params: Dict) -> Dict:
+        self._require(
+            params, "PolicyName", "ServiceNamespace", "ResourceId", "ScalableDimension"
+        )
+        policy_key = self._target_key(params) + (params["PolicyName"],)
+        if policy_key not in self.policies:
+            raise APIError(
+                "ObjectNotFoundException",
+                f"No scaling policy found for service namespace: {policy_key[0]}, "
+                f"resource ID: {policy_key[1]}, scalable dimension: {policy_key[2]}, "
+                f"policy name: {policy_key[3]}",
+            )
+        del self.policies[policy_key]
+        return {}
+
+    def _op_DescribeScalingActivities(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace")
+        resource_id = params.get("ResourceId")
+        dimension = params.get("ScalableDimension")
+        include_not_scaled = params.get("IncludeNotScaledActivities", False)
+        items = [
+            dict(a)
+            for a in self.activities
+            if a["ServiceNamespace"] == params["ServiceNamespace"]
+            and (not resource_id or a["ResourceId"] == resource_id)
+            and (not dimension or a["ScalableDimension"] == dimension)
+            and (include_not_scaled or not a.get("NotScaledReasons"))
+        ]
+        return self._paginate(items, params, "ScalingActivities")
+
+    def _op_PutScheduledAction(self, params: Dict) -> Dict:
+        self._require(
+            params,
+            "ScheduledActionName",
+            "ServiceNamespace",
+            "ResourceId",
+            "ScalableDimension",
+        )
+        key = self._target_key(params)
+        if key not in self.targets:
+            raise APIError(
+                "ObjectNotFoundException",
+                f"No scalable target registered for service namespace: {key[0]}, "
+                f"resource ID: {key[1]}, scalable dimension: {key[2]}",
+            )
+        action_key = key + (params["ScheduledActionName"],)
+        action = self.scheduled_actions.get(action_key)
+        if action is None:
+            action = {
+                "ScheduledActionARN": (
+                    f"arn:aws:autoscaling:{self.config.region}:{self.config.account_id}:"
+                    f"scheduledAction:{uuid.uuid4()}:resource/{key[0]}/{key[1]}:"
+                    f"scheduledActionName/{params['ScheduledActionName']}"
+                ),
+                "ScheduledActionName": params["ScheduledActionName"],
+                "ServiceNamespace": key[0],
+                "ResourceId": key[1],
+                "ScalableDimension": key[2],
+                "CreationTime": time.time(),
+            }
+            self.scheduled_actions[action_key] = action
+        for name in (
+            "Schedule",
+            "Timezone",
+            "StartTime",
+            "EndTime",
+            "ScalableTargetAction",
+        ):
+            if name in params:
+                action[name] = params[name]
+        return {}
+
+    def _op_DescribeScheduledActions(self, params: Dict) -> Dict:
+        self._require(params, "ServiceNamespace")
+        names = params.get("ScheduledActionNames")
+        resource_id = params.get("ResourceId")
+        dimension = params.get("ScalableDimension")
+        items = [
+            dict(a)
+            for a in self.scheduled_actions.values()
+            if a["ServiceNamespace"] == params["ServiceNamespace"]
+            and (not names or a["ScheduledActionName"] in names)
+            and (not resource_id or a["ResourceId"] == resource_id)
+            and (not dimension or a["ScalableDimension"] == dimension)
+        ]
+        return self._paginate(items, params, "ScheduledActions")
+
+    def _op_DeleteScheduledAction(self, params: Dict) -> Dict:
+        self._require(
+            params,
+            "ScheduledActionName",
+            "ServiceNamespace",
+            "ResourceId",
+            "ScalableDimension",
+        )
+        action_key = self._target_key(params) + (params["ScheduledActionName"],)
+        if action_key not in self.scheduled_actions:
+            raise APIError(
+                "ObjectNotFoundException",
+                f"No scheduled action found for service namespace: {action_key[0]}, "
+                f"resource ID: {action_key[1]}, scalable dimension: {action_key[2]}, "
+                f"scheduled action name: {action_key[3]}",
+            )
+        del self.scheduled_actions[action_key]
+        return {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend: ApplicationAutoScalingBackend = None
+
+    def log_message(self, format, *args):
+        logging.debug("standin: " + format, *args)
+
+    def _send(self, status: int, body: Dict, headers: Dict[str, str] = {}):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/_standin/stats":
+            self._send(200, self.backend.stats())
+        else:
+            self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path == "/_standin/reset":
+            self.backend.reset()
+            self._send(200, {})
+            return
+        if self.path == "/_standin/config":
+            self.backend.configure(**json.loads(body or b"{}"))
+            self._send(200, {})
+            return
+
+        target = self.headers.get("X-Amz-Target", "")
+        if not target.startswith(TARGET_PREFIX):
+            self._send(400, {"__type": "UnknownOperationException", "message": target})
+            return
+        try:
+            params = json.loads(body or b"{}")
+            result = self.backend.handle(target[len(TARGET_PREFIX) :], params)
+        except APIError as err:
+            self._send(
+                err.status,
+                {"__type": err.code, "message": err.message},
+                {"x-amzn-ErrorType": err.code},
+            )
+            return
+        self._send(200, result)
+
+
+class StandInServer:
+    """Runs the stand-in on a background thread.
+
+    Usable as a context manager; `endpoint_url` is valid once started.
+    """
+
+    def __init__(
+        self,
+        config: Optional[StandInConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.backend = ApplicationAutoScalingBackend(config)
+        handler = type("Handler", (_Handler,), {"backend": self.backend})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def remote_stats(endpoint_url: str) -> Dict:
+    """Returns the stats of a stand-in running in another process."""
+    with urllib.request.urlopen(endpoint_url.rstrip("/") + "/_standin/stats") as response:
+        return json.load(response)
+
+
+def remote_configure(endpoint_url: str, **settings):
+    """Calls `ApplicationAutoScalingBackend.configure` on a stand-in running in
+    another process.
+    """
+    request = urllib.request.Request(
+        endpoint_url.rstrip("/") + "/_standin/config",
+        data=json.dumps(settings).encode(),
+        method="POST",
+    )
+    urllib.request.urlopen(request).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4566)
+    parser.add_argument("--region", default=DEFAULT_REGION)
+    parser.add_argument("--account-id", default=DEFAULT_ACCOUNT_ID)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--tps-limit",
+        action="append",
+        default=[],
+        metavar="OPERATION=TPS",
+        help="Token bucket limit for an operation; may be repeated",
+    )
+    parser.add_argument("--throttle-probability", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    tps_limits = {}
+    for limit in args.tps_limit:
+        operation, tps = limit.split("=", 1)
+        tps_limits[operation] = float(tps)
+
+    server = StandInServer(
+        StandInConfig(
+            region=args.region,
+            account_id=args.account_id,
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            tps_limits=tps_limits,
+            throttle_probability=args.throttle_probability,
+            page_size=args.page_size,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    logging.info(f"Application Auto Scaling stand-in listening on {server.endpoint_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Local stand-in for the subset of the S3 API used by the bootstrap.
+
+Serves path-style REST requests for buckets (create, head, list objects) and
+objects (put, get, head, copy, multipart copy), which is enough to exercise
+`e2e.common.s3_copy` without AWS. Each bucket remembers the region it was
+created in and reports it through ``x-amz-bucket-region``, so cross-region
+copies can be tested against a single server. Run it in-process via
+`S3StandInServer` or as a sidecar::
+
+    python -m e2e.standins.s3 --port 4567
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+DEFAULT_REGION = "us-west-2"
+XML_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+DEFAULT_MAX_KEYS = 1000
+
+
+class S3Error(Exception):
+    def __init__(self, code: str, message: str, status: int):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+@dataclass
+class S3Object:
+    body: bytes
+    etag: str
+    metadata: Dict[str, str] = field(default_factory=dict)
+    last_modified: datetime.datetime = field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+
+
+@dataclass
+class S3Bucket:
+    region: str
+    objects: Dict[str, S3Object] = field(default_factory=dict)
+
+
+def _md5_etag(body: bytes) -> str:
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _timestamp(when: datetime.datetime) -> str:
+    return when.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class S3Backend:
+    """In-memory buckets, objects and multipart uploads of the stand-in."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.buckets: Dict[str, S3Bucket] = {}
+            # upload id: (bucket, key, metadata, {part number: (etag, body)})
+            self.uploads: Dict[str, Tuple[str, str, Dict, Dict[int, Tuple[str, bytes]]]] = {}
+            self.calls: Dict[str, int] = defaultdict(int)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "buckets": {name: len(b.objects) for name, b in self.buckets.items()},
+            }
+
+    def count(self, operation: str):
+        with self._lock:
+            self.calls[operation] += 1
+
+    def create_bucket(self, name: str, region: str = DEFAULT_REGION):
+        with self._lock:
+            self.buckets.setdefault(name, S3Bucket(region))
+
+    def bucket(self, name: str) -> S3Bucket:
+        with self._lock:
+            bucket = self.buckets.get(name)
+        if bucket is None:
+            raise S3Error("NoSuchBucket", f"The specified bucket does not exist: {name}", 404)
+        return bucket
+
+    def get_object(self, bucket: str, key: str) -> S3Object:
+        with self._lock:
+            obj = self.bucket(bucket).objects.get(key)
+        if obj is None:
+            raise S3Error("NoSuchKey", f"The specified key does not exist: {key}", 404)
+        return obj
+
+    def put_object(
+        self, bucket: str, key: str, body: bytes, metadata: Optional[Dict] = None
+    ) -> S3Object:
+        obj = S3Object(body, _md5_etag(body), dict(metadata or {}))
+        with self._lock:
+            self.bucket(bucket).objects[key] = obj
+        return obj
+
+    def list_objects(self, bucket: str, prefix: str, start_after: str, max_keys: int):
+        with self._lock:
+            keys = sorted(
+                k
+                for k in self.bucket(bucket).objects
+                if k.startswith(prefix) and k > start_after
+            )
+            page = keys[:max_keys]
+            return (
+                [(k, self.buckets[bucket].objects[k]) for k in page],
+                len(keys) > max_keys,
+            )
+
+    def create_upload(self, bucket: str, key: str, metadata: Dict) -> str:
+        self.bucket(bucket)
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self.uploads[upload_id] = (bucket, key, dict(metadata), {})
+        return upload_id
+
+    def put_part(self, upload_id: str, number: int, body: bytes) -> str:
+        etag = _md5_etag(body)
+        with self._lock:
+            upload = self.uploads.get(upload_id)
+            if upload is None:
+                raise S3Error("NoSuchUpload", "The specified upload does not exist", 404)
+            upload[3][number] = (etag, body)
+        return etag
+
+    def complete_upload(self, upload_id: str, parts: List[Tuple[int, str]]) -> S3Object:
+        with self._lock:
+            upload = self.uploads.pop(upload_id, None)
+        if upload is None:
+            raise S3Error("NoSuchUpload", "The specified upload does not exist", 404)
+        bucket, key, metadata, stored = upload
+        body = b""
+        digests = b""
+        for number, etag in parts:
+            if number not in stored or stored[number][0] != etag:
+                raise S3Error("InvalidPart", f"Part {number} was not uploaded", 400)
+            body += stored[number][1]
+            digests += hashlib.md5(stored[number][1]).digest()
+        obj = S3Object(
+            body, f'"{hashlib.md5(digests).hexdigest()}-{len(parts)}"', metadata
+        )
+        with self._lock:
+            self.bucket(bucket).objects[key] = obj
+        return obj
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    backend: S3Backend = None
+
+    def log_message(self, format, *args):
+        logging.debug("s3 standin: " + format, *args)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        send_body: bool = True,
+    ):
+        self.send_response(status)
+        self.send_header("x-amz-request-id", uuid.uuid4().hex)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def _send_xml(self, root: str, children: str, headers: Optional[Dict] = None):
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<{root} xmlns="{XML_NAMESPACE}">{children}</{root}>'
+        ).encode()
+        self._send(200, body, dict(headers or {}, **{"Content-Type": "application/xml"}))
+
+    def _send_error(self, err: S3Error, send_body: bool = True):
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{err.code}</Code>'
+            f"<Message>{escape(err.message)}</Message></Error>"
+        ).encode()
+        self._send(err.status, body, {"Content-Type": "application/xml"}, send_body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _parse(self) -> Tuple[str, str, Dict[str, str]]:
+        url = urlparse(self.path)
+        parts = url.path.lstrip("/").split("/", 1)
+        bucket = unquote(parts[0])
+        key = unquote(parts[1]) if len(parts) > 1 else ""
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        return bucket, key, query
+
+    def _metadata(self) -> Dict[str, str]:
+        return {
+            name[len("x-amz-meta-") :].lower(): value
+            for name, value in self.headers.items()
+            if name.lower().startswith("x-amz-meta-")
+        }
+
+    def _object_headers(self, obj: S3Object) -> Dict[str, str]:
+        headers = {
+            "ETag": obj.etag,
+            "Last-Modified": obj.last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "Content-Type": "binary/octet-stream",
+        }
+        for name, value in obj.metadata.items():
+            headers[f"x-amz-meta-{name}"] = value
+        return headers
+
+    def _dispatch(self, method: str):
+        send_body = method != "HEAD"
+        try:
+            body = self._read_body() if method in ("PUT", "POST") else b""
+            if self.path.startswith("/_standin/"):
+                return self._standin(method)
+            bucket, key, query = self._parse()
+            handler = getattr(self, f"_{method.lower()}_{'object' if key else 'bucket'}")
+            handler(bucket, key, query, body)
+        except S3Error as err:
+            self._send_error(err, send_body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _standin(self, method: str):
+        if method == "GET" and self.path == "/_standin/stats":
+            self._send(200, json.dumps(self.backend.stats()).encode())
+        elif method == "POST" and self.path == "/_standin/reset":
+            self.backend.reset()
+            self._send(200)
+        else:
+            self._send(404)
+
+    def _put_bucket(self, bucket, key, query, body):
+        self.backend.count("CreateBucket")
+        region = DEFAULT_REGION
+        if body:
+            constraint = ElementTree.fromstring(body).find(
+                f"{{{XML_NAMESPACE}}}LocationConstraint"
+            )
+            if constraint is not None and constraint.text:
+                region = constraint.text
+        self.backend.create_bucket(bucket, region)
+        self._send(200, headers={"Location": f"/{bucket}"})
+
+    def _head_bucket(self, bucket, key, query, body):
+        self.backend.count("HeadBucket")
+        region = self.backend.bucket(bucket).region
+        self._send(200, headers={"x-amz-bucket-region": region}, send_body=False)
+
+    def _get_bucket(self, bucket, key, query, body):
+        if "location" in query:
+            self.backend.count("GetBucketLocation")
+            region = self.backend.bucket(bucket).region
+            self._send_xml("LocationConstraint", "" if region == "us-east-1" else region)
+            return
+        self.backend.count("ListObjectsV2")
+        prefix = query.get("prefix", "")
+        max_keys = int(query.get("max-keys") or DEFAULT_MAX_KEYS)
+        start_after = query.get("continuation-token") or query.get("start-after", "")
+        items, truncated = self.backend.list_objects(bucket, prefix, start_after, max_keys)
+        contents = "".join(
+            f"<Contents><Key>{escape(k)}</Key>"
+            f"<LastModified>{_timestamp(o.last_modified)}</LastModified>"
+            f"<ETag>{escape(o.etag)}</ETag><Size>{len(o.body)}</Size>"
+            f"<StorageClass>STANDARD</StorageClass></Contents>"
+            for k, o in items
+        )
+        next_token = (
+            f"<NextContinuationToken>{escape(items[-1][0])}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        self._send_xml(
+            "ListBucketResult",
+            f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(items)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"
+            f"{contents}{next_token}",
+        )
+
+    def _copy_source(self) -> Optional[Tuple[bytes, S3Object]]:
+        source = self.headers.get("x-amz-copy-source")
+        if not source:
+            return None
+        source_bucket, source_key = unquote(source.split("?", 1)[0]).lstrip("/").split("/", 1)
+        obj = self.backend.get_object(source_bucket, source_key)
+        copy_range = self.headers.get("x-amz-copy-source-range")
+        if copy_range:
+            start, end = copy_range[len("bytes=") :].split("-")
+            return obj.body[int(start) : int(end) + 1], obj
+        return obj.body, obj
+
+    def _put_object(self, bucket, key, query, body):
+        copied = self._copy_source()
+        if "uploadId" in query:
+            number = int(query["partNumber"])
+            if copied is not None:
+                self.backend.count("UploadPartCopy")
+                etag = self.backend.put_part(query["uploadId"], number, copied[0])
+                self._send_xml(
+                    "CopyPartResult",
+                    f"<ETag>{escape(etag)}</ETag>"
+                    f"<LastModified>{_timestamp(copied[1].last_modified)}</LastModified>",
+                )
+            else:
+                self.backend.count("UploadPart")
+                etag = self.backend.put_part(query["uploadId"], number, body)
+                self._send(200, headers={"ETag": etag})
+            return
+        if copied is not None:
+            self.backend.count("CopyObject")
+            source_body, source = copied
+            metadata = (
+                self._metadata()
+                if self.headers.get("x-amz-metadata-directive") == "REPLACE"
+                else source.metadata
+            )
+            obj = self.backend.put_object(bucket, key, source_body, metadata)
+            self._send_xml(
+                "CopyObjectResult",
+                f"<ETag>{escape(obj.etag)}</ETag>"
+                f"<LastModified>{_timestamp(obj.last_modified)}</LastModified>",
+            )
+            return
+        self.backend.count("PutObject")
+        obj = self.backend.put_object(bucket, key, body, self._metadata())
+        self._send(200, headers={"ETag": obj.etag})
+
+    def _get_object(self, bucket, key, query, body):
+        self.backend.count("GetObject")
+        obj = self.backend.get_object(bucket, key)
+        self._send(200, obj.body, self._object_headers(obj))
+
+    def _head_object(self, bucket, key, query, body):
+        self.backend.count("HeadObject")
+        obj = self.backend.get_object(bucket, key)
+        headers = self._object_headers(obj)
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(obj.body)))
+        self.end_headers()
+
+    def _post_object(self, bucket, key, query, body):
+        if "uploads" in query:
+            self.backend.count("CreateMultipartUpload")
+            upload_id = self.backend.create_upload(bucket, key, self._metadata())
+            self._send_xml(
+                "InitiateMultipartUploadResult",
+                f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+                f"<UploadId>{upload_id}</UploadId>",
+            )
+            return
+        self.backend.count("CompleteMultipartUpload")
+        root = ElementTree.fromstring(body)
+        parts = [
+            (
+                int(part.find(f"{{{XML_NAMESPACE}}}PartNumber").text),
+                part.find(f"{{{XML_NAMESPACE}}}ETag").text,
+            )
+            for part in root.iter(f"{{{XML_NAMESPACE}}}Part")
+        ]
+        obj = self.backend.complete_upload(query["uploadId"], parts)
+        self._send_xml(
+            "CompleteMultipartUploadResult",
+            f"<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+            f"<ETag>{escape(obj.etag)}</ETag>",
+        )
+
+
+class S3StandInServer:
+    """Runs the S3 stand-in on a background thread.
+
+    Usable as a context manager; `endpoint_url` is valid once started.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.backend = S3Backend()
+        handler = type("Handler", (_Handler,), {"backend": self.backend})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "S3StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "S3StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4567)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    server = S3StandInServer(host=args.host, port=args.port)
+    logging.info(f"S3 stand-in listening on {server.endpoint_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
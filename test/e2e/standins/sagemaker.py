@@ -0,0 +1,320 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Local stand-in for the subset of the SageMaker API used by the tests.
+
+Handles models, endpoint configs, endpoints and their tags over the
+awsJson1_1 protocol, which is enough to exercise the endpoint pool without
+AWS. Endpoints are ``Creating`` for `creation_seconds` after CreateEndpoint
+and ``InService`` afterwards. Run it in-process via `SageMakerStandInServer`
+or as a sidecar::
+
+    python -m e2e.standins.sagemaker --port 4568
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from e2e.standins.applicationautoscaling import (
+    APIError,
+    DEFAULT_ACCOUNT_ID,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_REGION,
+)
+
+TARGET_PREFIX = "SageMaker."
+
+
+class SageMakerBackend:
+    """In-memory state and operation handlers of the SageMaker stand-in."""
+
+    def __init__(
+        self,
+        region: str = DEFAULT_REGION,
+        account_id: str = DEFAULT_ACCOUNT_ID,
+        creation_seconds: float = 0.0,
+    ):
+        self.region = region
+        self.account_id = account_id
+        self.creation_seconds = creation_seconds
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.models: Dict[str, Dict] = {}
+            self.endpoint_configs: Dict[str, Dict] = {}
+            self.endpoints: Dict[str, Dict] = {}
+            self.tags: Dict[str, Dict[str, str]] = {}
+            self.calls: Dict[str, int] = defaultdict(int)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "models": len(self.models),
+                "endpoint_configs": len(self.endpoint_configs),
+                "endpoints": len(self.endpoints),
+            }
+
+    def handle(self, operation: str, params: Dict) -> Dict:
+        with self._lock:
+            self.calls[operation] += 1
+            handler = getattr(self, f"_op_{operation}", None)
+            if handler is None:
+                raise APIError(
+                    "UnknownOperationException", f"Unsupported operation {operation}"
+                )
+            return handler(params)
+
+    def _arn(self, kind: str, name: str) -> str:
+        return f"arn:aws:sagemaker:{self.region}:{self.account_id}:{kind}/{name.lower()}"
+
+    def _set_tags(self, arn: str, tags: List[Dict]):
+        current = self.tags.setdefault(arn, {})
+        for tag in tags or []:
+            current[tag["Key"]] = tag["Value"]
+
+    @staticmethod
+    def _missing(kind: str, name: str) -> APIError:
+        return APIError("ValidationException", f"Could not find {kind} \"{name}\".")
+
+    def _create(self, store: Dict, kind: str, name: str, params: Dict) -> str:
+        if name in store:
+            raise APIError(
+                "ValidationException", f"Cannot create already existing {kind} \"{name}\"."
+            )
+        arn = self._arn(kind.replace(" ", "-"), name)
+        store[name] = dict(params, Arn=arn, CreationTime=time.time())
+        self._set_tags(arn, params.get("Tags"))
+        return arn
+
+    def _delete(self, store: Dict, kind: str, name: str) -> Dict:
+        if name not in store:
+            raise self._missing(kind, name)
+        self.tags.pop(store.pop(name)["Arn"], None)
+        return {}
+
+    def _op_CreateModel(self, params: Dict) -> Dict:
+        return {"ModelArn": self._create(self.models, "model", params["ModelName"], params)}
+
+    def _op_DeleteModel(self, params: Dict) -> Dict:
+        return self._delete(self.models, "model", params["ModelName"])
+
+    def _op_CreateEndpointConfig(self, params: Dict) -> Dict:
+        name = params["EndpointConfigName"]
+        return {
+            "EndpointConfigArn": self._create(
+                self.endpoint_configs, "endpoint config", name, params
+            )
+        }
+
+    def _op_DescribeEndpointConfig(self, params: Dict) -> Dict:
+        name = params["EndpointConfigName"]
+        config = self.endpoint_configs.get(name)
+        if config is None:
+            raise self._missing("endpoint config", name)
+        return {
+            "EndpointConfigName": name,
+            "EndpointConfigArn": config["Arn"],
+            "ProductionVariants": config.get("ProductionVariants", []),
+            "CreationTime": config["CreationTime"],
+        }
+
+    def _op_DeleteEndpointConfig(self, params: Dict) -> Dict:
+        return self._delete(self.endpoint_configs, "endpoint config", params["EndpointConfigName"])
+
+    def _op_CreateEndpoint(self, params: Dict) -> Dict:
+        config_name = params["EndpointConfigName"]
+        if config_name not in self.endpoint_configs:
+            raise self._missing("endpoint configuration", config_name)
+        arn = self._create(self.endpoints, "endpoint", params["EndpointName"], params)
+        return {"EndpointArn": arn}
+
+    def _status(self, endpoint: Dict) -> str:
+        if time.time() - endpoint["CreationTime"] < self.creation_seconds:
+            return "Creating"
+        return "InService"
+
+    def _summary(self, name: str, endpoint: Dict) -> Dict:
+        return {
+            "EndpointName": name,
+            "EndpointArn": endpoint["Arn"],
+            "CreationTime": endpoint["CreationTime"],
+            "LastModifiedTime": endpoint["CreationTime"],
+            "EndpointStatus": self._status(endpoint),
+        }
+
+    def _op_DescribeEndpoint(self, params: Dict) -> Dict:
+        name = params["EndpointName"]
+        endpoint = self.endpoints.get(name)
+        if endpoint is None:
+            raise self._missing("endpoint", name)
+        config = self.endpoint_configs.get(endpoint["EndpointConfigName"], {})
+        return dict(
+            self._summary(name, endpoint),
+            EndpointConfigName=endpoint["EndpointConfigName"],
+            ProductionVariants=[
+                {
+                    "VariantName": v["VariantName"],
+                    "CurrentInstanceCount": v.get("InitialInstanceCount", 1),
+                    "DesiredInstanceCount": v.get("InitialInstanceCount", 1),
+                }
+                for v in config.get("ProductionVariants", [])
+            ],
+        )
+
+    def _op_DeleteEndpoint(self, params: Dict) -> Dict:
+        return self._delete(self.endpoints, "endpoint", params["EndpointName"])
+
+    def _op_ListEndpoints(self, params: Dict) -> Dict:
+        contains = params.get("NameContains")
+        status = params.get("StatusEquals")
+        items = [
+            self._summary(name, endpoint)
+            for name, endpoint in sorted(self.endpoints.items())
+            if (not contains or contains in name)
+        ]
+        items = [i for i in items if not status or i["EndpointStatus"] == status]
+        max_results = params.get("MaxResults") or DEFAULT_PAGE_SIZE
+        start = int(params.get("NextToken") or 0)
+        result = {"Endpoints": items[start : start + max_results]}
+        if start + max_results < len(items):
+            result["NextToken"] = str(start + max_results)
+        return result
+
+    def _op_AddTags(self, params: Dict) -> Dict:
+        self._set_tags(params["ResourceArn"], params.get("Tags"))
+        return {"Tags": params.get("Tags", [])}
+
+    def _op_DeleteTags(self, params: Dict) -> Dict:
+        current = self.tags.get(params["ResourceArn"], {})
+        for key in params.get("TagKeys", []):
+            current.pop(key, None)
+        return {}
+
+    def _op_ListTags(self, params: Dict) -> Dict:
+        tags = self.tags.get(params["ResourceArn"], {})
+        return {"Tags": [{"Key": k, "Value": v} for k, v in sorted(tags.items())]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend: SageMakerBackend = None
+
+    def log_message(self, format, *args):
+        logging.debug("sagemaker standin: " + format, *args)
+
+    def _send(self, status: int, body: Dict, headers: Dict[str, str] = {}):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/_standin/stats":
+            self._send(200, self.backend.stats())
+        else:
+            self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path == "/_standin/reset":
+            self.backend.reset()
+            self._send(200, {})
+            return
+
+        target = self.headers.get("X-Amz-Target", "")
+        if not target.startswith(TARGET_PREFIX):
+            self._send(400, {"__type": "UnknownOperationException", "message": target})
+            return
+        try:
+            params = json.loads(body or b"{}")
+            result = self.backend.handle(target[len(TARGET_PREFIX) :], params)
+        except APIError as err:
+            self._send(
+                err.status,
+                {"__type": err.code, "message": err.message},
+                {"x-amzn-ErrorType": err.code},
+            )
+            return
+        self._send(200, result)
+
+
+class SageMakerStandInServer:
+    """Runs the SageMaker stand-in on a background thread.
+
+    Usable as a context manager; `endpoint_url` is valid once started.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, creation_seconds: float = 0.0):
+        self.backend = SageMakerBackend(creation_seconds=creation_seconds)
+        handler = type("Handler", (_Handler,), {"backend": self.backend})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SageMakerStandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "SageMakerStandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4568)
+    parser.add_argument("--creation-seconds", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    server = SageMakerStandInServer(
+        host=args.host, port=args.port, creation_seconds=args.creation_seconds
+    )
+    logging.info(f"SageMaker stand-in listening on {server.endpoint_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
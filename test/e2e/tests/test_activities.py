@@ -0,0 +1,97 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the scaling activity timeline, run against a recorded
+activity fixture and the local Application Auto Scaling stand-in.
+"""
+
+import datetime
+import os
+
+import yaml
+
+from e2e import resource_directory
+from e2e.common.activities import (
+    ActivityTimeline,
+    Cooldowns,
+    collect,
+    load_activities,
+)
+from e2e.common.utils import sagemaker_endpoint_register_scalable_target
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "sagemaker_scaling_activities.json"
+)
+ALARM_HIGH = "TargetTracking-endpoint/recorded-endpoint/variant/variant-1-AlarmHigh-4f6c2a1e"
+ALARM_LOW = "TargetTracking-endpoint/recorded-endpoint/variant/variant-1-AlarmLow-9b3d7e05"
+
+
+def at(minute: int, second: int = 0) -> str:
+    return f"2024-05-02T10:{minute:02d}:{second:02d}Z"
+
+
+def policy_spec() -> dict:
+    with open(resource_directory / "sagemaker_endpoint_autoscaling_policy.yaml") as f:
+        return yaml.safe_load(f)["spec"]
+
+
+class TestActivityTimeline:
+    def test_recorded_activities(self):
+        timeline = ActivityTimeline()
+        timeline.extend(load_activities(FIXTURE))
+        assert len(timeline) == 5
+        assert timeline.alarm_names() == sorted([ALARM_HIGH, ALARM_LOW])
+        timeline.attach_alarm_history(
+            {
+                ALARM_HIGH: [at(0), at(6), at(50)],
+                ALARM_LOW: [at(29), at(39, 30)],
+            }
+        )
+
+        cooldowns = Cooldowns.from_policy(policy_spec())
+        assert cooldowns == Cooldowns(scale_in=700, scale_out=300)
+        analysis = timeline.analyze(cooldowns, initial_capacity=1)
+
+        assert analysis.scaled == 4
+        assert (analysis.scale_outs, analysis.scale_ins) == (2, 2)
+        assert analysis.capacity_deltas == [1, 1, -1, -1]
+        assert analysis.alarm_to_start["max"] == 60
+        assert analysis.alarm_to_start["p50"] == 60
+        assert analysis.duration["max"] == 240
+        # The second scale-out starts 2 minutes after the first one ended and
+        # the second scale-in 7 minutes after the first one
+        assert [(v.direction, v.gap) for v in analysis.cooldown_violations] == [
+            ("out", 120),
+            ("in", 420),
+        ]
+        assert analysis.cooldown_adherence == 0.5
+        assert analysis.to_dict()["cooldown_adherence"] == 0.5
+
+    def test_cooldowns_from_api_policy(self):
+        assert Cooldowns.from_policy(
+            {"StepScalingPolicyConfiguration": {"Cooldown": 60}}
+        ) == Cooldowns(60, 60)
+        assert Cooldowns.from_policy(
+            {"TargetTrackingScalingPolicyConfiguration": {"ScaleOutCooldown": 30}}
+        ) == Cooldowns(0, 30)
+
+    def test_collect_streams_from_the_api(self, applicationautoscaling_standin):
+        activities = load_activities(FIXTURE)
+        resource_id = activities[0]["ResourceId"]
+        sagemaker_endpoint_register_scalable_target(resource_id)
+        for activity in reversed(activities):
+            applicationautoscaling_standin.backend.add_activity(activity)
+
+        since = datetime.datetime(2024, 5, 2, 10, 20, tzinfo=datetime.timezone.utc)
+        timeline = collect(resource_id, since=since, with_alarms=False)
+        assert len(timeline) == 3
+        assert list(timeline.capacity) == [1, 2, 2]
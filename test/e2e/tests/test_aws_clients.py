@@ -0,0 +1,114 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the shared boto3 client registry."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from e2e.common.aws_clients import ClientRegistry
+
+
+class FakeSession:
+    """Stands in for a boto3 session, recording the clients it builds."""
+
+    def __init__(self, region_name="us-west-2", access_key="AKID"):
+        self.region_name = region_name
+        self.access_key = access_key
+        self.built = []
+        self._lock = threading.Lock()
+
+    def get_credentials(self):
+        frozen = SimpleNamespace(access_key=self.access_key, secret_key="secret", token=None)
+        return SimpleNamespace(get_frozen_credentials=lambda: frozen)
+
+    def client(self, service_name, region_name=None, endpoint_url=None, config=None):
+        client = SimpleNamespace(
+            service_name=service_name, region_name=region_name, endpoint_url=endpoint_url
+        )
+        with self._lock:
+            self.built.append(client)
+        return client
+
+
+def test_client_is_reused_across_threads():
+    session = FakeSession()
+    registry = ClientRegistry(session=session)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(
+            executor.map(lambda _: registry.client("application-autoscaling"), range(64))
+        )
+
+    assert len(session.built) == 1
+    assert all(c is clients[0] for c in clients)
+    assert registry.stats.created == 1
+    assert registry.stats.reused == 63
+
+
+def test_clients_are_per_service_and_region():
+    session = FakeSession()
+    registry = ClientRegistry(session=session)
+
+    autoscaling = registry.client("application-autoscaling")
+    assert registry.client("sagemaker") is not autoscaling
+    east = registry.client("application-autoscaling", "us-east-1")
+
+    assert east is not autoscaling
+    assert east.region_name == "us-east-1"
+    assert autoscaling.region_name == "us-west-2"
+    assert registry.stats.created == 3
+    assert registry.stats.reused == 0
+
+
+def test_rotated_credentials_replace_the_client():
+    session = FakeSession()
+    registry = ClientRegistry(session=session)
+    before = registry.client("sagemaker")
+
+    session.access_key = "ROTATED"
+    after = registry.client("sagemaker")
+
+    assert after is not before
+    assert registry.client("sagemaker") is after
+    assert registry.stats.created == 2
+    assert registry.stats.reused == 1
+    assert registry.stats.invalidated == 1
+
+
+def test_set_endpoint_url_overrides_environment(monkeypatch):
+    monkeypatch.setenv("AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING", "http://env:1")
+    session = FakeSession()
+    registry = ClientRegistry(session=session)
+
+    assert registry.client("application-autoscaling").endpoint_url == "http://env:1"
+
+    registry.set_endpoint_url("application-autoscaling", "http://standin:2")
+    overridden = registry.client("application-autoscaling")
+    assert overridden.endpoint_url == "http://standin:2"
+    assert registry.stats.invalidated == 1
+
+    registry.set_endpoint_url("application-autoscaling", None)
+    assert registry.client("application-autoscaling").endpoint_url == "http://env:1"
+    assert registry.stats.created == 3
+
+
+def test_clear_resets_clients_and_counters():
+    session = FakeSession()
+    registry = ClientRegistry(session=session)
+    registry.client("sagemaker")
+    registry.client("sagemaker")
+
+    registry.clear()
+
+    assert registry.stats.created == registry.stats.reused == 0
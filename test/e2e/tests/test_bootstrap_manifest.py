@@ -0,0 +1,185 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the incremental bootstrap manifest.
+"""
+
+import itertools
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from e2e.bootstrap_manifest import (
+    BootstrapManifest,
+    bootstrap_incrementally,
+    load_previous,
+)
+from e2e.common.aws_clients import get_client
+
+_names = itertools.count()
+
+
+@dataclass
+class FakeResource:
+    name_prefix: str
+    policies: list = field(default_factory=list)
+    name: str = field(init=False, default="")
+    cleaned_up: bool = field(init=False, default=False)
+
+    def bootstrap(self):
+        self.name = f"{self.name_prefix}-{next(_names)}"
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+@dataclass
+class FakeResources:
+    Bucket: FakeResource
+    Role: FakeResource
+
+    def serialize(self, directory: Path, bootstrap_file_name: str = "bootstrap.pkl"):
+        with open(Path(directory) / bootstrap_file_name, "wb") as stream:
+            pickle.dump(self, stream)
+
+    @classmethod
+    def deserialize(cls, directory: Path, bootstrap_file_name: str = "bootstrap.pkl"):
+        with open(Path(directory) / bootstrap_file_name, "rb") as stream:
+            return pickle.load(stream)
+
+
+def run_bootstrap(directory: Path, role_policies: list):
+    resources = FakeResources(
+        Bucket=FakeResource("bucket"), Role=FakeResource("role", role_policies)
+    )
+    previous, previous_manifest = load_previous(FakeResources, directory)
+    manifest, report = bootstrap_incrementally(
+        resources, previous, previous_manifest, exists=lambda _: True
+    )
+    resources.serialize(directory)
+    manifest.write(directory)
+    return resources, report, previous
+
+
+class TestIncrementalBootstrap:
+    def test_only_changed_resources_are_applied(self, tmp_path):
+        first, report, _ = run_bootstrap(tmp_path, ["read"])
+        assert report.applied == ["Bucket", "Role"]
+
+        second, report, _ = run_bootstrap(tmp_path, ["read"])
+        assert report.applied == []
+        assert report.reused == ["Bucket", "Role"]
+        assert (second.Bucket.name, second.Role.name) == (first.Bucket.name, first.Role.name)
+
+        third, report, previous = run_bootstrap(tmp_path, ["read", "write"])
+        assert report.reused == ["Bucket"]
+        assert report.applied == report.replaced == ["Role"]
+        assert third.Role.name != first.Role.name
+        assert previous.Role.cleaned_up
+
+        manifest = BootstrapManifest.load(tmp_path)
+        assert manifest.resources["Role"].outputs["name"] == third.Role.name
+
+    def test_missing_resources_are_bootstrapped_again(self, tmp_path):
+        run_bootstrap(tmp_path, [])
+        previous, previous_manifest = load_previous(FakeResources, tmp_path)
+        resources = FakeResources(Bucket=FakeResource("bucket"), Role=FakeResource("role"))
+        _, report = bootstrap_incrementally(
+            resources,
+            previous,
+            previous_manifest,
+            exists=lambda r: r.name_prefix != "role",
+        )
+        assert report.reused == ["Bucket"]
+        assert report.applied == ["Role"]
+        assert report.replaced == []
+
+    def test_manifest_for_another_bootstrap_file_is_ignored(self, tmp_path):
+        run_bootstrap(tmp_path, [])
+        assert BootstrapManifest.load(tmp_path).matches_pickle(tmp_path)
+
+        # Rewritten without its manifest, e.g. by an older bootstrap script
+        with open(tmp_path / "bootstrap.pkl", "ab") as stream:
+            stream.write(b"\0")
+        assert not BootstrapManifest.load(tmp_path).matches_pickle(tmp_path)
+        assert load_previous(FakeResources, tmp_path) == (None, None)
+
+        _, report, _ = run_bootstrap(tmp_path, [])
+        assert report.applied == ["Bucket", "Role"]
+
+
+class TestDataBucketSync:
+    def test_unchanged_source_is_not_synced_again(self, s3_standin):
+        from e2e.bootstrap_resources import SAGEMAKER_SOURCE_DATA_BUCKET
+        from e2e.service_bootstrap import sync_data_bucket
+
+        client = get_client("s3")
+        for bucket in (SAGEMAKER_SOURCE_DATA_BUCKET, "data-bucket"):
+            client.create_bucket(
+                Bucket=bucket,
+                CreateBucketConfiguration={"LocationConstraint": "us-west-2"},
+            )
+        for i in range(5):
+            client.put_object(
+                Bucket=SAGEMAKER_SOURCE_DATA_BUCKET, Key=f"train/{i}.csv", Body=b"1,2\n"
+            )
+        bucket = FakeResource("data")
+        bucket.name = "data-bucket"
+
+        entry = sync_data_bucket(bucket)
+        calls = dict(s3_standin.backend.stats()["calls"])
+        assert calls["CopyObject"] == 5
+
+        assert sync_data_bucket(bucket, entry) == entry
+        after = s3_standin.backend.stats()["calls"]
+        assert after["CopyObject"] == 5
+        # Only the source is listed
+        assert after["ListObjectsV2"] == calls["ListObjectsV2"] + 1
+
+        client.put_object(Bucket=SAGEMAKER_SOURCE_DATA_BUCKET, Key="train/0.csv", Body=b"3\n")
+        changed = sync_data_bucket(bucket, entry)
+        assert changed.digest != entry.digest
+        assert s3_standin.backend.stats()["calls"]["CopyObject"] == 6
+
+
+class TestBootstrapState:
+    def test_outputs_are_read_without_unpickling(self, tmp_path, monkeypatch):
+        from e2e.bootstrap_resources import BootstrapState
+
+        resources, _, _ = run_bootstrap(tmp_path, ["read"])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("bootstrap file was deserialized")
+
+        monkeypatch.setattr(FakeResources, "deserialize", classmethod(fail))
+        state = BootstrapState(tmp_path, resources_type=FakeResources)
+        assert state.Bucket.name == resources.Bucket.name
+        assert state.Role.name == resources.Role.name
+
+    def test_falls_back_to_the_bootstrap_file(self, tmp_path):
+        from e2e.bootstrap_resources import BootstrapState
+
+        resources, _, _ = run_bootstrap(tmp_path, ["read"])
+        BootstrapManifest.remove(tmp_path)
+
+        state = BootstrapState(tmp_path, resources_type=FakeResources)
+        assert state.manifest() is None
+        assert state.Role.name == resources.Role.name
+        # Fields that are not outputs always come from the bootstrap file
+        assert state.Role.policies == ["read"]
+
+    def test_nothing_is_read_until_first_access(self, tmp_path):
+        from e2e.bootstrap_resources import BootstrapState
+
+        state = BootstrapState(tmp_path / "missing", resources_type=FakeResources)
+        role = state.Role
+        assert repr(role) == "BootstrappedResource('Role')"
@@ -0,0 +1,92 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Tests for ScalingPolicies created together with their ScalableTarget.
+
+When ACK_DEPENDENCY_RETRY_INTERVAL is set, a policy reconciled before its
+target is registered is requeued after that interval, backed off up to
+ACK_DEPENDENCY_RETRY_MAX_INTERVAL, instead of going back to the work queue's
+exponential backoff, so it should report an ARN soon after its target does.
+The fleet test needs a controller whose metrics endpoint is
+ACK_CONTROLLER_METRICS_URL, set up with a short retry interval, e.g. 2s
+through deployment.extraEnvVars, and only runs with --runslow.
+"""
+
+import json
+import logging
+
+import pytest
+
+from e2e import service_marker
+from e2e.common import metrics
+from e2e.common.scale import (
+    POLICY_RESOURCE_PLURAL,
+    TARGET_RESOURCE_PLURAL,
+    ScaleHarness,
+    ScaleResource,
+    lags_behind_targets,
+)
+
+RETRIES_METRIC = "ack_dependency_retries_total"
+
+TARGETS = 50
+POLICIES_PER_TARGET = 2
+# Upper bound on how long after its target a policy may report an ARN. A
+# policy retried on the backoff instead has failed a few times by the time
+# its target is registered, and waits tens of seconds for its next attempt.
+MAX_LAG_SECONDS = 5
+
+
+def test_lags_behind_targets():
+    targets = [
+        ScaleResource(TARGET_RESOURCE_PLURAL, "t-0", "endpoint/a", synced=10.0),
+        ScaleResource(TARGET_RESOURCE_PLURAL, "t-1", "endpoint/b"),
+    ]
+    policies = [
+        ScaleResource(POLICY_RESOURCE_PLURAL, "p-0", "endpoint/a", synced=10.5),
+        ScaleResource(POLICY_RESOURCE_PLURAL, "p-1", "endpoint/a", synced=12.0),
+        ScaleResource(POLICY_RESOURCE_PLURAL, "p-2", "endpoint/a"),
+        ScaleResource(POLICY_RESOURCE_PLURAL, "p-3", "endpoint/b", synced=11.0),
+    ]
+    assert lags_behind_targets(targets, policies) == [0.5, 2.0]
+
+
+@pytest.fixture
+def fleet():
+    harness = ScaleHarness(TARGETS, POLICIES_PER_TARGET, policies_first=True)
+    yield harness
+    harness.cleanup()
+
+
+@service_marker
+@pytest.mark.slow
+class TestDependencyWait:
+    def test_policies_follow_their_targets(self, fleet):
+        retries_before = metrics.sum_by(metrics.scrape(), RETRIES_METRIC, "result")
+        report = fleet.run(timeout=600)
+        scraped = metrics.scrape()
+        if not scraped.get(RETRIES_METRIC):
+            pytest.skip("the controller's dependency retry interval is not set")
+        retries = metrics.diff(
+            metrics.sum_by(scraped, RETRIES_METRIC, "result"),
+            retries_before,
+        )
+        logging.info(json.dumps(report.to_dict(), indent=2, default=str))
+        logging.info(f"dependency retries: {retries}")
+
+        assert report.failed == {}
+        assert report.unsynced == []
+        # The policies were submitted first, so some of them found their
+        # target missing and were retried
+        assert sum(retries.values()) > 0
+        assert report.policy_lag_behind_target.count == TARGETS * POLICIES_PER_TARGET
+        assert report.policy_lag_behind_target.p99 < MAX_LAG_SECONDS
@@ -0,0 +1,125 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the streaming describe iterators, run against the local
+Application Auto Scaling stand-in.
+"""
+
+import itertools
+import time
+
+from e2e.common import describe
+from e2e.common.utils import (
+    application_autoscaling_client,
+    sagemaker_endpoint_describe_scalable_target,
+    sagemaker_endpoint_put_scaling_policy,
+    sagemaker_endpoint_register_scalable_target,
+)
+
+
+def resource_id(i: int) -> str:
+    return f"endpoint/endpoint-{i}/variant/variant-1"
+
+
+def calls(standin, operation: str) -> int:
+    return standin.backend.stats()["calls"].get(operation, 0)
+
+
+class TestDescribe:
+    def test_helpers_follow_next_token(self, applicationautoscaling_standin):
+        applicationautoscaling_standin.backend.config.page_size = 3
+        for i in range(10):
+            sagemaker_endpoint_register_scalable_target(resource_id(i))
+            sagemaker_endpoint_put_scaling_policy(resource_id(i), "policy")
+
+        targets = list(describe.scalable_targets("sagemaker"))
+        assert len(targets) == 10
+        assert calls(applicationautoscaling_standin, "DescribeScalableTargets") == 4
+
+        assert len(list(describe.scaling_policies("sagemaker", policy_names=["policy"]))) == 10
+        assert len(sagemaker_endpoint_describe_scalable_target(resource_id(9))["ScalableTargets"]) == 1
+
+    def test_resource_ids_are_split_into_batches(self, applicationautoscaling_standin):
+        for i in range(60):
+            sagemaker_endpoint_register_scalable_target(resource_id(i))
+        ids = [resource_id(i) for i in range(0, 60, 2)] + [resource_id(i) for i in range(60)]
+
+        targets = list(describe.scalable_targets("sagemaker", resource_ids=ids))
+        assert sorted(t["ResourceId"] for t in targets) == sorted(set(ids))
+        requests = [
+            params
+            for operation, params in applicationautoscaling_standin.backend.requests
+            if operation == "DescribeScalableTargets"
+        ]
+        assert [len(params["ResourceIds"]) for params in requests] == [50, 10]
+
+    def test_iteration_is_lazy(self, applicationautoscaling_standin):
+        for i in range(20):
+            sagemaker_endpoint_register_scalable_target(resource_id(i))
+
+        first = list(itertools.islice(describe.scalable_targets("sagemaker", max_results=5), 3))
+        assert len(first) == 3
+        assert calls(applicationautoscaling_standin, "DescribeScalableTargets") == 1
+
+    def test_prefetch_overlaps_page_requests(self, applicationautoscaling_standin):
+        for i in range(8):
+            sagemaker_endpoint_register_scalable_target(resource_id(i))
+        applicationautoscaling_standin.backend.configure(latency=0.1)
+
+        def consume(prefetch: bool) -> float:
+            start = time.monotonic()
+            for _ in describe.iter_pages(
+                application_autoscaling_client().describe_scalable_targets,
+                {"ServiceNamespace": "sagemaker"},
+                max_results=2,
+                prefetch=prefetch,
+            ):
+                time.sleep(0.1)
+            return time.monotonic() - start
+
+        sequential = consume(prefetch=False)
+        overlapped = consume(prefetch=True)
+        assert overlapped < sequential - 0.2
+
+    def test_activities_and_scheduled_actions(self, applicationautoscaling_standin):
+        sagemaker_endpoint_register_scalable_target(resource_id(0))
+        client = application_autoscaling_client()
+        for i in range(4):
+            client.put_scheduled_action(
+                ServiceNamespace="sagemaker",
+                ResourceId=resource_id(0),
+                ScalableDimension="sagemaker:variant:DesiredInstanceCount",
+                ScheduledActionName=f"action-{i}",
+                Schedule="cron(0 8 * * ? *)",
+                ScalableTargetAction={"MinCapacity": 1, "MaxCapacity": 2},
+            )
+            applicationautoscaling_standin.backend.add_activity(
+                {
+                    "ActivityId": f"activity-{i}",
+                    "ServiceNamespace": "sagemaker",
+                    "ResourceId": resource_id(0),
+                    "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
+                    "Description": "Setting desired instance count",
+                    "Cause": "monitor alarm",
+                    "StartTime": time.time(),
+                    "StatusCode": "Successful",
+                    **({"NotScaledReasons": [{"Code": "AlreadyAtMaxCapacity"}]} if i == 3 else {}),
+                }
+            )
+
+        actions = describe.scheduled_actions(
+            "sagemaker", resource_id=resource_id(0), action_names=["action-1", "action-2"]
+        )
+        assert [a["ScheduledActionName"] for a in actions] == ["action-1", "action-2"]
+        activities = describe.scaling_activities("sagemaker", max_results=1, prefetch=True)
+        assert [a["ActivityId"] for a in activities] == ["activity-2", "activity-1", "activity-0"]
+        assert len(list(describe.scaling_activities("sagemaker", include_not_scaled=True))) == 4
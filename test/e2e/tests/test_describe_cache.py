@@ -0,0 +1,84 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Checks that ScalingPolicy reads of the same scalable target share
+DescribeScalingPolicies calls through the controller's describe cache.
+
+Needs a controller started with ACK_POLICY_DESCRIBE_CACHE_TTL set, since
+the cache is off by default, whose Application Auto Scaling endpoint
+(AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING) is the local stand-in and whose
+metrics endpoint is ACK_CONTROLLER_METRICS_URL, so it only runs with
+--runslow.
+"""
+
+import logging
+import os
+
+import pytest
+
+from e2e import service_marker
+from e2e.common import metrics
+from e2e.common.scale import ScaleHarness
+from e2e.standins.applicationautoscaling import remote_stats
+
+STANDIN_ENDPOINT_ENV = "AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING"
+CACHE_HITS_METRIC = "ack_describe_cache_hits_total"
+CACHE_MISSES_METRIC = "ack_describe_cache_misses_total"
+OPERATION = "DescribeScalingPolicies"
+
+
+def standin_calls(operation: str) -> int:
+    stats = remote_stats(os.environ[STANDIN_ENDPOINT_ENV])
+    return stats["calls"].get(operation, 0)
+
+
+def cache_lookups(samples, name: str) -> float:
+    return metrics.sum_by(samples, name, "op_id").get(OPERATION, 0.0)
+
+
+@pytest.fixture
+def policy_fleet():
+    if not os.environ.get(STANDIN_ENDPOINT_ENV):
+        pytest.skip(f"{STANDIN_ENDPOINT_ENV} does not point at a stand-in")
+    harness = ScaleHarness(targets=5, policies_per_target=4)
+    yield harness
+    harness.cleanup()
+
+
+@service_marker
+@pytest.mark.slow
+class TestDescribeCache:
+    def test_policies_share_describes(self, policy_fleet):
+        before = metrics.scrape()
+        calls_before = standin_calls(OPERATION)
+
+        report = policy_fleet.run(timeout=600)
+        assert report.failed == {}
+        assert report.unsynced == []
+
+        after = metrics.scrape()
+        calls = standin_calls(OPERATION) - calls_before
+        hits = cache_lookups(after, CACHE_HITS_METRIC) - cache_lookups(
+            before, CACHE_HITS_METRIC
+        )
+        misses = cache_lookups(after, CACHE_MISSES_METRIC) - cache_lookups(
+            before, CACHE_MISSES_METRIC
+        )
+        logging.info(
+            f"{OPERATION}: {calls} calls for {hits + misses} reads ({hits} cache hits)"
+        )
+
+        if hits + misses == 0:
+            pytest.skip("the controller's describe cache is disabled")
+        assert hits > 0
+        # Every miss costs at least one call and every hit costs none
+        assert misses <= calls < hits + misses
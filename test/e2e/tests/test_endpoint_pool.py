@@ -0,0 +1,222 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the warm endpoint pool, run against the local SageMaker
+and Application Auto Scaling stand-ins.
+"""
+
+import pytest
+
+from e2e.common import workers
+from e2e.common.aws_clients import get_client
+from e2e.common.endpoint_pool import EndpointLease, EndpointPool, LeaseLostError
+
+SPEC = {"ENDPOINT_INSTANCE_TYPE": "ml.c5.large"}
+DIMENSION = "sagemaker:variant:DesiredInstanceCount"
+# Endpoints whose creation fails
+FAILING = set()
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_endpoint(lease: EndpointLease, tags):
+    if lease.endpoint_name in FAILING:
+        raise RuntimeError("capacity error")
+    client = get_client("sagemaker")
+    client.create_model(ModelName=lease.model_name)
+    client.create_endpoint_config(
+        EndpointConfigName=lease.endpoint_config_name,
+        ProductionVariants=[
+            {"VariantName": lease.variant_name, "ModelName": lease.model_name}
+        ],
+    )
+    client.create_endpoint(
+        EndpointName=lease.endpoint_name,
+        EndpointConfigName=lease.endpoint_config_name,
+        Tags=[{"Key": k, "Value": v} for k, v in tags.items()],
+    )
+
+
+def add_endpoint_setup(provisioner, lease: EndpointLease, tags):
+    provisioner.add(f"{lease.endpoint_name}/create", lambda: create_endpoint(lease, tags))
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch, sagemaker_standin, applicationautoscaling_standin):
+    monkeypatch.setenv(workers.STATE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv(workers.RUN_ID_ENV, "run-1")
+    return EndpointPool(
+        "test",
+        lease_ttl=600,
+        idle_ttl=3600,
+        spec=SPEC,
+        add_endpoint_setup=add_endpoint_setup,
+        clock=FakeClock(),
+    )
+
+
+def register_scaling(lease: EndpointLease):
+    client = get_client("application-autoscaling")
+    client.register_scalable_target(
+        ServiceNamespace="sagemaker",
+        ResourceId=lease.resource_id,
+        ScalableDimension=DIMENSION,
+        MinCapacity=1,
+        MaxCapacity=2,
+    )
+    client.put_scaling_policy(
+        PolicyName="policy",
+        ServiceNamespace="sagemaker",
+        ResourceId=lease.resource_id,
+        ScalableDimension=DIMENSION,
+        PolicyType="TargetTrackingScaling",
+        TargetTrackingScalingPolicyConfiguration={"TargetValue": 70.0},
+    )
+
+
+class TestEndpointPool:
+    def test_released_endpoint_is_reset_and_reused(
+        self, pool, sagemaker_standin, applicationautoscaling_standin
+    ):
+        first = pool.acquire()
+        assert first.endpoint_name.startswith("ack-pool-test-")
+        register_scaling(first)
+
+        pool.release(first)
+        stats = applicationautoscaling_standin.backend.stats()
+        assert stats["targets"] == 0
+        assert stats["policies"] == 0
+
+        second = pool.acquire()
+        assert second.endpoint_name == first.endpoint_name
+        assert sagemaker_standin.backend.stats()["calls"]["CreateEndpoint"] == 1
+
+    def test_concurrent_leases_get_different_endpoints(self, pool):
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first.endpoint_name != second.endpoint_name
+        assert len(pool.members()) == 2
+
+    def test_expired_lease_is_taken_over_and_reset(self, pool, applicationautoscaling_standin):
+        abandoned = pool.acquire()
+        register_scaling(abandoned)
+
+        pool.clock.now += 601
+        other = EndpointPool(
+            "test", lease_ttl=600, spec=SPEC, add_endpoint_setup=add_endpoint_setup, clock=pool.clock
+        )
+        other.owner = "run-2/gw0"
+        lease = other.acquire()
+        assert lease.endpoint_name == abandoned.endpoint_name
+        assert applicationautoscaling_standin.backend.stats()["targets"] == 0
+
+        with pytest.raises(LeaseLostError):
+            pool.renew(abandoned)
+        # Releasing a lease that was taken over leaves the new holder alone
+        pool.release(abandoned)
+        assert pool.members()[0].leased(pool.clock())
+
+    def test_pool_is_scoped_to_its_state_directory(self, pool, tmp_path, monkeypatch):
+        local = pool.acquire()
+        pool.release(local)
+
+        # Another machine, with a state directory of its own, using the same
+        # pool never leases or collects this machine's members
+        monkeypatch.setenv(workers.STATE_DIR_ENV, str(tmp_path / "elsewhere"))
+        other = EndpointPool(
+            "test", lease_ttl=600, spec=SPEC, add_endpoint_setup=add_endpoint_setup, clock=pool.clock
+        )
+        assert other.members() == []
+        lease = other.acquire()
+        assert lease.endpoint_name != local.endpoint_name
+        assert [m.name for m in pool.members()] == [local.endpoint_name]
+
+        pool.clock.now += 3601
+        assert local.endpoint_name not in other.collect_idle()
+
+    def test_idle_and_stale_members_are_collected(self, pool):
+        leased = pool.acquire()
+        idle = pool.acquire()
+        pool.release(idle)
+
+        assert pool.collect_idle() == []
+        pool.clock.now += 3601
+        pool.renew(leased)
+        assert pool.collect_idle() == [idle.endpoint_name]
+
+        pool.release(leased)
+        changed = EndpointPool(
+            "test", spec={"ENDPOINT_INSTANCE_TYPE": "ml.m5.large"}, clock=pool.clock
+        )
+        assert changed.collect_idle() == [leased.endpoint_name]
+        assert pool.members() == []
+
+    def test_idle_members_are_torn_down_together(self, pool, sagemaker_standin, caplog):
+        idle = [pool.acquire() for _ in range(2)]
+        for lease in idle:
+            pool.release(lease)
+        pool.clock.now += 3601
+
+        with caplog.at_level("INFO"):
+            deleted = pool.collect_idle()
+        assert sorted(deleted) == sorted(lease.endpoint_name for lease in idle)
+        assert sagemaker_standin.backend.stats()["calls"]["DeleteEndpoint"] == 2
+        # Both endpoints were deleted by one provisioner run
+        reports = [r.message for r in caplog.records if "Provisioning finished" in r.message]
+        assert len(reports) == 1
+        assert "6 steps" in reports[0]
+
+    def test_prewarm_creates_only_missing_members(self, pool, sagemaker_standin):
+        free = pool.acquire()
+        pool.release(free)
+
+        created = pool.prewarm(3)
+        assert len(created) == 2
+        assert pool.prewarm(3) == []
+
+        leased = {pool.acquire().endpoint_name for _ in range(3)}
+        assert leased == {free.endpoint_name, *created}
+        assert sagemaker_standin.backend.stats()["calls"]["CreateEndpoint"] == 3
+
+    def test_prewarm_drops_members_that_fail(self, pool, monkeypatch):
+        deleted = []
+        monkeypatch.setattr(
+            pool,
+            "add_endpoint_teardown",
+            lambda provisioner, name: provisioner.add(
+                f"{name}/delete", lambda: deleted.append(name)
+            ),
+        )
+        real_new_member = pool._new_member
+        names = []
+
+        def new_member(digest, leased):
+            lease, tags = real_new_member(digest, leased)
+            names.append(lease.endpoint_name)
+            if len(names) == 1:
+                FAILING.add(lease.endpoint_name)
+            return lease, tags
+
+        monkeypatch.setattr(pool, "_new_member", new_member)
+        try:
+            created = pool.prewarm(2)
+        finally:
+            FAILING.clear()
+
+        assert created == names[1:]
+        assert deleted == names[:1]
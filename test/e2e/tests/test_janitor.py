@@ -0,0 +1,93 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the leaked resource janitor, run against the local
+Application Auto Scaling stand-in.
+"""
+
+import time
+
+from e2e.common.janitor import Janitor
+from e2e.common.utils import (
+    sagemaker_endpoint_put_scaling_policy,
+    sagemaker_endpoint_register_scalable_target,
+)
+
+HOUR = 60 * 60
+
+
+def leak(endpoint: str, policies: int = 1) -> str:
+    resource_id = f"endpoint/{endpoint}/variant/variant-1"
+    sagemaker_endpoint_register_scalable_target(resource_id)
+    for i in range(policies):
+        sagemaker_endpoint_put_scaling_policy(resource_id, f"policy-{i}")
+    return resource_id
+
+
+def janitor(**kwargs) -> Janitor:
+    kwargs.setdefault("clock", lambda: time.time() + 7 * HOUR)
+    return Janitor(tps=1000, **kwargs)
+
+
+class TestJanitor:
+    def test_dry_run_only_reports(self, applicationautoscaling_standin):
+        for i in range(3):
+            leak(f"sagemaker-endpoint-{i}", policies=2)
+        leak("production-endpoint")
+
+        report = janitor(dry_run=True).run()
+        assert report.matched == {"sagemaker": {"policies": 6, "targets": 3}}
+        assert report.scanned_targets == 4
+        assert report.scanned_namespaces > 1
+        assert report.deleted_policies == report.deregistered_targets == []
+        assert applicationautoscaling_standin.backend.stats()["policies"] == 7
+        assert report.summary().startswith("Would delete 6 policies and 3 targets")
+
+    def test_policies_are_deleted_before_their_targets(self, applicationautoscaling_standin):
+        for i in range(10):
+            leak(f"ack-scale-w0{i}-abc-{i}", policies=3)
+        kept = leak("production-endpoint")
+
+        report = janitor().run()
+        assert len(report.deleted_policies) == 30
+        assert len(report.deregistered_targets) == 10
+        assert report.failed == {}
+
+        backend = applicationautoscaling_standin.backend
+        assert backend.stats()["targets"] == 1
+        assert backend.targets[("sagemaker", kept, "sagemaker:variant:DesiredInstanceCount")]
+        deletes = [
+            (op, params["ResourceId"])
+            for op, params in backend.requests
+            if op in ("DeleteScalingPolicy", "DeregisterScalableTarget")
+        ]
+        for i, (op, resource_id) in enumerate(deletes):
+            if op == "DeregisterScalableTarget":
+                assert ("DeleteScalingPolicy", resource_id) not in deletes[i:]
+
+    def test_recent_resources_are_left_alone(self, applicationautoscaling_standin):
+        leak("sagemaker-endpoint-old")
+        report = janitor(clock=time.time).run()
+        assert report.matched == {}
+
+        # A policy too young to delete keeps its target registered
+        resource_id = leak("sagemaker-endpoint-mixed", policies=2)
+        backend = applicationautoscaling_standin.backend
+        for key, policy in backend.policies.items():
+            if key[1] == resource_id and key[3] == "policy-1":
+                policy["CreationTime"] = time.time() + 7 * HOUR
+        report = janitor(namespaces=["sagemaker"]).run()
+        assert report.skipped_targets == [
+            f"sagemaker/{resource_id}/sagemaker:variant:DesiredInstanceCount"
+        ]
+        assert len(report.deregistered_targets) == 1
+        assert backend.stats()["policies"] == 1
@@ -0,0 +1,115 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for reading the controller's Prometheus metrics."""
+
+import math
+
+import pytest
+
+from e2e.common import metrics
+
+EXPOSITION = """\
+# HELP ack_outbound_api_requests_total Number of outbound API requests
+# TYPE ack_outbound_api_requests_total counter
+ack_outbound_api_requests_total{op_id="PutScalingPolicy",op_type="CREATE"} 12
+ack_outbound_api_requests_total{op_id="DescribeScalingPolicies",op_type="READ_ONE"} 30
+ack_outbound_api_requests_total{op_id="DescribeScalingPolicies",op_type="READ_MANY"} 4
+# HELP controller_runtime_reconcile_time_seconds Length of time per reconciliation
+# TYPE controller_runtime_reconcile_time_seconds histogram
+controller_runtime_reconcile_time_seconds_bucket{controller="scalingpolicy",le="0.1"} 2
+controller_runtime_reconcile_time_seconds_bucket{controller="scalingpolicy",le="0.5"} 6
+controller_runtime_reconcile_time_seconds_bucket{controller="scalingpolicy",le="1"} 10
+controller_runtime_reconcile_time_seconds_bucket{controller="scalingpolicy",le="+Inf"} 10
+controller_runtime_reconcile_time_seconds_sum{controller="scalingpolicy"} 4.2
+controller_runtime_reconcile_time_seconds_count{controller="scalingpolicy"} 10
+controller_runtime_reconcile_time_seconds_bucket{controller="scalabletarget",le="0.1"} 0
+controller_runtime_reconcile_time_seconds_bucket{controller="scalabletarget",le="0.5"} 0
+controller_runtime_reconcile_time_seconds_bucket{controller="scalabletarget",le="1"} 1
+controller_runtime_reconcile_time_seconds_bucket{controller="scalabletarget",le="+Inf"} 4
+controller_runtime_reconcile_time_seconds_sum{controller="scalabletarget"} 12.5
+controller_runtime_reconcile_time_seconds_count{controller="scalabletarget"} 4
+ack_label_escapes{path="a\\"b"} 1
+"""
+
+
+@pytest.fixture
+def samples():
+    return metrics.parse_metrics(EXPOSITION)
+
+
+def test_parse_metrics_keys_series_by_labels(samples):
+    requests = samples[metrics.API_REQUESTS_METRIC]
+    assert requests[frozenset({("op_id", "PutScalingPolicy"), ("op_type", "CREATE")})] == 12
+    assert len(requests) == 3
+    assert samples["controller_runtime_reconcile_time_seconds_sum"][
+        frozenset({("controller", "scalabletarget")})
+    ] == 12.5
+    assert list(samples["ack_label_escapes"]) == [frozenset({("path", 'a\\"b')})]
+
+
+def test_sum_by_and_diff(samples):
+    assert metrics.api_call_counts(samples) == {
+        "PutScalingPolicy": 12,
+        "DescribeScalingPolicies": 34,
+    }
+    assert metrics.sum_by(samples, metrics.API_REQUESTS_METRIC, "op_id", op_type="READ_MANY") == {
+        "DescribeScalingPolicies": 4
+    }
+    assert metrics.diff({"a": 3, "b": 1}, {"a": 1, "b": 1}) == {"a": 2}
+
+
+def test_histogram_buckets_are_summed_and_sorted(samples):
+    name = metrics.RECONCILE_TIME_METRIC
+    assert metrics.histogram_buckets(samples, name, controller="scalingpolicy") == [
+        (0.1, 2),
+        (0.5, 6),
+        (1.0, 10),
+        (math.inf, 10),
+    ]
+    assert metrics.histogram_buckets(samples, name) == [
+        (0.1, 2),
+        (0.5, 6),
+        (1.0, 11),
+        (math.inf, 14),
+    ]
+    assert metrics.histogram_buckets(samples, "missing") == []
+
+
+def test_histogram_quantile_interpolates_within_bucket(samples):
+    buckets = metrics.histogram_buckets(
+        samples, metrics.RECONCILE_TIME_METRIC, controller="scalingpolicy"
+    )
+    # Ranks 5 and 9 fall in the (0.1, 0.5] and (0.5, 1] buckets
+    assert metrics.histogram_quantile(0.5, buckets) == pytest.approx(0.4)
+    assert metrics.histogram_quantile(0.9, buckets) == pytest.approx(0.875)
+    # Within the first bucket, the lower bound is zero
+    assert metrics.histogram_quantile(0.1, buckets) == pytest.approx(0.05)
+
+
+def test_histogram_quantile_in_inf_bucket_returns_highest_finite_bound(samples):
+    buckets = metrics.histogram_buckets(
+        samples, metrics.RECONCILE_TIME_METRIC, controller="scalabletarget"
+    )
+    assert metrics.histogram_quantile(0.25, buckets) == pytest.approx(1.0)
+    assert metrics.histogram_quantile(0.99, buckets) == 1.0
+
+
+def test_histogram_quantile_of_empty_histogram_is_none():
+    assert metrics.histogram_quantile(0.5, []) is None
+    assert metrics.histogram_quantile(0.5, [(0.1, 0), (math.inf, 0)]) is None
+
+
+def test_diff_buckets_subtracts_earlier_scrape():
+    before = [(0.1, 1), (math.inf, 2)]
+    after = [(0.1, 4), (0.5, 1), (math.inf, 8)]
+    assert metrics.diff_buckets(after, before) == [(0.1, 3), (0.5, 1), (math.inf, 6)]
@@ -0,0 +1,135 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the dependency graph provisioner, using fake steps."""
+
+import threading
+import time
+
+import pytest
+
+from e2e.common.provisioner import Provisioner, ProvisioningError
+
+
+class Recorder:
+    """Builds fake steps that record when they start and finish."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def step(self, name, seconds=0.0, error=None, barrier=None):
+        def action():
+            with self._lock:
+                self.events.append(("start", name))
+            if barrier is not None:
+                barrier.wait(timeout=5)
+            time.sleep(seconds)
+            with self._lock:
+                self.events.append(("finish", name))
+            if error is not None:
+                raise error
+            return name.upper()
+
+        return action
+
+    def index(self, kind, name):
+        return self.events.index((kind, name))
+
+
+def test_steps_start_after_their_dependencies_finish():
+    recorder = Recorder()
+    provisioner = Provisioner()
+    provisioner.add("endpoint", recorder.step("endpoint"), depends_on=["config"])
+    provisioner.add("model", recorder.step("model"))
+    provisioner.add("config", recorder.step("config"), depends_on=["model"])
+
+    report = provisioner.run()
+
+    assert recorder.index("finish", "model") < recorder.index("start", "config")
+    assert recorder.index("finish", "config") < recorder.index("start", "endpoint")
+    assert report.results == {"model": "MODEL", "config": "CONFIG", "endpoint": "ENDPOINT"}
+    assert report.skipped == []
+
+
+def test_independent_steps_run_concurrently():
+    recorder = Recorder()
+    # Only released once all three endpoints are in flight at the same time
+    barrier = threading.Barrier(3)
+    provisioner = Provisioner(max_workers=3)
+    for name in ("a", "b", "c"):
+        provisioner.add(name, recorder.step(name, barrier=barrier))
+
+    report = provisioner.run()
+
+    assert sorted(report.results) == ["a", "b", "c"]
+    assert not barrier.broken
+
+
+def test_failure_skips_dependents_but_not_independent_steps():
+    recorder = Recorder()
+    error = RuntimeError("capacity error")
+    provisioner = Provisioner()
+    provisioner.add("a/model", recorder.step("a/model", error=error))
+    provisioner.add("a/config", recorder.step("a/config"), depends_on=["a/model"])
+    provisioner.add("a/endpoint", recorder.step("a/endpoint"), depends_on=["a/config"])
+    provisioner.add("b/model", recorder.step("b/model"))
+    provisioner.add("b/config", recorder.step("b/config"), depends_on=["b/model"])
+
+    with pytest.raises(ProvisioningError) as raised:
+        provisioner.run()
+
+    assert raised.value.errors == {"a/model": error}
+    report = raised.value.report
+    assert sorted(report.skipped) == ["a/config", "a/endpoint"]
+    assert sorted(report.results) == ["b/config", "b/model"]
+    assert ("start", "a/config") not in recorder.events
+
+
+def test_critical_path_is_the_longest_chain():
+    recorder = Recorder()
+    provisioner = Provisioner()
+    provisioner.add("slow", recorder.step("slow", seconds=0.2))
+    provisioner.add("fast", recorder.step("fast", seconds=0.01))
+    provisioner.add("after-fast", recorder.step("after-fast", seconds=0.01), depends_on=["fast"])
+    provisioner.add("after-slow", recorder.step("after-slow", seconds=0.05), depends_on=["slow"])
+
+    report = provisioner.run()
+
+    assert report.critical_path == ["slow", "after-slow"]
+    assert report.critical_path_seconds == pytest.approx(
+        report.steps["slow"].duration + report.steps["after-slow"].duration
+    )
+    assert report.critical_path_seconds <= report.wall_seconds
+    assert "slow -> after-slow" in report.summary()
+
+
+@pytest.mark.parametrize(
+    "steps, message",
+    [
+        ([("a", ["missing"])], "unknown step"),
+        ([("a", ["b"]), ("b", ["a"])], "cycle"),
+    ],
+)
+def test_invalid_graphs_are_rejected(steps, message):
+    provisioner = Provisioner()
+    for name, depends_on in steps:
+        provisioner.add(name, lambda: None, depends_on=depends_on)
+
+    with pytest.raises(ValueError, match=message):
+        provisioner.run()
+
+
+def test_duplicate_steps_are_rejected():
+    provisioner = Provisioner().add("a", lambda: None)
+    with pytest.raises(ValueError, match="Duplicate"):
+        provisioner.add("a", lambda: None)
@@ -0,0 +1,107 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Load test for the controller's adaptive rate limiter.
+
+Creates a fleet while the local Application Auto Scaling stand-in enforces
+tight per-operation TPS limits, and checks that the fleet still converges in
+time and that the controller backs off instead of hammering the throttled
+operations. Needs a controller started with ACK_API_RATE_LIMIT set, since
+rate limiting is off by default, whose endpoint
+(AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING) is the stand-in and whose metrics
+endpoint is ACK_CONTROLLER_METRICS_URL, so it only runs with --runslow.
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+from e2e import service_marker
+from e2e.common import metrics
+from e2e.common.scale import POLICY_OPERATIONS, TARGET_OPERATIONS, ScaleHarness
+from e2e.standins.applicationautoscaling import remote_configure, remote_stats
+
+STANDIN_ENDPOINT_ENV = "AWS_ENDPOINT_URL_APPLICATION_AUTOSCALING"
+THROTTLES_METRIC = "ack_rate_limiter_throttles_total"
+RATE_METRIC = "ack_rate_limiter_rate"
+
+TARGETS = 50
+POLICIES_PER_TARGET = 1
+TPS_LIMIT = 5
+# Upper bound on time-to-converge. Each resource needs a few reads and one
+# write, so at TPS_LIMIT per operation the fleet needs on the order of a
+# minute of API time; the rest is headroom for requeues.
+CONVERGENCE_SECONDS = 300
+# Share of calls the stand-in may reject once the limiter has adapted
+MAX_THROTTLED_FRACTION = 0.25
+
+
+@pytest.fixture
+def throttling_standin():
+    endpoint_url = os.environ.get(STANDIN_ENDPOINT_ENV)
+    if not endpoint_url:
+        pytest.skip(f"{STANDIN_ENDPOINT_ENV} does not point at a stand-in")
+    remote_configure(
+        endpoint_url,
+        tps_limits={op: TPS_LIMIT for op in TARGET_OPERATIONS + POLICY_OPERATIONS},
+    )
+    yield endpoint_url
+    remote_configure(endpoint_url, tps_limits={})
+
+
+@pytest.fixture
+def fleet(throttling_standin):
+    harness = ScaleHarness(TARGETS, POLICIES_PER_TARGET)
+    yield harness
+    harness.cleanup()
+
+
+@service_marker
+@pytest.mark.slow
+class TestRateLimit:
+    def test_converges_under_throttling(self, throttling_standin, fleet):
+        stats_before = remote_stats(throttling_standin)
+        throttles_before = metrics.sum_by(metrics.scrape(), THROTTLES_METRIC, "op_id")
+
+        report = fleet.run(timeout=CONVERGENCE_SECONDS)
+
+        stats_after = remote_stats(throttling_standin)
+        scraped = metrics.scrape()
+        if not scraped.get(RATE_METRIC):
+            pytest.skip("the controller's rate limiter is disabled")
+        throttles = metrics.diff(
+            metrics.sum_by(scraped, THROTTLES_METRIC, "op_id"),
+            throttles_before,
+        )
+        calls = sum(stats_after["calls"].values()) - sum(stats_before["calls"].values())
+        throttled = sum(stats_after["throttled"].values()) - sum(
+            stats_before["throttled"].values()
+        )
+        logging.info(
+            json.dumps(
+                {
+                    "wall_seconds": report.wall_seconds,
+                    "calls": calls,
+                    "throttled": throttled,
+                    "controller_throttles": throttles,
+                },
+                indent=2,
+            )
+        )
+
+        assert report.failed == {}
+        assert report.unsynced == []
+        assert report.wall_seconds < CONVERGENCE_SECONDS
+        assert calls > 0
+        assert throttled / calls <= MAX_THROTTLED_FRACTION
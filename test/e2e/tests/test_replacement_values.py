@@ -0,0 +1,62 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the lazily resolved replacement values.
+"""
+
+import importlib
+
+import pytest
+
+import acktest.aws.identity
+import e2e.bootstrap_resources
+import e2e.replacement_values
+from e2e.replacement_values import LazyReplacementValues
+
+
+class TestLazyReplacementValues:
+    def test_values_are_resolved_once_on_first_access(self):
+        calls = []
+
+        def resolver(value):
+            def resolve():
+                calls.append(value)
+                return value
+            return resolve
+
+        values = LazyReplacementValues({"A": resolver("a"), "B": resolver("b")})
+        assert sorted(values) == ["A", "B"]
+        assert calls == []
+
+        assert values["A"] == "a"
+        assert values["A"] == "a"
+        assert calls == ["a"]
+        assert values.resolved() == {"A": "a"}
+
+        assert values.copy() == {"A": "a", "B": "b"}
+        assert calls == ["a", "b"]
+        with pytest.raises(KeyError):
+            values["C"]
+
+    def test_import_does_no_lookups(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("looked up at import time")
+
+        monkeypatch.setattr(acktest.aws.identity, "get_region", fail)
+        monkeypatch.setattr(e2e.bootstrap_resources, "get_bootstrap_resources", fail)
+        try:
+            module = importlib.reload(e2e.replacement_values)
+            assert len(module.REPLACEMENT_VALUES) == 4
+            assert module.REPLACEMENT_VALUES.resolved() == {}
+        finally:
+            monkeypatch.undo()
+            importlib.reload(e2e.replacement_values)
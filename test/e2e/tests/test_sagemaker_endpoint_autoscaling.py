@@ -13,73 +13,67 @@
 """Integration tests for the Application Auto Scaling ScalingPolicy API.
 """
 
-import boto3
 import botocore
 import pytest
 import datetime
 import logging
 from typing import Dict, Tuple
 
-from acktest.resources import random_suffix_name
 from acktest.k8s import resource as k8s
-from time import sleep
 
 from e2e import service_marker, create_applicationautoscaling_resource
 
 from e2e.replacement_values import REPLACEMENT_VALUES
 from e2e.bootstrap_resources import TestBootstrapResources, get_bootstrap_resources
-from e2e.common.sagemaker_utils import (
-    sagemaker_client,
-    wait_sagemaker_endpoint_status,
-    sagemaker_make_model,
-    sagemaker_make_endpoint_config,
-    sagemaker_make_endpoint,
+from e2e.common import describe, timing
+from e2e.common.workers import (
+    claim_resource_id,
+    ledger,
+    release_resource_id,
+    unique_name,
 )
+from e2e.common.utils import application_autoscaling_client
+from e2e.common.waiter import watch_until
+from e2e.common.watch_events import WatchEventCounter
 
 TARGET_RESOURCE_PLURAL = "scalabletargets"
 POLICY_RESOURCE_PLURAL = "scalingpolicies"
-ENDPOINT_STATUS_INSERVICE = "InService"
-
-
-@pytest.fixture(scope="module")
-def name_suffix():
-    return random_suffix_name("sagemaker-endpoint", 32)
+# Writes an update may cause: the spec patch itself, the controller's status
+# patch and the patch recording the ScalableTarget's spec fingerprint
+MAX_WRITES_PER_UPDATE = 3
+# How long writes are still counted after an update is observed, so that the
+# status patch ending its reconcile, and any reconcile that patch triggers,
+# count as well
+UPDATE_SETTLE_SECONDS = 30
 
 
 @pytest.fixture(scope="module")
 def applicationautoscaling_client():
-    return boto3.client("application-autoscaling")
+    return application_autoscaling_client()
 
 
 @pytest.fixture(scope="module")
-def sagemaker_endpoint(name_suffix):
-    model_name = name_suffix + "-model"
-    endpoint_config_name = name_suffix + "-config"
-    endpoint_name = name_suffix
-    variant_name = "variant-1"
-    resource_id = f"endpoint/{endpoint_name}/variant/variant-1"
-
-    model_input, model_response = sagemaker_make_model(model_name)
-    endpoint_config_input, endpoint_config_response = sagemaker_make_endpoint_config(
-        model_name, variant_name, endpoint_config_name
-    )
-    endpoint_input, endpoint_response = sagemaker_make_endpoint(
-        endpoint_name, endpoint_config_name
+def sagemaker_endpoint(endpoint_pool):
+    lease = endpoint_pool.acquire()
+    claim_resource_id(lease.resource_id)
+    token = ledger().record(
+        "endpoint_lease",
+        pool=endpoint_pool.name,
+        endpoint=lease.endpoint_name,
+        owner=lease.owner,
     )
 
-    wait_sagemaker_endpoint_status(endpoint_name, ENDPOINT_STATUS_INSERVICE)
-    assert resource_id is not None
+    yield lease.resource_id, lease.endpoint_name, lease.variant_name
 
-    yield resource_id, endpoint_name, variant_name
-    sagemaker_client().delete_endpoint(EndpointName=endpoint_name)
-    sagemaker_client().delete_endpoint_config(EndpointConfigName=endpoint_config_name)
-    sagemaker_client().delete_model(ModelName=model_name)
+    endpoint_pool.release(lease)
+    release_resource_id(lease.resource_id)
+    ledger().release(token)
 
 
 @pytest.fixture(scope="module")
 def generate_sagemaker_target(sagemaker_endpoint):
     resource_id, endpoint_name, variant_name = sagemaker_endpoint
-    target_resource_name = random_suffix_name("sagemaker-scalable-target", 32)
+    target_resource_name = unique_name("sagemaker-scalable-target", 32)
 
     replacements = REPLACEMENT_VALUES.copy()
     replacements["SCALABLETARGET_NAME"] = target_resource_name
@@ -96,6 +90,9 @@ def generate_sagemaker_target(sagemaker_endpoint):
         replacements=replacements,
     )
 
+    token = ledger().record(
+        "custom_resource", plural=TARGET_RESOURCE_PLURAL, name=target_resource_name
+    )
     assert target_resource is not None
 
     yield (
@@ -110,6 +107,7 @@ def generate_sagemaker_target(sagemaker_endpoint):
     if k8s.get_resource_exists(target_reference):
         _, deleted = k8s.delete_custom_resource(target_reference)
         assert deleted
+    ledger().release(token)
 
 
 @pytest.fixture(scope="module")
@@ -122,7 +120,7 @@ def generate_sagemaker_policy_A(generate_sagemaker_target):
         target_spec,
         target_resource,
     ) = generate_sagemaker_target
-    policy_resource_name = random_suffix_name("sagemaker-scaling-policy-a", 32)
+    policy_resource_name = unique_name("sagemaker-scaling-policy-a", 32)
 
     replacements = REPLACEMENT_VALUES.copy()
     replacements["SCALINGPOLICY_NAME"] = policy_resource_name
@@ -139,6 +137,9 @@ def generate_sagemaker_policy_A(generate_sagemaker_target):
         replacements=replacements,
     )
 
+    token = ledger().record(
+        "custom_resource", plural=POLICY_RESOURCE_PLURAL, name=policy_resource_name
+    )
     assert policy_resource is not None
 
     yield (
@@ -154,6 +155,7 @@ def generate_sagemaker_policy_A(generate_sagemaker_target):
     if k8s.get_resource_exists(policy_reference):
         _, deleted = k8s.delete_custom_resource(policy_reference)
         assert deleted
+    ledger().release(token)
 
 
 @pytest.fixture(scope="module")
@@ -166,7 +168,7 @@ def generate_sagemaker_policy_B(generate_sagemaker_target):
         target_spec,
         target_resource,
     ) = generate_sagemaker_target
-    policy_resource_name = random_suffix_name("sagemaker-scaling-policy-b", 32)
+    policy_resource_name = unique_name("sagemaker-scaling-policy-b", 32)
 
     replacements = REPLACEMENT_VALUES.copy()
     replacements["SCALINGPOLICY_NAME"] = policy_resource_name
@@ -185,6 +187,9 @@ def generate_sagemaker_policy_B(generate_sagemaker_target):
         replacements=replacements,
     )
 
+    token = ledger().record(
+        "custom_resource", plural=POLICY_RESOURCE_PLURAL, name=policy_resource_name
+    )
     assert policy_resource is not None
 
     yield (
@@ -197,6 +202,7 @@ def generate_sagemaker_policy_B(generate_sagemaker_target):
     if k8s.get_resource_exists(policy_reference):
         _, deleted = k8s.delete_custom_resource(policy_reference)
         assert deleted
+    ledger().release(token)
 
 
 @service_marker
@@ -205,31 +211,45 @@ class TestSageMakerEndpointAutoscaling:
     def wait_until_update(
         self, reference, previous_modified_time, wait_period=2, wait_time=30
     ):
-        for i in range(wait_period):
-            resource = k8s.get_resource(reference)
-            assert resource is not None
-            assert "lastModifiedTime" in resource["status"]
-            last_modified_time = resource["status"]["lastModifiedTime"]
-            d1 = datetime.datetime.strptime(last_modified_time, "%Y-%m-%dT%H:%M:%SZ")
-            d2 = datetime.datetime.strptime(
-                previous_modified_time, "%Y-%m-%dT%H:%M:%SZ"
+        previous = datetime.datetime.strptime(
+            previous_modified_time, "%Y-%m-%dT%H:%M:%SZ"
+        )
+
+        def updated(resource):
+            if resource is None:
+                pytest.fail(f"{reference.name} was deleted while waiting for an update")
+            last_modified_time = resource.get("status", {}).get("lastModifiedTime")
+            if last_modified_time is None:
+                return False
+            current = datetime.datetime.strptime(
+                last_modified_time, "%Y-%m-%dT%H:%M:%SZ"
             )
-            if d1 > d2:
-                return True
-            sleep(wait_time)
-        return False
+            return current > previous
+
+        result = watch_until(
+            reference,
+            updated,
+            timeout=wait_period * wait_time,
+            description=f"{reference.name} lastModifiedTime update",
+        )
+        if result.satisfied:
+            timing.record("time_to_converge", result.elapsed, resource=reference.name)
+        return result.satisfied
 
     def get_sagemaker_scalable_target_description(
         self, applicationautoscaling_client, resource_id: str, expectedTargets: int
     ):
         try:
-            targets = applicationautoscaling_client.describe_scalable_targets(
-                ServiceNamespace="sagemaker",
-                ResourceIds=[resource_id],
+            targets = list(
+                describe.scalable_targets(
+                    "sagemaker",
+                    resource_ids=[resource_id],
+                    client=applicationautoscaling_client,
+                )
             )
 
-            assert len(targets["ScalableTargets"]) == expectedTargets
-            return targets["ScalableTargets"]
+            assert len(targets) == expectedTargets
+            return targets
         except botocore.exceptions.ClientError as error:
             logging.error(
                 f"ApplicationAutoscaling could not find a scalableTarget for the resource {resource_id}. Error {error}."
@@ -240,12 +260,14 @@ class TestSageMakerEndpointAutoscaling:
         self, applicationautoscaling_client, resource_id: str, policy_name: str
     ):
         try:
-            policies = applicationautoscaling_client.describe_scaling_policies(
-                ServiceNamespace="sagemaker",
-                ResourceId=resource_id,
-                PolicyNames=[policy_name],
+            return list(
+                describe.scaling_policies(
+                    "sagemaker",
+                    resource_id=resource_id,
+                    policy_names=[policy_name],
+                    client=applicationautoscaling_client,
+                )
             )
-            return policies["ScalingPolicies"]
         except botocore.exceptions.ClientError as error:
             logging.error(
                 f"ApplicationAutoscaling could not find a scalingPolicy for the resource {resource_id}, policyName {policy_name}. Error {error}."
@@ -318,8 +340,12 @@ class TestSageMakerEndpointAutoscaling:
         target_spec["spec"]["maxCapacity"] = updatedMaxCapacity
         assert "lastModifiedTime" in target_resource["status"]
         last_modified_time = target_resource["status"]["lastModifiedTime"]
-        k8s.patch_custom_resource(target_reference, target_spec)
-        assert self.wait_until_update(target_reference, last_modified_time) == True
+        with WatchEventCounter([TARGET_RESOURCE_PLURAL], settle=UPDATE_SETTLE_SECONDS) as events:
+            k8s.patch_custom_resource(target_reference, target_spec)
+            assert self.wait_until_update(target_reference, last_modified_time) == True
+        target_writes = events.modified(TARGET_RESOURCE_PLURAL, target_reference.name)
+        logging.info(f"ScalableTarget update caused {target_writes} writes")
+        assert target_writes <= MAX_WRITES_PER_UPDATE
 
         updated_target_description = self.get_sagemaker_scalable_target_description(
             applicationautoscaling_client, resource_id, 1
@@ -333,8 +359,12 @@ class TestSageMakerEndpointAutoscaling:
         ] = updatedTargetValue
         assert "lastModifiedTime" in policy_resource["status"]
         last_modified_time = policy_resource["status"]["lastModifiedTime"]
-        k8s.patch_custom_resource(policy_reference, policy_spec)
-        assert self.wait_until_update(policy_reference, last_modified_time) == True
+        with WatchEventCounter([POLICY_RESOURCE_PLURAL], settle=UPDATE_SETTLE_SECONDS) as events:
+            k8s.patch_custom_resource(policy_reference, policy_spec)
+            assert self.wait_until_update(policy_reference, last_modified_time) == True
+        policy_writes = events.modified(POLICY_RESOURCE_PLURAL, policy_reference.name)
+        logging.info(f"ScalingPolicy update caused {policy_writes} writes")
+        assert policy_writes <= MAX_WRITES_PER_UPDATE
 
         updated_policy_description = self.get_sagemaker_scaling_policy_description(
             applicationautoscaling_client,
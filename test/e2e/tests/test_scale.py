@@ -0,0 +1,82 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Scale tests creating many ScalableTargets and ScalingPolicies at once.
+
+The fleet tests are meant for a kind/envtest cluster whose controller and
+metrics endpoint (ACK_CONTROLLER_METRICS_URL) point at local stand-ins, and
+only run with --runslow.
+"""
+
+import json
+import logging
+
+import pytest
+
+from e2e import service_marker
+from e2e.common.janitor import DEFAULT_PREFIXES, owned_by_tests
+from e2e.common.scale import ScaleHarness, event_resource, has_arn, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 90) == 5
+    assert percentile(values, 100) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([], 50) is None
+
+
+def test_error_events_carry_no_resource():
+    resource = {
+        "metadata": {"name": "policy"},
+        "status": {"ackResourceMetadata": {"arn": "arn:aws:autoscaling:policy"}},
+    }
+    assert event_resource({"type": "MODIFIED", "object": resource}) is resource
+    assert has_arn(resource)
+
+    gone = {"type": "ERROR", "object": {"kind": "Status", "code": 410, "reason": "Expired"}}
+    assert event_resource(gone) is None
+
+
+def test_janitor_recognises_harness_names():
+    harness = ScaleHarness(1, 1)
+    assert harness.name_prefix.startswith("ack-scale-")
+    assert owned_by_tests(f"endpoint/{harness.name_prefix}-0/variant/variant-1", DEFAULT_PREFIXES)
+    assert not owned_by_tests("endpoint/scale-prod/variant/variant-1", DEFAULT_PREFIXES)
+
+
+@pytest.fixture
+def scale_harness(request):
+    targets, policies_per_target = request.param
+    harness = ScaleHarness(targets, policies_per_target)
+    yield harness
+    harness.cleanup()
+
+
+@service_marker
+@pytest.mark.slow
+class TestScale:
+    @pytest.mark.parametrize(
+        "scale_harness", [(10, 2), (100, 2), (250, 4)], indirect=True
+    )
+    def test_fleet_converges(self, scale_harness):
+        report = scale_harness.run(timeout=900)
+        logging.info(json.dumps(report.to_dict(), indent=2, default=str))
+
+        assert report.failed == {}
+        assert report.unsynced == []
+        assert report.target_time_to_synced.count == scale_harness.targets
+        assert (
+            report.policy_time_to_synced.count
+            == scale_harness.targets * scale_harness.policies_per_target
+        )
@@ -0,0 +1,95 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the sharded mode helpers."""
+
+import datetime
+from collections import Counter
+
+from e2e.common.sharding import (
+    GROUP_LABEL,
+    ROLE_LABEL,
+    SHARD_LABEL,
+    balanced_namespaces,
+    ownership,
+    shard_of,
+)
+
+NOW = datetime.datetime(2026, 10, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def lease(role, holder, age=0, shard=None, group="ack-applicationautoscaling"):
+    labels = {GROUP_LABEL: group, ROLE_LABEL: role}
+    if shard is not None:
+        labels[SHARD_LABEL] = str(shard)
+    renewed = NOW - datetime.timedelta(seconds=age)
+    return {
+        "metadata": {"labels": labels},
+        "spec": {
+            "holderIdentity": holder,
+            "leaseDurationSeconds": 15,
+            "renewTime": renewed.isoformat().replace("+00:00", "Z"),
+        },
+    }
+
+
+def test_shard_of_is_stable_and_in_range():
+    keys = [f"team-{i}" for i in range(2000)]
+    shards = [shard_of(key, 16) for key in keys]
+    assert shards == [shard_of(key, 16) for key in keys]
+    assert set(shards) == set(range(16))
+    # Roughly uniform: no shard gets twice its fair share
+    assert max(Counter(shards).values()) < 2 * len(keys) / 16
+    assert shard_of("anything", 1) == 0
+
+
+def test_adding_a_shard_only_moves_keys_to_it():
+    keys = [f"ns-{i}" for i in range(2000)]
+    moved = [key for key in keys if shard_of(key, 8) != shard_of(key, 9)]
+    assert all(shard_of(key, 9) == 8 for key in moved)
+    assert 0.05 < len(moved) / len(keys) < 0.2
+
+
+def test_balanced_namespaces_cover_every_shard_equally():
+    names = balanced_namespaces("bench", 8, per_shard=3)
+    assert len(names) == len(set(names)) == 24
+    assert Counter(shard_of(name, 8) for name in names) == {s: 3 for s in range(8)}
+
+
+def test_ownership_ignores_expired_and_foreign_leases():
+    owned = ownership(
+        [
+            lease("member", "replica-a"),
+            lease("member", "replica-b", age=5),
+            lease("member", "replica-c", age=60),
+            lease("shard", "replica-a", shard=0),
+            lease("shard", "replica-b", shard=1),
+            lease("shard", "replica-c", shard=2, age=60),
+            lease("shard", "", shard=3),
+            lease("shard", "other", shard=3, group="another-controller"),
+        ],
+        now=NOW,
+    )
+    assert owned.members == ["replica-a", "replica-b"]
+    assert owned.owners == {0: "replica-a", 1: "replica-b"}
+    assert owned.shards_of("replica-a") == [0]
+    assert not owned.balanced(4)
+
+
+def test_balanced_requires_even_shares_of_live_members():
+    members = [lease("member", m) for m in ("a", "b", "c")]
+    even = [lease("shard", "abc"[s % 3], shard=s) for s in range(8)]
+    assert ownership(members + even, now=NOW).balanced(8)
+
+    skewed = [lease("shard", "a" if s < 5 else "b", shard=s) for s in range(7)]
+    skewed.append(lease("shard", "c", shard=7))
+    assert not ownership(members + skewed, now=NOW).balanced(8)
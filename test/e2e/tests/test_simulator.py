@@ -0,0 +1,142 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the scaling policy simulator."""
+
+import pytest
+import yaml
+
+from e2e import resource_directory
+from e2e.common.simulator import (
+    MetricSeries,
+    SimulationPolicy,
+    capacity_bounds,
+    load_series,
+    simulate,
+    sweep,
+)
+from e2e.common.targets import SAGEMAKER_VARIANT, ScalableTarget, ScalingPolicy
+
+
+def spec(file_name: str) -> dict:
+    with open(resource_directory / file_name) as f:
+        return yaml.safe_load(f)["spec"]
+
+
+def spike(before: int = 30, during: int = 60, after: int = 60, load: float = 250.0):
+    """One datapoint per minute: quiet, then `load` for `during` minutes."""
+    return MetricSeries.of([50.0] * before + [load] * during + [50.0] * after)
+
+
+class TestSimulator:
+    def test_policy_from_resource_specs(self):
+        policy = SimulationPolicy.from_policy(spec("sagemaker_endpoint_autoscaling_policy.yaml"))
+        assert (policy.target_value, policy.scale_in_cooldown, policy.scale_out_cooldown) == (
+            60.0,
+            700.0,
+            300.0,
+        )
+        assert capacity_bounds(spec("sagemaker_endpoint_autoscaling_target.yaml")) == (1, 2)
+
+        target = ScalableTarget(SAGEMAKER_VARIANT, "endpoint/e/variant/v", 1, 8)
+        api_policy = SimulationPolicy.from_policy(
+            ScalingPolicy.target_tracking(target, "p", 70.0, 700, 300)
+        )
+        assert api_policy.target_value == 70.0
+        assert capacity_bounds(target) == (1, 8)
+
+    def test_target_tracking_follows_demand(self):
+        policy = SimulationPolicy(target_value=70.0, scale_in_cooldown=700, scale_out_cooldown=300)
+        result = simulate(spike(), policy, min_capacity=1, max_capacity=8)
+
+        # Three datapoints above the target, then enough capacity for 250/70
+        assert result.capacity[29] == 1
+        assert result.capacity[33] == 4
+        assert result.peak_capacity == 4
+        assert result.scale_outs == 1
+        # Back to one instance once the low alarm and cooldowns allow it
+        assert result.scale_ins == 1
+        assert result.capacity[-1] == 1
+        assert result.slo_breach_minutes == 3
+        assert 30 / 60 < result.instance_hours < 150 * 4 / 60
+
+    def test_max_capacity_bounds_the_simulation(self):
+        policy = SimulationPolicy.from_policy(spec("sagemaker_endpoint_autoscaling_policy.yaml"))
+        result = simulate(spike(), policy, *capacity_bounds(spec("sagemaker_endpoint_autoscaling_target.yaml")))
+        assert result.peak_capacity == 2
+        # Two instances cannot bring 250 below the target of 60
+        assert result.slo_breach_minutes == 60
+
+    def test_provisioning_delay_adds_breaches(self):
+        policy = SimulationPolicy(target_value=70.0)
+        fast = simulate(spike(), policy, 1, 8)
+        slow = simulate(spike(), policy, 1, 8, provisioning_delay=600)
+        # The scale-out happens at minute 32 and serves from minute 42
+        assert slow.slo_breach_minutes == fast.slo_breach_minutes + 9
+        assert slow.instance_hours == pytest.approx(fast.instance_hours)
+
+    def test_step_scaling(self):
+        policy = SimulationPolicy.from_policy(
+            {
+                "PolicyType": "StepScaling",
+                "StepScalingPolicyConfiguration": {
+                    "AdjustmentType": "ChangeInCapacity",
+                    "Cooldown": 120,
+                    "StepAdjustments": [
+                        {"MetricIntervalLowerBound": 0, "MetricIntervalUpperBound": 50, "ScalingAdjustment": 1},
+                        {"MetricIntervalLowerBound": 50, "ScalingAdjustment": 2},
+                    ],
+                },
+            },
+            alarm_threshold=100.0,
+            scale_out_datapoints=1,
+        )
+        result = simulate(spike(), policy, 1, 10)
+        # 250 on one instance is 150 over the threshold: +2, then 83 per
+        # instance is under it
+        assert result.capacity[31] == 3
+        assert result.scale_outs == 1
+        with pytest.raises(ValueError):
+            SimulationPolicy.from_policy({"PolicyType": "StepScaling"})
+
+    def test_sweep_in_parallel(self):
+        series = spike()
+        policy = SimulationPolicy()
+        grid = {"target_value": [50.0, 70.0], "scale_out_cooldown": [60, 300], "max_capacity": [3, 8]}
+        parallel = sweep(series, policy, 1, 8, grid, processes=2)
+        sequential = sweep(series, policy, 1, 8, grid, processes=1)
+        assert parallel == sequential
+        assert len(parallel) == 8
+        assert parallel[0]["parameters"] == {"target_value": 50.0, "scale_out_cooldown": 60, "max_capacity": 3}
+        unbounded = {
+            r["parameters"]["target_value"]: r
+            for r in parallel
+            if r["parameters"]["max_capacity"] == 8 and r["parameters"]["scale_out_cooldown"] == 300
+        }
+        assert unbounded[50.0]["peak_capacity"] == 5
+        assert unbounded[70.0]["peak_capacity"] == 4
+        assert unbounded[50.0]["instance_hours"] > unbounded[70.0]["instance_hours"]
+        with pytest.raises(ValueError):
+            sweep(series, policy, 1, 8, {"unknown": [1]})
+
+    def test_load_csv_series(self, tmp_path):
+        path = tmp_path / "series.csv"
+        path.write_text(
+            "timestamp,value\n"
+            "2024-05-02T10:00:00Z,10\n"
+            "2024-05-02T10:01:00Z,20\n"
+            "1714644120,30\n"
+        )
+        series = load_series(str(path))
+        assert list(series.values) == [10.0, 20.0, 30.0]
+        assert series.times[1] - series.times[0] == 60
+        assert series.times[2] - series.times[1] == 60
@@ -0,0 +1,154 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the local Application Auto Scaling stand-in.
+"""
+
+import boto3
+import botocore
+import pytest
+from botocore.config import Config
+
+from e2e.common.utils import (
+    application_autoscaling_client,
+    sagemaker_endpoint_delete_scaling_policy,
+    sagemaker_endpoint_deregister_scalable_target,
+    sagemaker_endpoint_describe_scalable_target,
+    sagemaker_endpoint_describe_scaling_policy,
+    sagemaker_endpoint_put_scaling_policy,
+    sagemaker_endpoint_register_scalable_target,
+)
+from e2e.standins.applicationautoscaling import (
+    StandInConfig,
+    remote_configure,
+    remote_stats,
+)
+
+RESOURCE_ID = "endpoint/standin/variant/variant-1"
+
+
+class TestApplicationAutoScalingStandIn:
+    def test_create_update_delete_cycle(self, applicationautoscaling_standin):
+        sagemaker_endpoint_register_scalable_target(RESOURCE_ID)
+        targets = sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)
+        assert len(targets["ScalableTargets"]) == 1
+        assert targets["ScalableTargets"][0]["MaxCapacity"] == 2
+        assert targets["ScalableTargets"][0]["RoleARN"]
+
+        policy_arn = sagemaker_endpoint_put_scaling_policy(RESOURCE_ID, "policy")[
+            "PolicyARN"
+        ]
+        policies = sagemaker_endpoint_describe_scaling_policy(RESOURCE_ID, "policy")
+        assert policies["ScalingPolicies"][0]["PolicyARN"] == policy_arn
+        config = policies["ScalingPolicies"][0]["TargetTrackingScalingPolicyConfiguration"]
+        assert config["TargetValue"] == 70.0
+
+        application_autoscaling_client().register_scalable_target(
+            ServiceNamespace="sagemaker",
+            ResourceId=RESOURCE_ID,
+            ScalableDimension="sagemaker:variant:DesiredInstanceCount",
+            MaxCapacity=4,
+        )
+        targets = sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)
+        assert targets["ScalableTargets"][0]["MaxCapacity"] == 4
+
+        sagemaker_endpoint_delete_scaling_policy(RESOURCE_ID, "policy")
+        sagemaker_endpoint_deregister_scalable_target(RESOURCE_ID)
+        assert sagemaker_endpoint_describe_scaling_policy(RESOURCE_ID, "policy")[
+            "ScalingPolicies"
+        ] == []
+        assert sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)[
+            "ScalableTargets"
+        ] == []
+
+        calls = applicationautoscaling_standin.backend.stats()["calls"]
+        assert calls["DeleteScalingPolicy"] == 1
+        assert calls["DeregisterScalableTarget"] == 1
+
+    def test_policy_requires_registered_target(self, applicationautoscaling_standin):
+        with pytest.raises(botocore.exceptions.ClientError) as err:
+            sagemaker_endpoint_put_scaling_policy(RESOURCE_ID, "policy")
+        assert err.value.response["Error"]["Code"] == "ObjectNotFoundException"
+
+    def test_rejected_register_leaves_state_unchanged(self, applicationautoscaling_standin):
+        client = application_autoscaling_client()
+        dimension = "sagemaker:variant:DesiredInstanceCount"
+        with pytest.raises(botocore.exceptions.ClientError) as err:
+            client.register_scalable_target(
+                ServiceNamespace="sagemaker",
+                ResourceId=RESOURCE_ID,
+                ScalableDimension=dimension,
+                MinCapacity=3,
+                MaxCapacity=2,
+            )
+        assert err.value.response["Error"]["Code"] == "ValidationException"
+        assert sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)[
+            "ScalableTargets"
+        ] == []
+
+        sagemaker_endpoint_register_scalable_target(RESOURCE_ID)
+        before = sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)
+        with pytest.raises(botocore.exceptions.ClientError) as err:
+            client.register_scalable_target(
+                ServiceNamespace="sagemaker",
+                ResourceId=RESOURCE_ID,
+                ScalableDimension=dimension,
+                MinCapacity=5,
+                SuspendedState={"DynamicScalingInSuspended": True},
+            )
+        assert err.value.response["Error"]["Code"] == "ValidationException"
+        after = sagemaker_endpoint_describe_scalable_target(RESOURCE_ID)
+        assert after["ScalableTargets"] == before["ScalableTargets"]
+
+    def test_pagination(self, applicationautoscaling_standin):
+        applicationautoscaling_standin.backend.config.page_size = 3
+        for i in range(7):
+            sagemaker_endpoint_register_scalable_target(f"endpoint/e{i}/variant/v")
+
+        paginator = application_autoscaling_client().get_paginator(
+            "describe_scalable_targets"
+        )
+        pages = list(paginator.paginate(ServiceNamespace="sagemaker"))
+        assert [len(p["ScalableTargets"]) for p in pages] == [3, 3, 1]
+
+    def test_throttling(self, applicationautoscaling_standin):
+        backend = applicationautoscaling_standin.backend
+        backend.config = StandInConfig(throttle_probability=1.0)
+        backend.reset()
+
+        # Built directly so boto3's own retries do not hide the throttle
+        client = boto3.client(
+            "application-autoscaling",
+            endpoint_url=applicationautoscaling_standin.endpoint_url,
+            config=Config(retries={"total_max_attempts": 1}),
+        )
+        with pytest.raises(botocore.exceptions.ClientError) as err:
+            client.describe_scalable_targets(ServiceNamespace="sagemaker")
+        assert err.value.response["Error"]["Code"] == "ThrottlingException"
+        assert backend.stats()["throttled"]["DescribeScalableTargets"] == 1
+
+    def test_config_route(self, applicationautoscaling_standin):
+        remote_configure(
+            applicationautoscaling_standin.endpoint_url,
+            tps_limits={"DescribeScalableTargets": 1},
+        )
+        assert remote_stats(applicationautoscaling_standin.endpoint_url)["calls"] == {}
+
+        client = boto3.client(
+            "application-autoscaling",
+            endpoint_url=applicationautoscaling_standin.endpoint_url,
+            config=Config(retries={"total_max_attempts": 1}),
+        )
+        client.describe_scalable_targets(ServiceNamespace="sagemaker")
+        with pytest.raises(botocore.exceptions.ClientError) as err:
+            client.describe_scalable_targets(ServiceNamespace="sagemaker")
+        assert err.value.response["Error"]["Code"] == "ThrottlingException"
@@ -0,0 +1,117 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the multi-namespace scalable target helpers, run against
+the local Application Auto Scaling stand-in.
+"""
+
+from collections import Counter
+
+from e2e.common.targets import (
+    DYNAMODB_INDEX_READ,
+    DYNAMODB_TABLE_WRITE,
+    ECS_SERVICE,
+    LAMBDA_PROVISIONED_CONCURRENCY,
+    SAGEMAKER_VARIANT,
+    ScalableTarget,
+    ScalingPolicy,
+    delete_policies,
+    deregister_targets,
+    describe_policies,
+    describe_targets,
+    put_policies,
+    register_targets,
+)
+
+
+def mixed_fleet(count: int):
+    targets = []
+    for i in range(count):
+        targets += [
+            ScalableTarget(
+                SAGEMAKER_VARIANT,
+                SAGEMAKER_VARIANT.resource_id(endpoint=f"endpoint-{i}", variant="v1"),
+            ),
+            ScalableTarget(ECS_SERVICE, ECS_SERVICE.resource_id(cluster="c", service=f"s{i}"), 1, 4),
+            ScalableTarget(DYNAMODB_TABLE_WRITE, DYNAMODB_TABLE_WRITE.resource_id(table=f"t{i}"), 5, 10),
+            ScalableTarget(
+                DYNAMODB_INDEX_READ,
+                DYNAMODB_INDEX_READ.resource_id(table=f"t{i}", index="by-date"),
+                5,
+                10,
+            ),
+            ScalableTarget(
+                LAMBDA_PROVISIONED_CONCURRENCY,
+                LAMBDA_PROVISIONED_CONCURRENCY.resource_id(function=f"f{i}", qualifier="live"),
+            ),
+        ]
+    return targets
+
+
+def describe_calls(standin) -> Counter:
+    return Counter(
+        (operation, params["ServiceNamespace"])
+        for operation, params in standin.backend.requests
+        if operation.startswith("Describe")
+    )
+
+
+class TestTargets:
+    def test_resource_ids_follow_the_type_format(self):
+        assert ECS_SERVICE.resource_id(cluster="c", service="s") == "service/c/s"
+        assert LAMBDA_PROVISIONED_CONCURRENCY.resource_id(
+            function="f", qualifier="1"
+        ) == "function:f:1"
+
+    def test_fleet_is_verified_with_one_describe_per_namespace(
+        self, applicationautoscaling_standin
+    ):
+        standin = applicationautoscaling_standin
+        standin.backend.config.page_size = 7
+        targets = mixed_fleet(12)
+        policies = [ScalingPolicy.target_tracking(t, "cpu") for t in targets]
+
+        assert register_targets(targets).ok
+        assert put_policies(policies).ok
+        keys = [t.key for t in targets]
+        # A target that was never registered is reported as missing
+        missing = ECS_SERVICE.key("service/c/missing")
+
+        standin.backend.requests.clear()
+        described = describe_targets(keys + [missing])
+        attached = describe_policies(keys)
+        calls = describe_calls(standin)
+
+        assert described[missing] is None
+        for target in targets:
+            assert described[target.key]["MaxCapacity"] == target.max_capacity
+            assert list(attached[target.key]) == ["cpu"]
+        # sagemaker, ecs, dynamodb and lambda: one paginated scan each,
+        # however many targets share the namespace
+        namespaces = {"sagemaker", "ecs", "dynamodb", "lambda"}
+        assert {ns for _, ns in calls} == namespaces
+        pages = sum(calls.values())
+        assert pages <= 2 * len(namespaces) * (1 + 24 // 7)
+        assert pages < len(targets)
+
+    def test_batch_delete_reports_failures_per_item(self, applicationautoscaling_standin):
+        targets = mixed_fleet(2)
+        policies = [ScalingPolicy.target_tracking(t, "cpu") for t in targets]
+        register_targets(targets)
+        put_policies(policies[1:])
+
+        deleted = delete_policies(policies)
+        assert set(deleted.failed) == {(targets[0].key, "cpu")}
+        assert len(deleted.succeeded) == len(policies) - 1
+
+        assert deregister_targets([t.key for t in targets]).ok
+        assert applicationautoscaling_standin.backend.stats()["targets"] == 0
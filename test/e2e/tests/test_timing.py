@@ -0,0 +1,61 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the per-test timing report.
+"""
+
+import json
+
+from e2e.common.timing import TimingReport
+from e2e.common.waiter import Backoff, FakeClock, poll_until
+
+
+class TestTimingReport:
+    def test_attributes_waits_and_measurements_to_test(self):
+        report = TimingReport()
+        poll_until(lambda: True, bool, 10, clock=FakeClock(), description="before")
+
+        report.begin("test_a")
+        statuses = iter([False, True])
+        poll_until(
+            lambda: next(statuses),
+            bool,
+            10,
+            backoff=Backoff(initial=2, jitter=0),
+            clock=FakeClock(),
+            description="policy synced",
+        )
+        report.record("time_to_converge", 2.0, resource="policy")
+        report.add_phase("test_a", "setup", 0.5, "passed")
+        report.add_phase("test_a", "call", 1.5, "failed")
+        report.end("test_a")
+        report.record("session_setup", 3.0)
+
+        test = report.to_dict()["tests"][0]
+        assert test["outcome"] == "failed"
+        assert test["seconds"] == 2.0
+        assert [w["description"] for w in test["waits"]] == ["policy synced"]
+        assert test["waits"][0]["seconds"] == 2
+        assert test["measurements"] == [
+            {"name": "time_to_converge", "seconds": 2.0, "labels": {"resource": "policy"}}
+        ]
+        assert report.to_dict()["measurements"][0]["name"] == "session_setup"
+
+    def test_write(self, tmp_path):
+        report = TimingReport()
+        report.begin("test_b")
+        report.add_phase("test_b", "call", 1.0, "passed")
+        report.end("test_b")
+
+        path = tmp_path / "timing.json"
+        report.write(str(path))
+        assert json.loads(path.read_text())["tests"][0]["nodeid"] == "test_b"
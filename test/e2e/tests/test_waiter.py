@@ -0,0 +1,151 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the e2e waiters.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from e2e.common.waiter import (
+    Backoff,
+    FakeClock,
+    FakeWatchSource,
+    WatchSource,
+    poll_until,
+    watch_until,
+)
+
+REFERENCE = SimpleNamespace(plural="scalingpolicies", name="policy")
+
+
+class TestPollUntil:
+    def test_returns_on_first_probe(self):
+        clock = FakeClock()
+        result = poll_until(lambda: "InService", lambda s: s == "InService", 60, clock=clock)
+
+        assert result.satisfied
+        assert result.attempts == 1
+        assert result.elapsed == 0
+        assert clock.sleeps == []
+
+    def test_backs_off_until_condition_holds(self):
+        clock = FakeClock()
+        statuses = iter(["Creating", "Creating", "Creating", "InService"])
+        backoff = Backoff(initial=1, maximum=4, multiplier=2, jitter=0)
+
+        result = poll_until(
+            lambda: next(statuses),
+            lambda s: s == "InService",
+            60,
+            backoff=backoff,
+            clock=clock,
+        )
+
+        assert result.satisfied
+        assert result.value == "InService"
+        assert clock.sleeps == [1, 2, 4]
+        assert result.elapsed == 7
+
+    def test_never_sleeps_past_deadline(self):
+        clock = FakeClock()
+        backoff = Backoff(initial=4, maximum=4, jitter=0)
+
+        result = poll_until(
+            lambda: "Creating", lambda s: s == "InService", 10, backoff=backoff, clock=clock
+        )
+
+        assert not result.satisfied
+        assert result.value == "Creating"
+        assert clock.sleeps == [4, 4, 2]
+        assert result.elapsed == 10
+
+    def test_jitter_stays_within_bounds(self):
+        backoff = Backoff(initial=2, maximum=16, multiplier=2, jitter=0.5)
+        delays = backoff.delays(random.Random(7))
+        for expected in [2, 4, 8, 16, 16]:
+            delay = next(delays)
+            assert expected / 2 <= delay <= expected
+
+
+class TestWatchUntil:
+    def test_returns_on_matching_event(self):
+        clock = FakeClock()
+        source = FakeWatchSource(
+            [
+                (0, {"status": {"lastModifiedTime": "old"}}),
+                (3, {"status": {"lastModifiedTime": "old"}}),
+                (2, {"status": {"lastModifiedTime": "new"}}),
+            ],
+            clock,
+        )
+
+        result = watch_until(
+            REFERENCE,
+            lambda obj: obj["status"]["lastModifiedTime"] == "new",
+            60,
+            source=source,
+            clock=clock,
+        )
+
+        assert result.satisfied
+        assert result.attempts == 3
+        assert result.elapsed == 5
+
+    def test_times_out_without_matching_event(self):
+        clock = FakeClock()
+        source = FakeWatchSource([(0, {"status": {}})], clock)
+
+        result = watch_until(
+            REFERENCE, lambda obj: "lastModifiedTime" in obj["status"], 30, source=source, clock=clock
+        )
+
+        assert not result.satisfied
+        assert result.elapsed == 30
+        assert result.value == {"status": {}}
+
+    def test_deletion_reaches_the_predicate_as_none(self):
+        clock = FakeClock()
+        source = FakeWatchSource([(0, {"status": {}}), (1, None)], clock)
+
+        result = watch_until(REFERENCE, lambda obj: obj is None, 30, source=source, clock=clock)
+
+        assert result.satisfied
+        assert result.value is None
+
+    def test_reopens_closed_stream_with_backoff(self):
+        clock = FakeClock()
+
+        class ClosingSource(WatchSource):
+            opened = 0
+
+            def stream(self, reference, timeout):
+                self.opened += 1
+                return iter(())
+
+        source = ClosingSource()
+        backoff = Backoff(initial=1, maximum=4, multiplier=2, jitter=0)
+
+        result = watch_until(
+            REFERENCE, lambda obj: False, 10, source=source, backoff=backoff, clock=clock
+        )
+
+        assert not result.satisfied
+        assert clock.sleeps == [1, 2, 4, 3]
+        assert source.opened == 4
+        assert result.elapsed == 10
+
+    def test_watch_source_is_abstract(self):
+        with pytest.raises(TypeError):
+            WatchSource()
@@ -0,0 +1,146 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+# 	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline tests for the coordination between parallel test workers.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from e2e.common import workers
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    monkeypatch.setenv(workers.STATE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv(workers.RUN_ID_ENV, "run-1")
+    monkeypatch.setattr(workers, "_ledger", None)
+    return tmp_path
+
+
+def as_worker(monkeypatch, worker: str):
+    monkeypatch.setenv(workers.XDIST_WORKER_ENV, worker)
+
+
+def hold_lock(state_dir: str, seconds: float, started):
+    import os
+
+    os.environ[workers.STATE_DIR_ENV] = state_dir
+    with workers.cross_worker_lock("bootstrap"):
+        started.set()
+        time.sleep(seconds)
+
+
+def record_and_exit(state_dir: str):
+    import os
+
+    os.environ[workers.STATE_DIR_ENV] = state_dir
+    os.environ[workers.RUN_ID_ENV] = "run-1"
+    os.environ[workers.XDIST_WORKER_ENV] = "gw7"
+    ledger = workers.ledger()
+    ledger.release(ledger.record("fake", name="released"))
+    ledger.record("fake", name="leaked")
+
+
+class TestNames:
+    def test_names_differ_between_workers(self, monkeypatch):
+        names = set()
+        for worker in ("gw0", "gw1", "gw10"):
+            as_worker(monkeypatch, worker)
+            for _ in range(50):
+                name = workers.unique_name("sagemaker-scalable-target", 32)
+                assert len(name) == 32
+                assert name.startswith("sagemaker-")
+                names.add(name)
+        assert len(names) == 150
+
+    def test_prefix_is_shortened_to_fit(self, monkeypatch):
+        as_worker(monkeypatch, "gw2")
+        name = workers.unique_name("scale", 16)
+        assert name.startswith("sca")
+        assert "-w2" in name
+        assert len(name) == 16
+
+
+class TestResourceIdClaims:
+    def test_other_workers_cannot_claim_the_same_id(self, state, monkeypatch):
+        resource_id = "endpoint/e/variant/variant-1"
+        as_worker(monkeypatch, "gw0")
+        workers.claim_resource_id(resource_id)
+        workers.claim_resource_id(resource_id)
+
+        as_worker(monkeypatch, "gw1")
+        with pytest.raises(workers.ResourceIdClaimedError, match="gw0"):
+            workers.claim_resource_id(resource_id)
+        workers.claim_resource_id("endpoint/other/variant/variant-1")
+
+
+class TestCrossWorkerLock:
+    def test_lock_is_exclusive_across_processes(self, state):
+        started = multiprocessing.Event()
+        holder = multiprocessing.Process(target=hold_lock, args=(str(state), 0.5, started))
+        holder.start()
+        try:
+            assert started.wait(10)
+            begin = time.monotonic()
+            with workers.cross_worker_lock("bootstrap"):
+                waited = time.monotonic() - begin
+        finally:
+            holder.join()
+        assert waited > 0.2
+
+
+class TestStateId:
+    def test_state_id_is_shared_by_one_state_directory(self, state, tmp_path, monkeypatch):
+        first = workers.state_id()
+        assert workers.state_id() == first
+
+        monkeypatch.setenv(workers.STATE_DIR_ENV, str(tmp_path / "other"))
+        assert workers.state_id() != first
+
+
+class TestLeftoverCleanup:
+    def test_finished_workers_leftovers_are_cleaned(self, state, monkeypatch):
+        cleaned = []
+        monkeypatch.setitem(workers._cleaners, "fake", lambda name: cleaned.append(name))
+
+        finished = multiprocessing.Process(target=record_and_exit, args=(str(state),))
+        finished.start()
+        finished.join()
+
+        # A worker that is still running is left alone
+        as_worker(monkeypatch, "gw0")
+        workers.ledger().record("fake", name="in-use")
+
+        result = workers.cleanup_worker_resources()
+        assert cleaned == ["leaked"]
+        assert result["skipped"] == ["run-1/gw0"]
+        assert len(result["deleted"]) == 1
+
+        # Running the cleanup again does not delete anything twice
+        workers.cleanup_worker_resources()
+        assert cleaned == ["leaked"]
+
+    def test_worker_cleans_its_own_leftovers(self, state, monkeypatch):
+        cleaned = []
+        monkeypatch.setitem(workers._cleaners, "fake", lambda name: cleaned.append(name))
+        as_worker(monkeypatch, "gw3")
+        ledger = workers.ledger()
+        ledger.release(ledger.record("fake", name="released"))
+        ledger.record("fake", name="leaked")
+
+        workers.cleanup_own_resources()
+        workers.cleanup_own_resources()
+        assert cleaned == ["leaked"]
+        assert workers.outstanding(ledger.path) == []